@@ -0,0 +1,135 @@
+"""
+Ausencias por cohorte de turno (alerta 'absence_alert')
+Una cohorte es un (departamento, turno) de schedule_rules con su hora de inicio del
+día en el calendario laboral (work_calendar.py: sin los festivos de los departamentos
+sin turnos). Por cada cohorte que trabaja hoy se programa un temporizador en la rueda
+(timing_wheel.py) a inicio + ABSENCE_GRACE_MINUTES; al vencer:
+
+    esperados = plantilla de la cohorte (empleados activos y turno de la semana)
+    ausentes  = esperados - llegados desde inicio - ABSENCE_EARLY_MINUTES
+
+La plantilla sale de un índice {cohorte: {employee_id: (nombre, depto)}} que se arma una vez
+por día (o tras invalidate(): cambios de empleados o turnos) con los empleados
+activos y el mapa de turnos; cada revisión solo recorre su cohorte. Los llegados
+salen de la proyección del dashboard, sin consultar la base de datos.
+
+A medianoche se programan las cohortes del día siguiente; una regla editada durante
+el día rige desde la planificación siguiente. Los empleados de un departamento por
+turnos sin turno asignado esa semana no se esperan.
+"""
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from timing_wheel import TimingWheel
+
+ABSENCE_GRACE_MINUTES = int(os.getenv('ABSENCE_GRACE_MINUTES', '15'))
+ABSENCE_EARLY_MINUTES = int(os.getenv('ABSENCE_EARLY_MINUTES', '180'))  # Marcajes que cuentan como llegada
+PLAN_KEY = ('absence_plan',)
+
+
+class AbsenceDetector:
+    def __init__(self, schedule_rules, work_calendar, shift_map, employees, arrived, on_absent, is_active=lambda: True,
+                 grace_minutes=ABSENCE_GRACE_MINUTES, early_minutes=ABSENCE_EARLY_MINUTES):
+        """
+        employees() -> {employee_id: (nombre, departamento)} de los empleados activos
+        arrived(employee_ids, since) -> ids con marcajes desde since ('YYYY-MM-DD HH:MM:SS')
+        on_absent(alerta) con cada cohorte que tiene ausentes; is_active(): si este proceso revisa
+        """
+        self.schedule_rules = schedule_rules
+        self.work_calendar = work_calendar
+        self.shift_map = shift_map
+        self.employees = employees
+        self.arrived = arrived
+        self.on_absent = on_absent
+        self.is_active = is_active
+        self.grace = timedelta(minutes=grace_minutes)
+        self.early = timedelta(minutes=early_minutes)
+
+        self.timers = TimingWheel(self._on_timer)
+        self._rosters = (None, None)  # (día 'YYYY-MM-DD', {(departamento, turno): {employee_id: (nombre, depto)}})
+        self._lock = threading.Lock()
+
+        self.stats = {'planned': 0, 'checks': 0, 'checked_employees': 0, 'absent': 0, 'roster_builds': 0}
+
+    def start(self):
+        self.plan()
+        self.timers.start()
+
+    def plan(self, day=None, now=None):
+        """Programar las revisiones de las cohortes de day (hoy) que aún no vencieron y la planificación siguiente"""
+        now = now or datetime.now()
+        day = day or now.date()
+        for rules in self.schedule_rules.cohorts(day.weekday()):
+            expected = self.work_calendar.expected_for(rules, day)
+            if not expected:
+                continue  # Festivo
+            start = datetime.combine(day, datetime.strptime(expected[0], '%H:%M').time())
+            deadline = start + self.grace
+            if deadline <= now:
+                continue
+            self.timers.schedule(('absence', day.isoformat(), rules.department, rules.shift_type), deadline.timestamp(), {
+                'day': day.isoformat(),
+                'department': rules.department,
+                'shift_type': rules.shift_type,
+                'expected_start': expected[0],
+                'since': (start - self.early).strftime('%Y-%m-%d %H:%M:%S')
+            })
+            self.stats['planned'] += 1
+        midnight = datetime.combine(day + timedelta(days=1), datetime.min.time())
+        self.timers.schedule(PLAN_KEY, midnight.timestamp(), {'day': (day + timedelta(days=1)).isoformat()})
+
+    def invalidate(self):
+        """Empleados o turnos modificados: rearmar las plantillas en la próxima revisión"""
+        with self._lock:
+            self._rosters = (None, None)
+
+    def roster(self, day, department, shift_type):
+        """{employee_id: (nombre, departamento)} esperados de la cohorte el día day ('YYYY-MM-DD')"""
+        with self._lock:
+            built_for, rosters = self._rosters
+        if built_for != day:
+            rosters = {}
+            assignments = self.shift_map.week(day)
+            for employee_id, employee in self.employees().items():
+                assignment = assignments.get(employee_id)
+                assigned = assignment[0] if assignment else None
+                rules = self.schedule_rules.rules_for(employee[1], assigned)
+                if rules.shift_type is not None and rules.shift_type != assigned:
+                    continue  # Departamento por turnos sin turno asignado (o con uno que no tiene)
+                if not self.work_calendar.expected_for(rules, day):
+                    continue
+                rosters.setdefault((rules.department, rules.shift_type), {})[employee_id] = employee
+            with self._lock:
+                self._rosters = (day, rosters)
+            self.stats['roster_builds'] += 1
+        return rosters.get((department, shift_type), {})
+
+    def check(self, cohort):
+        """Ausentes de una cohorte: plantilla menos llegados (una diferencia de conjuntos)"""
+        expected = self.roster(cohort['day'], cohort['department'], cohort['shift_type'])
+        missing = expected.keys() - self.arrived(expected.keys(), cohort['since'])
+        self.stats['checks'] += 1
+        self.stats['checked_employees'] += len(expected)
+        self.stats['absent'] += len(missing)
+        if not missing:
+            return None
+
+        label = f"turno {cohort['shift_type']}" if cohort['shift_type'] else 'horario'
+        return dict(cohort, alert_type='absence', expected=len(expected), count=len(missing),
+                    employees=[{'employee_id': employee_id, 'name': expected[employee_id][0],
+                                'department': expected[employee_id][1]}
+                               for employee_id in sorted(missing, key=expected.get)],
+                    message=f"{len(missing)} de {len(expected)} sin marcar en {cohort['department']} "
+                            f"({label} de las {cohort['expected_start']})")
+
+    def _on_timer(self, key, payload):
+        if key == PLAN_KEY:
+            self.invalidate()
+            self.plan(date.fromisoformat(payload['day']))
+            return
+        if not self.is_active():
+            return
+        alert = self.check(payload)
+        if alert:
+            self.on_absent(alert)
@@ -0,0 +1,97 @@
+"""
+Agrupación de emisiones Socket.IO en ráfagas
+En los cambios de turno (06:00, 14:00) cientos de marcajes llegan en pocos minutos y
+cada uno emitía sus propios eventos. BatchingEmitter acumula los eventos de una sala
+durante una ventana corta y los envía en un solo frame 'batch':
+
+    {'events': [{'event': 'dashboard_delta', 'data': {...}}, ...]}
+
+- el orden de los eventos dentro de cada sala se conserva (un lock de envío por sala;
+  las salas distintas y emit() no esperan a los envíos de otra sala)
+- un solo evento en la ventana se emite tal cual (sin envoltorio)
+- max_batch eventos fuerzan el envío sin esperar a que termine la ventana
+- los eventos fuera de batched_events se emiten al momento
+- stats: eventos, frames enviados y frames ahorrados
+
+Uso (mismo formato que socketio.emit):
+    emitter = BatchingEmitter(socketio)
+    emitter.emit('employee_added', data)
+    emitter.emit('dashboard_delta', delta, to='dept:Operativos')
+"""
+import os
+import threading
+
+BATCHED_EVENTS = ('dashboard_delta', 'employee_added')
+
+
+class BatchingEmitter:
+    def __init__(self, socketio, window_ms=None, max_batch=None, batched_events=BATCHED_EVENTS):
+        self.socketio = socketio
+        self.window = (window_ms if window_ms is not None else int(os.getenv('EMIT_BATCH_WINDOW_MS', '150'))) / 1000
+        self.max_batch = max_batch if max_batch is not None else int(os.getenv('EMIT_BATCH_MAX', '50'))
+        self.batched_events = set(batched_events)
+
+        self._pending = {}  # sala -> [(evento, datos)]
+        self._send_locks = {}  # sala -> lock de envío
+        self._lock = threading.Lock()  # Solo colas y estadísticas, nunca durante un envío
+
+        self.stats = {'events': 0, 'frames': 0, 'batches': 0, 'frames_saved': 0, 'max_batch_seen': 0}
+
+    def emit(self, event, data=None, to=None):
+        """Emitir ahora o encolar en la ventana de la sala (to=None: todos los clientes)"""
+        if self.window <= 0 or event not in self.batched_events:
+            self._send(event, data, to)
+            with self._lock:
+                self.stats['events'] += 1
+                self.stats['frames'] += 1
+            return
+
+        with self._lock:
+            self.stats['events'] += 1
+            queue = self._pending.setdefault(to, [])
+            queue.append((event, data))
+            first = len(queue) == 1
+            full = len(queue) >= self.max_batch
+
+        if full:
+            self.flush(to)
+        elif first:
+            self.socketio.start_background_task(self._flush_later, to)
+
+    def _flush_later(self, room):
+        self.socketio.sleep(self.window)
+        self.flush(room)
+
+    def flush(self, room=None):
+        """Enviar lo acumulado para la sala"""
+        with self._lock:
+            send_lock = self._send_locks.setdefault(room, threading.Lock())
+
+        # Tomar la cola y enviarla con el lock de la sala: dos flush de la misma sala no se adelantan entre sí
+        with send_lock:
+            with self._lock:
+                events = self._pending.pop(room, None)
+                if not events:
+                    return
+                self.stats['frames'] += 1
+                self.stats['frames_saved'] += len(events) - 1
+                if len(events) > 1:
+                    self.stats['batches'] += 1
+                self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(events))
+
+            if len(events) == 1:
+                self._send(events[0][0], events[0][1], room)
+            else:
+                self._send('batch', {'events': [{'event': event, 'data': data} for event, data in events]}, room)
+
+    def flush_all(self):
+        with self._lock:
+            rooms = list(self._pending)
+        for room in rooms:
+            self.flush(room)
+
+    def _send(self, event, data, room):
+        if room is None:
+            self.socketio.emit(event, data)
+        else:
+            self.socketio.emit(event, data, to=room)
@@ -0,0 +1,178 @@
+"""
+Benchmark del perfil SQLite: lecturas y escrituras concurrentes
+Compara la conexión por defecto (rollback journal, una conexión por operación)
+con sqlite_profile.SQLiteProfile sobre el mismo esquema y los mismos datos.
+
+Lectores: consultas del dashboard (estado por empleado y últimos registros).
+Escritores: marcajes (INSERT en attendance_records + upsert en employee_presence).
+
+Uso:
+    python bench_sqlite_profile.py [--readers 4] [--writers 2] [--seconds 10] [--employees 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from schema_migrations import SchemaMigrator
+from sqlite_profile import SQLiteProfile
+
+READ_QUERIES = [
+    ('''
+        SELECT e.name, e.employee_id, p.last_event, p.last_timestamp
+        FROM employees e
+        LEFT JOIN employee_presence p ON e.employee_id = p.employee_id AND p.workday = ?
+        WHERE e.active = 1
+    ''', lambda today: (today,)),
+    ('''
+        SELECT ar.employee_id, e.name, ar.event_type, ar.timestamp
+        FROM attendance_records ar JOIN employees e ON ar.employee_id = e.employee_id
+        WHERE date(ar.timestamp) = ?
+        ORDER BY ar.timestamp DESC LIMIT 20
+    ''', lambda today: (today,)),
+    ('''
+        SELECT COUNT(*), COUNT(DISTINCT employee_id) FROM attendance_records
+        WHERE date(timestamp) = ?
+    ''', lambda today: (today,)),
+]
+
+
+def build_database(path, employees, days):
+    """Crear esquema con las migraciones y cargar datos de prueba"""
+    SchemaMigrator(lambda: sqlite3.connect(path), 'sqlite').migrate()
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.executemany(
+        'INSERT OR IGNORE INTO employees (employee_id, name, department) VALUES (?, ?, ?)',
+        [(f'B{i:04d}', f'Empleado {i}', random.choice(['Operativos', 'Administración', 'Logística']))
+         for i in range(employees)]
+    )
+    start = datetime.now().replace(hour=6, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    rows = []
+    for day in range(days):
+        base = start + timedelta(days=day)
+        for i in range(employees):
+            for event_type, hour in (('entrada', 0), ('break_salida', 3), ('break_entrada', 3.3), ('salida', 8)):
+                rows.append((f'B{i:04d}', event_type, (base + timedelta(hours=hour, minutes=random.randint(0, 20))).strftime('%Y-%m-%d %H:%M:%S')))
+    cursor.executemany('INSERT INTO attendance_records (employee_id, event_type, timestamp) VALUES (?, ?, ?)', rows)
+    conn.commit()
+    conn.close()
+
+
+def punch(conn, employee_id):
+    cursor = conn.cursor()
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute('INSERT INTO attendance_records (employee_id, event_type, timestamp) VALUES (?, ?, ?)',
+                   (employee_id, 'entrada', now))
+    cursor.execute('''
+        INSERT OR REPLACE INTO employee_presence (employee_id, workday, last_event, last_timestamp, on_break)
+        VALUES (?, ?, ?, ?, 0)
+    ''', (employee_id, now.split(' ')[0], 'entrada', now))
+    conn.commit()
+
+
+def run(connect, readers, writers, seconds, employees):
+    """Ejecutar lectores y escritores concurrentes; devuelve contadores y latencias"""
+    stop = threading.Event()
+    results = {'reads': 0, 'writes': 0, 'errors': 0, 'read_ms': [], 'write_ms': []}
+    lock = threading.Lock()
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    def reader():
+        while not stop.is_set():
+            sql, params = random.choice(READ_QUERIES)
+            started = time.perf_counter()
+            try:
+                conn = connect()
+                conn.cursor().execute(sql, params(today)).fetchall()
+                conn.close()
+                with lock:
+                    results['reads'] += 1
+                    results['read_ms'].append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError:
+                with lock:
+                    results['errors'] += 1
+
+    def writer():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn = connect()
+                punch(conn, f'B{random.randrange(employees):04d}')
+                conn.close()
+                with lock:
+                    results['writes'] += 1
+                    results['write_ms'].append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError:
+                with lock:
+                    results['errors'] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def report(label, results, seconds):
+    print(f"{label:<22} {results['reads'] / seconds:>10.1f} {results['writes'] / seconds:>10.1f} "
+          f"{percentile(results['read_ms'], 95):>12.2f} {percentile(results['write_ms'], 95):>12.2f} "
+          f"{results['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de lecturas/escrituras concurrentes en SQLite')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    try:
+        template = os.path.join(workdir, 'template.db')
+        build_database(template, args.employees, args.days)
+
+        default_path = os.path.join(workdir, 'default.db')
+        profile_path = os.path.join(workdir, 'profile.db')
+        shutil.copy(template, default_path)
+        shutil.copy(template, profile_path)
+
+        print(f"Lectores: {args.readers}  Escritores: {args.writers}  Duración: {args.seconds}s  "
+              f"Registros: {args.employees * args.days * 4}")
+        print(f"{'Configuración':<22} {'lect/s':>10} {'escr/s':>10} {'p95 lect ms':>12} {'p95 escr ms':>12} {'errores':>8}")
+
+        default_results = run(lambda: sqlite3.connect(default_path), args.readers, args.writers,
+                              args.seconds, args.employees)
+        report('por defecto', default_results, args.seconds)
+
+        profile = SQLiteProfile(profile_path, maintenance_interval=0)
+        profile_results = run(profile.connect, args.readers, args.writers, args.seconds, args.employees)
+        profile.checkpoint()
+        report('sqlite_profile', profile_results, args.seconds)
+        print(f"Conexiones de lectura abiertas: {profile.stats['readers_opened']}  "
+              f"Espera del escritor: {profile.stats['writer_wait_ms']:.0f} ms")
+        profile.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,4 +3,7 @@
 
 set -o errexit
 
-pip install -r requirements_production.txt
\ No newline at end of file
+pip install -r requirements_production.txt
+
+# CSS/JS de las plantillas minificados, versionados y precomprimidos (static/dist)
+python static_assets.py
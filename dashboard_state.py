@@ -0,0 +1,635 @@
+"""
+Proyección en memoria del dashboard
+Mantiene los datos de /api/dashboard, /api/breaks/status y /api/alerts/late sin
+consultar la base de datos en cada petición:
+- marcajes del día por empleado y por lector (totales y empleados únicos)
+- estado dentro/fuera, departamento y turno de la semana por empleado activo
+- anillo con los últimos registros de empleados activos
+- empleados en break/almuerzo, breaks y almuerzos completados (BreakTracker)
+- alertas de tardanza del día
+
+Se reconstruye desde la base de datos al arrancar, al cambiar el día, tras
+invalidate() (cambios de empleados o turnos) y cada max_age segundos para recoger
+marcajes escritos por otros procesos. Cada marcaje del proceso se aplica con
+apply_punch() y sube la versión; el JSON de /api/dashboard se serializa una sola
+vez por versión y estado de conexión.
+
+Protocolo de deltas (Socket.IO 'dashboard_delta'):
+- cada cambio incremental es un delta con seq = versión resultante (seq consecutivos)
+- 'punch': marcaje con contadores absolutos; 'late': alerta de tardanza
+- 'sync': el estado se reconstruyó; los clientes piden snapshot
+- deltas_since(seq) devuelve los deltas posteriores a seq o None si ya no están en
+  el registro (el cliente recibe entonces un snapshot completo)
+- epoch identifica la secuencia: los workers que no leen el dispositivo copian el
+  estado del líder (export_state/load_state) y aplican sus deltas con apply_remote,
+  así cualquier worker responde con el mismo epoch y seq que emite el líder
+
+Alcances (salas Socket.IO): 'all' o 'dept:<departamento>', 'shift:<turno>',
+'reader:<lector>'. Cada delta se emite solo a las salas que afecta, con una
+secuencia propia por sala y los contadores calculados para ese alcance.
+"""
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+
+from schedule_rules import ScheduleRules
+
+RECENT_LIMIT = 20
+DELTA_LOG_SIZE = 1000
+ALL_ROOM = 'all'
+
+BREAK_START_EVENTS = ('break_salida', 'almuerzo_salida')
+BREAK_END_EVENTS = ('break_entrada', 'almuerzo_entrada')
+SCOPE_PATTERN = re.compile(r'^(dept|shift|reader):(.{1,50})$')
+
+
+def parse_scope(value):
+    """Alcance pedido por el cliente -> nombre de sala, o None para todo"""
+    if not value or value == ALL_ROOM:
+        return None
+    if not SCOPE_PATTERN.match(value):
+        raise ValueError(f"Alcance inválido: {value}")
+    return value
+
+
+def _text(value):
+    """Timestamps de PostgreSQL (datetime) al mismo formato que guarda SQLite"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def _started(timestamp):
+    return datetime.strptime(timestamp[:19], '%Y-%m-%d %H:%M:%S')
+
+
+class BreakTracker:
+    """Breaks y almuerzos del día; se usa con el lock de DashboardState tomado
+
+    Quién está en break o almuerzo y desde cuándo (la hora se convierte al marcar, no en
+    cada lectura), completados por empleado y totales del día que se actualizan con cada
+    marcaje: /api/breaks/status no recorre empleados ni consulta la base de datos.
+    Pendientes: un break al día para quien tiene ventana de break en las reglas de su
+    departamento y turno (schedule_rules.py), un almuerzo para quien tiene ventana de almuerzo.
+    """
+
+    def __init__(self, rules_for):
+        self.rules_for = rules_for
+        self.on_break = OrderedDict()  # employee_id -> (name, department, event_type, timestamp, inicio)
+        self.break_done = {}  # employee_id -> breaks completados (solo activos)
+        self.lunch_done = {}  # employee_id -> almuerzos completados (solo activos)
+        self.eligible = {}  # employee_id -> (tiene break, tiene almuerzo) (solo activos)
+        self.breaks_completed = 0
+        self.lunch_completed = 0
+        self.break_eligible = 0
+        self.lunch_eligible = 0
+
+    def load(self, rows, departments, shifts):
+        """Estado desde breaks.status_by_employee (una fila agrupada por empleado)"""
+        started = []
+        break_done = {}
+        lunch_done = {}
+        for emp_id, name, department, breaks, lunches, last_start, last_lunch_start, last_end in rows:
+            break_done[emp_id] = int(breaks or 0)
+            lunch_done[emp_id] = int(lunches or 0)
+            last_start = _text(last_start)
+            last_end = _text(last_end)
+            if last_start and (not last_end or last_start > last_end):
+                event_type = 'almuerzo_salida' if _text(last_lunch_start) == last_start else 'break_salida'
+                started.append((last_start, emp_id, (name, department, event_type, last_start, _started(last_start))))
+        self.on_break = OrderedDict((emp_id, entry) for _, emp_id, entry in sorted(started))
+        self._set_done(break_done, lunch_done, departments, shifts)
+
+    def restore(self, on_break, break_done, lunch_done, departments, shifts):
+        """Estado de export() (copia del líder)"""
+        self.on_break = OrderedDict((row[0], tuple(row[1:5]) + (_started(row[4]),)) for row in on_break)
+        self._set_done(dict(break_done), dict(lunch_done), departments, shifts)
+
+    def export(self):
+        """(on_break, break_done, lunch_done) serializables"""
+        return ([[emp_id] + list(entry[:4]) for emp_id, entry in self.on_break.items()],
+                dict(self.break_done), dict(self.lunch_done))
+
+    def _set_done(self, break_done, lunch_done, departments, shifts):
+        self.break_done = break_done
+        self.lunch_done = lunch_done
+        self.breaks_completed = sum(break_done.values())
+        self.lunch_completed = sum(lunch_done.values())
+        eligible = {}
+        for emp_id, department in departments.items():
+            rules = self.rules_for(department, shifts.get(emp_id))
+            eligible[emp_id] = (rules.has_break, rules.has_lunch)
+        self.eligible = eligible
+        self.break_eligible = sum(1 for has_break, _ in eligible.values() if has_break)
+        self.lunch_eligible = sum(1 for _, has_lunch in eligible.values() if has_lunch)
+
+    def apply(self, employee_id, name, department, event_type, timestamp):
+        """Marcaje de un empleado activo; misma regla que la consulta: cuenta el último registro de break"""
+        if event_type in BREAK_START_EVENTS:
+            self.on_break.pop(employee_id, None)
+            self.on_break[employee_id] = (name, department, event_type, timestamp, _started(timestamp))
+        elif event_type in BREAK_END_EVENTS:
+            self.on_break.pop(employee_id, None)
+            if event_type == 'break_entrada':
+                self.break_done[employee_id] = self.break_done.get(employee_id, 0) + 1
+                self.breaks_completed += 1
+            else:
+                self.lunch_done[employee_id] = self.lunch_done.get(employee_id, 0) + 1
+                self.lunch_completed += 1
+
+    def counters(self, members=None):
+        """Completados y pendientes; members None = todos los activos (totales incrementales)"""
+        if members is None:
+            breaks_completed, lunch_completed = self.breaks_completed, self.lunch_completed
+            break_eligible, lunch_eligible = self.break_eligible, self.lunch_eligible
+        else:
+            breaks_completed = sum(self.break_done.get(emp_id, 0) for emp_id in members)
+            lunch_completed = sum(self.lunch_done.get(emp_id, 0) for emp_id in members)
+            eligible = [self.eligible.get(emp_id, (False, False)) for emp_id in members]
+            break_eligible = sum(1 for has_break, _ in eligible if has_break)
+            lunch_eligible = sum(1 for _, has_lunch in eligible if has_lunch)
+        return {
+            'breaks_completed': breaks_completed,
+            'breaks_pending': max(0, break_eligible - breaks_completed),
+            'lunch_completed': lunch_completed,
+            'lunch_pending': max(0, lunch_eligible - lunch_completed)
+        }
+
+    def status(self, now, members=None):
+        """Diccionario de /api/breaks/status con la duración al momento de la lectura"""
+        on_break = []
+        on_lunch = []
+        for emp_id, (name, department, event_type, timestamp, start) in self.on_break.items():
+            if members is not None and emp_id not in members:
+                continue
+            employee_data = {
+                'employee_id': emp_id,
+                'name': name,
+                'department': department,
+                'start_time': timestamp[11:16],
+                'duration': int((now - start).total_seconds() / 60)
+            }
+            if event_type == 'break_salida':
+                on_break.append(employee_data)
+            else:
+                on_lunch.append(employee_data)
+
+        status = {'on_break': on_break, 'on_lunch': on_lunch}
+        status.update(self.counters(members))
+        return status
+
+
+class DashboardState:
+    def __init__(self, serialize, max_age=None, delta_log_size=DELTA_LOG_SIZE, rules_for=None):
+        """rules_for(departamento, turno) -> reglas compiladas (por defecto las sembradas por la migración 0009)"""
+        self.serialize = serialize
+        self.max_age = max_age if max_age is not None else int(os.getenv('DASHBOARD_REBUILD_SECONDS', '300'))
+
+        self.epoch = uuid.uuid4().hex[:12]
+        self.workday = None
+        self.version = 0
+        self.last_punch = {}  # employee_id -> último timestamp del día (deduplicación)
+        self.punch_counts = {}  # employee_id -> marcajes del día (todos los empleados)
+        self.reader_punches = {}  # lector -> {employee_id: marcajes del día}
+        self.employees = OrderedDict()  # employee_id -> [name, last_event, timestamp] (solo activos)
+        self.departments = {}  # employee_id -> departamento (solo activos)
+        self.shifts = {}  # employee_id -> turno de la semana
+        self.recent = deque(maxlen=RECENT_LIMIT)  # (name, event_type, timestamp, verify_method, employee_id, lector)
+        self.breaks = BreakTracker(rules_for or ScheduleRules(None, None, None).rules_for)
+        self.late_alerts = []
+        self.room_versions = {}  # sala -> seq de la sala ('all' usa version)
+
+        self.deltas = deque(maxlen=delta_log_size)
+        self._log_start = 0  # Versión desde la que el registro de deltas está completo
+
+        self._lock = threading.RLock()
+        self._dirty = True
+        self._built_at = 0
+        self._cache = (None, None)  # (clave, cuerpo) en una sola asignación
+
+        self.stats = {'rebuilds': 0, 'loads': 0, 'punches': 0, 'serializations': 0, 'hits': 0,
+                      'delta_replies': 0, 'snapshot_replies': 0}
+
+    def invalidate(self):
+        """Forzar reconstrucción en la próxima lectura"""
+        self._dirty = True
+
+    def needs_rebuild(self, today):
+        return (self._dirty or self.workday != today
+                or (self.max_age > 0 and time.time() - self._built_at > self.max_age))
+
+    def rebuild(self, connect, queries, today, late_alert, new_epoch=False):
+        """Cargar el estado del día desde la base de datos; devuelve el delta 'sync'
+
+        late_alert(employee_id, name, department, expected_time, timestamp, late_minutes) -> dict
+        con la tardanza guardada en daily_summaries al registrar la primera entrada
+        new_epoch: secuencia propia (copia local de un worker que no es el líder)
+        """
+        today_date = datetime.strptime(today, '%Y-%m-%d').date()
+        week_start = (today_date - timedelta(days=today_date.weekday())).isoformat()
+        # Presencia y breaks por día laboral: incluye los turnos noche de ayer todavía abiertos
+        yesterday = (today_date - timedelta(days=1)).isoformat()
+
+        with self._lock:
+            conn = connect()
+            cursor = conn.cursor()
+            try:
+                queries.run(cursor, 'attendance.punches_by_reader_day', (today,))
+                punch_rows = cursor.fetchall()
+
+                queries.run(cursor, 'presence.active_status', (yesterday,))
+                status_rows = cursor.fetchall()
+
+                queries.run(cursor, 'shifts.week_map', (week_start,))
+                shifts = {row[0]: row[1] for row in cursor.fetchall()}
+
+                queries.run(cursor, 'attendance.recent_active')
+                recent = [tuple(_text(value) for value in row[:5]) + (str(row[5]),) for row in cursor.fetchall()]
+
+                queries.run(cursor, 'breaks.status_by_employee', (yesterday, today, today))
+                break_rows = cursor.fetchall()
+
+                queries.run(cursor, 'summaries.late_day_active', (today,))
+                late_rows = cursor.fetchall()
+            finally:
+                conn.close()
+
+            last_punch = {}
+            punch_counts = {}
+            reader_punches = {}
+            for reader_no, emp_id, count, last_ts in punch_rows:
+                last_ts = _text(last_ts)
+                reader_punches.setdefault(str(reader_no), {})[emp_id] = count
+                punch_counts[emp_id] = punch_counts.get(emp_id, 0) + count
+                if last_ts > last_punch.get(emp_id, ''):
+                    last_punch[emp_id] = last_ts
+
+            employees = OrderedDict()
+            departments = {}
+            for name, emp_id, last_event, ts, department in status_rows:
+                employees[emp_id] = [name, last_event, _text(ts)]
+                departments[emp_id] = department
+
+            late_alerts = [
+                late_alert(emp_id, name, department, expected_start, _text(first_entry_at), late_minutes)
+                for emp_id, name, department, expected_start, first_entry_at, late_minutes in late_rows
+            ]
+
+            self.workday = today
+            self.last_punch = last_punch
+            self.punch_counts = punch_counts
+            self.reader_punches = reader_punches
+            self.employees = employees
+            self.departments = departments
+            self.shifts = shifts
+            self.recent = deque(recent, maxlen=RECENT_LIMIT)
+            self.breaks.load(break_rows, departments, shifts)
+            self.late_alerts = late_alerts
+            self._dirty = False
+            self._built_at = time.time()
+            if new_epoch:
+                self.epoch = uuid.uuid4().hex[:12]
+            self.version += 1
+            # Las salas también avanzan: sus clientes no pueden quedarse con la versión anterior
+            self.room_versions = {room: seq + 1 for room, seq in self.room_versions.items()}
+            self.deltas.clear()
+            self._log_start = self.version
+            self.stats['rebuilds'] += 1
+            return {'epoch': self.epoch, 'seq': self.version, 'type': 'sync', 'workday': today}
+
+    def export_state(self):
+        """Estado completo serializable para replicarlo en otros workers"""
+        with self._lock:
+            on_break, break_done, lunch_done = self.breaks.export()
+            return {
+                'epoch': self.epoch,
+                'version': self.version,
+                'workday': self.workday,
+                'last_punch': dict(self.last_punch),
+                'punch_counts': dict(self.punch_counts),
+                'reader_punches': {reader: dict(counts) for reader, counts in self.reader_punches.items()},
+                'employees': [[emp_id] + list(status) for emp_id, status in self.employees.items()],
+                'departments': dict(self.departments),
+                'shifts': dict(self.shifts),
+                'recent': [list(row) for row in self.recent],
+                'on_break': on_break,
+                'break_done': break_done,
+                'lunch_done': lunch_done,
+                'late_alerts': list(self.late_alerts),
+                'room_versions': dict(self.room_versions)
+            }
+
+    def load_state(self, data):
+        """Reemplazar el estado por una copia de export_state() (del líder)"""
+        with self._lock:
+            self.epoch = data['epoch']
+            self.version = data['version']
+            self.workday = data['workday']
+            self.last_punch = dict(data['last_punch'])
+            self.punch_counts = dict(data['punch_counts'])
+            self.reader_punches = {reader: dict(counts) for reader, counts in data['reader_punches'].items()}
+            self.employees = OrderedDict((row[0], list(row[1:])) for row in data['employees'])
+            self.departments = dict(data['departments'])
+            self.shifts = dict(data['shifts'])
+            self.recent = deque((tuple(row) for row in data['recent']), maxlen=RECENT_LIMIT)
+            self.breaks.restore(data['on_break'], data['break_done'], data['lunch_done'], self.departments, self.shifts)
+            self.late_alerts = list(data['late_alerts'])
+            self.room_versions = dict(data['room_versions'])
+            self._dirty = False
+            self._built_at = time.time()
+            self.deltas.clear()
+            self._log_start = self.version
+            self.stats['loads'] += 1
+
+    def apply_remote(self, delta):
+        """Aplicar un delta del líder; False si no es el siguiente de la secuencia (pedir estado)"""
+        with self._lock:
+            if delta.get('epoch') != self.epoch or delta['seq'] != self.version + 1:
+                return False
+            if delta['type'] == 'punch':
+                record = delta['record']
+                self._apply_punch(record['employee_id'], record['name'], record['department'],
+                                  record['event_type'], record['timestamp'], record['verify_method'],
+                                  record['reader_no'])
+            elif delta['type'] == 'late':
+                self.late_alerts.append(delta['alert'])
+            self.version = delta['seq']
+            for room, seq in delta['rooms'].items():
+                if room != ALL_ROOM:
+                    self.room_versions[room] = seq
+            self.deltas.append(delta)
+            return True
+
+    # Alcances
+
+    def _members(self, scope):
+        """Empleados activos dentro del alcance (None = todos los activos)"""
+        if scope is None:
+            return self.employees.keys()
+        kind, _, value = scope.partition(':')
+        if kind == 'dept':
+            return {emp_id for emp_id, department in self.departments.items() if department == value}
+        if kind == 'shift':
+            return {emp_id for emp_id, shift in self.shifts.items() if shift == value and emp_id in self.employees}
+        return {emp_id for emp_id in self.reader_punches.get(value, {}) if emp_id in self.employees}
+
+    def _counters(self, scope=None, members=None):
+        """Contadores absolutos del alcance: marcajes, empleados únicos, presencia, breaks y almuerzos"""
+        members = self._members(scope) if members is None else members
+        if scope is None:
+            total_records = sum(self.punch_counts.values())
+            unique_employees = len(self.last_punch)
+        elif scope.startswith('reader:'):
+            counts = self.reader_punches.get(scope.partition(':')[2], {})
+            total_records = sum(counts.values())
+            unique_employees = len(counts)
+        else:
+            total_records = sum(self.punch_counts.get(emp_id, 0) for emp_id in members)
+            unique_employees = sum(1 for emp_id in members if emp_id in self.last_punch)
+
+        inside = sum(1 for emp_id in members if self.employees[emp_id][1] == 'entrada')
+        return {
+            'total_records': total_records,
+            'unique_employees': unique_employees,
+            'presence': {'inside': inside, 'outside': len(members) - inside},
+            'breaks': self.breaks.counters(None if scope is None else members)
+        }
+
+    def rooms_for(self, employee_id, department=None, reader_no=None):
+        """Salas a las que llega un evento del empleado (y del lector, si aplica)"""
+        rooms = [ALL_ROOM]
+        if employee_id in self.employees:
+            rooms.append(f"dept:{self.departments.get(employee_id) or department}")
+            shift = self.shifts.get(employee_id)
+            if shift:
+                rooms.append(f'shift:{shift}')
+        if reader_no is not None:
+            rooms.append(f'reader:{reader_no}')
+        return rooms
+
+    def room_deltas(self, delta):
+        """Copias del delta por sala, con la secuencia y los contadores de cada una"""
+        with self._lock:
+            payloads = []
+            for room, seq in delta['rooms'].items():
+                if room == ALL_ROOM:
+                    payloads.append((room, delta))
+                    continue
+                payload = dict(delta, seq=seq, room=room)
+                if delta['type'] == 'punch':
+                    payload.update(self._counters(room))
+                payloads.append((room, payload))
+            return payloads
+
+    # Cambios incrementales
+
+    def _append_delta(self, delta, rooms):
+        self.version += 1
+        delta['epoch'] = self.epoch
+        delta['seq'] = self.version
+        delta['rooms'] = {ALL_ROOM: self.version}
+        for room in rooms:
+            if room != ALL_ROOM:
+                self.room_versions[room] = self.room_versions.get(room, 0) + 1
+                delta['rooms'][room] = self.room_versions[room]
+        self.deltas.append(delta)
+        return delta
+
+    def _apply_punch(self, employee_id, name, department, event_type, timestamp, verify_method, reader_no):
+        """Mutación de un marcaje (con el lock tomado); devuelve si el empleado está en el dashboard"""
+        self.last_punch[employee_id] = timestamp
+        self.punch_counts[employee_id] = self.punch_counts.get(employee_id, 0) + 1
+        reader = self.reader_punches.setdefault(str(reader_no), {})
+        reader[employee_id] = reader.get(employee_id, 0) + 1
+
+        status = self.employees.get(employee_id)
+        if status is None:
+            return False
+        status[0] = name
+        status[1] = event_type
+        status[2] = timestamp
+        self.recent.appendleft((name, event_type, timestamp, verify_method, employee_id, str(reader_no)))
+
+        self.breaks.apply(employee_id, name, department, event_type, timestamp)
+        return True
+
+    def apply_punch(self, employee_id, name, department, event_type, timestamp, verify_method, reader_no=1):
+        """Aplicar un marcaje ya confirmado en la base de datos; devuelve el delta o None"""
+        with self._lock:
+            if self._dirty or timestamp.split(' ')[0] != self.workday:
+                return None  # La próxima lectura reconstruye y ya lo incluye
+            previous = self.last_punch.get(employee_id)
+            if previous is not None and previous >= timestamp:
+                return None  # Ya incluido por una reconstrucción concurrente
+
+            tracked = self._apply_punch(employee_id, name, department, event_type, timestamp,
+                                        verify_method, reader_no)
+            self.stats['punches'] += 1
+            delta = {
+                'type': 'punch',
+                'workday': self.workday,
+                'tracked': tracked,
+                'record': {
+                    'employee_id': employee_id,
+                    'name': name,
+                    'event_type': event_type,
+                    'timestamp': timestamp,
+                    'verify_method': verify_method,
+                    'department': department or 'General',
+                    'reader_no': str(reader_no)
+                }
+            }
+            delta.update(self._counters())
+            return self._append_delta(delta, self.rooms_for(employee_id, department, str(reader_no)))
+
+    def apply_late(self, alert):
+        """Registrar una alerta de tardanza; devuelve el delta o None"""
+        with self._lock:
+            if self._dirty or alert['timestamp'].split(' ')[0] != self.workday:
+                return None
+            if alert['employee_id'] not in self.employees:
+                return None  # Igual que summaries.late_day_active: solo empleados activos
+            if any(existing['employee_id'] == alert['employee_id'] for existing in self.late_alerts):
+                return None
+            self.late_alerts.append(alert)
+            delta = {'type': 'late', 'workday': self.workday, 'alert': alert}
+            return self._append_delta(delta, self.rooms_for(alert['employee_id'], alert['department']))
+
+    def deltas_since(self, seq, epoch=None):
+        """Deltas posteriores a seq, o None si el cliente necesita un snapshot"""
+        with self._lock:
+            if epoch != self.epoch or seq is None or seq < self._log_start or seq > self.version:
+                return None
+            if self.deltas and self.deltas[0]['seq'] > seq + 1:
+                return None  # El registro ya descartó deltas que el cliente no vio
+            return [delta for delta in self.deltas if delta['seq'] > seq]
+
+    # Lecturas
+
+    def snapshot(self, connected, monitoring, scope=None):
+        """Diccionario de /api/dashboard (mismo formato que la versión con consultas)"""
+        with self._lock:
+            members = self._members(scope)
+            inside = []
+            outside = []
+            for emp_id, (name, last_event, timestamp) in self.employees.items():
+                if scope is not None and emp_id not in members:
+                    continue
+                if last_event == 'entrada':
+                    inside.append({'name': name, 'id': emp_id, 'time': timestamp})
+                else:
+                    outside.append({'name': name, 'id': emp_id, 'time': timestamp})
+
+            if scope is None:
+                recent = [row[:4] for row in self.recent]
+            elif scope.startswith('reader:'):
+                recent = [row[:4] for row in self.recent if row[5] == scope.partition(':')[2]]
+            else:
+                recent = [row[:4] for row in self.recent if row[4] in members]
+
+            counters = self._counters(scope, members)
+            return {
+                'total_records': counters['total_records'],
+                'unique_employees': counters['unique_employees'],
+                'employees_inside': inside,
+                'employees_outside': outside,
+                'recent_records': recent,
+                'connected': connected,
+                'monitoring': monitoring
+            }
+
+    def break_status(self, now=None, scope=None):
+        """Diccionario de /api/breaks/status con la duración calculada al momento de la lectura"""
+        now = now or datetime.now()
+        with self._lock:
+            members = None if scope is None else self._members(scope)
+            return self.breaks.status(now, members)
+
+    def open_breaks(self):
+        """{employee_id: (name, department, event_type, timestamp)} de quienes están en break o almuerzo"""
+        with self._lock:
+            return {emp_id: entry[:4] for emp_id, entry in self.breaks.on_break.items()}
+
+    def open_break(self, employee_id):
+        """(name, department, event_type, timestamp) del break en curso del empleado, o None"""
+        with self._lock:
+            entry = self.breaks.on_break.get(employee_id)
+            return entry[:4] if entry else None
+
+    def break_taken(self, employee_id):
+        """Si el empleado ya completó o está tomando su break del día (sin contar almuerzos)"""
+        with self._lock:
+            entry = self.breaks.on_break.get(employee_id)
+            return bool(self.breaks.break_done.get(employee_id)) or bool(entry and entry[2] == 'break_salida')
+
+    def arrived_since(self, employee_ids, since):
+        """Empleados de employee_ids con su último marcaje del día desde since (absence_detector.py)"""
+        with self._lock:
+            return {emp_id for emp_id in employee_ids if self.last_punch.get(emp_id, '') >= since}
+
+    def late_alerts_for(self, scope=None):
+        with self._lock:
+            if scope is None:
+                return list(self.late_alerts)
+            members = self._members(scope)
+            return [alert for alert in self.late_alerts if alert['employee_id'] in members]
+
+    def live_snapshot(self, connected, monitoring, scope=None):
+        """Estado completo para clientes del protocolo de deltas"""
+        with self._lock:
+            return {
+                'epoch': self.epoch,
+                'seq': self.version if scope is None else self.room_versions.get(scope, 0),
+                'scope': scope or ALL_ROOM,
+                'workday': self.workday,
+                'dashboard': self.snapshot(connected, monitoring, scope),
+                'breaks': self.break_status(scope=scope),
+                'late_alerts': self.late_alerts_for(scope)
+            }
+
+    def stream_snapshot(self, recent_limit=RECENT_LIMIT):
+        """Estado reducido para pantallas de solo lectura (sse_stream.py)"""
+        with self._lock:
+            snapshot = {
+                'epoch': self.epoch,
+                'seq': self.version,
+                'workday': self.workday,
+                'recent_records': [list(row[:4]) for row in list(self.recent)[:recent_limit]]
+            }
+            snapshot.update(self._counters())
+            return snapshot
+
+    def sync_reply(self, since, epoch, connected, monitoring, scope=None):
+        """Respuesta a snapshot_request: deltas pendientes o snapshot completo
+
+        Las salas con alcance no guardan registro de deltas: al día o snapshot.
+        """
+        with self._lock:
+            if scope is None:
+                deltas = self.deltas_since(since, epoch)
+            else:
+                deltas = [] if epoch == self.epoch and since == self.room_versions.get(scope, 0) else None
+            if deltas is not None:
+                self.stats['delta_replies'] += 1
+                seq = self.version if scope is None else self.room_versions.get(scope, 0)
+                return {'epoch': self.epoch, 'seq': seq, 'deltas': deltas}
+            self.stats['snapshot_replies'] += 1
+            snapshot = self.live_snapshot(connected, monitoring, scope)
+            return {'epoch': self.epoch, 'seq': snapshot['seq'], 'snapshot': snapshot}
+
+    def body(self, connected, monitoring):
+        """JSON serializado una vez por versión"""
+        key, body = self._cache
+        if key == (self.epoch, self.version, connected, monitoring):
+            self.stats['hits'] += 1
+            return body
+        with self._lock:
+            key = (self.epoch, self.version, connected, monitoring)
+            body = self.serialize(self.snapshot(connected, monitoring)).encode('utf-8')
+            self._cache = (key, body)
+            self.stats['serializations'] += 1
+            return body
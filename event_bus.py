@@ -0,0 +1,97 @@
+"""
+Bus de eventos entre workers
+Replica el estado del dashboard del proceso líder (ver ingest_leader.py) en los
+demás workers y lleva sus peticiones al líder (sincronizar, invalidar, monitoreo).
+
+- RedisBus: pub/sub de Redis (REDIS_URL), el mismo servidor que usa Socket.IO
+  como message_queue para llegar a los navegadores conectados a cualquier worker
+- LocalBus: en proceso; un solo worker o pruebas con varios sistemas en un proceso
+
+Los mensajes son diccionarios JSON; cada suscriptor ignora los que publicó él mismo
+(campo 'origin').
+"""
+import json
+import os
+import threading
+import time
+
+CHANNEL = 'attendance_state'
+
+
+class LocalBus:
+    def __init__(self):
+        self._handlers = []
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+    def publish(self, message):
+        # Misma copia que haría la serialización de Redis
+        payload = json.loads(json.dumps(message, default=str))
+        for handler in list(self._handlers):
+            try:
+                handler(payload)
+            except Exception as e:
+                print(f"Error procesando mensaje del bus: {e}")
+
+    def close(self):
+        self._handlers = []
+
+
+class RedisBus:
+    def __init__(self, url, channel=CHANNEL):
+        import redis
+
+        self.channel = channel
+        self._redis = redis.Redis.from_url(url)
+        self._handlers = []
+        self._pubsub = None
+        self._thread = None
+        self._closed = False
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+        if self._thread is None:
+            self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self.channel)
+            self._thread = threading.Thread(target=self._listen, daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        while not self._closed:
+            try:
+                for item in self._pubsub.listen():
+                    self._dispatch(item)
+            except Exception as e:
+                if self._closed:
+                    break
+                # redis-py vuelve a suscribirse al reconectar en la siguiente llamada a listen()
+                print(f"Bus Redis desconectado: {e}")
+                time.sleep(1)
+
+    def _dispatch(self, item):
+        try:
+            message = json.loads(item['data'])
+        except (TypeError, ValueError):
+            return
+        for handler in list(self._handlers):
+            try:
+                handler(message)
+            except Exception as e:
+                print(f"Error procesando mensaje del bus: {e}")
+
+    def publish(self, message):
+        self._redis.publish(self.channel, json.dumps(message, default=str))
+
+    def close(self):
+        self._closed = True
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+def create_bus(url=None):
+    """RedisBus si hay REDIS_URL; si no, LocalBus (un solo worker)"""
+    url = url if url is not None else os.getenv('REDIS_URL')
+    if url:
+        return RedisBus(url)
+    return LocalBus()
@@ -0,0 +1,168 @@
+"""
+Respuestas condicionales y comprimidas para las APIs de lectura
+Las versiones salen de contadores de cambios (tabla data_versions, migración 0005)
+que cada escritura incrementa en su misma transacción:
+- 'employees', 'schedules', 'shifts'   tablas completas
+- 'attendance:<YYYY-MM-DD>'           marcajes de un día
+- 'summaries:<YYYY-MM>'               resúmenes diarios de un mes
+- 'schedule_rules'                    department_schedules y break_types (schedule_rules.py)
+- 'holidays'                          festivos del calendario laboral (work_calendar.py)
+
+El ETag se calcula con la URL y las versiones de las que depende la respuesta, antes
+de generarla: si el cliente ya la tiene se responde 304 sin consultar ni serializar.
+Los cuerpos se guardan comprimidos (brotli si está instalado, si no gzip) en una
+caché LRU por ETag y codificación.
+
+Uso:
+    return response_cache.respond(request, ['employees'], build)
+"""
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+MIN_COMPRESS_BYTES = 1024
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Días pasados: los marcajes ya no cambian; un día de caché acota el efecto de renombrar empleados
+IMMUTABLE_MAX_AGE = 86400
+
+
+class DataVersions:
+    def __init__(self, get_connection, queries):
+        self.get_connection = get_connection
+        self.queries = queries
+
+    def bump(self, cursor, *names):
+        """Incrementar contadores dentro de la transacción de la escritura"""
+        now = time.time()
+        for name in names:
+            self.queries.run(cursor, 'versions.bump', (name, now))
+
+    def read(self, names):
+        """[(nombre, versión, updated_at)]; (0, 0) si nunca cambió"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            versions = []
+            for name in names:
+                self.queries.run(cursor, 'versions.get', (name,))
+                row = cursor.fetchone()
+                versions.append((name, row[0], float(row[1])) if row else (name, 0, 0.0))
+            return versions
+        finally:
+            conn.close()
+
+
+def _accepted_encoding(accept_encoding):
+    accepted = {part.split(';')[0].strip() for part in (accept_encoding or '').split(',')}
+    if BROTLI_AVAILABLE and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class ResponseCache:
+    def __init__(self, versions, serialize, response_class, max_bytes=CACHE_MAX_BYTES):
+        self.versions = versions
+        self.serialize = serialize
+        self.response_class = response_class
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # (etag, codificación) -> cuerpo
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.stats = {'requests': 0, 'not_modified': 0, 'hits': 0, 'builds': 0,
+                      'bytes_raw': 0, 'bytes_sent': 0}
+
+    def respond(self, request, names, build, immutable=False, extra=None):
+        """Respuesta JSON de build() con ETag/Last-Modified de las versiones en names
+
+        extra: otro valor del que depende la respuesta (p. ej. la fecha de hoy); entra en
+        el ETag y desactiva Last-Modified, que solo sigue a las versiones
+        """
+        versions = self.versions.read(names)
+        digest = hashlib.sha1(repr((request.full_path, versions, extra)).encode('utf-8')).hexdigest()[:20]
+        etag = f'W/"{digest}"'  # Débil: el mismo para todas las codificaciones
+        last_modified = 0 if extra is not None else max((updated_at for _, _, updated_at in versions), default=0)
+        self.stats['requests'] += 1
+
+        headers = {
+            'ETag': etag,
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': f'public, max-age={IMMUTABLE_MAX_AGE}, immutable' if immutable else 'no-cache'
+        }
+        if last_modified:
+            headers['Last-Modified'] = formatdate(int(last_modified), usegmt=True)
+
+        if self._not_modified(request, etag, last_modified):
+            self.stats['not_modified'] += 1
+            return self.response_class(status=304, headers=headers)
+
+        encoding = _accepted_encoding(request.headers.get('Accept-Encoding'))
+        key = (etag, encoding)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None and encoding:
+                # Cuerpos de menos de MIN_COMPRESS_BYTES: guardados sin comprimir para todas las codificaciones
+                # (uno más grande sin comprimir es el de un cliente sin Accept-Encoding: se comprime aparte)
+                plain = self._entries.get((etag, None))
+                if plain is not None and len(plain) < MIN_COMPRESS_BYTES:
+                    body, key, encoding = plain, (etag, None), None
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+
+        if body is None:
+            raw = self.serialize(build()).encode('utf-8')
+            self.stats['builds'] += 1
+            self.stats['bytes_raw'] += len(raw)
+            if encoding and len(raw) < MIN_COMPRESS_BYTES:
+                encoding = None
+                key = (etag, None)
+            body = _compress(raw, encoding) if encoding else raw
+            self._store(key, body)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        self.stats['bytes_sent'] += len(body)
+        return self.response_class(body, mimetype='application/json', headers=headers)
+
+    def _not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # Comparación débil: W/"x" y "x" son la misma versión
+            tags = {tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')}
+            return '*' in tags or etag.replace('W/', '', 1) in tags
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if if_modified_since and last_modified:
+            try:
+                return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _store(self, key, body):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
@@ -0,0 +1,105 @@
+"""
+Elección del proceso que lee el dispositivo (un único lector por despliegue)
+Cada worker compite por un lease en la tabla ingest_leases (migración 0004):
+- el líder renueva el lease cada ttl/3 segundos
+- si el líder muere, su lease caduca a los ttl segundos y otro worker lo toma
+- un líder que no puede renovar se degrada antes de que su lease pueda caducar
+
+Funciona igual en PostgreSQL y SQLite (consultas leases.* del registro).
+
+Uso:
+    leader = IngestLeader(system.get_connection, system.queries,
+                          on_elected=..., on_demoted=..., on_tick=...)
+    leader.start()
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+
+
+class IngestLeader:
+    def __init__(self, get_connection, queries, name='device_ingest', ttl=None,
+                 on_elected=None, on_demoted=None, on_tick=None):
+        self.get_connection = get_connection
+        self.queries = queries
+        self.name = name
+        self.ttl = ttl if ttl is not None else float(os.getenv('INGEST_LEASE_SECONDS', '30'))
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_tick = on_tick
+
+        self.is_leader = False
+        self._renewed_at = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def try_acquire(self):
+        """Tomar o renovar el lease; devuelve True si este proceso es el líder"""
+        now = time.time()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            self.queries.run(cursor, 'leases.claim', (self.name, self.holder, now + self.ttl, now))
+            self.queries.run(cursor, 'leases.holder', (self.name,))
+            row = cursor.fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        held = bool(row) and row[0] == self.holder
+        if held:
+            self._renewed_at = now
+        return held
+
+    def check(self):
+        """Una ronda de elección: actualiza is_leader y dispara los callbacks de transición"""
+        try:
+            held = self.try_acquire()
+        except Exception as e:
+            print(f"Error renovando lease de ingesta: {e}")
+            # Sin poder renovar, el lease puede caducar y pasar a otro proceso
+            held = self.is_leader and time.time() - self._renewed_at < self.ttl * 2 / 3
+
+        if held and not self.is_leader:
+            self.is_leader = True
+            print(f"Proceso líder de ingesta: {self.holder}")
+            if self.on_elected:
+                self.on_elected()
+        elif not held and self.is_leader:
+            self.is_leader = False
+            print(f"Proceso deja de ser líder de ingesta: {self.holder}")
+            if self.on_demoted:
+                self.on_demoted()
+
+        if self.on_tick:
+            self.on_tick(self.is_leader)
+        return self.is_leader
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.ttl / 3):
+            self.check()
+
+    def release(self):
+        """Liberar el lease al apagar para que otro proceso lo tome sin esperar ttl"""
+        self._stop.set()
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            try:
+                self.queries.run(cursor, 'leases.release', (self.name, self.holder))
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error liberando lease de ingesta: {e}")
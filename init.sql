@@ -63,9 +63,11 @@ CREATE TABLE IF NOT EXISTS system_config (
 );
 
 -- Índices para rendimiento
-CREATE INDEX IF NOT EXISTS idx_attendance_employee_date ON attendance_records (employee_id, DATE(timestamp));
-CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records (timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_employees_active ON employees (active) WHERE active = true;
+-- Mismo conjunto que migrations/0001_indices_carga_real.postgresql.sql (generado por query_advisor.py)
+CREATE INDEX IF NOT EXISTS idx_ar_employee_ts ON attendance_records (employee_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_ar_day_employee_event ON attendance_records (DATE(timestamp), employee_id, event_type);
+CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records (timestamp);
+CREATE INDEX IF NOT EXISTS idx_employees_active_department ON employees (department, name) WHERE active = true;
 CREATE INDEX IF NOT EXISTS idx_blocked_attempts_date ON blocked_attempts (DATE(created_at));
 
 -- Insertar empleado administrador por defecto
@@ -0,0 +1,104 @@
+-- Migración 0001: esquema base del sistema de asistencia (antes init_database)
+
+CREATE TABLE IF NOT EXISTS employees (
+    id SERIAL PRIMARY KEY,
+    employee_id TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    department TEXT DEFAULT 'General',
+    schedule TEXT DEFAULT 'estandar',
+    phone TEXT DEFAULT '',
+    email TEXT DEFAULT '',
+    active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    synced_to_device BOOLEAN DEFAULT false
+);
+
+CREATE TABLE IF NOT EXISTS employee_schedules (
+    id SERIAL PRIMARY KEY,
+    employee_id TEXT NOT NULL,
+    schedule_type TEXT NOT NULL,
+    shift_type TEXT DEFAULT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    days_of_week TEXT NOT NULL,
+    active_from DATE DEFAULT CURRENT_DATE,
+    active_until DATE DEFAULT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS break_types (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(50) NOT NULL,
+    display_name VARCHAR(100) NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    mandatory BOOLEAN DEFAULT true,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS department_schedules (
+    id SERIAL PRIMARY KEY,
+    department VARCHAR(100) NOT NULL,
+    shift_type VARCHAR(50),
+    work_start TIME NOT NULL,
+    work_end TIME NOT NULL,
+    break_start TIME NOT NULL,
+    break_end TIME NOT NULL,
+    has_lunch BOOLEAN DEFAULT FALSE,
+    lunch_options TEXT[],
+    friday_end TIME,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS attendance_records (
+    id SERIAL PRIMARY KEY,
+    employee_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    reader_no INTEGER DEFAULT 1,
+    verify_method TEXT DEFAULT 'huella',
+    status TEXT DEFAULT 'autorizado',
+    break_type VARCHAR(50),
+    is_break_record BOOLEAN DEFAULT FALSE,
+    break_duration_minutes INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS daily_summaries (
+    id SERIAL PRIMARY KEY,
+    employee_id TEXT NOT NULL,
+    date DATE NOT NULL,
+    first_entry TIME,
+    last_exit TIME,
+    total_hours DECIMAL(4,2) DEFAULT 0,
+    worked_day BOOLEAN DEFAULT false,
+    is_holiday BOOLEAN DEFAULT false,
+    is_weekend BOOLEAN DEFAULT false,
+    late_minutes INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(employee_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS weekly_shift_assignments (
+    id SERIAL PRIMARY KEY,
+    employee_id TEXT NOT NULL,
+    week_start DATE NOT NULL,
+    week_end DATE NOT NULL,
+    shift_type TEXT NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(employee_id, week_start)
+);
+
+-- Estado actual por empleado (último evento del día laboral)
+CREATE TABLE IF NOT EXISTS employee_presence (
+    employee_id TEXT PRIMARY KEY,
+    workday DATE NOT NULL,
+    last_event TEXT NOT NULL,
+    last_timestamp TIMESTAMP NOT NULL,
+    on_break BOOLEAN DEFAULT false,
+    break_type VARCHAR(50),
+    break_started_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records(timestamp);
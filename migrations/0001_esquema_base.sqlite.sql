@@ -0,0 +1,84 @@
+-- Migración 0001: esquema base del sistema de asistencia (antes init_database)
+
+CREATE TABLE IF NOT EXISTS employees (
+    id INTEGER PRIMARY KEY,
+    employee_id TEXT UNIQUE,
+    name TEXT,
+    department TEXT DEFAULT 'General',
+    schedule TEXT DEFAULT 'estandar',
+    phone TEXT DEFAULT '',
+    email TEXT DEFAULT '',
+    active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    synced_to_device BOOLEAN DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS employee_schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_id TEXT NOT NULL,
+    schedule_type TEXT NOT NULL,
+    shift_type TEXT DEFAULT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    days_of_week TEXT NOT NULL,
+    active_from DATE DEFAULT CURRENT_DATE,
+    active_until DATE DEFAULT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS attendance_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_id TEXT,
+    event_type TEXT,
+    timestamp TIMESTAMP,
+    reader_no INTEGER DEFAULT 1,
+    verify_method TEXT DEFAULT 'huella',
+    status TEXT DEFAULT 'autorizado',
+    break_type TEXT,
+    is_break_record BOOLEAN DEFAULT 0,
+    break_duration_minutes INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS daily_summaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_id TEXT NOT NULL,
+    date DATE NOT NULL,
+    first_entry TEXT,
+    last_exit TEXT,
+    total_hours REAL DEFAULT 0,
+    worked_day BOOLEAN DEFAULT 0,
+    is_holiday BOOLEAN DEFAULT 0,
+    is_weekend BOOLEAN DEFAULT 0,
+    late_minutes INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(employee_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS weekly_shift_assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_id TEXT NOT NULL,
+    week_start DATE NOT NULL,
+    week_end DATE NOT NULL,
+    shift_type TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(employee_id, week_start)
+);
+
+-- Estado actual por empleado (último evento del día laboral)
+CREATE TABLE IF NOT EXISTS employee_presence (
+    employee_id TEXT PRIMARY KEY,
+    workday DATE NOT NULL,
+    last_event TEXT NOT NULL,
+    last_timestamp TIMESTAMP NOT NULL,
+    on_break BOOLEAN DEFAULT 0,
+    break_type TEXT,
+    break_started_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records(timestamp);
+
+INSERT OR IGNORE INTO employees (employee_id, name, department)
+VALUES ('1', 'Administrador', 'Administración');
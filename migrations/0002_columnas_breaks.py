@@ -0,0 +1,44 @@
+"""
+Migración 0002: columnas de breaks y restricción de tipos de evento
+Reemplaza fix_database_columns.py y update_event_constraint.py para bases creadas
+con esquemas anteriores (init.sql, system_optimized.py)
+"""
+
+BREAK_COLUMNS = {
+    'postgresql': [
+        ('break_type', 'VARCHAR(50)'),
+        ('is_break_record', 'BOOLEAN DEFAULT FALSE'),
+        ('break_duration_minutes', 'INTEGER'),
+    ],
+    'sqlite': [
+        ('break_type', 'TEXT'),
+        ('is_break_record', 'BOOLEAN DEFAULT 0'),
+        ('break_duration_minutes', 'INTEGER'),
+    ],
+}
+
+EVENT_TYPES = ('entrada', 'salida', 'break_salida', 'break_entrada', 'almuerzo_salida', 'almuerzo_entrada')
+
+
+def existing_columns(cursor, db_type, table):
+    if db_type == 'postgresql':
+        cursor.execute('SELECT column_name FROM information_schema.columns WHERE table_name = %s', (table,))
+        return {row[0] for row in cursor.fetchall()}
+    cursor.execute(f'PRAGMA table_info({table})')
+    return {row[1] for row in cursor.fetchall()}
+
+
+def upgrade(cursor, db_type):
+    columns = existing_columns(cursor, db_type, 'attendance_records')
+    for column_name, definition in BREAK_COLUMNS[db_type]:
+        if column_name not in columns:
+            cursor.execute(f'ALTER TABLE attendance_records ADD COLUMN {column_name} {definition}')
+
+    if db_type == 'postgresql':
+        # init.sql solo permitía entrada/salida
+        allowed = ', '.join(f"'{event_type}'" for event_type in EVENT_TYPES)
+        cursor.execute('ALTER TABLE attendance_records DROP CONSTRAINT IF EXISTS attendance_records_event_type_check')
+        cursor.execute(f'''
+            ALTER TABLE attendance_records
+            ADD CONSTRAINT attendance_records_event_type_check CHECK (event_type IN ({allowed}))
+        ''')
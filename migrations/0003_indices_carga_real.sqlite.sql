@@ -0,0 +1,28 @@
+-- Migración 0003: índices para la carga real de la aplicación
+-- Generada por query_advisor.py el 2026-10-19
+-- Datos sembrados: 200 empleados, 44645 marcajes
+
+-- Último evento y verificación de duplicados por empleado
+CREATE INDEX IF NOT EXISTS idx_ar_employee_ts ON attendance_records (employee_id, timestamp);
+
+-- Conteos del día, primera entrada, tardanzas y resúmenes diarios
+CREATE INDEX IF NOT EXISTS idx_ar_day_employee_event ON attendance_records (date(timestamp), employee_id, event_type);
+
+-- Estado de breaks del día (filtro is_break_record)
+CREATE INDEX IF NOT EXISTS idx_ar_day_breaks ON attendance_records (date(timestamp), employee_id, timestamp) WHERE is_break_record = 1;
+
+-- has_break_today: búsqueda por break_type
+CREATE INDEX IF NOT EXISTS idx_ar_employee_break_type ON attendance_records (employee_id, break_type, date(timestamp)) WHERE is_break_record = 1;
+
+-- Listados de empleados activos por departamento
+CREATE INDEX IF NOT EXISTS idx_employees_active_department ON employees (department, name) WHERE active = 1;
+
+-- Reporte semanal de turnos agrupado por turno
+CREATE INDEX IF NOT EXISTS idx_wsa_week_shift ON weekly_shift_assignments (week_start, shift_type);
+
+-- Índices anteriores cubiertos por el conjunto nuevo
+DROP INDEX IF EXISTS idx_attendance_employee_id;
+DROP INDEX IF EXISTS idx_attendance_date;
+DROP INDEX IF EXISTS idx_attendance_employee_date;
+DROP INDEX IF EXISTS idx_employees_active;
+DROP INDEX IF EXISTS idx_weekly_shifts_employee_week;
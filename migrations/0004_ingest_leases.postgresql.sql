@@ -0,0 +1,9 @@
+-- Migración 0004: lease del proceso que lee el dispositivo (ingest_leader.py)
+-- Una fila por lease; expires_at en segundos epoch del reloj del proceso que renueva
+
+CREATE TABLE IF NOT EXISTS ingest_leases (
+    name VARCHAR(50) PRIMARY KEY,
+    holder VARCHAR(120) NOT NULL,
+    expires_at DOUBLE PRECISION NOT NULL,
+    acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,9 @@
+-- Migración 0004: lease del proceso que lee el dispositivo (ingest_leader.py)
+-- Una fila por lease; expires_at en segundos epoch del reloj del proceso que renueva
+
+CREATE TABLE IF NOT EXISTS ingest_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    acquired_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
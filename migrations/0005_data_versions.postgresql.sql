@@ -0,0 +1,9 @@
+-- Migración 0005: contadores de cambios para ETag/304 de las APIs de lectura (http_cache.py)
+-- name: tabla ('employees', 'schedules', 'shifts') o partición ('attendance:<día>', 'summaries:<mes>')
+-- updated_at en segundos epoch (Last-Modified)
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DOUBLE PRECISION NOT NULL
+);
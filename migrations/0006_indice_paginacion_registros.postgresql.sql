@@ -0,0 +1,7 @@
+-- Migración 0006: paginación por keyset de /api/records
+-- Páginas ORDER BY timestamp DESC, id DESC con (timestamp, id) < (cursor): un rango del índice por página
+
+CREATE INDEX IF NOT EXISTS idx_ar_ts_id ON attendance_records (timestamp, id);
+
+-- Cubierto por idx_ar_ts_id
+DROP INDEX IF EXISTS idx_attendance_timestamp;
@@ -0,0 +1,3 @@
+-- Migración 0006: paginación por keyset de /api/records
+-- Sin cambios en SQLite: idx_attendance_timestamp ya termina en el rowid (id INTEGER PRIMARY KEY),
+-- así que equivale a un índice (timestamp, id)
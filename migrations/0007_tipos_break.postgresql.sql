@@ -0,0 +1,14 @@
+-- Migración 0007: duración de los tipos de break que usa system_optimized_v2.py
+-- (attendance_records.break_type); la vigilancia de breaks vencidos (timing_wheel.py) la lee al arrancar
+
+INSERT INTO break_types (name, display_name, duration_minutes, mandatory)
+SELECT 'admin_break', 'Break Administrativo', 20, true
+WHERE NOT EXISTS (SELECT 1 FROM break_types WHERE name = 'admin_break');
+
+INSERT INTO break_types (name, display_name, duration_minutes, mandatory)
+SELECT 'operativo_break', 'Break Operativo', 20, true
+WHERE NOT EXISTS (SELECT 1 FROM break_types WHERE name = 'operativo_break');
+
+INSERT INTO break_types (name, display_name, duration_minutes, mandatory)
+SELECT 'almuerzo_admin', 'Almuerzo Administrativo', 60, true
+WHERE NOT EXISTS (SELECT 1 FROM break_types WHERE name = 'almuerzo_admin');
@@ -0,0 +1,23 @@
+-- Migración 0007: duración de los tipos de break que usa system_optimized_v2.py
+-- (attendance_records.break_type); la vigilancia de breaks vencidos (timing_wheel.py) la lee al arrancar
+
+CREATE TABLE IF NOT EXISTS break_types (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    display_name TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    mandatory BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO break_types (name, display_name, duration_minutes, mandatory)
+SELECT 'admin_break', 'Break Administrativo', 20, 1
+WHERE NOT EXISTS (SELECT 1 FROM break_types WHERE name = 'admin_break');
+
+INSERT INTO break_types (name, display_name, duration_minutes, mandatory)
+SELECT 'operativo_break', 'Break Operativo', 20, 1
+WHERE NOT EXISTS (SELECT 1 FROM break_types WHERE name = 'operativo_break');
+
+INSERT INTO break_types (name, display_name, duration_minutes, mandatory)
+SELECT 'almuerzo_admin', 'Almuerzo Administrativo', 60, 1
+WHERE NOT EXISTS (SELECT 1 FROM break_types WHERE name = 'almuerzo_admin');
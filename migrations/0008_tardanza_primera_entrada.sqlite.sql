@@ -0,0 +1,36 @@
+-- Migración 0008: tardanza guardada al registrar la primera entrada del día
+-- first_entry_at: marcaje completo de la primera entrada (se escribe una sola vez)
+-- expected_start: hora de entrada esperada 'HH:MM' con la que se calculó late_minutes (NULL si no era día laboral)
+-- idx_ds_late: listas de tardanzas por día o por rango de fechas sin recorrer los resúmenes puntuales
+
+ALTER TABLE daily_summaries ADD COLUMN first_entry_at TIMESTAMP;
+ALTER TABLE daily_summaries ADD COLUMN expected_start TEXT;
+
+-- Días anteriores: mismas reglas que get_expected_hours_by_department al aplicar esta migración
+-- (administrativos y General de lunes a viernes a las 07:00 / 08:00, Operativos todos los días a las 06:00)
+INSERT INTO daily_summaries (employee_id, date, first_entry_at, expected_start, late_minutes)
+SELECT employee_id, day, first_at, expected_start,
+       CASE WHEN expected_start IS NOT NULL AND first_at > day || ' ' || expected_start || ':00'
+            THEN (CAST(strftime('%s', first_at) AS INTEGER) - CAST(strftime('%s', day || ' ' || expected_start || ':00') AS INTEGER)) / 60
+            ELSE 0 END
+FROM (
+    SELECT ar.employee_id, DATE(ar.timestamp) as day, MIN(ar.timestamp) as first_at,
+           CASE
+               WHEN e.department = 'Operativos' THEN '06:00'
+               WHEN strftime('%w', DATE(ar.timestamp)) IN ('0', '6') THEN NULL
+               WHEN e.department IN ('Reacondicionamiento', 'Logistica', 'Administracion') THEN '07:00'
+               ELSE '08:00'
+           END as expected_start
+    FROM attendance_records ar
+    JOIN employees e ON ar.employee_id = e.employee_id
+    WHERE ar.event_type = 'entrada'
+    GROUP BY ar.employee_id, DATE(ar.timestamp), e.department
+) first_entries
+WHERE true
+ON CONFLICT (employee_id, date) DO UPDATE SET
+    first_entry_at = EXCLUDED.first_entry_at,
+    expected_start = EXCLUDED.expected_start,
+    late_minutes = EXCLUDED.late_minutes
+WHERE daily_summaries.first_entry_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ds_late ON daily_summaries (date, first_entry_at) WHERE late_minutes > 0;
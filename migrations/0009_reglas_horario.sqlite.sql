@@ -0,0 +1,42 @@
+-- Migración 0009: horarios por departamento y turno que compila schedule_rules.py
+-- work_days: días laborales (0=lunes ... 6=domingo) separados por coma
+-- Filas con los nombres de departamento que usan los empleados; si ya existen (también con tilde) no se tocan
+
+CREATE TABLE IF NOT EXISTS department_schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    department TEXT NOT NULL,
+    shift_type TEXT,
+    work_start TEXT NOT NULL,
+    work_end TEXT NOT NULL,
+    break_start TEXT NOT NULL,
+    break_end TEXT NOT NULL,
+    has_lunch BOOLEAN DEFAULT 0,
+    lunch_options TEXT,
+    friday_end TEXT,
+    work_days TEXT DEFAULT '0,1,2,3,4',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO department_schedules (department, shift_type, work_start, work_end, break_start, break_end, has_lunch, lunch_options, friday_end, work_days)
+SELECT 'Reacondicionamiento', NULL, '07:00', '17:00', '09:00', '10:00', 1, '12:00-13:00,13:00-14:00', '16:00', '0,1,2,3,4'
+WHERE NOT EXISTS (SELECT 1 FROM department_schedules WHERE department = 'Reacondicionamiento' AND shift_type IS NULL);
+
+INSERT INTO department_schedules (department, shift_type, work_start, work_end, break_start, break_end, has_lunch, lunch_options, friday_end, work_days)
+SELECT 'Logistica', NULL, '07:00', '17:00', '09:00', '10:00', 1, '12:00-13:00,13:00-14:00', '16:00', '0,1,2,3,4'
+WHERE NOT EXISTS (SELECT 1 FROM department_schedules WHERE department IN ('Logistica', 'Logística') AND shift_type IS NULL);
+
+INSERT INTO department_schedules (department, shift_type, work_start, work_end, break_start, break_end, has_lunch, lunch_options, friday_end, work_days)
+SELECT 'Administracion', NULL, '07:00', '17:00', '09:00', '10:00', 1, '12:00-13:00,13:00-14:00', '16:00', '0,1,2,3,4'
+WHERE NOT EXISTS (SELECT 1 FROM department_schedules WHERE department IN ('Administracion', 'Administración') AND shift_type IS NULL);
+
+INSERT INTO department_schedules (department, shift_type, work_start, work_end, break_start, break_end, has_lunch, lunch_options, friday_end, work_days)
+SELECT 'Operativos', 'mañana', '06:00', '14:00', '09:00', '10:00', 0, NULL, NULL, '0,1,2,3,4,5,6'
+WHERE NOT EXISTS (SELECT 1 FROM department_schedules WHERE department = 'Operativos' AND shift_type = 'mañana');
+
+INSERT INTO department_schedules (department, shift_type, work_start, work_end, break_start, break_end, has_lunch, lunch_options, friday_end, work_days)
+SELECT 'Operativos', 'tarde', '14:00', '22:00', '17:00', '18:00', 0, NULL, NULL, '0,1,2,3,4,5,6'
+WHERE NOT EXISTS (SELECT 1 FROM department_schedules WHERE department = 'Operativos' AND shift_type = 'tarde');
+
+INSERT INTO department_schedules (department, shift_type, work_start, work_end, break_start, break_end, has_lunch, lunch_options, friday_end, work_days)
+SELECT 'Operativos', 'noche', '22:00', '06:00', '01:00', '02:00', 0, NULL, NULL, '0,1,2,3,4,5,6'
+WHERE NOT EXISTS (SELECT 1 FROM department_schedules WHERE department = 'Operativos' AND shift_type = 'noche');
@@ -0,0 +1,98 @@
+"""
+Migración 0010: día laboral (workday) de cada marcaje
+El turno noche (22:00-06:00) cruza la medianoche: sus marcajes de madrugada pertenecen
+al día en que empezó el turno. system_optimized_v2.py lo asigna al registrar
+(workday_for); esta migración:
+- agrega attendance_records.workday con índices (employee_id, workday) y (workday)
+- el estado de breaks filtra por workday: idx_ar_workday_breaks reemplaza a idx_ar_day_breaks
+  (DATE(timestamp), migración 0003)
+- rellena los marcajes existentes: DATE(timestamp), o el día anterior para los de antes
+  del workday_cutoff de las reglas (schedule_rules.py, tabla de la migración 0009) del turno
+  asignado ese día anterior si cruza la medianoche, laborable ese día, y la semana del propio
+  marcaje sin turno asignado o con el mismo (la entrada de mañana del lunes siguiente a una
+  semana de noche se queda en su día)
+- trigger: los marcajes que otros scripts insertan sin workday toman DATE(timestamp)
+"""
+from datetime import date
+
+from schedule_rules import RULE_COLUMNS, ScheduleRules
+
+def existing_columns(cursor, db_type, table):
+    if db_type == 'postgresql':
+        cursor.execute('SELECT column_name FROM information_schema.columns WHERE table_name = %s', (table,))
+        return {row[0] for row in cursor.fetchall()}
+    cursor.execute(f'PRAGMA table_info({table})')
+    return {row[1] for row in cursor.fetchall()}
+
+
+def upgrade(cursor, db_type):
+    if 'workday' not in existing_columns(cursor, db_type, 'attendance_records'):
+        column_type = 'DATE' if db_type == 'postgresql' else 'TEXT'
+        cursor.execute(f'ALTER TABLE attendance_records ADD COLUMN workday {column_type}')
+
+    if db_type == 'postgresql':
+        cursor.execute('UPDATE attendance_records SET workday = timestamp::date WHERE workday IS NULL')
+        cursor.execute('''
+            CREATE OR REPLACE FUNCTION attendance_workday_default() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.workday IS NULL THEN
+                    NEW.workday := NEW.timestamp::date;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute('DROP TRIGGER IF EXISTS trg_attendance_workday ON attendance_records')
+        cursor.execute('''
+            CREATE TRIGGER trg_attendance_workday BEFORE INSERT ON attendance_records
+            FOR EACH ROW EXECUTE PROCEDURE attendance_workday_default()
+        ''')
+    else:
+        cursor.execute('UPDATE attendance_records SET workday = DATE(timestamp) WHERE workday IS NULL')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_attendance_workday AFTER INSERT ON attendance_records
+            FOR EACH ROW WHEN NEW.workday IS NULL
+            BEGIN
+                UPDATE attendance_records SET workday = DATE(NEW.timestamp) WHERE id = NEW.id;
+            END
+        ''')
+    backfill_night_shifts(cursor, db_type)
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_employee_workday ON attendance_records(employee_id, workday)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_workday ON attendance_records(workday)')
+    is_break = 'is_break_record = true' if db_type == 'postgresql' else 'is_break_record = 1'
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_ar_workday_breaks ON attendance_records(workday, employee_id) WHERE {is_break}')
+    cursor.execute('DROP INDEX IF EXISTS idx_ar_day_breaks')
+
+
+def backfill_night_shifts(cursor, db_type):
+    """Marcajes de madrugada de un turno que cruza la medianoche: al día anterior"""
+    cursor.execute(f"SELECT {', '.join(RULE_COLUMNS)} FROM department_schedules ORDER BY department, work_start, id")
+    schedule_rules = ScheduleRules(None, None, None)
+    schedule_rules.compile(cursor.fetchall(), {})
+
+    if db_type == 'postgresql':
+        timestamp_date, previous_date, param = 'ar.timestamp::date', 'ar.timestamp::date - 1', '%s'
+    else:
+        timestamp_date, previous_date, param = 'DATE(ar.timestamp)', "DATE(ar.timestamp, '-1 day')", '?'
+    # Solo empleados con turno asignado el día anterior; la hora se compara con las reglas abajo
+    cursor.execute(f'''
+        SELECT ar.id, ar.timestamp, {previous_date}, e.department, prev.shift_type, own.shift_type
+        FROM attendance_records ar
+        JOIN employees e ON e.employee_id = ar.employee_id
+        JOIN weekly_shift_assignments prev ON prev.employee_id = ar.employee_id
+             AND {previous_date} BETWEEN prev.week_start AND prev.week_end
+        LEFT JOIN weekly_shift_assignments own ON own.employee_id = ar.employee_id
+             AND {timestamp_date} BETWEEN own.week_start AND own.week_end
+    ''')
+    updates = []
+    for record_id, timestamp, previous, department, shift_type, own_shift_type in cursor.fetchall():
+        if own_shift_type is not None and own_shift_type != shift_type:
+            continue
+        rules = schedule_rules.rules_for(department, shift_type)
+        previous = str(previous)[:10]
+        if (rules.overnight and str(timestamp)[11:16] < rules.workday_cutoff
+                and rules.expected[date.fromisoformat(previous).weekday()]):
+            updates.append((previous, record_id))
+    if updates:
+        cursor.executemany(f'UPDATE attendance_records SET workday = {param} WHERE id = {param}', updates)
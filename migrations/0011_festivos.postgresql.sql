@@ -0,0 +1,9 @@
+-- Migración 0011: festivos del calendario laboral (work_calendar.py)
+-- Un festivo no es laborable para los departamentos sin turnos; los turnos trabajan y el día
+-- queda marcado en daily_summaries.is_holiday. Se administran con /api/holidays.
+
+CREATE TABLE IF NOT EXISTS holidays (
+    day DATE PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
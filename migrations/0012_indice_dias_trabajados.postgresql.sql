@@ -0,0 +1,6 @@
+-- Migración 0012: días trabajados por rango de fechas (summaries.worked_days)
+-- idx_ds_worked_days: el índice de presencia en bits (presence_bitmap.py) y el resumen mensual leen
+-- los días trabajados de todos los empleados de un mes o un año sin recorrer toda la tabla;
+-- incluye employee_id y total_hours para responder solo con el índice
+
+CREATE INDEX IF NOT EXISTS idx_ds_worked_days ON daily_summaries (date, employee_id, total_hours) WHERE worked_day = true;
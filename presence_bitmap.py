@@ -0,0 +1,95 @@
+"""
+Índice de presencia en bits: un entero por empleado y año, un bit por día trabajado
+(bit 0 = 1 de enero; daily_summaries.worked_day). Con las máscaras del calendario
+laboral del mismo año (work_calendar.py) los conteos son operaciones de bits:
+
+    presentes                 popcount(P)
+    ausentes en días hábiles  popcount(W & ~P & transcurridos)
+    presentes en festivos     popcount(P & H)
+    presentes en no hábiles   popcount(P & ~W)
+
+Cada año se carga con una sola consulta la primera vez que se pide. Cada resumen
+escrito (update_daily_summary, festivos) sube el contador 'summaries:<YYYY-MM>' de
+data_versions; en cada consulta se comparan los 12 contadores del año y solo se
+vuelven a leer los meses que cambiaron, en este proceso o en otro.
+"""
+import calendar
+import threading
+from datetime import date
+
+from work_calendar import as_date
+
+YEARS_CACHED = 3
+
+
+def year_offset(day):
+    """Bit del día dentro de su año"""
+    return day.timetuple().tm_yday - 1
+
+
+def month_mask(year, month_num):
+    """Bits de los días del mes dentro del año"""
+    return ((1 << calendar.monthrange(year, month_num)[1]) - 1) << year_offset(date(year, month_num, 1))
+
+
+def counts(present, work_mask, holiday_mask, elapsed_mask=-1):
+    """Conteos de días de un empleado con sus bits de presencia y las máscaras de su calendario"""
+    return {
+        'days_present': present.bit_count(),
+        'work_days': (work_mask & elapsed_mask).bit_count(),
+        'absent_work_days': (work_mask & ~present & elapsed_mask).bit_count(),
+        'present_holidays': (present & holiday_mask).bit_count(),
+        'present_non_work_days': (present & ~work_mask).bit_count()
+    }
+
+
+class PresenceBitmap:
+    def __init__(self, get_connection, queries, versions, max_years=YEARS_CACHED):
+        self.get_connection = get_connection
+        self.queries = queries
+        self.versions = versions
+        self.max_years = max_years
+
+        self._years = {}  # año -> ({employee_id: bits}, [versión de cada mes])
+        self._lock = threading.Lock()
+
+        self.stats = {'year_loads': 0, 'month_reloads': 0}
+
+    def year(self, year):
+        """{employee_id: bits} del año, al día con los resúmenes de todos los procesos"""
+        names = [f'summaries:{year:04d}-{month_num:02d}' for month_num in range(1, 13)]
+        versions = [version for _, version, _ in self.versions.read(names)]
+        with self._lock:
+            cached = self._years.get(year)
+        if cached is None:
+            bits = self._load(f'{year:04d}-01-01', f'{year + 1:04d}-01-01')
+            self.stats['year_loads'] += 1
+        else:
+            bits = dict(cached[0])
+            for month_num, (known, current) in enumerate(zip(cached[1], versions), start=1):
+                if known == current:
+                    continue
+                mask = ~month_mask(year, month_num)
+                bits = {employee_id: value & mask for employee_id, value in bits.items()}
+                next_month = f'{year + 1:04d}-01-01' if month_num == 12 else f'{year:04d}-{month_num + 1:02d}-01'
+                for employee_id, value in self._load(f'{year:04d}-{month_num:02d}-01', next_month).items():
+                    bits[employee_id] = bits.get(employee_id, 0) | value
+                self.stats['month_reloads'] += 1
+
+        with self._lock:
+            self._years[year] = (bits, versions)
+            while len(self._years) > self.max_years:
+                del self._years[min(self._years)]
+        return bits
+
+    def _load(self, start, end):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            self.queries.run(cursor, 'summaries.worked_days', (start, end))
+            bits = {}
+            for employee_id, day, _ in cursor.fetchall():
+                bits[employee_id] = bits.get(employee_id, 0) | 1 << year_offset(as_date(day))
+            return bits
+        finally:
+            conn.close()
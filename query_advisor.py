@@ -0,0 +1,559 @@
+"""
+Asesor de planes de consulta
+Recolecta las sentencias SQL que ejecuta la aplicación, las ejecuta con EXPLAIN
+sobre un conjunto de datos sembrado y genera el conjunto de índices como migración versionada
+
+Uso:
+    python query_advisor.py                                  # SQLite temporal
+    python query_advisor.py --database-url postgresql://...  # BD PostgreSQL de pruebas (se siembra)
+    python query_advisor.py --employees 500 --days 90 --no-migration
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time as time_module
+from datetime import datetime, timedelta
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+APP_SOURCES = ['system_optimized_v2.py', 'system_breaks.py']
+
+# Índices propuestos para la carga real: (nombre, tabla, columnas PostgreSQL, columnas SQLite,
+# predicado parcial PostgreSQL, predicado parcial SQLite, motivo)
+CANDIDATE_INDEXES = [
+    ('idx_ar_employee_ts', 'attendance_records',
+     'employee_id, timestamp', 'employee_id, timestamp', None, None,
+     'Último evento y verificación de duplicados por empleado'),
+    ('idx_ar_day_employee_event', 'attendance_records',
+     'DATE(timestamp), employee_id, event_type', 'date(timestamp), employee_id, event_type', None, None,
+     'Conteos del día, primera entrada, tardanzas y resúmenes diarios'),
+    ('idx_ar_workday_breaks', 'attendance_records',
+     'workday, employee_id', 'workday, employee_id',
+     'is_break_record = true', 'is_break_record = 1',
+     'Estado de breaks del día laboral (filtro is_break_record)'),
+    ('idx_ar_employee_break_type', 'attendance_records',
+     'employee_id, break_type, DATE(timestamp)', 'employee_id, break_type, date(timestamp)',
+     'is_break_record = true', 'is_break_record = 1',
+     'has_break_today: búsqueda por break_type'),
+    ('idx_attendance_timestamp', 'attendance_records',
+     'timestamp', 'timestamp', None, None,
+     'Registros recientes ordenados por timestamp y rangos de reportes'),
+    ('idx_employees_active_department', 'employees',
+     'department, name', 'department, name', 'active = true', 'active = 1',
+     'Listados de empleados activos por departamento'),
+    ('idx_daily_summaries_date', 'daily_summaries',
+     'date', 'date', None, None,
+     'Reportes mensuales sobre daily_summaries'),
+    ('idx_wsa_week_shift', 'weekly_shift_assignments',
+     'week_start, shift_type', 'week_start, shift_type', None, None,
+     'Reporte semanal de turnos agrupado por turno'),
+]
+
+# Índices anteriores que quedan cubiertos por el conjunto propuesto
+SUPERSEDED_INDEXES = [
+    ('idx_attendance_employee_id', 'attendance_records', 'employee_id'),
+    ('idx_attendance_date', 'attendance_records', 'DATE(timestamp)'),
+    ('idx_attendance_employee_date', 'attendance_records', 'employee_id, DATE(timestamp)'),
+    ('idx_employees_active', 'employees', 'active'),
+    ('idx_weekly_shifts_employee_week', 'weekly_shift_assignments', 'employee_id, week_start'),
+]
+
+
+def normalize_sql(sql):
+    """Normalizar espacios para agrupar sentencias idénticas"""
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+POSTGRESQL_MARKERS = ('%s', '%(', 'DISTINCT ON', 'INTERVAL', 'NOW()', '::', 'DATE_TRUNC', 'ON CONFLICT', '= true', 'ARRAY[')
+SQLITE_MARKERS = ('?', "date('now')", 'INSERT OR', 'strftime(', '= 1', '= 0')
+
+
+def detect_dialect(sql):
+    """Detectar el dialecto de una sentencia según sus marcadores"""
+    if any(marker in sql for marker in POSTGRESQL_MARKERS):
+        return 'postgresql'
+    if any(marker in sql for marker in SQLITE_MARKERS):
+        return 'sqlite'
+    return None
+
+
+class SQLTracer:
+    """Registra cada sentencia ejecutada por las conexiones que envuelve"""
+
+    def __init__(self, trace_file=None):
+        self.trace_file = trace_file
+        self.statements = {}
+        self.lock = threading.Lock()
+
+    def wrap(self, connection_factory):
+        """Envolver una función de conexión para que sus cursores registren las sentencias"""
+        def connect():
+            return _TracingConnection(connection_factory(), self)
+        return connect
+
+    def record(self, sql, params):
+        key = normalize_sql(sql)
+        with self.lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                entry = {'sql': sql, 'params': params, 'count': 0, 'total_ms': 0.0}
+                self.statements[key] = entry
+                if self.trace_file:
+                    with open(self.trace_file, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps({'sql': key, 'params': params}, default=str) + '\n')
+            entry['count'] += 1
+        return entry
+
+
+class _TracingConnection:
+    def __init__(self, conn, tracer):
+        self._conn = conn
+        self._tracer = tracer
+
+    def cursor(self, *args, **kwargs):
+        return _TracingCursor(self._conn.cursor(*args, **kwargs), self._tracer)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # isolation_level y demás atributos van a la conexión real
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+class _TracingCursor:
+    def __init__(self, cursor, tracer):
+        self._cursor = cursor
+        self._tracer = tracer
+
+    def execute(self, sql, params=None):
+        entry = self._tracer.record(sql, params)
+        started = time_module.perf_counter()
+        try:
+            if params is None:
+                return self._cursor.execute(sql)
+            return self._cursor.execute(sql, params)
+        finally:
+            entry['total_ms'] += (time_module.perf_counter() - started) * 1000
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        self._tracer.record(sql, seq_of_params[0] if seq_of_params else None)
+        return self._cursor.executemany(sql, seq_of_params)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def extract_static_statements(paths=APP_SOURCES):
+    """Extraer del código fuente las sentencias literales pasadas a cursor.execute"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    statements = []
+    for path in paths:
+        full_path = os.path.join(base_dir, path)
+        if not os.path.exists(full_path):
+            continue
+        with open(full_path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr in ('execute', 'executemany') and node.args
+                    and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                sql = normalize_sql(node.args[0].value)
+                if sql.split(' ')[0].upper() in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'):
+                    statements.append({'source': f'{path}:{node.lineno}', 'sql': sql})
+    return statements
+
+
+def registry_statements(db_type):
+    """Sentencias del registro de consultas renderizadas para el dialecto"""
+    from query_registry import QueryRegistry
+    registry = QueryRegistry(db_type, prepare=False)
+    return [{'source': f'query_registry:{name}', 'sql': normalize_sql(registry.sql(name))}
+            for name in registry.queries]
+
+
+def seed_dataset(conn, db_type, employees=200, days=60):
+    """Sembrar empleados, marcajes, resúmenes y turnos representativos"""
+    ph = '%s' if db_type == 'postgresql' else '?'
+    cursor = conn.cursor()
+    rng = random.Random(42)
+    departments = ['Operativos'] * 6 + ['Reacondicionamiento', 'Logistica', 'Administracion', 'General']
+    shifts = {'mañana': (6, 14), 'tarde': (14, 22), 'noche': (22, 6)}
+
+    employee_rows = []
+    for i in range(employees):
+        department = rng.choice(departments)
+        employee_rows.append((f'S{i:05d}', f'Empleado {i:05d}', department, 'turnos' if department == 'Operativos' else 'estandar', i % 25 != 0))
+    cursor.executemany(
+        f'INSERT INTO employees (employee_id, name, department, schedule, active) VALUES ({ph}, {ph}, {ph}, {ph}, {ph})',
+        employee_rows
+    )
+
+    now = datetime.now()
+    today = now.date()
+    first_day = today - timedelta(days=days - 1)
+    records = []
+    summaries = []
+    assignments = {}
+
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        week_start = day - timedelta(days=day.weekday())
+        for employee_id, _, department, _, _ in employee_rows:
+            if department == 'Operativos':
+                shift = assignments.setdefault((employee_id, week_start), rng.choice(list(shifts)))
+                start_hour, end_hour = shifts[shift]
+            else:
+                if day.weekday() >= 5:
+                    continue
+                start_hour, end_hour = 7, 17
+            if rng.random() < 0.08:
+                continue  # Ausencia
+
+            entry = datetime.combine(day, datetime.min.time()) + timedelta(hours=start_hour, minutes=rng.randint(-10, 25))
+            worked = ((end_hour - start_hour) % 24) * 60
+            exit_time = entry + timedelta(minutes=worked + rng.randint(-15, 20))
+            break_out = entry + timedelta(minutes=180 + rng.randint(0, 30))
+            break_in = break_out + timedelta(minutes=rng.randint(15, 30))
+            events = [
+                ('entrada', entry, None),
+                ('break_salida', break_out, 'operativo_break' if department == 'Operativos' else 'admin_break'),
+                ('break_entrada', break_in, 'operativo_break' if department == 'Operativos' else 'admin_break'),
+            ]
+            if department != 'Operativos':
+                lunch_out = datetime.combine(day, datetime.min.time()) + timedelta(hours=12, minutes=rng.randint(0, 60))
+                events.append(('almuerzo_salida', lunch_out, 'almuerzo_admin'))
+                events.append(('almuerzo_entrada', lunch_out + timedelta(minutes=rng.randint(50, 70)), 'almuerzo_admin'))
+            if day < today:
+                events.append(('salida', exit_time, None))
+
+            for event_type, moment, break_type in events:
+                if moment > now:
+                    continue
+                records.append((employee_id, event_type, moment.strftime('%Y-%m-%d %H:%M:%S'), rng.randint(1, 4),
+                                'huella', 'autorizado', break_type is not None, break_type))
+            summaries.append((employee_id, day.isoformat(), entry.strftime('%H:%M:%S'), exit_time.strftime('%H:%M:%S'),
+                              round(worked / 60 - 0.33, 2), True, day.weekday() >= 5))
+
+    cursor.executemany(f'''
+        INSERT INTO attendance_records
+        (employee_id, event_type, timestamp, reader_no, verify_method, status, is_break_record, break_type)
+        VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+    ''', records)
+    cursor.executemany(f'''
+        INSERT INTO daily_summaries (employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend)
+        VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+    ''', summaries)
+    cursor.executemany(f'''
+        INSERT INTO weekly_shift_assignments (employee_id, week_start, week_end, shift_type, start_time, end_time)
+        VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+    ''', [(emp_id, week.isoformat(), (week + timedelta(days=6)).isoformat(), shift,
+           '%02d:00:00' % shifts[shift][0], '%02d:00:00' % shifts[shift][1])
+          for (emp_id, week), shift in assignments.items()])
+    conn.commit()
+    return {'employees': len(employee_rows), 'records': len(records), 'summaries': len(summaries)}
+
+
+def run_workload(app_module):
+    """Ejecutar las rutas y métodos de la aplicación para que el trazador capture sus sentencias"""
+    system = app_module.system
+    client = app_module.app.test_client()
+    today = datetime.now().date()
+    week_start = today - timedelta(days=today.weekday())
+    month = today.strftime('%Y-%m')
+    iso_year, iso_week, _ = today.isocalendar()
+
+    paths = [
+        '/api/dashboard',
+        '/api/employees',
+        f'/api/records?date={today.isoformat()}',
+        f'/api/reports/daily?date={today.isoformat()}',
+        f'/api/reports/weekly?week={iso_year}-W{iso_week:02d}',
+        f'/api/reports/attendance?start_date={(today - timedelta(days=6)).isoformat()}&end_date={today.isoformat()}',
+        '/api/breaks/status',
+        '/api/alerts/late',
+        f'/api/employees/technicians?week_start={week_start.isoformat()}',
+        '/api/employees/technicians',
+        f'/api/schedules/weekly-report?week_start={week_start.isoformat()}',
+        '/api/schedules',
+        f'/api/reports/monthly?month={month}',
+        f'/api/reports/monthly-summary?month={month}',
+        f'/api/reports/presence-stats?year={today.year}',
+    ]
+    for path in paths:
+        try:
+            client.get(path)
+        except Exception as e:
+            print(f"Error ejecutando {path}: {e}")
+
+    # Camino de escritura: alta de empleados y primer marcaje del día
+    for employee_id, department in (('ADV001', 'Operativos'), ('ADV002', 'Administracion')):
+        try:
+            system.add_employee(employee_id, f'Asesor {employee_id}', department)
+            system.record_attendance(employee_id, datetime.now().isoformat())
+        except Exception as e:
+            print(f"Error registrando {employee_id}: {e}")
+
+    # Consultas de system_breaks (aplicación separada) ejecutadas con la misma conexión trazada
+    ph = '%s' if system.db_type == 'postgresql' else '?'
+    true = 'TRUE' if system.db_type == 'postgresql' else '1'
+    conn = system.get_connection()
+    cursor = conn.cursor()
+    for sql, params in (
+        (f"SELECT COUNT(*) FROM attendance_records WHERE employee_id = {ph} AND {'DATE' if ph == '%s' else 'date'}(timestamp) = {ph} "
+         f"AND break_type = {ph} AND is_break_record = {true}", ('S00001', today.isoformat(), 'operativo_break')),
+        (f"SELECT event_type FROM attendance_records WHERE employee_id = {ph} AND {'DATE' if ph == '%s' else 'date'}(timestamp) = {ph} "
+         f"ORDER BY timestamp DESC LIMIT 1", ('S00001', today.isoformat())),
+    ):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    conn.close()
+
+
+def explain(conn, db_type, sql, params):
+    """Obtener el plan de una sentencia y sus problemas"""
+    cursor = conn.cursor()
+    result = {'seq_scans': [], 'sorts': 0, 'indexes': [], 'non_covering': [], 'ms': None}
+
+    if db_type == 'postgresql':
+        cursor.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        conn.rollback()  # EXPLAIN ANALYZE ejecuta la sentencia: no conservar escrituras
+        result['ms'] = plan[0].get('Execution Time')
+
+        def walk(node):
+            node_type = node.get('Node Type', '')
+            if node_type == 'Seq Scan':
+                result['seq_scans'].append(node.get('Relation Name'))
+            elif node_type in ('Sort', 'Incremental Sort'):
+                result['sorts'] += 1
+            if node.get('Index Name'):
+                result['indexes'].append(node['Index Name'])
+                if node_type in ('Index Scan', 'Bitmap Index Scan'):
+                    result['non_covering'].append(node['Index Name'])
+            for child in node.get('Plans', []):
+                walk(child)
+        walk(plan[0]['Plan'])
+    else:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params or [])
+        for row in cursor.fetchall():
+            detail = row[-1]
+            if detail.startswith('SCAN ') and 'INDEX' not in detail:
+                result['seq_scans'].append(detail.split(' ')[1])
+            if 'USE TEMP B-TREE' in detail:
+                result['sorts'] += 1
+            match = re.search(r'USING (COVERING )?INDEX (\w+)', detail)
+            if match:
+                result['indexes'].append(match.group(2))
+                if not match.group(1):
+                    result['non_covering'].append(match.group(2))
+        if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            started = time_module.perf_counter()
+            cursor.execute(sql, params or [])
+            cursor.fetchall()
+            result['ms'] = (time_module.perf_counter() - started) * 1000
+
+    cursor.close()
+    return result
+
+
+def index_ddl(db_type, index):
+    name, table, pg_cols, sqlite_cols, pg_where, sqlite_where, _ = index
+    cols, where = (pg_cols, pg_where) if db_type == 'postgresql' else (sqlite_cols, sqlite_where)
+    ddl = f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})'
+    return ddl + (f' WHERE {where}' if where else '')
+
+
+def apply_index_set(conn, db_type, candidates, legacy):
+    """Dejar en la BD solo el conjunto indicado (candidatos o índices anteriores)"""
+    cursor = conn.cursor()
+    for index in CANDIDATE_INDEXES:
+        cursor.execute(f'DROP INDEX IF EXISTS {index[0]}')
+    for name, _, _ in SUPERSEDED_INDEXES:
+        cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+    if legacy:
+        for name, table, cols in SUPERSEDED_INDEXES:
+            if db_type == 'sqlite':
+                cols = cols.replace('DATE(', 'date(')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records (timestamp)')
+    for index in candidates:
+        cursor.execute(index_ddl(db_type, index))
+    cursor.execute('ANALYZE')
+    conn.commit()
+
+
+def next_migration_version(directory=MIGRATIONS_DIR):
+    versions = [int(m.group(1)) for m in (re.match(r'(\d{4})_', f) for f in os.listdir(directory)) if m] if os.path.isdir(directory) else []
+    return max(versions, default=0) + 1
+
+
+def write_migration(used_candidates, stats, directory=MIGRATIONS_DIR, name='indices_carga_real'):
+    """Escribir el conjunto de índices como migración versionada para ambos dialectos"""
+    os.makedirs(directory, exist_ok=True)
+    version = next_migration_version(directory)
+    paths = []
+
+    for db_type in ('postgresql', 'sqlite'):
+        lines = [
+            f'-- Migración {version:04d}: índices para la carga real de la aplicación',
+            f'-- Generada por query_advisor.py el {datetime.now().strftime("%Y-%m-%d")}',
+            f'-- Datos sembrados: {stats["employees"]} empleados, {stats["records"]} marcajes',
+            '',
+        ]
+        for index in used_candidates:
+            lines.append(f'-- {index[6]}')
+            lines.append(index_ddl(db_type, index) + ';')
+            lines.append('')
+        lines.append('-- Índices anteriores cubiertos por el conjunto nuevo')
+        for old_name, _, _ in SUPERSEDED_INDEXES:
+            lines.append(f'DROP INDEX IF EXISTS {old_name};')
+
+        path = os.path.join(directory, f'{version:04d}_{name}.{db_type}.sql')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        paths.append(path)
+
+    return paths
+
+
+def format_issues(result):
+    issues = []
+    if result['seq_scans']:
+        issues.append('seq scan: ' + ', '.join(sorted(set(result['seq_scans']))))
+    if result['sorts']:
+        issues.append(f"sort x{result['sorts']}")
+    if result['non_covering']:
+        issues.append('índice no cubriente: ' + ', '.join(sorted(set(result['non_covering']))))
+    return '; '.join(issues) or 'ok'
+
+
+def load_app(database_url, sqlite_path):
+    """Importar la aplicación apuntando a la BD de pruebas (crea el esquema)"""
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+    else:
+        os.environ.pop('DATABASE_URL', None)
+        os.environ['SQLITE_PATH'] = sqlite_path
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import system_optimized_v2
+    return system_optimized_v2
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Asesor de planes de consulta e índices')
+    parser.add_argument('--database-url', help='BD PostgreSQL vacía para sembrar (por defecto SQLite temporal)')
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--trace-file', help='Guardar las sentencias capturadas en JSONL')
+    parser.add_argument('--no-migration', action='store_true', help='Solo reportar, sin escribir migración')
+    args = parser.parse_args()
+
+    sqlite_path = os.path.join(tempfile.mkdtemp(prefix='advisor_'), 'advisor.db')
+    app_module = load_app(args.database_url, sqlite_path)
+    system = app_module.system
+    db_type = system.db_type
+    raw_connect = system.get_connection
+
+    # En SQLite, DDL y EXPLAIN en la misma conexión: los EXPLAIN en caché de otra conexión
+    # no detectan el cambio de esquema
+    conn = system.sqlite_profile.direct_connection() if db_type == 'sqlite' else raw_connect()
+    print(f"Sembrando datos ({db_type})...")
+    stats = seed_dataset(conn, db_type, args.employees, args.days)
+    print(f"  {stats['employees']} empleados, {stats['records']} marcajes, {stats['summaries']} resúmenes")
+    apply_index_set(conn, db_type, [], legacy=True)
+
+    # Capturar la carga real de la aplicación
+    tracer = SQLTracer(args.trace_file)
+    system.queries.prepare = False  # Capturar el SQL, no EXECUTE de sentencias preparadas
+    system.get_connection = tracer.wrap(raw_connect)
+    run_workload(app_module)
+    system.get_connection = raw_connect
+    captured = list(tracer.statements.values())
+    print(f"Sentencias capturadas: {len(captured)}")
+
+    # Cobertura respecto al código fuente
+    seen = set(tracer.statements)
+    static = [s for s in extract_static_statements() if detect_dialect(s['sql']) in (db_type, None)]
+    static += registry_statements(db_type)
+    missing = [s for s in static if s['sql'] not in seen]
+    if missing:
+        print(f"Sentencias del código sin ejecutar por la carga ({len(missing)}):")
+        for s in missing:
+            print(f"  {s['source']}: {s['sql'][:90]}")
+
+    def plan_all():
+        plans = {}
+        for entry in captured:
+            try:
+                plans[normalize_sql(entry['sql'])] = explain(conn, db_type, entry['sql'], entry['params'])
+            except Exception as e:
+                if db_type == 'postgresql':
+                    conn.rollback()
+                plans[normalize_sql(entry['sql'])] = {'error': str(e)}
+        return plans
+
+    before = plan_all()
+    apply_index_set(conn, db_type, CANDIDATE_INDEXES, legacy=False)
+    after = plan_all()
+
+    print("\nPLANES (antes -> después)")
+    print("=" * 70)
+    for entry in sorted(captured, key=lambda e: -e['count']):
+        key = normalize_sql(entry['sql'])
+        b, a = before[key], after[key]
+        if 'error' in b or 'error' in a:
+            print(f"- {key[:100]}\n    error: {b.get('error') or a.get('error')}")
+            continue
+        timing = ''
+        if b['ms'] is not None and a['ms'] is not None:
+            timing = f" [{b['ms']:.2f} ms -> {a['ms']:.2f} ms]"
+        print(f"- x{entry['count']} {key[:100]}{timing}")
+        print(f"    antes:   {format_issues(b)}")
+        print(f"    después: {format_issues(a)}")
+
+    used_names = {name for plan in after.values() for name in plan.get('indexes', [])}
+    used = [index for index in CANDIDATE_INDEXES if index[0] in used_names]
+    unused = [index[0] for index in CANDIDATE_INDEXES if index[0] not in used_names]
+
+    print("\nÍNDICES USADOS POR LA CARGA")
+    for index in used:
+        print(f"  {index[0]}: {index[6]}")
+    if unused:
+        print(f"Sin uso en esta carga (no se incluyen): {', '.join(unused)}")
+
+    remaining = sorted({table for plan in after.values() for table in plan.get('seq_scans', [])})
+    if remaining:
+        print(f"Seq scans restantes (tablas pequeñas o consultas sin filtro): {', '.join(remaining)}")
+
+    conn.close()
+
+    if not args.no_migration and used:
+        for path in write_migration(used, stats):
+            print(f"Migración escrita: {os.path.relpath(path)}")
+
+
+if __name__ == '__main__':
+    main()
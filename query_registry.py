@@ -0,0 +1,661 @@
+"""
+Registro de consultas con nombre
+Cada consulta se define una sola vez con parámetros '?' y se renderiza por dialecto:
+- PostgreSQL: PREPARE/EXECUTE en el servidor, una vez por conexión del pool
+- SQLite: texto idéntico en cada llamada, reutilizado por la caché de sentencias
+  de las conexiones de larga vida de sqlite_profile
+Cada ejecución se cronometra por nombre (ver /api/metrics/queries).
+
+Marcadores de dialecto dentro del SQL:
+    {true} / {false}   literal booleano (true/false en PostgreSQL, 1/0 en SQLite,
+                       igual que los índices parciales de las migraciones)
+
+Listas como un solo parámetro: queries.array(valores) (= ANY(?) en PostgreSQL,
+json_each(?) en SQLite). Inserciones de muchas filas: queries.run_values (VALUES ?
+en PostgreSQL para execute_values, una fila por ejecución en SQLite).
+
+Uso:
+    queries.run(cursor, 'employees.by_id', (employee_id,))
+    row = cursor.fetchone()
+"""
+import itertools
+import json
+import os
+import re
+import threading
+import time
+
+BOOLEAN_TOKENS = {
+    'postgresql': {'{true}': 'true', '{false}': 'false'},
+    'sqlite': {'{true}': '1', '{false}': '0'},
+}
+
+
+class Query:
+    def __init__(self, sql=None, postgresql=None, sqlite=None):
+        self.sql = {'postgresql': postgresql or sql, 'sqlite': sqlite or sql}
+
+    def for_dialect(self, db_type):
+        sql = self.sql[db_type]
+        for token, literal in BOOLEAN_TOKENS[db_type].items():
+            sql = sql.replace(token, literal)
+        return sql
+
+
+def _replace_placeholders(sql, replacement, escape_percent=False):
+    """Reemplazar '?' fuera de literales; replacement(n) recibe el índice 1..n"""
+    result = []
+    in_string = False
+    index = 0
+    for char in sql:
+        if char == "'":
+            in_string = not in_string
+            result.append(char)
+        elif char == '?' and not in_string:
+            index += 1
+            result.append(replacement(index))
+        elif char == '%' and not in_string and escape_percent:
+            result.append('%%')
+        else:
+            result.append(char)
+    return ''.join(result), index
+
+
+def render(sql, db_type):
+    """SQL neutro ('?') al estilo de parámetros del driver"""
+    if db_type == 'postgresql':
+        return _replace_placeholders(sql, lambda n: '%s', escape_percent=True)[0]
+    return sql
+
+
+QUERIES = {
+    # Empleados
+    'employees.by_id': Query('SELECT name, department, schedule FROM employees WHERE employee_id = ?'),
+    'employees.name_department': Query('SELECT name, department FROM employees WHERE employee_id = ?'),
+    'employees.name_active': Query('SELECT name, active FROM employees WHERE employee_id = ?'),
+    'employees.name': Query('SELECT name FROM employees WHERE employee_id = ?'),
+    'employees.list': Query('''
+        SELECT employee_id, name, department, schedule, phone, email, active, synced_to_device, created_at
+        FROM employees ORDER BY name
+    '''),
+    'employees.active': Query('SELECT employee_id, name, department FROM employees WHERE active = {true} ORDER BY name'),
+    'employees.insert': Query('''
+        INSERT INTO employees (employee_id, name, department, schedule, phone, email)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''),
+    'employees.set_active': Query('UPDATE employees SET active = ? WHERE employee_id = ?'),
+    'employees.update': Query('''
+        UPDATE employees
+        SET name = ?, department = ?, phone = ?, email = ?, active = ?
+        WHERE employee_id = ?
+    '''),
+    'employees.delete': Query('DELETE FROM employees WHERE employee_id = ?'),
+
+    # Marcajes
+    'attendance.recent_for_employee': Query('''
+        SELECT timestamp FROM attendance_records
+        WHERE employee_id = ? AND timestamp > ?
+        ORDER BY timestamp DESC LIMIT 1
+    '''),
+    'attendance.insert': Query('''
+        INSERT INTO attendance_records
+        (employee_id, event_type, timestamp, workday, reader_no, verify_method, status, is_break_record, break_type)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''),
+    # Por día laboral (migración 0010): el turno noche queda en el día en que empezó
+    'attendance.entries_exits_employee_workday': Query('''
+        SELECT event_type, timestamp FROM attendance_records
+        WHERE employee_id = ? AND workday = ? AND event_type IN ('entrada', 'salida')
+        ORDER BY timestamp
+    '''),
+    'attendance.entries_exits_range': Query('''
+        SELECT employee_id, event_type, timestamp, workday FROM attendance_records
+        WHERE workday BETWEEN ? AND ? AND event_type IN ('entrada', 'salida')
+        ORDER BY employee_id, timestamp
+    '''),
+    'attendance.count_day': Query('SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = ?'),
+    'attendance.count_employees_day': Query(
+        'SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE DATE(timestamp) = ?'
+    ),
+    'attendance.punches_by_reader_day': Query('''
+        SELECT reader_no, employee_id, COUNT(*), MAX(timestamp) FROM attendance_records
+        WHERE DATE(timestamp) = ?
+        GROUP BY reader_no, employee_id
+    '''),
+    'attendance.count_event_day': Query(
+        'SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = ? AND event_type = ?'
+    ),
+    'attendance.count_range': Query('SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) BETWEEN ? AND ?'),
+    'attendance.count_employees_range': Query(
+        'SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE DATE(timestamp) BETWEEN ? AND ?'
+    ),
+    'attendance.recent_active': Query('''
+        SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method, ar.employee_id, ar.reader_no
+        FROM attendance_records ar
+        JOIN employees e ON ar.employee_id = e.employee_id
+        WHERE e.active = {true}
+        ORDER BY ar.timestamp DESC LIMIT 20
+    '''),
+    'attendance.day_detail': Query('''
+        SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method, e.department
+        FROM attendance_records ar
+        JOIN employees e ON ar.employee_id = e.employee_id
+        WHERE DATE(ar.timestamp) = ?
+        ORDER BY ar.timestamp DESC
+    '''),
+    'attendance.day_report': Query('''
+        SELECT e.name, ar.event_type, ar.timestamp
+        FROM attendance_records ar
+        JOIN employees e ON ar.employee_id = e.employee_id
+        WHERE DATE(ar.timestamp) = ?
+        ORDER BY ar.timestamp
+    '''),
+
+    # Breaks
+    'breaks.types': Query('SELECT name, duration_minutes FROM break_types'),
+    # Una fila por empleado: completados y últimas salidas/regresos (en break si la última salida es posterior).
+    # (ayer, hoy, hoy): los del día laboral de hoy y los de ayer del turno noche que sigue abierto en
+    # employee_presence; IN con los dos días: búsquedas por igualdad en idx_ar_workday_breaks (migración 0010)
+    'breaks.status_by_employee': Query('''
+        SELECT ar.employee_id, e.name, e.department,
+               SUM(CASE WHEN ar.event_type = 'break_entrada' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN ar.event_type = 'almuerzo_entrada' THEN 1 ELSE 0 END),
+               MAX(CASE WHEN ar.event_type IN ('break_salida', 'almuerzo_salida') THEN ar.timestamp END),
+               MAX(CASE WHEN ar.event_type = 'almuerzo_salida' THEN ar.timestamp END),
+               MAX(CASE WHEN ar.event_type IN ('break_entrada', 'almuerzo_entrada') THEN ar.timestamp END)
+        FROM attendance_records ar
+        JOIN employees e ON ar.employee_id = e.employee_id
+        LEFT JOIN employee_presence p ON p.employee_id = ar.employee_id
+        WHERE ar.workday IN (?, ?) AND (ar.workday = ? OR p.workday = ar.workday)
+              AND ar.is_break_record = {true}
+              AND e.active = {true}
+        GROUP BY ar.employee_id, e.name, e.department
+    '''),
+
+    # Festivos (migración 0011, work_calendar.py)
+    'holidays.list': Query('SELECT day, name FROM holidays ORDER BY day'),
+    'holidays.upsert': Query('''
+        INSERT INTO holidays (day, name) VALUES (?, ?)
+        ON CONFLICT (day) DO UPDATE SET name = EXCLUDED.name
+    '''),
+    'holidays.delete': Query('DELETE FROM holidays WHERE day = ?'),
+
+    # Presencia
+    'presence.upsert': Query('''
+        INSERT INTO employee_presence
+        (employee_id, workday, last_event, last_timestamp, on_break, break_type, break_started_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (employee_id)
+        DO UPDATE SET
+            workday = EXCLUDED.workday,
+            last_event = EXCLUDED.last_event,
+            last_timestamp = EXCLUDED.last_timestamp,
+            on_break = EXCLUDED.on_break,
+            break_type = EXCLUDED.break_type,
+            break_started_at = EXCLUDED.break_started_at,
+            updated_at = CURRENT_TIMESTAMP
+    '''),
+    # Cambio de día (hoy, ayer, empleados con turno noche ayer): solo sobreviven los turnos noche
+    # de ayer todavía abiertos
+    'presence.delete_stale': Query(
+        postgresql='''
+            DELETE FROM employee_presence
+            WHERE workday < ? AND NOT (workday = ? AND last_event <> 'salida' AND employee_id = ANY(?))
+        ''',
+        sqlite='''
+            DELETE FROM employee_presence
+            WHERE workday < ? AND NOT (workday = ? AND last_event <> 'salida'
+                                       AND employee_id IN (SELECT value FROM json_each(?)))
+        '''
+    ),
+    # Último marcaje desde ayer (ayer, hoy, empleados con turno noche ayer): el de hoy, o el turno
+    # noche de ayer todavía abierto
+    'presence.rebuild_day': Query(
+        postgresql='''
+            INSERT INTO employee_presence
+            (employee_id, workday, last_event, last_timestamp, on_break, break_type, break_started_at)
+            SELECT employee_id, workday, event_type, timestamp,
+                   event_type IN ('break_salida', 'almuerzo_salida'),
+                   CASE WHEN event_type IN ('break_salida', 'almuerzo_salida') THEN break_type END,
+                   CASE WHEN event_type IN ('break_salida', 'almuerzo_salida') THEN timestamp END
+            FROM (
+                SELECT employee_id, event_type, timestamp, workday, break_type,
+                       ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY timestamp DESC) as rn
+                FROM attendance_records
+                WHERE workday >= ?
+            ) last_events
+            WHERE rn = 1 AND (workday = ? OR (event_type <> 'salida' AND employee_id = ANY(?)))
+            ON CONFLICT (employee_id) DO NOTHING
+        ''',
+        sqlite='''
+            INSERT INTO employee_presence
+            (employee_id, workday, last_event, last_timestamp, on_break, break_type, break_started_at)
+            SELECT employee_id, workday, event_type, timestamp,
+                   event_type IN ('break_salida', 'almuerzo_salida'),
+                   CASE WHEN event_type IN ('break_salida', 'almuerzo_salida') THEN break_type END,
+                   CASE WHEN event_type IN ('break_salida', 'almuerzo_salida') THEN timestamp END
+            FROM (
+                SELECT employee_id, event_type, timestamp, workday, break_type,
+                       ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY timestamp DESC) as rn
+                FROM attendance_records
+                WHERE workday >= ?
+            ) last_events
+            WHERE rn = 1 AND (workday = ? OR (event_type <> 'salida'
+                                              AND employee_id IN (SELECT value FROM json_each(?))))
+            ON CONFLICT (employee_id) DO NOTHING
+        '''
+    ),
+    # Último marcaje con su día laboral: determine_event_type decide si sigue vigente
+    'presence.department_last_event': Query('''
+        SELECT e.department, p.workday, p.last_event FROM employees e
+        LEFT JOIN employee_presence p ON e.employee_id = p.employee_id
+        WHERE e.employee_id = ?
+    '''),
+    # Desde ayer: tras delete_stale solo quedan de ayer los turnos noche abiertos
+    'presence.active_status': Query('''
+        SELECT e.name, e.employee_id, p.last_event, p.last_timestamp, e.department
+        FROM employees e
+        LEFT JOIN employee_presence p ON e.employee_id = p.employee_id AND p.workday >= ?
+        WHERE e.active = {true}
+    '''),
+
+    # Lease del proceso que lee el dispositivo (ingest_leader.py)
+    'leases.claim': Query('''
+        INSERT INTO ingest_leases (name, holder, expires_at, acquired_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (name)
+        DO UPDATE SET
+            holder = EXCLUDED.holder,
+            expires_at = EXCLUDED.expires_at,
+            acquired_at = CASE WHEN ingest_leases.holder = EXCLUDED.holder
+                               THEN ingest_leases.acquired_at ELSE EXCLUDED.acquired_at END
+        WHERE ingest_leases.holder = EXCLUDED.holder OR ingest_leases.expires_at < ?
+    '''),
+    'leases.holder': Query('SELECT holder, expires_at FROM ingest_leases WHERE name = ?'),
+    'leases.release': Query('DELETE FROM ingest_leases WHERE name = ? AND holder = ?'),
+
+    # Contadores de cambios para ETag/304 (http_cache.py)
+    'versions.bump': Query('''
+        INSERT INTO data_versions (name, version, updated_at)
+        VALUES (?, 1, ?)
+        ON CONFLICT (name)
+        DO UPDATE SET version = data_versions.version + 1, updated_at = EXCLUDED.updated_at
+    '''),
+    'versions.get': Query('SELECT version, updated_at FROM data_versions WHERE name = ?'),
+
+    # Resúmenes diarios (rango de fechas sargable en lugar de DATE_TRUNC/strftime)
+    'summaries.upsert': Query('''
+        INSERT INTO daily_summaries
+        (employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend, is_holiday)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (employee_id, date)
+        DO UPDATE SET
+            first_entry = EXCLUDED.first_entry,
+            last_exit = EXCLUDED.last_exit,
+            total_hours = EXCLUDED.total_hours,
+            worked_day = EXCLUDED.worked_day,
+            is_weekend = EXCLUDED.is_weekend,
+            is_holiday = EXCLUDED.is_holiday
+    '''),
+    # Festivo agregado o eliminado: resúmenes ya guardados de ese día
+    'summaries.mark_holiday': Query('UPDATE daily_summaries SET is_holiday = ? WHERE date = ?'),
+    # Primera entrada del día: solo la primera escribe (rowcount 1); las siguientes no cambian nada
+    'summaries.first_entry': Query('''
+        INSERT INTO daily_summaries (employee_id, date, first_entry_at, expected_start, late_minutes)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (employee_id, date)
+        DO UPDATE SET
+            first_entry_at = EXCLUDED.first_entry_at,
+            expected_start = EXCLUDED.expected_start,
+            late_minutes = EXCLUDED.late_minutes
+        WHERE daily_summaries.first_entry_at IS NULL
+    '''),
+    # Tardanzas por día o rango (índice parcial idx_ds_late, migración 0008)
+    'summaries.late_day_active': Query('''
+        SELECT ds.employee_id, e.name, e.department, ds.expected_start, ds.first_entry_at, ds.late_minutes
+        FROM daily_summaries ds
+        JOIN employees e ON ds.employee_id = e.employee_id
+        WHERE ds.date = ? AND ds.late_minutes > 0 AND e.active = {true}
+        ORDER BY ds.first_entry_at
+    '''),
+    'summaries.late_range': Query('''
+        SELECT ds.employee_id, e.name, e.department, ds.expected_start, ds.first_entry_at, ds.late_minutes
+        FROM daily_summaries ds
+        JOIN employees e ON ds.employee_id = e.employee_id
+        WHERE ds.date BETWEEN ? AND ? AND ds.late_minutes > 0
+        ORDER BY ds.date, ds.first_entry_at
+    '''),
+    # Días trabajados de todos los empleados en [inicio, fin) (monthly-summary y presence_bitmap.py)
+    'summaries.worked_days': Query('''
+        SELECT employee_id, date, total_hours FROM daily_summaries
+        WHERE date >= ? AND date < ? AND worked_day = {true}
+    '''),
+
+    # Turnos
+    # Semana completa (shift_map.py y dashboard_state.py)
+    'shifts.week_map': Query('''
+        SELECT employee_id, shift_type, start_time, end_time
+        FROM weekly_shift_assignments WHERE week_start = ?
+    '''),
+    # Asignación en lote: conflictos de todos los empleados y semanas en una consulta (parámetros queries.array)
+    'shifts.conflicts': Query(
+        postgresql='''
+            SELECT e.name, wsa.shift_type, wsa.week_start FROM weekly_shift_assignments wsa
+            JOIN employees e ON wsa.employee_id = e.employee_id
+            WHERE wsa.employee_id = ANY(?) AND wsa.week_start = ANY(?)
+            ORDER BY wsa.week_start, e.name
+        ''',
+        sqlite='''
+            SELECT e.name, wsa.shift_type, wsa.week_start FROM weekly_shift_assignments wsa
+            JOIN employees e ON wsa.employee_id = e.employee_id
+            WHERE wsa.employee_id IN (SELECT value FROM json_each(?))
+                  AND wsa.week_start IN (SELECT value FROM json_each(?))
+            ORDER BY wsa.week_start, e.name
+        '''
+    ),
+    # Todas las filas en un solo INSERT (queries.run_values)
+    'shifts.upsert_values': Query(
+        postgresql='''
+            INSERT INTO weekly_shift_assignments
+            (employee_id, week_start, week_end, shift_type, start_time, end_time)
+            VALUES ?
+            ON CONFLICT (employee_id, week_start)
+            DO UPDATE SET
+                week_end = EXCLUDED.week_end,
+                shift_type = EXCLUDED.shift_type,
+                start_time = EXCLUDED.start_time,
+                end_time = EXCLUDED.end_time
+        ''',
+        sqlite='''
+            INSERT INTO weekly_shift_assignments
+            (employee_id, week_start, week_end, shift_type, start_time, end_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (employee_id, week_start)
+            DO UPDATE SET
+                week_end = EXCLUDED.week_end,
+                shift_type = EXCLUDED.shift_type,
+                start_time = EXCLUDED.start_time,
+                end_time = EXCLUDED.end_time
+        '''
+    ),
+    'shifts.delete_week': Query('DELETE FROM weekly_shift_assignments WHERE employee_id = ? AND week_start = ?'),
+
+    # Horarios
+    'schedules.active': Query('''
+        SELECT es.employee_id, e.name, es.schedule_type, es.shift_type,
+               es.start_time, es.end_time, es.days_of_week, es.active_from, es.active_until
+        FROM employee_schedules es
+        JOIN employees e ON es.employee_id = e.employee_id
+        WHERE e.active = {true}
+        ORDER BY e.name
+    '''),
+    'schedules.delete_employee': Query('DELETE FROM employee_schedules WHERE employee_id = ?'),
+    # Reglas por departamento y turno (schedule_rules.py); por work_start: el primer turno es el más temprano
+    'schedules.rules': Query('''
+        SELECT department, shift_type, work_start, work_end, break_start, break_end,
+               has_lunch, lunch_options, friday_end, work_days
+        FROM department_schedules
+        ORDER BY department, work_start, id
+    '''),
+}
+
+# Variantes con filtros opcionales: una sentencia fija por combinación para poder prepararlas
+REPORT_EMPLOYEES = 'SELECT employee_id, name, department, schedule FROM employees WHERE active = {true}'
+QUERIES.update({
+    'reports.employees': Query(REPORT_EMPLOYEES + ' ORDER BY name'),
+    'reports.employees_by_id': Query(REPORT_EMPLOYEES + ' AND employee_id = ? ORDER BY name'),
+    'reports.employees_by_department': Query(REPORT_EMPLOYEES + ' AND department = ? ORDER BY name'),
+    'reports.employees_by_id_department': Query(REPORT_EMPLOYEES + ' AND employee_id = ? AND department = ? ORDER BY name'),
+})
+
+MONTHLY_REPORT = '''
+    SELECT e.employee_id, e.name, e.department, e.schedule,
+           ds.date, ds.first_entry, ds.last_exit, ds.total_hours,
+           ds.worked_day, ds.is_weekend, ds.is_holiday
+    FROM employees e
+    LEFT JOIN daily_summaries ds ON e.employee_id = ds.employee_id
+    WHERE e.active = {true} AND ds.date >= ? AND ds.date < ?
+'''
+QUERIES.update({
+    'reports.monthly': Query(MONTHLY_REPORT + ' ORDER BY e.name, ds.date'),
+    'reports.monthly_employee': Query(MONTHLY_REPORT + ' AND e.employee_id = ? ORDER BY e.name, ds.date'),
+})
+
+# Registros de un día paginados por (timestamp, id) descendente: rango del índice
+# (timestamp, id) por página y una sentencia fija por combinación de filtros
+RECORD_FILTERS = (
+    ('department', 'e.department = ?'),
+    ('event_type', 'ar.event_type = ?'),
+    ('employee_id', 'ar.employee_id = ?'),
+    ('reader_no', 'ar.reader_no = ?'),
+    ('verify_method', 'ar.verify_method = ?'),
+)
+RECORDS_PAGE = '''
+    SELECT ar.id, ar.employee_id, e.name, e.department, ar.event_type, ar.timestamp, ar.verify_method, ar.reader_no
+    FROM attendance_records ar
+    JOIN employees e ON ar.employee_id = e.employee_id
+    WHERE ar.timestamp >= ? AND ar.timestamp < ?'''
+RECORDS_COUNT = '''
+    SELECT COUNT(*)
+    FROM attendance_records ar
+    JOIN employees e ON ar.employee_id = e.employee_id
+    WHERE ar.timestamp >= ? AND ar.timestamp < ?'''
+
+
+def records_query_name(kind, filters):
+    """'attendance.page', 'attendance.page_after' o 'attendance.page_count' con los filtros usados"""
+    return f"attendance.{kind}" + (f"[{','.join(filters)}]" if filters else '')
+
+
+for size in range(len(RECORD_FILTERS) + 1):
+    for combination in itertools.combinations(RECORD_FILTERS, size):
+        filters = [name for name, _ in combination]
+        conditions = ''.join(f' AND {condition}' for _, condition in combination)
+        QUERIES.update({
+            records_query_name('page', filters): Query(
+                RECORDS_PAGE + conditions + ' ORDER BY ar.timestamp DESC, ar.id DESC LIMIT ?'),
+            records_query_name('page_after', filters): Query(
+                RECORDS_PAGE + conditions + ' AND (ar.timestamp, ar.id) < (?, ?) ORDER BY ar.timestamp DESC, ar.id DESC LIMIT ?'),
+            records_query_name('page_count', filters): Query(RECORDS_COUNT + conditions),
+        })
+
+
+class QueryRegistry:
+    def __init__(self, db_type, queries=QUERIES, prepare=None):
+        self.db_type = db_type
+        self.queries = queries
+        if prepare is None:
+            # La traza de query_advisor necesita ver el SQL original, no EXECUTE
+            prepare = (os.getenv('PREPARED_STATEMENTS', 'true').lower() != 'false'
+                       and not os.getenv('SQL_TRACE_FILE'))
+        self.prepare = prepare and db_type == 'postgresql'
+
+        self._rendered = {}
+        self._prepared_sql = {}
+        self._unpreparable = set()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        for name, query in queries.items():
+            sql = query.for_dialect(db_type)
+            self._rendered[name] = render(sql, db_type)
+            if db_type == 'postgresql':
+                body, count = _replace_placeholders(sql, lambda n: f'${n}')
+                self._prepared_sql[name] = (self.statement_name(name), body, count)
+
+    @staticmethod
+    def statement_name(name):
+        return 'q_' + re.sub(r'\W', '_', name)
+
+    def sql(self, name):
+        """SQL renderizado para el dialecto (sin preparar)"""
+        return self._rendered[name]
+
+    def run(self, cursor, name, params=()):
+        """Ejecutar la consulta con nombre en el cursor dado; la transacción es del llamador"""
+        started = time.perf_counter()
+        prepared = False
+        try:
+            if self.prepare and name not in self._unpreparable:
+                prepared = self._execute_prepared(cursor, name, params)
+            if not prepared:
+                cursor.execute(self._rendered[name], tuple(params))
+        finally:
+            self._record(name, (time.perf_counter() - started) * 1000, prepared)
+        return cursor
+
+    def run_many(self, cursor, name, seq_of_params):
+        started = time.perf_counter()
+        try:
+            cursor.executemany(self._rendered[name], [tuple(params) for params in seq_of_params])
+        finally:
+            self._record(name, (time.perf_counter() - started) * 1000, False)
+        return cursor
+
+    def run_values(self, cursor, name, rows, page_size=1000):
+        """Muchas filas en una sentencia por página (execute_values); en SQLite, executemany en proceso"""
+        started = time.perf_counter()
+        try:
+            if self.db_type == 'postgresql':
+                from psycopg2.extras import execute_values
+                execute_values(cursor, self._rendered[name], [tuple(row) for row in rows], page_size=page_size)
+            else:
+                cursor.executemany(self._rendered[name], [tuple(row) for row in rows])
+        finally:
+            self._record(name, (time.perf_counter() - started) * 1000, False)
+        return cursor
+
+    def array(self, values):
+        """Lista como parámetro único: array de PostgreSQL o texto JSON para json_each de SQLite"""
+        values = list(values)
+        if self.db_type == 'postgresql':
+            return values
+        return json.dumps(values, default=str)
+
+    def _execute_prepared(self, cursor, name, params):
+        """EXECUTE de una sentencia preparada en la conexión del cursor (PREPARE la primera vez)"""
+        conn = cursor.connection
+        prepared_names = getattr(conn, 'prepared_statements', None)
+        if prepared_names is None:
+            return False  # Conexión fuera del pool: sin registro de sentencias preparadas
+
+        statement, body, count = self._prepared_sql[name]
+        if statement not in prepared_names:
+            # Un PREPARE fallido no debe abortar la transacción del llamador
+            cursor.execute('SAVEPOINT query_registry_prepare')
+            try:
+                cursor.execute(f'PREPARE {statement} AS {body}')
+                cursor.execute('RELEASE SAVEPOINT query_registry_prepare')
+            except Exception as e:
+                cursor.execute('ROLLBACK TO SAVEPOINT query_registry_prepare')
+                self._unpreparable.add(name)
+                print(f"Consulta {name} sin preparar: {e}")
+                return False
+            prepared_names.add(statement)
+
+        if count:
+            cursor.execute(f"EXECUTE {statement} ({', '.join(['%s'] * count)})", tuple(params))
+        else:
+            cursor.execute(f'EXECUTE {statement}')
+        return True
+
+    def _record(self, name, elapsed_ms, prepared):
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'prepared': False})
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['prepared'] = stats['prepared'] or prepared
+
+    def stats(self):
+        """Tiempos por consulta, de mayor a menor tiempo total"""
+        with self._stats_lock:
+            rows = [{
+                'query': name,
+                'calls': s['calls'],
+                'total_ms': round(s['total_ms'], 2),
+                'avg_ms': round(s['total_ms'] / s['calls'], 3),
+                'max_ms': round(s['max_ms'], 2),
+                'prepared': s['prepared'],
+            } for name, s in self._stats.items()]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+class PostgresPool:
+    """Pool de conexiones psycopg2: las sentencias preparadas viven mientras vive la conexión"""
+
+    def __init__(self, database_url, minconn=None, maxconn=None):
+        import psycopg2
+        import psycopg2.extensions
+        from psycopg2.pool import ThreadedConnectionPool
+
+        class PreparedConnection(psycopg2.extensions.connection):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.prepared_statements = set()
+
+        minconn = minconn if minconn is not None else int(os.getenv('DB_POOL_MIN', '1'))
+        maxconn = maxconn if maxconn is not None else int(os.getenv('DB_POOL_MAX', '10'))
+        self._pool = ThreadedConnectionPool(minconn, maxconn, database_url, connection_factory=PreparedConnection)
+        # ThreadedConnectionPool falla si se agota; esperar en lugar de fallar
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def connect(self):
+        """Reemplazo de psycopg2.connect(url) para get_connection()"""
+        self._slots.acquire()
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        return _PooledConnection(self, conn)
+
+    def _release(self, conn):
+        try:
+            broken = conn.closed
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            self._pool.putconn(conn, close=broken)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._pool.closeall()
+
+
+class _PooledConnection:
+    """Conexión prestada: close() la devuelve al pool (con rollback de lo no confirmado)"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool._release(conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise AttributeError(name)
+        return getattr(conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        return False
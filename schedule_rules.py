@@ -0,0 +1,264 @@
+"""
+Reglas de horario y breaks por departamento y turno, compiladas en memoria
+Fuente: tablas department_schedules y break_types (migraciones 0007 y 0009). Cada fila
+(departamento, turno) se compila una sola vez en:
+- ventanas de clasificación ordenadas (break, almuerzo) en segundos del día, con
+  búsqueda binaria (bisect) del marcaje: O(log n) sin comparar hora por hora
+- horario esperado (inicio, fin) por día de la semana, con el fin especial del viernes
+- horas a descontar por breaks y almuerzo, tipo de break y cierre de su ventana
+
+Los nombres de departamento se comparan sin tildes ni mayúsculas ('Logística' y
+'Logistica' son el mismo). Un departamento por turnos consultado sin turno usa el
+horario de su primer turno, sin ventanas de break. Los departamentos sin fila usan
+DEFAULT_RULE (General: L-V 08:00-17:00, descuenta break y almuerzo). Hasta la primera
+carga (o si las tablas no se pueden leer) rigen DEFAULT_SCHEDULES, las filas de la 0009.
+
+Las reglas se recargan cuando cambia el contador 'schedule_rules' de data_versions
+(se comprueba en cada renovación del lease). Tras editar las tablas a mano:
+    UPDATE data_versions SET version = version + 1 WHERE name = 'schedule_rules';
+"""
+import threading
+import unicodedata
+from bisect import bisect_right
+
+# Duración en minutos por tipo de break si falta en break_types
+DEFAULT_BREAK_MINUTES = {'admin_break': 20, 'operativo_break': 20, 'almuerzo_admin': 60}
+LUNCH_BREAK_TYPE = 'almuerzo_admin'
+
+# Departamentos sin fila en department_schedules
+DEFAULT_RULE = {
+    'department': 'General', 'shift_type': None, 'work_start': '08:00', 'work_end': '17:00',
+    'break_start': None, 'break_end': None, 'has_lunch': True, 'lunch_options': None,
+    'friday_end': None, 'work_days': '0,1,2,3,4'
+}
+RULE_COLUMNS = tuple(DEFAULT_RULE)
+
+# Filas que siembra la migración 0009, en el orden de RULE_COLUMNS
+ADMIN_LUNCH_OPTIONS = '12:00-13:00,13:00-14:00'
+DEFAULT_SCHEDULES = (
+    ('Administracion', None, '07:00', '17:00', '09:00', '10:00', True, ADMIN_LUNCH_OPTIONS, '16:00', '0,1,2,3,4'),
+    ('Logistica', None, '07:00', '17:00', '09:00', '10:00', True, ADMIN_LUNCH_OPTIONS, '16:00', '0,1,2,3,4'),
+    ('Operativos', 'mañana', '06:00', '14:00', '09:00', '10:00', False, None, None, '0,1,2,3,4,5,6'),
+    ('Operativos', 'tarde', '14:00', '22:00', '17:00', '18:00', False, None, None, '0,1,2,3,4,5,6'),
+    ('Operativos', 'noche', '22:00', '06:00', '01:00', '02:00', False, None, None, '0,1,2,3,4,5,6'),
+    ('Reacondicionamiento', None, '07:00', '17:00', '09:00', '10:00', True, ADMIN_LUNCH_OPTIONS, '16:00', '0,1,2,3,4'),
+)
+
+
+def department_key(department):
+    """Nombre de departamento sin tildes ni mayúsculas"""
+    text = unicodedata.normalize('NFKD', department or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).strip().casefold()
+
+
+def _hhmm(value):
+    """'HH:MM' de un TIME de PostgreSQL o de un texto 'HH:MM[:SS]' de SQLite"""
+    if value is None:
+        return None
+    if hasattr(value, 'strftime'):
+        return value.strftime('%H:%M')
+    return str(value)[:5]
+
+
+def _seconds(hhmm):
+    return int(hhmm[:2]) * 3600 + int(hhmm[3:5]) * 60
+
+
+def _lunch_windows(options):
+    """Opciones de almuerzo ('12:00-13:00', ...) unidas en ventanas contiguas"""
+    if not options:
+        return []
+    if isinstance(options, str):
+        options = options.strip('{}').split(',')
+    windows = []
+    for option in sorted(option.strip().strip('"') for option in options if option.strip()):
+        start, _, end = option.partition('-')
+        start, end = _seconds(start.strip()), _seconds(end.strip())
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+    return windows
+
+
+class ShiftRules:
+    """Reglas compiladas de un departamento y turno"""
+    __slots__ = ('department', 'shift_type', 'work_start', 'work_end', 'break_start', 'break_end',
+                 'break_type', 'overnight_break', 'overnight', 'workday_cutoff', 'deduction_hours', 'expected',
+                 'has_break', 'has_lunch', '_starts', '_windows')
+
+    def __init__(self, row, break_minutes, with_windows=True):
+        self.department = row['department']
+        self.shift_type = row['shift_type']
+        self.work_start = _hhmm(row['work_start'])
+        self.work_end = _hhmm(row['work_end'])
+        self.break_start = _hhmm(row['break_start']) if with_windows else None
+        self.break_end = _hhmm(row['break_end']) if with_windows else None
+        self.break_type = 'operativo_break' if row['shift_type'] else 'admin_break'
+        # Ventana del break de madrugada en un turno que empieza la noche anterior
+        self.overnight_break = bool(self.break_end and self.break_end < self.work_start)
+        # Turno que cruza la medianoche: los marcajes de antes de workday_cutoff (mitad de las
+        # horas libres entre el fin y el siguiente inicio) pertenecen al día en que empezó
+        self.overnight = self.work_end < self.work_start
+        cutoff = (_seconds(self.work_end) + _seconds(self.work_start)) // 2 if self.overnight else 0
+        self.workday_cutoff = f'{cutoff // 3600:02d}:{cutoff % 3600 // 60:02d}'
+
+        deduction = break_minutes.get(self.break_type, DEFAULT_BREAK_MINUTES[self.break_type])
+        if row['has_lunch']:
+            deduction += break_minutes.get(LUNCH_BREAK_TYPE, DEFAULT_BREAK_MINUTES[LUNCH_BREAK_TYPE])
+        self.deduction_hours = deduction / 60
+
+        work_days = {int(day) for day in str(row['work_days'] or DEFAULT_RULE['work_days']).split(',') if day.strip()}
+        friday_end = _hhmm(row['friday_end'])
+        self.expected = tuple(
+            (self.work_start, friday_end if day == 4 and friday_end else self.work_end) if day in work_days else None
+            for day in range(7)
+        )
+
+        # Intervalo cerrado [inicio, fin] en segundos del día, ordenado por inicio y sin solapes
+        windows = []
+        if with_windows:
+            if self.break_start and self.break_end:
+                windows.append((_seconds(self.break_start), _seconds(self.break_end), 'break'))
+            if row['has_lunch']:
+                windows.extend((start, end, 'almuerzo') for start, end in _lunch_windows(row['lunch_options']))
+        windows.sort()
+        self._starts = [window[0] for window in windows]
+        self._windows = windows
+        # Un break / un almuerzo al día para quien tiene la ventana (pendientes del dashboard)
+        self.has_break = any(kind == 'break' for _, _, kind in windows)
+        self.has_lunch = any(kind == 'almuerzo' for _, _, kind in windows)
+
+    def window_at(self, moment):
+        """'break', 'almuerzo' o None para la hora (time o datetime) de un marcaje"""
+        seconds = moment.hour * 3600 + moment.minute * 60 + moment.second + (1 if moment.microsecond else 0)
+        index = bisect_right(self._starts, seconds) - 1
+        if index >= 0 and seconds <= self._windows[index][1]:
+            return self._windows[index][2]
+        return None
+
+    def is_work_day(self, day_of_week):
+        return self.expected[day_of_week] is not None
+
+    def as_dict(self):
+        return {
+            'department': self.department,
+            'shift_type': self.shift_type,
+            'expected': list(self.expected),
+            'windows': [{'kind': kind, 'start': f'{start // 3600:02d}:{start % 3600 // 60:02d}',
+                         'end': f'{end // 3600:02d}:{end % 3600 // 60:02d}'} for start, end, kind in self._windows],
+            'break_type': self.break_type,
+            'deduction_minutes': round(self.deduction_hours * 60)
+        }
+
+
+class ScheduleRules:
+    def __init__(self, get_connection, queries, versions):
+        self.get_connection = get_connection
+        self.queries = queries
+        self.versions = versions
+
+        self.version = None
+        self.generation = 0  # Sube con cada compilación (work_calendar.py descarta sus meses)
+        self.break_minutes = dict(DEFAULT_BREAK_MINUTES)
+        # (reglas por (clave de departamento, turno), memo por (departamento, turno) tal como llegan,
+        #  reglas por defecto): se reemplaza entero al recompilar
+        self._compiled = ({}, {}, ShiftRules(DEFAULT_RULE, self.break_minutes))
+        self._lock = threading.Lock()
+        self.compile(DEFAULT_SCHEDULES, {})
+
+    def compile(self, rows, break_minutes):
+        """Compilar filas de department_schedules (tuplas en el orden de RULE_COLUMNS)"""
+        minutes = dict(DEFAULT_BREAK_MINUTES)
+        minutes.update(break_minutes)
+        rules = {}
+        first_shift = {}
+        for values in rows:
+            row = dict(zip(RULE_COLUMNS, values))
+            key = department_key(row['department'])
+            rules[(key, row['shift_type'])] = ShiftRules(row, minutes)
+            if row['shift_type'] and key not in first_shift:
+                first_shift[key] = row  # Filas ordenadas por work_start: el turno más temprano
+        for key, row in first_shift.items():
+            rules.setdefault((key, None), ShiftRules(row, minutes, with_windows=False))
+
+        with self._lock:
+            self.break_minutes = minutes
+            self._compiled = (rules, {}, ShiftRules(DEFAULT_RULE, minutes))
+            self.generation += 1
+
+    def load(self):
+        """Leer ambas tablas y compilar; conserva las reglas anteriores si falla"""
+        try:
+            version = self.versions.read(['schedule_rules'])[0][1]
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            try:
+                self.queries.run(cursor, 'schedules.rules')
+                rows = cursor.fetchall()
+                self.queries.run(cursor, 'breaks.types')
+                break_minutes = {name: int(duration) for name, duration in cursor.fetchall()}
+            finally:
+                conn.close()
+            self.compile(rows, break_minutes)
+            self.version = version
+        except Exception as e:
+            print(f"Error cargando reglas de horario: {e}")
+
+    def refresh(self):
+        """Recompilar si cambió el contador 'schedule_rules'"""
+        try:
+            version = self.versions.read(['schedule_rules'])[0][1]
+        except Exception as e:
+            print(f"Error leyendo versión de reglas de horario: {e}")
+            return
+        if version != self.version:
+            self.load()
+
+    def rules_for(self, department, shift_type=None):
+        """Reglas de un departamento y turno (del departamento sin turno, o DEFAULT_RULE)"""
+        compiled, lookup, default = self._compiled
+        rules = lookup.get((department, shift_type))
+        if rules is None:
+            key = department_key(department)
+            rules = compiled.get((key, shift_type)) or compiled.get((key, None)) or default
+            lookup[(department, shift_type)] = rules
+        return rules
+
+    def classify(self, department, shift_type, moment):
+        """Ventana ('break', 'almuerzo' o None) en la que cae un marcaje"""
+        return self.rules_for(department, shift_type).window_at(moment)
+
+    def cohorts(self, day_of_week):
+        """Reglas (departamento, turno) que trabajan ese día, incluida DEFAULT_RULE"""
+        compiled, _, default = self._compiled
+        rules = [rules for key, rules in compiled.items() if key[1] == rules.shift_type] + [default]
+        return [rules for rules in rules if rules.is_work_day(day_of_week)]
+
+    def expected_hours(self, department, day_of_week, shift_type=None):
+        """('HH:MM' inicio, 'HH:MM' fin) o None si no es día laboral"""
+        return self.rules_for(department, shift_type).expected[day_of_week]
+
+    def is_work_day(self, department, day_of_week, shift_type=None):
+        return self.rules_for(department, shift_type).is_work_day(day_of_week)
+
+    def deduction_hours(self, department, shift_type=None):
+        return self.rules_for(department, shift_type).deduction_hours
+
+    def break_type(self, department):
+        return self.rules_for(department).break_type
+
+    def minutes_for(self, break_type):
+        return self.break_minutes.get(break_type, DEFAULT_BREAK_MINUTES.get(break_type, 0))
+
+    def snapshot(self):
+        """Reglas compiladas (para /api/schedule-rules)"""
+        compiled, _, default = self._compiled
+        return {
+            'version': self.version,
+            'break_minutes': dict(self.break_minutes),
+            # Sin las entradas sin turno derivadas del primer turno
+            'rules': [compiled[key].as_dict() for key in sorted(compiled, key=lambda key: (key[0], key[1] or ''))
+                      if key[1] == compiled[key].shift_type],
+            'default': default.as_dict()
+        }
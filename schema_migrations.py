@@ -0,0 +1,208 @@
+"""
+Migraciones versionadas del esquema
+Aplica en orden los archivos de migrations/ y registra la versión en schema_migrations.
+Un solo proceso (líder) aplica las migraciones; el resto solo compara versiones.
+
+Archivos en migrations/:
+    NNNN_nombre.postgresql.sql / NNNN_nombre.sqlite.sql   SQL por dialecto
+    NNNN_nombre.py                                        upgrade(cursor, db_type)
+
+Uso:
+    python schema_migrations.py           # aplicar migraciones pendientes
+    python schema_migrations.py status    # mostrar versión actual y pendientes
+"""
+import importlib.util
+import os
+import re
+import sys
+
+from dotenv import load_dotenv
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Clave del advisory lock de PostgreSQL para elegir al proceso que migra
+ADVISORY_LOCK_KEY = 727001
+
+
+class SchemaMigrator:
+    def __init__(self, get_connection, db_type, directory=MIGRATIONS_DIR):
+        self.get_connection = get_connection
+        self.db_type = db_type
+        self.directory = directory
+        self._migrations = None
+
+    def available(self):
+        """Migraciones disponibles para el dialecto: lista ordenada de (versión, nombre, ruta)"""
+        if self._migrations is None:
+            found = {}
+            for filename in sorted(os.listdir(self.directory)):
+                match = re.match(r'^(\d{4})_(\w+?)(?:\.(postgresql|sqlite))?\.(sql|py)$', filename)
+                if not match:
+                    continue
+                version, name, dialect, extension = match.groups()
+                if extension == 'sql' and dialect != self.db_type:
+                    continue
+                found[int(version)] = (int(version), name, os.path.join(self.directory, filename))
+            self._migrations = [found[version] for version in sorted(found)]
+        return self._migrations
+
+    def latest_version(self):
+        migrations = self.available()
+        return migrations[-1][0] if migrations else 0
+
+    def current_version(self, conn=None):
+        """Versión aplicada (0 si la tabla de control no existe)"""
+        own_conn = conn is None
+        conn = conn or self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT MAX(version) FROM schema_migrations')
+            row = cursor.fetchone()
+            return row[0] or 0
+        except Exception:
+            conn.rollback()
+            return 0
+        finally:
+            if own_conn:
+                conn.close()
+
+    def pending(self, current=None):
+        current = self.current_version() if current is None else current
+        return [migration for migration in self.available() if migration[0] > current]
+
+    def ensure_current(self, auto_migrate=True):
+        """Comprobación barata al iniciar: migrar solo si hay pendientes (un único líder las aplica)"""
+        current = self.current_version()
+        if current >= self.latest_version():
+            return True
+
+        if not auto_migrate:
+            print(f"Esquema desactualizado (versión {current}, última {self.latest_version()}). "
+                  f"Ejecutar: python schema_migrations.py")
+            return False
+
+        self.migrate()
+        return True
+
+    def migrate(self):
+        """Aplicar migraciones pendientes bajo un bloqueo exclusivo"""
+        if self.db_type == 'postgresql':
+            return self._migrate_postgresql()
+        return self._migrate_sqlite()
+
+    def _ensure_table(self, cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def _migrate_postgresql(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        applied = []
+
+        try:
+            # Los demás procesos esperan aquí y luego encuentran todo aplicado
+            cursor.execute('SELECT pg_advisory_lock(%s)', (ADVISORY_LOCK_KEY,))
+            self._ensure_table(cursor)
+            conn.commit()
+
+            for version, name, path in self.pending(self.current_version(conn)):
+                try:
+                    self._apply(cursor, path)
+                    cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (%s, %s)', (version, name))
+                    conn.commit()
+                    applied.append(version)
+                    print(f"Migración {version:04d}_{name} aplicada")
+                except Exception:
+                    conn.rollback()
+                    raise
+        finally:
+            try:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', (ADVISORY_LOCK_KEY,))
+                conn.commit()
+            finally:
+                conn.close()
+
+        return applied
+
+    def _migrate_sqlite(self):
+        conn = self.get_connection()
+        conn.isolation_level = None  # Transacciones explícitas: el DDL queda dentro de BEGIN IMMEDIATE
+        cursor = conn.cursor()
+        applied = []
+
+        try:
+            self._ensure_table(cursor)
+
+            for version, name, path in self.available():
+                # BEGIN IMMEDIATE toma el bloqueo de escritura: otro proceso espera y vuelve a comprobar
+                cursor.execute('BEGIN IMMEDIATE')
+                try:
+                    cursor.execute('SELECT 1 FROM schema_migrations WHERE version = ?', (version,))
+                    if cursor.fetchone():
+                        cursor.execute('COMMIT')
+                        continue
+                    self._apply(cursor, path)
+                    cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (version, name))
+                    cursor.execute('COMMIT')
+                    applied.append(version)
+                    print(f"Migración {version:04d}_{name} aplicada")
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
+        finally:
+            conn.close()
+
+        return applied
+
+    def _apply(self, cursor, path):
+        if path.endswith('.py'):
+            spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.upgrade(cursor, self.db_type)
+            return
+
+        with open(path, encoding='utf-8') as f:
+            script = f.read()
+
+        if self.db_type == 'postgresql':
+            cursor.execute(script)
+        else:
+            # executescript haría COMMIT implícito; ejecutar sentencia por sentencia
+            lines = [line for line in script.splitlines() if not line.strip().startswith('--')]
+            for statement in '\n'.join(lines).split(';'):
+                if statement.strip():
+                    cursor.execute(statement)
+
+
+def connection_from_env():
+    """Función de conexión y dialecto según DATABASE_URL / SQLITE_PATH (igual que la aplicación)"""
+    load_dotenv()
+    database_url = os.getenv('DATABASE_URL')
+    if database_url and database_url.startswith('postgresql'):
+        import psycopg2
+        return (lambda: psycopg2.connect(database_url)), 'postgresql'
+
+    import sqlite3
+    db_path = os.getenv('SQLITE_PATH', 'attendance.db')
+    return (lambda: sqlite3.connect(db_path, timeout=30)), 'sqlite'
+
+
+if __name__ == '__main__':
+    get_connection, db_type = connection_from_env()
+    migrator = SchemaMigrator(get_connection, db_type)
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'status':
+        current = migrator.current_version()
+        print(f"Base de datos: {db_type.upper()}")
+        print(f"Versión actual: {current} / última disponible: {migrator.latest_version()}")
+        for version, name, _ in migrator.pending(current):
+            print(f"  pendiente: {version:04d}_{name}")
+    else:
+        applied = migrator.migrate()
+        print(f"Esquema al día ({len(applied)} migraciones aplicadas)")
@@ -0,0 +1,91 @@
+"""
+Turnos semanales en memoria (weekly_shift_assignments)
+Cada semana se carga completa con una sola consulta la primera vez que se pide y
+queda en memoria: el turno de un marcaje es una búsqueda en un dict y las vistas
+semanales (técnicos, reporte, PDF) se arman con el mismo mapa.
+
+Invalidación por semana:
+- /api/schedules/bulk: las semanas escritas, en este worker y por el bus de eventos
+  en los demás (mensaje 'shifts')
+- DELETE /api/schedules/<employee_id>/shifts/<semana>: solo la semana borrada
+Una carga que empezó antes de una invalidación no se guarda (contador de generación).
+
+Se conservan las WEEKS_CACHED semanas usadas más recientemente.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+WEEKS_CACHED = 8
+
+
+def week_start(day):
+    """Lunes 'YYYY-MM-DD' de la semana de day (date, datetime o 'YYYY-MM-DD')"""
+    if isinstance(day, str):
+        day = datetime.strptime(day[:10], '%Y-%m-%d').date()
+    elif isinstance(day, datetime):
+        day = day.date()
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+class ShiftMap:
+    def __init__(self, get_connection, queries, max_weeks=WEEKS_CACHED):
+        self.get_connection = get_connection
+        self.queries = queries
+        self.max_weeks = max_weeks
+
+        self._weeks = OrderedDict()  # 'YYYY-MM-DD' -> {employee_id: (turno, inicio, fin)}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'loads': 0, 'invalidations': 0}
+
+    def week(self, start, cursor=None):
+        """{employee_id: (turno, hora inicio, hora fin)} de la semana que empieza el lunes start"""
+        start = week_start(start)
+        with self._lock:
+            assignments = self._weeks.get(start)
+            if assignments is not None:
+                self._weeks.move_to_end(start)
+                self.stats['hits'] += 1
+                return assignments
+            generation = self._generation
+
+        if cursor is None:
+            conn = self.get_connection()
+            try:
+                return self.week(start, conn.cursor())
+            finally:
+                conn.close()
+
+        self.queries.run(cursor, 'shifts.week_map', (start,))
+        assignments = {emp_id: (shift_type, str(start_time), str(end_time))
+                       for emp_id, shift_type, start_time, end_time in cursor.fetchall()}
+
+        with self._lock:
+            self.stats['loads'] += 1
+            if generation == self._generation:
+                self._weeks[start] = assignments
+                while len(self._weeks) > self.max_weeks:
+                    self._weeks.popitem(last=False)
+        return assignments
+
+    def shift_for(self, employee_id, day=None):
+        """Turno asignado al empleado la semana de day (hoy por defecto), o None"""
+        assignment = self.week(day or date.today()).get(employee_id)
+        return assignment[0] if assignment else None
+
+    def invalidate(self, starts=None):
+        """Descartar semanas: las indicadas o todas"""
+        with self._lock:
+            self._generation += 1
+            self.stats['invalidations'] += 1
+            if starts is None:
+                self._weeks.clear()
+                return
+            for start in {week_start(start) for start in starts}:
+                self._weeks.pop(start, None)
+
+    def cached_weeks(self):
+        with self._lock:
+            return list(self._weeks)
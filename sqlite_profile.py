@@ -0,0 +1,308 @@
+"""
+Perfil SQLite para despliegues locales (sin PostgreSQL)
+- WAL, synchronous=NORMAL, caché de páginas y mmap dimensionados, busy_timeout
+- Una conexión de escritura de larga vida (serializada con un lock) y conexiones
+  de lectura reutilizables, una por hilo activo
+- Mantenimiento periódico: PRAGMA optimize y checkpoint del WAL
+
+get_connection() devuelve una sesión con la misma interfaz que sqlite3
+(cursor/commit/rollback/close): las lecturas van a una conexión de lectura y,
+desde la primera escritura, toda la sesión usa la conexión de escritura hasta
+commit/rollback/close. Una sesión anidada en el mismo hilo (otra get_connection()
+mientras una sesión exterior escribe) lee con el escritor y escribe dentro de un
+SAVEPOINT: su commit lo libera y su rollback lo deshace, pero solo la sesión exterior
+termina la transacción.
+
+Verificar y luego escribir (duplicados, conflictos): begin_write() toma el escritor y
+abre la transacción (BEGIN IMMEDIATE) antes de la lectura de verificación, que así
+queda en la misma transacción que la escritura.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+
+WRITE_STATEMENT = re.compile(
+    r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|BEGIN|SAVEPOINT|VACUUM|REINDEX|ANALYZE)\b',
+    re.IGNORECASE
+)
+CTE_WRITE = re.compile(r'\b(INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+
+def is_write(sql):
+    """Determinar si una sentencia necesita la conexión de escritura"""
+    lines = [line for line in sql.strip().splitlines() if not line.strip().startswith('--')]
+    statement = '\n'.join(lines).lstrip()
+    if statement[:4].upper() == 'WITH':
+        return bool(CTE_WRITE.search(statement))
+    return bool(WRITE_STATEMENT.match(statement))
+
+
+class SQLiteProfile:
+    def __init__(self, db_path, cache_mb=None, mmap_mb=None, busy_timeout_ms=None,
+                 maintenance_interval=None, max_idle_readers=8):
+        self.db_path = db_path
+        self.cache_mb = cache_mb if cache_mb is not None else int(os.getenv('SQLITE_CACHE_MB', '64'))
+        self.mmap_mb = mmap_mb if mmap_mb is not None else int(os.getenv('SQLITE_MMAP_MB', '256'))
+        self.busy_timeout_ms = busy_timeout_ms if busy_timeout_ms is not None else int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+        self.maintenance_interval = (maintenance_interval if maintenance_interval is not None
+                                     else int(os.getenv('SQLITE_MAINTENANCE_SECONDS', '300')))
+        self.max_idle_readers = max_idle_readers
+        self.cached_statements = 256  # Sentencias compiladas por conexión (query_registry reutiliza el texto)
+
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._writer_owner = None  # Hilo con el escritor: sesiones anidadas del mismo hilo lo comparten
+        self._writer_depth = 0
+        self._idle_readers = []
+        self._readers_lock = threading.Lock()
+        self._maintenance_thread = None
+        self._stop = threading.Event()
+
+        self.stats = {'sessions': 0, 'reads': 0, 'writes': 0, 'readers_opened': 0,
+                      'writer_wait_ms': 0.0, 'checkpoints': 0}
+
+    # Conexiones
+
+    def _configure(self, conn):
+        cursor = conn.cursor()
+        cursor.execute(f'PRAGMA busy_timeout = {self.busy_timeout_ms}')
+        cursor.execute('PRAGMA synchronous = NORMAL')
+        cursor.execute(f'PRAGMA cache_size = {-self.cache_mb * 1024}')  # Negativo = KiB
+        cursor.execute(f'PRAGMA mmap_size = {self.mmap_mb * 1024 * 1024}')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        cursor.close()
+        return conn
+
+    def direct_connection(self):
+        """Conexión independiente con el perfil aplicado (migraciones, herramientas)"""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+        return self._configure(conn)
+
+    def _writer_connection(self):
+        if self._writer is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False,
+                                   cached_statements=self.cached_statements)
+            conn.execute('PRAGMA journal_mode = WAL')  # Persistente en el archivo
+            self._writer = self._configure(conn)
+        return self._writer
+
+    def _checkout_reader(self):
+        with self._readers_lock:
+            if self._idle_readers:
+                return self._idle_readers.pop()
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False, isolation_level=None,
+                               cached_statements=self.cached_statements)
+        self._configure(conn)
+        conn.execute('PRAGMA query_only = ON')
+        self.stats['readers_opened'] += 1
+        return conn
+
+    def _checkin_reader(self, conn):
+        with self._readers_lock:
+            if len(self._idle_readers) < self.max_idle_readers:
+                self._idle_readers.append(conn)
+                return
+        conn.close()
+
+    def _acquire_writer(self):
+        if self._writer_owner == threading.get_ident():
+            self._writer_depth += 1
+            return self._writer_connection()
+        started = time.perf_counter()
+        self._writer_lock.acquire()
+        self.stats['writer_wait_ms'] += (time.perf_counter() - started) * 1000
+        self._writer_owner = threading.get_ident()
+        self._writer_depth = 1
+        return self._writer_connection()
+
+    def holds_writer(self):
+        """Si el hilo actual tiene el escritor (alguna de sus sesiones está escribiendo)"""
+        return self._writer_owner == threading.get_ident()
+
+    def _release_writer(self):
+        self._writer_depth -= 1
+        if self._writer_depth == 0:
+            self._writer_owner = None
+            self._writer_lock.release()
+
+    def connect(self):
+        """Reemplazo de sqlite3.connect(db_path) para get_connection()"""
+        self.stats['sessions'] += 1
+        return _Session(self)
+
+    # Mantenimiento
+
+    def checkpoint(self):
+        """PRAGMA optimize y checkpoint del WAL entre transacciones de escritura"""
+        writer = self._acquire_writer()
+        try:
+            writer.execute('PRAGMA optimize')
+            writer.execute('PRAGMA wal_checkpoint(PASSIVE)')
+            self.stats['checkpoints'] += 1
+        finally:
+            self._release_writer()
+
+    def start_maintenance(self):
+        if self._maintenance_thread or self.maintenance_interval <= 0:
+            return
+        self._maintenance_thread = threading.Thread(target=self._maintenance_loop, daemon=True)
+        self._maintenance_thread.start()
+
+    def _maintenance_loop(self):
+        while not self._stop.wait(self.maintenance_interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                print(f"Error en mantenimiento SQLite: {e}")
+
+    def close(self):
+        self._stop.set()
+        with self._readers_lock:
+            for conn in self._idle_readers:
+                conn.close()
+            self._idle_readers = []
+        if self._writer is not None:
+            with self._writer_lock:
+                self._writer.close()
+                self._writer = None
+
+
+class _Session:
+    """Conexión lógica: lector prestado y, desde la primera escritura, el escritor con su lock"""
+
+    def __init__(self, profile):
+        self._profile = profile
+        self._reader = None
+        self._writer = None
+        self._savepoint = None  # Sesión anidada: SAVEPOINT dentro de la transacción exterior
+
+    def _take_writer(self):
+        self._writer = self._profile._acquire_writer()
+        if self._profile._writer_depth > 1:
+            self._savepoint = f'nested_session_{self._profile._writer_depth}'
+            self._writer.execute(f'SAVEPOINT {self._savepoint}')
+
+    def begin_write(self):
+        """Tomar el escritor y abrir la transacción antes de leer (verificación atómica con la escritura)"""
+        if self._writer is None:
+            self._take_writer()
+        if not self._writer.in_transaction:
+            self._writer.execute('BEGIN IMMEDIATE')
+
+    def _connection_for(self, sql):
+        if self._writer is None and is_write(sql):
+            self._take_writer()
+        if self._writer is not None:
+            self._profile.stats['writes'] += 1
+            return self._writer
+        if self._profile.holds_writer():
+            # Otra sesión de este hilo escribe: leer su transacción, no una instantánea anterior
+            self._profile.stats['reads'] += 1
+            return self._profile._writer_connection()
+        if self._reader is None:
+            self._reader = self._profile._checkout_reader()
+        self._profile.stats['reads'] += 1
+        return self._reader
+
+    def cursor(self):
+        return _SessionCursor(self)
+
+    def execute(self, sql, params=None):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        if self._writer is not None:
+            try:
+                if self._savepoint:
+                    self._writer.execute(f'RELEASE SAVEPOINT {self._savepoint}')
+                else:
+                    self._writer.commit()
+            finally:
+                self._end_write()
+
+    def rollback(self):
+        if self._writer is not None:
+            try:
+                if self._savepoint:
+                    self._writer.execute(f'ROLLBACK TO SAVEPOINT {self._savepoint}')
+                    self._writer.execute(f'RELEASE SAVEPOINT {self._savepoint}')
+                else:
+                    self._writer.rollback()
+            finally:
+                self._end_write()
+
+    def _end_write(self):
+        self._writer = None
+        self._savepoint = None
+        self._profile._release_writer()
+
+    def close(self):
+        # Cerrar sin commit descarta la transacción (o el SAVEPOINT de una sesión anidada), igual que sqlite3
+        self.rollback()
+        if self._reader is not None:
+            reader, self._reader = self._reader, None
+            self._profile._checkin_reader(reader)
+
+    def __del__(self):
+        # Conexiones abandonadas tras una excepción: liberar el lock de escritura
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+class _SessionCursor:
+    def __init__(self, session):
+        self._session = session
+        self._cursor = None
+
+    def execute(self, sql, params=None):
+        self._cursor = self._session._connection_for(sql).cursor()
+        self._cursor.execute(sql, params if params is not None else ())
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor = self._session._connection_for(sql).cursor()
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount if self._cursor else -1
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid if self._cursor else None
+
+    @property
+    def description(self):
+        return self._cursor.description if self._cursor else None
+
+    def close(self):
+        if self._cursor:
+            self._cursor.close()
@@ -0,0 +1,126 @@
+"""
+Server-Sent Events de solo lectura para pantallas de planta (/api/stream)
+Una conexión HTTP por pantalla, sin sesión Socket.IO ni sondeo. Recibe los mismos
+deltas del estado del dashboard que se emiten por Socket.IO y se replican por el bus
+de eventos, reducidos a lo que muestra una pantalla:
+
+    event: snapshot   contadores, presencia, breaks y últimos registros (al conectar
+                      o tras una reconstrucción del estado)
+    event: punch      marcaje con los contadores absolutos después de aplicarlo
+    event: late       alerta de tardanza
+
+- id: '<epoch>:<seq>' del delta; al reconectar, el navegador envía Last-Event-ID y se
+  reenvían los deltas pendientes del registro del estado (o un snapshot si ya no están)
+- cada heartbeat segundos sin eventos se envía un comentario (': ping') para que
+  proxies y navegadores no cierren la conexión
+- cada conexión tiene un búfer de buffer_limit frames; si la pantalla no los consume
+  se cierra y al reconectar retoma desde su último id
+
+Cada frame se serializa una sola vez y se comparte entre todas las conexiones.
+"""
+import os
+import queue
+import threading
+
+RECENT_LIMIT = 10
+
+
+class _Client:
+    def __init__(self, buffer_limit):
+        self.queue = queue.Queue(maxsize=buffer_limit)
+        self.overflow = False
+
+
+class SSEBroker:
+    def __init__(self, state, serialize, heartbeat=None, buffer_limit=None):
+        self.state = state
+        self.serialize = serialize
+        self.heartbeat = heartbeat if heartbeat is not None else float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+        self.buffer_limit = buffer_limit if buffer_limit is not None else int(os.getenv('SSE_BUFFER_LIMIT', '100'))
+
+        self._clients = set()
+        self._lock = threading.Lock()
+
+        self.stats = {'connections': 0, 'active': 0, 'frames': 0, 'resumed': 0, 'dropped': 0}
+
+    def _frame(self, event, epoch, seq, data):
+        return f"id: {epoch}:{seq}\nevent: {event}\ndata: {self.serialize(data)}\n\n"
+
+    def _snapshot_frame(self):
+        snapshot = self.state.stream_snapshot(RECENT_LIMIT)
+        return snapshot['epoch'], snapshot['seq'], self._frame('snapshot', snapshot['epoch'], snapshot['seq'], snapshot)
+
+    def _delta_frame(self, delta):
+        if delta['type'] == 'punch':
+            data = {key: delta[key] for key in ('record', 'total_records', 'unique_employees', 'presence', 'breaks')}
+            return self._frame('punch', delta['epoch'], delta['seq'], data)
+        if delta['type'] == 'late':
+            return self._frame('late', delta['epoch'], delta['seq'], delta['alert'])
+        return None
+
+    def publish(self, delta):
+        """Enviar un delta del estado ('sync': snapshot nuevo) a todas las conexiones"""
+        with self._lock:
+            clients = list(self._clients)
+        if not clients:
+            return
+        if delta['type'] == 'sync':
+            epoch, seq, frame = self._snapshot_frame()
+        else:
+            epoch, seq, frame = delta['epoch'], delta['seq'], self._delta_frame(delta)
+        if frame is None:
+            return
+
+        for client in clients:
+            try:
+                client.queue.put_nowait((epoch, seq, frame))
+            except queue.Full:
+                client.overflow = True
+
+    def _resume_frames(self, last_event_id):
+        """Frames desde Last-Event-ID: deltas pendientes o snapshot"""
+        epoch, _, seq = (last_event_id or '').partition(':')
+        deltas = self.state.deltas_since(int(seq), epoch) if seq.isdigit() else None
+        if deltas is None:
+            return [self._snapshot_frame()]
+        self.stats['resumed'] += 1
+        frames = [(delta['epoch'], delta['seq'], self._delta_frame(delta)) for delta in deltas]
+        if not frames:
+            frames = [(epoch, int(seq), None)]  # Al día: solo fija la posición
+        return frames
+
+    def stream(self, last_event_id=None):
+        """Generador de la respuesta text/event-stream de una conexión"""
+        client = _Client(self.buffer_limit)
+        with self._lock:
+            self._clients.add(client)
+            self.stats['connections'] += 1
+            self.stats['active'] = len(self._clients)
+        try:
+            yield "retry: 3000\n\n"
+            # Registrado antes de calcular la reanudación: lo publicado entre medias se filtra por seq
+            position = (None, 0)
+            for epoch, seq, frame in self._resume_frames(last_event_id):
+                position = (epoch, seq)
+                if frame:
+                    self.stats['frames'] += 1
+                    yield frame
+
+            while True:
+                try:
+                    epoch, seq, frame = client.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ': ping\n\n'
+                    continue
+                if client.overflow:
+                    self.stats['dropped'] += 1
+                    return
+                if epoch == position[0] and seq <= position[1]:
+                    continue
+                position = (epoch, seq)
+                self.stats['frames'] += 1
+                yield frame
+        finally:
+            with self._lock:
+                self._clients.discard(client)
+                self.stats['active'] = len(self._clients)
@@ -0,0 +1,2083 @@
+// Función para formatear fecha y hora de Colombia
+function formatColombiaDateTime(timestamp) {
+    const date = new Date(timestamp);
+    return date.toLocaleString('es-ES', {
+        timeZone: 'America/Bogota',
+        year: 'numeric',
+        month: '2-digit',
+        day: '2-digit',
+        hour: '2-digit',
+        minute: '2-digit',
+        second: '2-digit'
+    });
+}
+
+// Función para formatear hora de Colombia
+function formatColombiaTime(timestamp) {
+    if (!timestamp) return '';
+    
+    // Debug: ver qué formato tiene el timestamp
+    console.log('Timestamp recibido:', timestamp);
+    
+    const timeStr = timestamp.toString();
+    
+    // Si tiene formato "YYYY-MM-DD HH:MM:SS"
+    if (timeStr.includes(' ') && timeStr.length >= 19) {
+        const timePart = timeStr.split(' ')[1];
+        return timePart.substring(0, 8); // HH:MM:SS
+    }
+    
+    // Si tiene formato ISO "YYYY-MM-DDTHH:MM:SS"
+    if (timeStr.includes('T') && timeStr.length >= 19) {
+        return timeStr.substring(11, 19); // HH:MM:SS
+    }
+    
+    // Fallback: intentar con Date pero ajustando zona horaria
+    try {
+        const date = new Date(timestamp + ' UTC');
+        date.setHours(date.getHours() - 5); // Ajustar a Colombia UTC-5
+        return date.toTimeString().substring(0, 8);
+    } catch (e) {
+        return timeStr;
+    }
+}
+
+// Funciones de loading
+function showLoading(message = 'Cargando...') {
+    const overlay = document.createElement('div');
+    overlay.className = 'loading-overlay';
+    overlay.id = 'loadingOverlay';
+    overlay.innerHTML = `
+        <div style="text-align: center;">
+            <div class="loading-spinner"></div>
+            <div class="loading-text">${message}</div>
+        </div>
+    `;
+    document.body.appendChild(overlay);
+}
+
+function hideLoading() {
+    const overlay = document.getElementById('loadingOverlay');
+    if (overlay) {
+        overlay.remove();
+    }
+}
+
+// Funciones de alertas personalizadas
+function showCustomAlert(title, message, type = 'info', buttons = null) {
+    return new Promise((resolve) => {
+        // Remover alertas existentes
+        document.querySelectorAll('.custom-alert').forEach(alert => alert.remove());
+        
+        const alertDiv = document.createElement('div');
+        alertDiv.className = 'custom-alert';
+        
+        const iconMap = {
+            success: 'fa-check',
+            error: 'fa-times',
+            warning: 'fa-exclamation-triangle',
+            info: 'fa-info-circle',
+            question: 'fa-question'
+        };
+        
+        const defaultButtons = buttons || [{
+            text: 'Aceptar',
+            class: 'primary',
+            value: true
+        }];
+        
+        alertDiv.innerHTML = `
+            <div class="alert-content">
+                <div class="alert-icon ${type}">
+                    <i class="fas ${iconMap[type] || 'fa-info-circle'}"></i>
+                </div>
+                <div class="alert-title">${title}</div>
+                <div class="alert-message">${message}</div>
+                <div class="alert-actions">
+                    ${defaultButtons.map((btn, index) => `
+                        <button class="alert-btn ${btn.class}" data-value="${btn.value}" data-index="${index}">
+                            ${btn.icon ? `<i class="fas ${btn.icon}"></i> ` : ''}${btn.text}
+                        </button>
+                    `).join('')}
+                </div>
+            </div>
+        `;
+        
+        document.body.appendChild(alertDiv);
+        
+        // Agregar event listeners
+        alertDiv.querySelectorAll('.alert-btn').forEach(btn => {
+            btn.addEventListener('click', () => {
+                const value = btn.dataset.value === 'true' ? true : btn.dataset.value === 'false' ? false : btn.dataset.value;
+                alertDiv.remove();
+                resolve(value);
+            });
+        });
+        
+        // Cerrar con ESC
+        const escHandler = (e) => {
+            if (e.key === 'Escape') {
+                alertDiv.remove();
+                document.removeEventListener('keydown', escHandler);
+                resolve(false);
+            }
+        };
+        document.addEventListener('keydown', escHandler);
+    });
+}
+
+function showSuccess(title, message) {
+    return showCustomAlert(title, message, 'success');
+}
+
+function showError(title, message) {
+    return showCustomAlert(title, message, 'error');
+}
+
+function showWarning(title, message) {
+    return showCustomAlert(title, message, 'warning');
+}
+
+function showInfo(title, message) {
+    return showCustomAlert(title, message, 'info');
+}
+
+function showConfirm(title, message) {
+    return showCustomAlert(title, message, 'question', [
+        {
+            text: 'Cancelar',
+            class: 'secondary',
+            value: false,
+            icon: 'fa-times'
+        },
+        {
+            text: 'Confirmar',
+            class: 'danger',
+            value: true,
+            icon: 'fa-check'
+        }
+    ]);
+}
+// Alcance del tablero (?department=, ?shift= o ?reader=): el servidor solo envía los eventos de esa sala
+const liveScope = (function() {
+    const params = new URLSearchParams(window.location.search);
+    if (params.get('department')) return `dept:${params.get('department')}`;
+    if (params.get('shift')) return `shift:${params.get('shift')}`;
+    if (params.get('reader')) return `reader:${params.get('reader')}`;
+    return 'all';
+})();
+// Conecta después de /api/bootstrap para continuar desde su secuencia
+const socket = io({ query: { scope: liveScope }, autoConnect: false });
+
+// Estado en vivo: snapshot + deltas con número de secuencia (ver dashboard_state.py)
+let liveEpoch = null;
+let liveSeq = null;
+let liveState = null;
+let dailyRecords = [];
+let syncPending = false;
+
+// Conectar WebSocket
+socket.on('connect', function() {
+    console.log('Conectado al servidor PCSHEK');
+    requestLiveSync();
+});
+
+// Escuchar deltas en tiempo real
+socket.on('dashboard_delta', function(delta) {
+    if (syncPending) return;  // La respuesta de sincronización ya incluye este cambio
+    // 'sync' lleva la secuencia global; cada sala tiene la suya, así que siempre se confirma
+    if (liveSeq === null || delta.epoch !== liveEpoch || delta.type === 'sync') {
+        requestLiveSync();
+        return;
+    }
+    if (delta.seq <= liveSeq) return;
+    if (delta.seq !== liveSeq + 1) {
+        requestLiveSync();  // Se perdió al menos un delta
+        return;
+    }
+    applyLiveDelta(delta);
+});
+
+// Break o almuerzo más largo de lo permitido, o break no tomado al cerrar su ventana
+socket.on('break_alert', function(alert) {
+    showNotification(`⏰ ${alert.message}`, 'error');
+});
+
+// Cohorte de turno con empleados sin marcar al vencer la gracia de su inicio
+socket.on('absence_alert', function(alert) {
+    showNotification(`🚫 ${alert.message}`, 'error');
+});
+
+socket.on('dashboard_update', function(data) {
+    updateDashboardData(data);
+});
+
+// Ráfagas agrupadas por el servidor: despachar cada evento en orden a sus handlers
+socket.on('batch', function(frame) {
+    frame.events.forEach(item => {
+        socket.listeners(item.event).forEach(handler => handler(item.data));
+    });
+});
+
+// Pedir deltas desde la última versión vista (o snapshot completo si ya no están)
+function requestLiveSync() {
+    if (syncPending) return;
+    syncPending = true;
+    socket.emit('snapshot_request', { epoch: liveEpoch, since: liveSeq, scope: liveScope }, function(reply) {
+        syncPending = false;
+        applyLiveReply(reply);
+    });
+}
+
+function applyLiveReply(reply) {
+    if (!reply) return;
+    if (reply.snapshot) {
+        applyLiveSnapshot(reply.snapshot);
+    } else if (reply.deltas) {
+        reply.deltas.forEach(delta => {
+            if (delta.seq === liveSeq + 1) applyLiveDelta(delta);
+        });
+    }
+}
+
+function applyLiveSnapshot(snapshot) {
+    const dayChanged = liveState && liveState.workday !== snapshot.workday;
+    liveState = snapshot;
+    liveEpoch = snapshot.epoch;
+    liveSeq = snapshot.seq;
+    updateDashboardData(snapshot.dashboard);
+    updateBreakStatus(snapshot.breaks);
+    updateLateAlerts(snapshot.late_alerts);
+    if (dayChanged) loadDailyAttendance();
+}
+
+function applyLiveDelta(delta) {
+    liveSeq = delta.seq;
+    if (delta.type === 'punch') {
+        applyPunchDelta(delta);
+    } else if (delta.type === 'late') {
+        liveState.late_alerts.push(delta.alert);
+        updateLateAlerts(liveState.late_alerts);
+        showLateArrivalNotification(delta.alert);
+    }
+}
+
+function applyPunchDelta(delta) {
+    const record = delta.record;
+    const dashboard = liveState.dashboard;
+    dashboard.total_records = delta.total_records;
+    dashboard.unique_employees = delta.unique_employees;
+
+    if (delta.tracked) {
+        // Mover al empleado entre dentro/fuera
+        const entry = { name: record.name, id: record.employee_id, time: record.timestamp };
+        dashboard.employees_inside = dashboard.employees_inside.filter(emp => emp.id !== record.employee_id);
+        dashboard.employees_outside = dashboard.employees_outside.filter(emp => emp.id !== record.employee_id);
+        (record.event_type === 'entrada' ? dashboard.employees_inside : dashboard.employees_outside).push(entry);
+        dashboard.recent_records.unshift([record.name, record.event_type, record.timestamp, record.verify_method]);
+        dashboard.recent_records.length = Math.min(dashboard.recent_records.length, 20);
+
+        // Breaks y almuerzos en curso
+        const breaks = liveState.breaks;
+        breaks.on_break = breaks.on_break.filter(emp => emp.employee_id !== record.employee_id);
+        breaks.on_lunch = breaks.on_lunch.filter(emp => emp.employee_id !== record.employee_id);
+        if (record.event_type === 'break_salida' || record.event_type === 'almuerzo_salida') {
+            const onBreak = {
+                employee_id: record.employee_id,
+                name: record.name,
+                department: record.department,
+                start_time: record.timestamp.substring(11, 16),
+                duration: 0
+            };
+            (record.event_type === 'break_salida' ? breaks.on_break : breaks.on_lunch).push(onBreak);
+        }
+    }
+    Object.assign(liveState.breaks, delta.breaks);
+
+    updateDashboardData(dashboard);
+    updateBreakStatus(liveState.breaks);
+    addNewActivity(record);
+
+    dailyRecords.unshift({
+        name: record.name,
+        event_type: record.event_type,
+        timestamp: record.timestamp,
+        verify_method: record.verify_method,
+        department: record.department
+    });
+    updateDailyAttendance(dailyRecords);
+}
+
+// Respaldo por HTTP solo mientras no hay WebSocket
+function pollLiveFallback() {
+    if (socket.connected) return;
+    const since = liveSeq === null ? '' : `&epoch=${liveEpoch}&since=${liveSeq}`;
+    fetch(`/api/dashboard/live?scope=${encodeURIComponent(liveScope)}${since}`)
+        .then(response => response.json())
+        .then(reply => applyLiveReply(reply))
+        .catch(error => console.error('Error:', error));
+}
+
+// Funciones principales
+function loadDashboardData() {
+    fetch('/api/dashboard')
+        .then(response => response.json())
+        .then(data => updateDashboardData(data))
+        .catch(error => console.error('Error:', error));
+}
+
+function updateDashboardData(data) {
+    // Solo actualizar elementos que existen
+    const insideCountEl = document.getElementById('insideCount');
+    const outsideCountEl = document.getElementById('outsideCount');
+    
+    if (insideCountEl) insideCountEl.textContent = data.employees_inside.length;
+    if (outsideCountEl) outsideCountEl.textContent = data.employees_outside.length;
+
+    // Actualizar estado de conexión
+    updateConnectionStatus(data.connected);
+
+    // Actualizar listas de empleados
+    updateEmployeeLists(data.employees_inside, data.employees_outside);
+
+    // Actualizar gráficos
+    updateCharts(data);
+}
+
+function updateConnectionStatus(connected) {
+    const dot = document.getElementById('headerConnectionDot');
+    const text = document.getElementById('headerConnectionText');
+    
+    if (connected) {
+        dot.className = 'status-dot connected';
+        text.textContent = 'Dispositivo Conectado';
+    } else {
+        dot.className = 'status-dot disconnected';
+        text.textContent = 'Dispositivo Desconectado';
+    }
+}
+
+function updateEmployeeLists(inside, outside) {
+    const insideList = document.getElementById('employeesInsideList');
+    const outsideList = document.getElementById('employeesOutsideList');
+
+    // Lista de empleados dentro
+    if (inside.length === 0) {
+        insideList.innerHTML = `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: var(--text-tertiary);">
+                        <i class="fas fa-home"></i>
+                    </div>
+                    <div>
+                        <div class="employee-name">Todos fuera</div>
+                    </div>
+                </div>
+            </div>
+        `;
+    } else {
+        insideList.innerHTML = inside.map(emp => {
+            // Extraer hora directamente del timestamp GMT
+            let timeDisplay = '';
+            if (emp.time) {
+                const str = String(emp.time);
+                // Buscar patrón HH:MM:SS en formato GMT
+                const timeMatch = str.match(/(\d{2}:\d{2}:\d{2})/);
+                if (timeMatch) {
+                    timeDisplay = timeMatch[1];
+                }
+            }
+            
+            return `
+                <div class="employee-item">
+                    <div class="employee-info">
+                        <div class="employee-avatar" style="background: var(--success-green);">
+                            ${emp.name.charAt(0).toUpperCase()}
+                        </div>
+                        <div>
+                            <div class="employee-name">${emp.name}</div>
+                            <div class="employee-time">${timeDisplay}</div>
+                        </div>
+                    </div>
+                    <div class="status-badge badge-inside">Dentro</div>
+                </div>
+            `;
+        }).join('');
+    }
+
+    // Lista de empleados fuera
+    if (outside.length === 0) {
+        outsideList.innerHTML = `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: var(--success-green);">
+                        <i class="fas fa-building"></i>
+                    </div>
+                    <div>
+                        <div class="employee-name">Todos dentro</div>
+                    </div>
+                </div>
+            </div>
+        `;
+    } else {
+        outsideList.innerHTML = outside.map(emp => {
+            // Extraer hora directamente del timestamp GMT
+            let timeDisplay = 'Sin registro';
+            if (emp.time) {
+                const str = String(emp.time);
+                // Buscar patrón HH:MM:SS en formato GMT
+                const timeMatch = str.match(/(\d{2}:\d{2}:\d{2})/);
+                if (timeMatch) {
+                    timeDisplay = timeMatch[1];
+                }
+            }
+            
+            return `
+                <div class="employee-item">
+                    <div class="employee-info">
+                        <div class="employee-avatar" style="background: var(--text-tertiary);">
+                            ${emp.name.charAt(0).toUpperCase()}
+                        </div>
+                        <div>
+                            <div class="employee-name">${emp.name}</div>
+                            <div class="employee-time">${timeDisplay}</div>
+                        </div>
+                    </div>
+                    <div class="status-badge badge-outside">Fuera</div>
+                </div>
+            `;
+        }).join('');
+    }
+}
+
+function addNewActivity(data) {
+    const activityList = document.getElementById('activityList');
+    
+    const newActivity = document.createElement('div');
+    newActivity.className = `activity-item ${data.event_type}`;
+    
+    let iconColor, iconName, eventDisplay;
+    
+    if (data.event_type === 'entrada') {
+        iconColor = 'var(--success-green)';
+        iconName = 'fa-sign-in-alt';
+        eventDisplay = 'ENTRADA';
+    } else if (data.event_type === 'salida') {
+        iconColor = 'var(--accent-purple)';
+        iconName = 'fa-sign-out-alt';
+        eventDisplay = 'SALIDA';
+    } else if (data.event_type === 'break_salida') {
+        iconColor = 'var(--amber-alert)';
+        iconName = 'fa-coffee';
+        eventDisplay = 'BREAK SALIDA';
+    } else if (data.event_type === 'break_entrada') {
+        iconColor = 'var(--amber-alert)';
+        iconName = 'fa-coffee';
+        eventDisplay = 'BREAK ENTRADA';
+    } else if (data.event_type === 'almuerzo_salida') {
+        iconColor = 'var(--orange-warning)';
+        iconName = 'fa-utensils';
+        eventDisplay = 'ALMUERZO SALIDA';
+    } else if (data.event_type === 'almuerzo_entrada') {
+        iconColor = 'var(--orange-warning)';
+        iconName = 'fa-utensils';
+        eventDisplay = 'ALMUERZO ENTRADA';
+    } else {
+        iconColor = 'var(--primary-blue)';
+        iconName = 'fa-clock';
+        eventDisplay = data.event_type.toUpperCase();
+    }
+    
+    newActivity.innerHTML = `
+        <div class="activity-icon" style="background: ${iconColor};">
+            <i class="fas ${iconName}"></i>
+        </div>
+        <div class="activity-details">
+            <div class="activity-name">${data.name} - ${eventDisplay}</div>
+            <div class="activity-meta">
+                ${formatColombiaDateTime(data.timestamp)} | ${data.verify_method} | ${data.department}
+            </div>
+        </div>
+    `;
+    
+    activityList.insertBefore(newActivity, activityList.firstChild);
+    
+    // Mantener solo los últimos 10 registros
+    while (activityList.children.length > 10) {
+        activityList.removeChild(activityList.lastChild);
+    }
+
+    // Mostrar notificación
+    showNotification(`${data.name} - ${eventDisplay}`, 'info');
+}
+
+function updateCharts(data) {
+    // Solo actualizar listas de empleados
+}
+
+
+
+
+
+// Funciones de UI
+function showTab(tabName) {
+    const clickedButton = event.target;
+    showLoading('Cambiando vista...');
+    
+    setTimeout(() => {
+        // Ocultar todos los tabs
+        document.querySelectorAll('.tab-content').forEach(tab => {
+            tab.style.display = 'none';
+        });
+        
+        // Remover clase active de todos los botones
+        document.querySelectorAll('.nav-tab').forEach(btn => {
+            btn.classList.remove('active');
+        });
+        
+        // Mostrar tab seleccionado
+        document.getElementById(tabName + '-tab').style.display = 'block';
+        
+        // Activar botón correspondiente
+        clickedButton.classList.add('active');
+        
+        // Cargar datos específicos del tab
+        if (tabName === 'schedules') {
+            // Establecer fecha de hoy para el reporte semanal
+            document.getElementById('weeklyReportDate').value = new Date().toISOString().split('T')[0];
+            // Establecer fecha de inicio de semana (lunes)
+            const today = new Date();
+            const monday = new Date(today.setDate(today.getDate() - today.getDay() + 1));
+            document.getElementById('bulkWeekStart').value = monday.toISOString().split('T')[0];
+            // Técnicos con la semana actual (ya cargados por /api/bootstrap si es la misma)
+            if (techniciansWeek === document.getElementById('bulkWeekStart').value) {
+                updateTechniciansDisplay();
+                updateWeeklyCalendar();
+                updateFilterCounts();
+            } else {
+                loadTechnicians();
+            }
+        }
+        
+        hideLoading();
+    }, 200);
+}
+
+function showAddEmployeeModal() {
+    document.getElementById('addEmployeeModal').style.display = 'block';
+}
+
+function closeModal() {
+    document.getElementById('addEmployeeModal').style.display = 'none';
+    document.getElementById('addEmployeeForm').reset();
+}
+
+function showNotification(message, type) {
+    // Remover notificaciones existentes
+    document.querySelectorAll('.notification').forEach(notif => {
+        notif.remove();
+    });
+    
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.innerHTML = `<i class="fas fa-info-circle"></i> ${message}`;
+    document.body.appendChild(notification);
+    
+    setTimeout(() => {
+        if (document.body.contains(notification)) {
+            notification.remove();
+        }
+    }, 4000);
+}
+
+function showInfoModal() {
+    showNotification('Sistema PCSHEK - Versión Empresarial v2.0', 'info');
+}
+
+// Reloj en tiempo real
+function updateClock() {
+    const now = new Date();
+    const timeStr = now.toLocaleTimeString('es-ES', {
+        hour: '2-digit',
+        minute: '2-digit',
+        second: '2-digit'
+    });
+    const dateStr = now.toLocaleDateString('es-ES', {
+        weekday: 'long',
+        year: 'numeric',
+        month: 'long',
+        day: 'numeric'
+    });
+    
+    document.getElementById('liveTime').textContent = timeStr;
+    document.getElementById('liveDate').textContent = dateStr;
+}
+
+// Formulario agregar empleado
+document.getElementById('addEmployeeForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+    
+    // Validación mejorada
+    const employeeId = document.getElementById('employeeId').value.trim();
+    const employeeName = document.getElementById('employeeName').value.trim();
+    
+    if (!employeeId || !employeeName) {
+        showError('Campos Requeridos', 'Por favor completa los campos obligatorios (ID y Nombre)');
+        return;
+    }
+    
+    // Validar formato de ID
+    if (employeeId.length < 2) {
+        showError('ID Inválido', 'El ID del empleado debe tener al menos 2 caracteres');
+        return;
+    }
+    
+    const formData = {
+        employee_id: employeeId,
+        name: employeeName,
+        department: document.getElementById('employeeDept').value,
+        schedule: document.getElementById('employeeSchedule').value,
+        phone: document.getElementById('employeePhone').value.trim(),
+        email: document.getElementById('employeeEmail').value.trim()
+    };
+    
+    // Validar email si se proporciona
+    if (formData.email && !isValidEmail(formData.email)) {
+        showError('Email Inválido', 'Por favor ingresa un email válido');
+        return;
+    }
+    
+    // Deshabilitar botón durante envío
+    const submitBtn = e.target.querySelector('button[type="submit"]');
+    const originalText = submitBtn.innerHTML;
+    submitBtn.disabled = true;
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Agregando...';
+    
+    fetch('/api/employees', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(formData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showNotification('Empleado agregado exitosamente', 'success');
+            closeModal();
+            loadDashboardData();
+        } else {
+            showNotification('Error: ' + data.message, 'error');
+        }
+    })
+    .catch(error => {
+        showNotification('Error de conexión al agregar empleado', 'error');
+    })
+    .finally(() => {
+        submitBtn.disabled = false;
+        submitBtn.innerHTML = originalText;
+    });
+});
+
+function isValidEmail(email) {
+    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    return emailRegex.test(email);
+}
+
+// Cerrar modal al hacer clic fuera
+window.onclick = function(event) {
+    const modal = document.getElementById('addEmployeeModal');
+    if (event.target === modal) {
+        closeModal();
+    }
+}
+
+// Inicialización
+updateClock();
+setInterval(updateClock, 1000);
+setInterval(pollLiveFallback, 30000);
+
+// Cargar datos iniciales: snapshot en vivo, marcajes del día, empleados y técnicos en una respuesta
+loadBootstrap();
+
+function loadBootstrap() {
+    fetch(`/api/bootstrap?scope=${encodeURIComponent(liveScope)}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            applyLiveSnapshot(data.live);
+            fillEmployeeSelect(data.employees);
+            allTechnicians = data.technicians;
+            techniciansWeek = data.week_start;
+            dailyRecords = data.records;
+            updateDailyAttendance(dailyRecords);
+            if (data.next_cursor) {
+                // Más de una página: el resto en segundo plano
+                fetchRecordPages({ date: data.live.workday, limit: 1000, cursor: data.next_cursor,
+                                   fields: 'name,event_type,timestamp,verify_method,department' })
+                    .then(page => {
+                        dailyRecords = dailyRecords.concat(page.records);
+                        updateDailyAttendance(dailyRecords);
+                    })
+                    .catch(error => console.error('Error:', error));
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            loadDailyAttendance();
+            loadEmployeesForExport();
+        })
+        .finally(() => socket.connect());
+}
+
+function loadBreakStatus() {
+    fetch('/api/breaks/status')
+        .then(response => response.json())
+        .then(data => {
+            updateBreakStatus(data);
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function updateBreakStatus(data) {
+    if (!data) return;
+    
+    // Actualizar contadores
+    document.getElementById('onBreakCount').textContent = (data.on_break && data.on_break.length) || 0;
+    document.getElementById('breaksCompletedCount').textContent = data.breaks_completed || 0;
+    document.getElementById('breaksPendingCount').textContent = data.breaks_pending || 0;
+    
+    // Actualizar lista de empleados en break
+    const onBreakList = document.getElementById('employeesOnBreakList');
+    if (!data.on_break || data.on_break.length === 0) {
+        onBreakList.innerHTML = `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: var(--emerald-primary);">
+                        <i class="fas fa-check"></i>
+                    </div>
+                    <div>
+                        <div class="employee-name">Sin breaks activos</div>
+                    </div>
+                </div>
+            </div>
+        `;
+    } else {
+        onBreakList.innerHTML = data.on_break.map(emp => {
+            const duration = emp.duration ? `(${emp.duration} min)` : '';
+            return `
+                <div class="employee-item">
+                    <div class="employee-info">
+                        <div class="employee-avatar" style="background: var(--amber-alert);">
+                            ${emp.name.charAt(0).toUpperCase()}
+                        </div>
+                        <div>
+                            <div class="employee-name">${emp.name}</div>
+                            <div class="employee-time">Break desde ${emp.start_time} ${duration}</div>
+                        </div>
+                    </div>
+                    <div class="status-badge" style="background: var(--amber-alert); color: white; padding: 0.25rem 0.5rem; border-radius: 12px; font-size: 0.75rem;">
+                        Break
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+}
+
+// Páginas de /api/records (keyset): sigue next_cursor hasta el final o hasta maxPages
+function fetchRecordPages(params, maxPages = Infinity) {
+    const records = [];
+    let pages = 0;
+    function next(cursor) {
+        const query = new URLSearchParams(params);
+        if (cursor) query.set('cursor', cursor);
+        return fetch(`/api/records?${query}`)
+            .then(response => response.json())
+            .then(page => {
+                records.push(...page.records);
+                pages += 1;
+                if (page.next_cursor && pages < maxPages) return next(page.next_cursor);
+                return { records, nextCursor: page.next_cursor, total: page.total };
+            });
+    }
+    return next(params.cursor);
+}
+
+function loadDailyAttendance() {
+    const today = new Date().toISOString().split('T')[0];
+    
+    // Mostrar loading solo si no hay datos
+    const attendanceList = document.getElementById('dailyAttendanceList');
+    if (attendanceList.children.length <= 1) {
+        showLoading('Cargando registros del día...');
+    }
+    
+    // Solo los campos que usa la vista agrupada por empleado
+    fetchRecordPages({ date: today, limit: 1000, fields: 'name,event_type,timestamp,verify_method,department' })
+        .then(page => page.records)
+        .then(data => {
+            dailyRecords = data;
+            setTimeout(() => {
+                updateDailyAttendance(data);
+                hideLoading();
+            }, 250);
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            hideLoading();
+        });
+}
+
+function updateDailyAttendance(records) {
+    const attendanceList = document.getElementById('dailyAttendanceList');
+    
+    if (!records || records.length === 0) {
+        attendanceList.innerHTML = `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: var(--text-tertiary);">
+                        <i class="fas fa-calendar-times"></i>
+                    </div>
+                    <div>
+                        <div class="employee-name">Sin registros hoy</div>
+                        <div class="employee-time">No hay marcajes registrados</div>
+                    </div>
+                </div>
+            </div>
+        `;
+        return;
+    }
+    
+    // Agrupar registros por empleado
+    const employeeRecords = {};
+    records.forEach(record => {
+        if (!employeeRecords[record.name]) {
+            employeeRecords[record.name] = {
+                name: record.name,
+                department: record.department,
+                entrada: null,
+                salida: null
+            };
+        }
+        
+        const timeStr = String(record.timestamp);
+        const timeMatch = timeStr.match(/(\d{2}:\d{2}:\d{2})/);
+        const time = timeMatch ? timeMatch[1] : '';
+        
+        if (record.event_type === 'entrada') {
+            if (!employeeRecords[record.name].entrada || time < employeeRecords[record.name].entrada) {
+                employeeRecords[record.name].entrada = time;
+            }
+        } else if (record.event_type === 'salida') {
+            if (!employeeRecords[record.name].salida || time > employeeRecords[record.name].salida) {
+                employeeRecords[record.name].salida = time;
+            }
+        }
+    });
+    
+    // Mostrar registros agrupados
+    attendanceList.innerHTML = Object.values(employeeRecords).map(emp => {
+        const entradaDisplay = emp.entrada || '--:--:--';
+        const salidaDisplay = emp.salida || '--:--:--';
+        const status = emp.entrada && emp.salida ? 'Completo' : emp.entrada ? 'Sin salida' : 'Sin entrada';
+        const statusColor = status === 'Completo' ? 'var(--success-green)' : status === 'Sin salida' ? 'var(--warning-orange)' : 'var(--text-tertiary)';
+        
+        return `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: ${statusColor};">
+                        ${emp.name.charAt(0).toUpperCase()}
+                    </div>
+                    <div style="flex: 1;">
+                        <div class="employee-name">${emp.name}</div>
+                        <div class="employee-time" style="font-size: 0.8rem; color: var(--text-tertiary);">
+                            ${emp.department}
+                        </div>
+                    </div>
+                    <div style="text-align: right; font-size: 0.85rem;">
+                        <div style="margin-bottom: 0.25rem;">
+                            <i class="fas fa-sign-in-alt" style="color: var(--success-green); margin-right: 0.5rem;"></i>
+                            <strong>Entrada:</strong> ${entradaDisplay}
+                        </div>
+                        <div>
+                            <i class="fas fa-sign-out-alt" style="color: var(--accent-purple); margin-right: 0.5rem;"></i>
+                            <strong>Salida:</strong> ${salidaDisplay}
+                        </div>
+                    </div>
+                </div>
+                <div style="margin-left: auto; display: flex; align-items: center;">
+                    <span style="
+                        background: ${statusColor}; color: white; padding: 0.25rem 0.5rem;
+                        border-radius: 12px; font-size: 0.75rem; font-weight: 600;
+                    ">
+                        ${status}
+                    </span>
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
+function loadBreakStatus() {
+    fetch('/api/breaks/status')
+        .then(response => response.json())
+        .then(data => {
+            updateBreakStatus(data);
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function updateBreakStatus(data) {
+    // Actualizar contadores
+    document.getElementById('onBreakCount').textContent = data.on_break ? data.on_break.length : 0;
+    document.getElementById('onLunchCount').textContent = data.on_lunch ? data.on_lunch.length : 0;
+    document.getElementById('breaksCompletedCount').textContent = data.breaks_completed || 0;
+    document.getElementById('breaksPendingCount').textContent = data.breaks_pending || 0;
+    document.getElementById('lunchCompletedCount').textContent = data.lunch_completed || 0;
+    document.getElementById('lunchPendingCount').textContent = data.lunch_pending || 0;
+    
+    // Actualizar lista de empleados en break
+    const onBreakList = document.getElementById('employeesOnBreakList');
+    if (!data.on_break || data.on_break.length === 0) {
+        onBreakList.innerHTML = `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: var(--emerald-primary);">
+                        <i class="fas fa-check"></i>
+                    </div>
+                    <div>
+                        <div class="employee-name">Sin breaks activos</div>
+                    </div>
+                </div>
+            </div>
+        `;
+    } else {
+        onBreakList.innerHTML = data.on_break.map(emp => {
+            const duration = emp.duration ? `(${emp.duration} min)` : '';
+            const breakTypeDisplay = emp.department === 'Operativos' ? 'Break Operativo' : 'Break Admin';
+            return `
+                <div class="employee-item">
+                    <div class="employee-info">
+                        <div class="employee-avatar" style="background: var(--amber-alert);">
+                            ${emp.name.charAt(0).toUpperCase()}
+                        </div>
+                        <div>
+                            <div class="employee-name">${emp.name}</div>
+                            <div class="employee-time">${breakTypeDisplay} desde ${emp.start_time} ${duration}</div>
+                        </div>
+                    </div>
+                    <div class="status-badge" style="background: var(--amber-alert); color: white; padding: 0.25rem 0.5rem; border-radius: 12px; font-size: 0.75rem;">
+                        Break
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+    
+    // Actualizar lista de empleados en almuerzo
+    const onLunchList = document.getElementById('employeesOnLunchList');
+    if (!data.on_lunch || data.on_lunch.length === 0) {
+        onLunchList.innerHTML = `
+            <div class="employee-item">
+                <div class="employee-info">
+                    <div class="employee-avatar" style="background: var(--emerald-primary);">
+                        <i class="fas fa-check"></i>
+                    </div>
+                    <div>
+                        <div class="employee-name">Sin almuerzos activos</div>
+                    </div>
+                </div>
+            </div>
+        `;
+    } else {
+        onLunchList.innerHTML = data.on_lunch.map(emp => {
+            const duration = emp.duration ? `(${emp.duration} min)` : '';
+            return `
+                <div class="employee-item">
+                    <div class="employee-info">
+                        <div class="employee-avatar" style="background: var(--orange-warning);">
+                            ${emp.name.charAt(0).toUpperCase()}
+                        </div>
+                        <div>
+                            <div class="employee-name">${emp.name}</div>
+                            <div class="employee-time">Almuerzo desde ${emp.start_time} ${duration}</div>
+                        </div>
+                    </div>
+                    <div class="status-badge" style="background: var(--orange-warning); color: white; padding: 0.25rem 0.5rem; border-radius: 12px; font-size: 0.75rem;">
+                        Almuerzo
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+}
+
+function updateLateAlerts(alerts) {
+    const alertsList = document.getElementById('lateAlertsList');
+    
+    if (!alerts || alerts.length === 0) {
+        alertsList.innerHTML = `
+            <div class="activity-item">
+                <div class="activity-icon" style="background: var(--success-green);">
+                    <i class="fas fa-check"></i>
+                </div>
+                <div class="activity-details">
+                    <div class="activity-name">Sin tardanzas registradas</div>
+                    <div class="activity-meta">Todos los empleados llegaron a tiempo hoy</div>
+                </div>
+            </div>
+        `;
+        return;
+    }
+    
+    alertsList.innerHTML = alerts.map(alert => {
+        const severity = alert.late_minutes > 30 ? 'severe' : alert.late_minutes > 15 ? 'moderate' : 'mild';
+        const iconColor = severity === 'severe' ? '#ef4444' : severity === 'moderate' ? 'var(--warning-orange)' : '#f59e0b';
+        const icon = severity === 'severe' ? 'fa-exclamation-circle' : 'fa-clock';
+        
+        return `
+            <div class="activity-item late-alert ${severity}">
+                <div class="activity-icon" style="background: ${iconColor};">
+                    <i class="fas ${icon}"></i>
+                </div>
+                <div class="activity-details">
+                    <div class="activity-name">${alert.name} - TARDANZA</div>
+                    <div class="activity-meta">
+                        Esperado: ${alert.expected_time} | Llegó: ${alert.actual_time} | 
+                        <strong style="color: ${iconColor};">${alert.late_minutes} min tarde</strong> | 
+                        ${alert.department}
+                    </div>
+                </div>
+                <div style="margin-left: auto; display: flex; align-items: center;">
+                    <span style="
+                        background: ${iconColor}; color: white; padding: 0.25rem 0.5rem;
+                        border-radius: 12px; font-size: 0.75rem; font-weight: 600;
+                    ">
+                        ${alert.late_minutes} min
+                    </span>
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
+function loadLateAlerts() {
+    fetch('/api/alerts/late')
+        .then(response => response.json())
+        .then(data => {
+            updateLateAlerts(data);
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function showLateArrivalNotification(data) {
+    const color = data.severity === 'severe' ? '#ef4444' : data.severity === 'moderate' ? 'var(--warning-orange)' : '#f59e0b';
+    
+    showNotification(
+        `⚠️ ${data.name} llegó ${data.late_minutes} minutos tarde (${data.actual_time})`,
+        'error'
+    );
+    
+    // Reproducir sonido de alerta (opcional)
+    try {
+        const audio = new Audio('data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTYIG2m98OScTgwOUarm7blmGgU7k9n1unEiBC13yO/eizEIHWq+8+OWT');
+        audio.volume = 0.3;
+        audio.play().catch(() => {});
+    } catch (e) {}
+}
+
+// Variables globales para drag & drop
+let draggedTechnician = null;
+let allTechnicians = [];
+let techniciansWeek = null;
+let currentFilter = 'all';
+const shiftCapacities = { 'mañana': 3, 'tarde': 3, 'noche': 2 };
+
+// Funciones para horarios en lote
+function loadTechnicians() {
+    const weekStart = document.getElementById('bulkWeekStart').value;
+    let url = '/api/employees/technicians';
+    if (weekStart) {
+        url += `?week_start=${weekStart}`;
+    }
+    
+    fetch(url)
+        .then(response => response.json())
+        .then(technicians => {
+            allTechnicians = technicians;
+            techniciansWeek = weekStart;
+            updateTechniciansDisplay();
+            updateWeeklyCalendar();
+            updateFilterCounts();
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function updateTechniciansDisplay() {
+    const grid = document.getElementById('techniciansGrid');
+    
+    if (allTechnicians.length === 0) {
+        grid.innerHTML = '<div style="text-align: center; padding: 2rem; color: #64748b; grid-column: 1 / -1;">No hay técnicos del departamento Desarme</div>';
+        return;
+    }
+    
+    const filteredTechnicians = filterTechniciansByType(allTechnicians, currentFilter);
+    
+    grid.innerHTML = filteredTechnicians.map(tech => {
+        const hasAssignment = tech.assigned_shift;
+        const cardClass = hasAssignment ? 'technician-card assigned' : 'technician-card';
+        const statusBadge = hasAssignment ? 
+            `<div style="background: var(--success-green); color: white; padding: 0.25rem 0.5rem; border-radius: 12px; font-size: 0.75rem; font-weight: 600; margin-top: 0.5rem;">
+                Turno: ${tech.assigned_shift}
+            </div>` : 
+            `<div style="background: #f1f5f9; color: var(--text-tertiary); padding: 0.25rem 0.5rem; border-radius: 12px; font-size: 0.75rem; font-weight: 600; margin-top: 0.5rem;">
+                Sin turno asignado
+            </div>`;
+        
+        return `
+            <div class="${cardClass}" data-id="${tech.employee_id}" data-shift="${tech.assigned_shift || 'unassigned'}" 
+                 draggable="true" ondragstart="startDrag(event)" ondragend="endDrag(event)" onclick="toggleTechnician('${tech.employee_id}')">
+                <div style="display: flex; align-items: center; gap: 0.75rem;">
+                    <input type="checkbox" class="tech-checkbox" data-id="${tech.employee_id}" style="width: 18px; height: 18px;">
+                    <div class="employee-avatar" style="background: ${hasAssignment ? 'var(--success-green)' : 'var(--primary-blue)'}; width: 40px; height: 40px;">
+                        ${tech.name.charAt(0).toUpperCase()}
+                    </div>
+                    <div style="flex: 1;">
+                        <div style="font-weight: 600; color: var(--text-primary);">${tech.name}</div>
+                        <div style="font-size: 0.8rem; color: var(--text-tertiary);">${tech.employee_id}</div>
+                        ${statusBadge}
+                    </div>
+                </div>
+            </div>
+        `;
+    }).join('');
+    
+    // Agregar estilos para las tarjetas
+    if (!document.getElementById('technicianStyles')) {
+        const style = document.createElement('style');
+        style.id = 'technicianStyles';
+        style.textContent = `
+            .technician-card {
+                padding: 1rem;
+                border: 2px solid #e5e7eb;
+                border-radius: 8px;
+                cursor: pointer;
+                transition: all 0.3s ease;
+                background: white;
+            }
+            .technician-card:hover {
+                border-color: var(--primary-blue);
+                box-shadow: 0 4px 12px rgba(59, 130, 246, 0.15);
+            }
+            .technician-card.selected {
+                border-color: var(--success-green);
+                background: rgba(16, 185, 129, 0.05);
+            }
+            .technician-card.assigned {
+                border-color: var(--success-green);
+                background: rgba(16, 185, 129, 0.02);
+            }
+            .technician-card.assigned:hover {
+                border-color: var(--success-green);
+                box-shadow: 0 4px 12px rgba(16, 185, 129, 0.15);
+            }
+        `;
+        document.head.appendChild(style);
+    }
+}
+
+function filterTechniciansByType(technicians, filter) {
+    if (filter === 'all') return technicians;
+    if (filter === 'unassigned') return technicians.filter(t => !t.assigned_shift);
+    return technicians.filter(t => t.assigned_shift === filter);
+}
+
+function filterTechnicians(filter) {
+    currentFilter = filter;
+    
+    // Actualizar botones activos
+    document.querySelectorAll('.filter-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    document.querySelector(`[data-filter="${filter}"]`).classList.add('active');
+    
+    updateTechniciansDisplay();
+}
+
+function updateFilterCounts() {
+    const counts = {
+        all: allTechnicians.length,
+        mañana: allTechnicians.filter(t => t.assigned_shift === 'mañana').length,
+        tarde: allTechnicians.filter(t => t.assigned_shift === 'tarde').length,
+        noche: allTechnicians.filter(t => t.assigned_shift === 'noche').length,
+        unassigned: allTechnicians.filter(t => !t.assigned_shift).length
+    };
+    
+    Object.keys(counts).forEach(key => {
+        const element = document.getElementById(`count${key.charAt(0).toUpperCase() + key.slice(1)}`);
+        if (element) element.textContent = counts[key];
+    });
+}
+
+function updateWeeklyCalendar() {
+    const shifts = { mañana: [], tarde: [], noche: [], unassigned: [] };
+    
+    allTechnicians.forEach(tech => {
+        const shift = tech.assigned_shift || 'unassigned';
+        shifts[shift].push(tech);
+    });
+    
+    Object.keys(shifts).forEach(shiftKey => {
+        const container = document.getElementById(`shift${shiftKey.charAt(0).toUpperCase() + shiftKey.slice(1)}`);
+        if (!container) return;
+        
+        container.innerHTML = shifts[shiftKey].map(tech => `
+            <div class="shift-tech-card" data-id="${tech.employee_id}" data-shift="${shiftKey}" 
+                 draggable="true" ondragstart="startDrag(event)" ondragend="endDrag(event)">
+                <div class="employee-avatar" style="background: ${getShiftColor(shiftKey)}; width: 32px; height: 32px; font-size: 0.8rem;">
+                    ${tech.name.charAt(0).toUpperCase()}
+                </div>
+                <div style="flex: 1;">
+                    <div style="font-weight: 600; font-size: 0.9rem;">${tech.name}</div>
+                    <div style="font-size: 0.75rem; color: var(--text-tertiary);">${tech.employee_id}</div>
+                </div>
+            </div>
+        `).join('');
+        
+        // Actualizar indicador de capacidad
+        updateCapacityIndicator(shiftKey, shifts[shiftKey].length);
+    });
+    
+    // Configurar drop zones
+    setupDropZones();
+}
+
+function getShiftColor(shift) {
+    const colors = {
+        mañana: '#84cc16',
+        tarde: '#14b8a6', 
+        noche: '#06b6d4',
+        unassigned: '#64748b'
+    };
+    return colors[shift] || '#64748b';
+}
+
+function updateCapacityIndicator(shift, current) {
+    const indicator = document.getElementById(`capacity${shift.charAt(0).toUpperCase() + shift.slice(1)}`);
+    if (!indicator) return;
+    
+    if (shift === 'unassigned') {
+        indicator.textContent = current;
+        indicator.className = 'capacity-indicator';
+        return;
+    }
+    
+    const capacity = shiftCapacities[shift] || 3;
+    indicator.textContent = `${current}/${capacity}`;
+    
+    // Actualizar color según capacidad
+    indicator.className = 'capacity-indicator';
+    if (current === capacity) {
+        indicator.classList.add('capacity-ok');
+    } else if (current > capacity) {
+        indicator.classList.add('capacity-critical');
+    } else if (current < capacity) {
+        indicator.classList.add('capacity-warning');
+    }
+}
+
+// Funciones de Drag & Drop
+function startDrag(event) {
+    draggedTechnician = {
+        id: event.target.closest('[data-id]').dataset.id,
+        currentShift: event.target.closest('[data-shift]').dataset.shift,
+        element: event.target.closest('[data-id]')
+    };
+    
+    event.target.closest('[data-id]').classList.add('dragging');
+    event.dataTransfer.effectAllowed = 'move';
+}
+
+function endDrag(event) {
+    event.target.closest('[data-id]').classList.remove('dragging');
+    draggedTechnician = null;
+}
+
+function setupDropZones() {
+    document.querySelectorAll('.shift-column').forEach(column => {
+        column.addEventListener('dragover', handleDragOver);
+        column.addEventListener('drop', handleDrop);
+        column.addEventListener('dragleave', handleDragLeave);
+    });
+}
+
+function handleDragOver(event) {
+    event.preventDefault();
+    event.currentTarget.classList.add('drag-over');
+}
+
+function handleDragLeave(event) {
+    event.currentTarget.classList.remove('drag-over');
+}
+
+function handleDrop(event) {
+    event.preventDefault();
+    event.currentTarget.classList.remove('drag-over');
+    
+    if (!draggedTechnician) return;
+    
+    const targetShift = event.currentTarget.dataset.shift;
+    const techId = draggedTechnician.id;
+    
+    if (draggedTechnician.currentShift === targetShift) return;
+    
+    // Asignar nuevo turno
+    assignTechnicianToShift(techId, targetShift);
+}
+
+function assignTechnicianToShift(techId, newShift) {
+    const weekStart = document.getElementById('bulkWeekStart').value;
+    
+    if (!weekStart) {
+        showWarning('Fecha Requerida', 'Por favor selecciona la fecha de inicio de semana');
+        return;
+    }
+    
+    if (newShift === 'unassigned') {
+        // Remover asignación (implementar API para eliminar)
+        showInfo('Función en Desarrollo', 'La remoción de turnos estará disponible próximamente');
+        return;
+    }
+    
+    fetch('/api/schedules/bulk', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            employee_ids: [techId],
+            shift_type: newShift,
+            week_start: weekStart
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showSuccess('Turno Actualizado', `Técnico asignado al turno ${newShift}`);
+            loadTechnicians();
+        } else {
+            showError('Error', data.message);
+        }
+    })
+    .catch(error => {
+        showError('Error de Conexión', 'No se pudo actualizar el turno');
+    });
+}
+
+function toggleTechnician(employeeId) {
+    const card = document.querySelector(`[data-id="${employeeId}"]`);
+    const checkbox = card ? card.querySelector('.tech-checkbox') : null;
+    
+    if (!checkbox) {
+        console.warn('Checkbox not found for employee:', employeeId);
+        return;
+    }
+    
+    checkbox.checked = !checkbox.checked;
+    
+    if (checkbox.checked) {
+        card.classList.add('selected');
+    } else {
+        card.classList.remove('selected');
+    }
+    
+    updateSelectedCount();
+}
+
+function updateSelectedCount() {
+    const selected = document.querySelectorAll('.tech-checkbox:checked').length;
+    document.getElementById('selectedCount').textContent = `${selected} técnicos seleccionados`;
+}
+
+function assignBulkSchedule() {
+    const selectedTechs = Array.from(document.querySelectorAll('.tech-checkbox:checked')).map(cb => cb.dataset.id);
+    const shiftType = document.getElementById('bulkShiftType').value;
+    const weekStart = document.getElementById('bulkWeekStart').value;
+    
+    if (selectedTechs.length === 0) {
+        showWarning('Selección Requerida', 'Por favor selecciona al menos un técnico');
+        return;
+    }
+    
+    if (!shiftType) {
+        showWarning('Turno Requerido', 'Por favor selecciona un turno');
+        return;
+    }
+    
+    if (!weekStart) {
+        showWarning('Fecha Requerida', 'Por favor selecciona la fecha de inicio de semana');
+        return;
+    }
+    
+    showLoading('Asignando turnos...');
+    
+    fetch('/api/schedules/bulk', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            employee_ids: selectedTechs,
+            shift_type: shiftType,
+            week_start: weekStart
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        hideLoading();
+        if (data.success) {
+            showSuccess('Turnos Asignados', data.message);
+            // Limpiar selección
+            document.querySelectorAll('.tech-checkbox:checked').forEach(cb => {
+                cb.checked = false;
+                cb.closest('.technician-card').classList.remove('selected');
+            });
+            updateSelectedCount();
+            // Recargar técnicos para mostrar nuevos estados
+            loadTechnicians();
+        } else {
+            showError('Error', data.message);
+        }
+    })
+    .catch(error => {
+        hideLoading();
+        showError('Error de Conexión', 'No se pudieron asignar los turnos');
+    });
+}
+
+function loadWeeklyReport() {
+    const weekStart = document.getElementById('weeklyReportDate').value;
+    if (!weekStart) {
+        showWarning('Fecha Requerida', 'Por favor selecciona una fecha');
+        return;
+    }
+    
+    fetch(`/api/schedules/weekly-report?week_start=${weekStart}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                showError('Error', data.error);
+                return;
+            }
+            
+            displayWeeklyReport(data);
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showError('Error de Conexión', 'No se pudo cargar el reporte semanal');
+        });
+}
+
+function displayWeeklyReport(data) {
+    const container = document.getElementById('weeklyScheduleReport');
+    
+    const shifts = data.shifts;
+    const hasData = Object.values(shifts).some(shift => shift.length > 0);
+    
+    if (!hasData) {
+        container.innerHTML = '<div style="text-align: center; padding: 2rem; color: #64748b;">No hay turnos asignados para esta semana</div>';
+        return;
+    }
+    
+    const shiftNames = {
+        'mañana': { name: 'TURNO MAÑANA', time: '6:00 AM - 2:00 PM', color: '#f59e0b' },
+        'tarde': { name: 'TURNO TARDE', time: '2:00 PM - 9:00 PM', color: '#3b82f6' },
+        'noche': { name: 'TURNO NOCHE', time: '10:00 PM - 6:00 AM', color: '#8b5cf6' }
+    };
+    
+    container.innerHTML = `
+        <div style="margin-bottom: 1rem; padding: 1rem; background: #f8fafc; border-radius: 8px;">
+            <h5 style="margin: 0; color: var(--text-primary);">Semana del ${data.week_start} al ${data.week_end}</h5>
+        </div>
+        ${Object.entries(shifts).map(([shiftKey, employees]) => {
+            if (employees.length === 0) return '';
+            
+            const shiftInfo = shiftNames[shiftKey];
+            return `
+                <div style="margin-bottom: 1.5rem; border: 1px solid #e5e7eb; border-radius: 8px; overflow: hidden;">
+                    <div style="background: ${shiftInfo.color}; color: white; padding: 1rem;">
+                        <h5 style="margin: 0; display: flex; align-items: center; gap: 0.5rem;">
+                            <i class="fas fa-clock"></i>
+                            ${shiftInfo.name} (${shiftInfo.time})
+                            <span style="margin-left: auto; background: rgba(255,255,255,0.2); padding: 0.25rem 0.5rem; border-radius: 12px; font-size: 0.8rem;">
+                                ${employees.length} empleados
+                            </span>
+                        </h5>
+                    </div>
+                    <div style="padding: 1rem;">
+                        <div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 0.5rem;">
+                            ${employees.map(emp => `
+                                <div style="display: flex; align-items: center; gap: 0.5rem; padding: 0.5rem; background: #f8fafc; border-radius: 6px;">
+                                    <div class="employee-avatar" style="background: ${shiftInfo.color}; width: 32px; height: 32px; font-size: 0.8rem;">
+                                        ${emp.name.charAt(0).toUpperCase()}
+                                    </div>
+                                    <div style="flex: 1;">
+                                        <div style="font-weight: 600; font-size: 0.9rem;">${emp.name}</div>
+                                        <div style="font-size: 0.75rem; color: var(--text-tertiary);">${emp.employee_id}</div>
+                                    </div>
+                                </div>
+                            `).join('')}
+                        </div>
+                    </div>
+                </div>
+            `;
+        }).join('')}
+    `;
+}
+
+function exportWeeklyPDF() {
+    const weekStart = document.getElementById('weeklyReportDate').value;
+    if (!weekStart) {
+        showWarning('Fecha Requerida', 'Por favor selecciona una fecha para exportar');
+        return;
+    }
+    
+    const url = `/api/schedules/export-pdf?week_start=${weekStart}`;
+    window.open(url, '_blank');
+}
+
+// Funciones para las nuevas vistas
+function loadRecords() {
+    const date = document.getElementById('recordsDate').value;
+    if (!date) {
+        showWarning('Fecha Requerida', 'Por favor selecciona una fecha para ver los registros');
+        return;
+    }
+    
+    loadRecordsPage(date, null);
+}
+
+// Registros de la fecha por páginas de 100; "Cargar más" continúa desde next_cursor
+function loadRecordsPage(date, cursor) {
+    const params = { date: date, limit: 100 };
+    if (cursor) {
+        params.cursor = cursor;
+    } else {
+        params.count = 1;
+    }
+    fetchRecordPages(params, 1)
+        .then(page => {
+            const recordsList = document.getElementById('recordsList');
+            const data = page.records;
+            if (!cursor && data.length === 0) {
+                recordsList.innerHTML = '<div style="text-align: center; padding: 2rem; color: #64748b;">No hay registros para esta fecha</div>';
+                return;
+            }
+            
+            const moreButton = document.getElementById('recordsLoadMore');
+            if (moreButton) moreButton.remove();
+            if (!cursor) {
+                recordsList.innerHTML = `<div style="padding: 0.5rem 0; color: #64748b;">${page.total} registros</div>`;
+            }
+            
+            recordsList.insertAdjacentHTML('beforeend', data.map(record => `
+                <div class="activity-item ${record.event_type}">
+                    <div class="activity-icon" style="background: ${record.event_type === 'entrada' ? '#10b981' : '#8b5cf6'};">
+                        <i class="fas ${record.event_type === 'entrada' ? 'fa-sign-in-alt' : 'fa-sign-out-alt'}"></i>
+                    </div>
+                    <div class="activity-details">
+                        <div class="activity-name">${record.name} - ${record.event_type.toUpperCase()}</div>
+                        <div class="activity-meta">
+                            ${new Date(record.timestamp).toLocaleString()} | ${record.verify_method} | ${record.department}
+                        </div>
+                    </div>
+                </div>
+            `).join(''));
+            
+            if (page.nextCursor) {
+                recordsList.insertAdjacentHTML('beforeend', `
+                    <button id="recordsLoadMore" class="btn btn-primary" style="margin: 1rem auto; display: block;">
+                        <i class="fas fa-chevron-down"></i> Cargar más
+                    </button>
+                `);
+                document.getElementById('recordsLoadMore').onclick = () => loadRecordsPage(date, page.nextCursor);
+            }
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function generateDailyReport() {
+    const date = document.getElementById('reportDate').value;
+    if (!date) {
+        showWarning('Fecha Requerida', 'Por favor selecciona una fecha para generar el reporte');
+        return;
+    }
+    
+    fetch(`/api/reports/daily?date=${date}`)
+        .then(response => response.json())
+        .then(data => {
+            const results = document.getElementById('reportResults');
+            results.innerHTML = `
+                <div style="background: white; padding: 1.5rem; border-radius: 12px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                    <h4>Reporte Diario - ${date}</h4>
+                    <div style="margin-top: 1rem;">
+                        <strong>Total de registros:</strong> ${data.total_records}<br>
+                        <strong>Empleados únicos:</strong> ${data.unique_employees}<br>
+                        <strong>Entradas:</strong> ${data.entries}<br>
+                        <strong>Salidas:</strong> ${data.exits}
+                    </div>
+                    <div style="margin-top: 1rem; max-height: 400px; overflow-y: auto;">
+                        ${data.records.map(record => `
+                            <div style="padding: 0.5rem; border-bottom: 1px solid #e5e7eb;">
+                                <strong>${record.name}</strong> - ${record.event_type.toUpperCase()} - ${new Date(record.timestamp).toLocaleTimeString()}
+                            </div>
+                        `).join('')}
+                    </div>
+                </div>
+            `;
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function generateWeeklyReport() {
+    const week = document.getElementById('reportWeek').value;
+    if (!week) {
+        showWarning('Semana Requerida', 'Por favor selecciona una semana para generar el reporte');
+        return;
+    }
+    
+    fetch(`/api/reports/weekly?week=${week}`)
+        .then(response => response.json())
+        .then(data => {
+            const results = document.getElementById('reportResults');
+            results.innerHTML = `
+                <div style="background: white; padding: 1.5rem; border-radius: 12px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                    <h4>Reporte Semanal - Semana ${week}</h4>
+                    <div style="margin-top: 1rem;">
+                        <strong>Total de registros:</strong> ${data.total_records}<br>
+                        <strong>Empleados activos:</strong> ${data.active_employees}<br>
+                        <strong>Promedio diario:</strong> ${Math.round(data.total_records / 7)} registros
+                    </div>
+                </div>
+            `;
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+function testConnection() {
+    fetch('/api/test_connection', { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('deviceStatus').textContent = data.connected ? 'Conectado' : 'Desconectado';
+            document.getElementById('deviceStatus').style.color = data.connected ? '#10b981' : '#ef4444';
+            
+            if (data.connected) {
+                showSuccess('Conexión Exitosa', data.message);
+            } else {
+                showError('Conexión Fallida', data.message);
+            }
+        })
+        .catch(error => {
+            showError('Error de Conexión', 'No se pudo probar la conexión con el dispositivo');
+        });
+}
+
+function startMonitoring() {
+    fetch('/api/start_monitoring', { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            showSuccess('Monitoreo Iniciado', data.message);
+        })
+        .catch(error => {
+            showError('Error', 'No se pudo iniciar el monitoreo del dispositivo');
+        });
+}
+
+function backupDatabase() {
+    showInfo('Función en Desarrollo', 'La función de respaldo de base de datos estará disponible próximamente.');
+}
+
+// Agregar listener para cambio de fecha de semana
+document.getElementById('bulkWeekStart').addEventListener('change', function() {
+    loadTechnicians();
+});
+
+// Establecer fechas por defecto para exportación
+const today = new Date().toISOString().split('T')[0];
+const weekAgo = new Date(Date.now() - 7 * 24 * 60 * 60 * 1000).toISOString().split('T')[0];
+const currentMonth = new Date().toISOString().slice(0, 7); // YYYY-MM
+
+document.getElementById('exportStartDate').value = weekAgo;
+document.getElementById('exportEndDate').value = today;
+document.getElementById('exportEmpStartDate').value = weekAgo;
+document.getElementById('exportEmpEndDate').value = today;
+document.getElementById('exportDeptStartDate').value = weekAgo;
+document.getElementById('exportDeptEndDate').value = today;
+document.getElementById('monthlyReportMonth').value = currentMonth;
+
+// Empleados para el selector (llegan con /api/bootstrap)
+function loadEmployeesForExport() {
+    fetch('/api/employees')
+        .then(response => response.json())
+        .then(employees => fillEmployeeSelect(employees))
+        .catch(error => console.error('Error:', error));
+}
+
+function fillEmployeeSelect(employees) {
+    const select = document.getElementById('exportEmployee');
+    select.innerHTML = '<option value="">Todos los empleados</option>';
+    employees.forEach(emp => {
+        select.innerHTML += `<option value="${emp.employee_id}">${emp.name}</option>`;
+    });
+}
+
+// Funciones de exportación
+function viewReport() {
+    const startDate = document.getElementById('exportStartDate').value;
+    const endDate = document.getElementById('exportEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para generar el reporte');
+        return;
+    }
+    
+    loadReportData(startDate, endDate);
+}
+
+function viewEmployeeReport() {
+    const employeeId = document.getElementById('exportEmployee').value;
+    const startDate = document.getElementById('exportEmpStartDate').value;
+    const endDate = document.getElementById('exportEmpEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para generar el reporte');
+        return;
+    }
+    
+    loadReportData(startDate, endDate, employeeId);
+}
+
+function viewDepartmentReport() {
+    const department = document.getElementById('exportDepartment').value;
+    const startDate = document.getElementById('exportDeptStartDate').value;
+    const endDate = document.getElementById('exportDeptEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para generar el reporte');
+        return;
+    }
+    
+    loadReportData(startDate, endDate, null, department);
+}
+
+function loadReportData(startDate, endDate, employeeId = null, department = null) {
+    let url = `/api/reports/attendance?start_date=${startDate}&end_date=${endDate}`;
+    if (employeeId) url += `&employee_id=${employeeId}`;
+    if (department) url += `&department=${encodeURIComponent(department)}`;
+    
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                showError('Error en el Reporte', data.error);
+                return;
+            }
+            displayReportTable(data);
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showError('Error de Conexión', 'No se pudo cargar el reporte. Verifica tu conexión.');
+        });
+}
+
+function displayReportTable(reportData) {
+    const tbody = document.getElementById('reportTableBody');
+    tbody.innerHTML = '';
+    
+    let totalRows = 0;
+    
+    for (const empId in reportData) {
+        const empData = reportData[empId];
+        
+        for (const dateStr in empData.days) {
+            const dayData = empData.days[dateStr];
+            const row = document.createElement('tr');
+            
+            // Determinar color de fila
+            let rowClass = '';
+            if (dayData.status === 'Presente') {
+                rowClass = dayData.late ? 'late-row' : 'present-row';
+            } else if (dayData.status === 'Ausente') {
+                rowClass = 'absent-row';
+            }
+            
+            row.className = rowClass;
+            
+            // Observaciones
+            let observations = [];
+            if (dayData.late) {
+                const lateText = dayData.late_minutes ? `Tardó ${dayData.late_minutes} min` : 'Tardó';
+                observations.push(lateText);
+            }
+            if (dayData.early_exit) {
+                const earlyText = dayData.early_minutes ? `Salió ${dayData.early_minutes} min temprano` : 'Salió temprano';
+                observations.push(earlyText);
+            }
+            
+            row.innerHTML = `
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${empData.name}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${empData.department}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${dayData.date}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${dayData.day_name}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">
+                    ${dayData.expected_hours ? `${dayData.expected_hours[0]} - ${dayData.expected_hours[1]}` : 'No laborable'}
+                </td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${dayData.entrada || '-'}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${dayData.salida || '-'}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${dayData.hours_worked}</td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">
+                    <span class="status-${dayData.status.toLowerCase().replace(' ', '-')}">${dayData.status}</span>
+                </td>
+                <td style="padding: 0.5rem; border: 1px solid #ddd;">${observations.join(', ')}</td>
+            `;
+            
+            tbody.appendChild(row);
+            totalRows++;
+        }
+    }
+    
+    // Mostrar el reporte
+    document.getElementById('reportPreview').style.display = 'block';
+    document.getElementById('reportPreview').scrollIntoView({ behavior: 'smooth' });
+    
+    // Mostrar estadísticas
+    console.log(`Reporte generado: ${totalRows} registros`);
+}
+
+function hideReportPreview() {
+    document.getElementById('reportPreview').style.display = 'none';
+}
+function exportToExcel() {
+    const startDate = document.getElementById('exportStartDate').value;
+    const endDate = document.getElementById('exportEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para exportar');
+        return;
+    }
+    
+    const url = `/api/export/excel?start_date=${startDate}&end_date=${endDate}`;
+    window.open(url, '_blank');
+}
+
+function exportToPDF() {
+    const startDate = document.getElementById('exportStartDate').value;
+    const endDate = document.getElementById('exportEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para exportar');
+        return;
+    }
+    
+    const url = `/api/export/pdf?start_date=${startDate}&end_date=${endDate}`;
+    window.open(url, '_blank');
+}
+
+function exportEmployeeToExcel() {
+    const employeeId = document.getElementById('exportEmployee').value;
+    const startDate = document.getElementById('exportEmpStartDate').value;
+    const endDate = document.getElementById('exportEmpEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para exportar');
+        return;
+    }
+    
+    let url = `/api/export/excel?start_date=${startDate}&end_date=${endDate}`;
+    if (employeeId) {
+        url += `&employee_id=${employeeId}`;
+    }
+    
+    window.open(url, '_blank');
+}
+
+function exportEmployeeToPDF() {
+    const employeeId = document.getElementById('exportEmployee').value;
+    const startDate = document.getElementById('exportEmpStartDate').value;
+    const endDate = document.getElementById('exportEmpEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para exportar');
+        return;
+    }
+    
+    let url = `/api/export/pdf?start_date=${startDate}&end_date=${endDate}`;
+    if (employeeId) {
+        url += `&employee_id=${employeeId}`;
+    }
+    
+    window.open(url, '_blank');
+}
+
+function exportDepartmentToExcel() {
+    const department = document.getElementById('exportDepartment').value;
+    const startDate = document.getElementById('exportDeptStartDate').value;
+    const endDate = document.getElementById('exportDeptEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para exportar');
+        return;
+    }
+    
+    let url = `/api/export/excel?start_date=${startDate}&end_date=${endDate}`;
+    if (department) {
+        url += `&department=${encodeURIComponent(department)}`;
+    }
+    
+    window.open(url, '_blank');
+}
+
+function exportDepartmentToPDF() {
+    const department = document.getElementById('exportDepartment').value;
+    const startDate = document.getElementById('exportDeptStartDate').value;
+    const endDate = document.getElementById('exportDeptEndDate').value;
+    
+    if (!startDate || !endDate) {
+        showWarning('Fechas Requeridas', 'Por favor selecciona las fechas de inicio y fin para exportar');
+        return;
+    }
+    
+    let url = `/api/export/pdf?start_date=${startDate}&end_date=${endDate}`;
+    if (department) {
+        url += `&department=${encodeURIComponent(department)}`;
+    }
+    
+    window.open(url, '_blank');
+}
+
+// Funciones para reporte mensual
+function viewMonthlyReport() {
+    const month = document.getElementById('monthlyReportMonth').value;
+    
+    if (!month) {
+        showWarning('Mes Requerido', 'Por favor selecciona un mes para generar el reporte');
+        return;
+    }
+    
+    showLoading('Generando reporte mensual...');
+    
+    fetch(`/api/reports/monthly-summary?month=${month}`)
+        .then(response => response.json())
+        .then(data => {
+            hideLoading();
+            if (data.error) {
+                showError('Error en el Reporte', data.error);
+                return;
+            }
+            displayMonthlyReportTable(data);
+        })
+        .catch(error => {
+            hideLoading();
+            console.error('Error:', error);
+            showError('Error de Conexión', 'No se pudo cargar el reporte mensual.');
+        });
+}
+
+function displayMonthlyReportTable(data) {
+    const tbody = document.getElementById('monthlyReportTableBody');
+    const summary = document.getElementById('monthlyReportSummary');
+    
+    // Mostrar resumen
+    summary.innerHTML = `
+        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; text-align: center;">
+            <div>
+                <div style="font-size: 1.5rem; font-weight: 700; color: var(--emerald-primary);">${data.totals.total_employees}</div>
+                <div style="font-size: 0.9rem; color: var(--text-tertiary);">Total Empleados</div>
+            </div>
+            <div>
+                <div style="font-size: 1.5rem; font-weight: 700; color: var(--teal-secondary);">${data.work_days}</div>
+                <div style="font-size: 0.9rem; color: var(--text-tertiary);">Días Laborables</div>
+            </div>
+            <div>
+                <div style="font-size: 1.5rem; font-weight: 700; color: var(--green-natural);">${data.totals.total_hours.toFixed(1)}</div>
+                <div style="font-size: 0.9rem; color: var(--text-tertiary);">Horas Totales</div>
+            </div>
+            <div>
+                <div style="font-size: 1.5rem; font-weight: 700; color: var(--lime-accent);">${data.totals.avg_days_present}</div>
+                <div style="font-size: 0.9rem; color: var(--text-tertiary);">Promedio Días Presente</div>
+            </div>
+        </div>
+        <div style="margin-top: 1rem; text-align: center; color: var(--text-secondary);">
+            <strong>Mes:</strong> ${data.month} | <strong>Período:</strong> ${data.month}-01 al ${data.month}-${new Date(data.month.split('-')[0], data.month.split('-')[1], 0).getDate()}
+        </div>
+    `;
+    
+    // Limpiar tabla
+    tbody.innerHTML = '';
+    
+    // Llenar tabla
+    data.employees.forEach(emp => {
+        const row = document.createElement('tr');
+        
+        // Determinar color de fila según asistencia
+        let rowClass = '';
+        const attendanceRate = emp.days_present / data.work_days;
+        if (attendanceRate >= 0.95) {
+            rowClass = 'present-row';
+        } else if (attendanceRate < 0.8) {
+            rowClass = 'absent-row';
+        } else if (attendanceRate < 0.9) {
+            rowClass = 'late-row';
+        }
+        
+        row.className = rowClass;
+        
+        row.innerHTML = `
+            <td style="padding: 0.75rem; border: 1px solid #ddd; font-weight: 600;">${emp.name}</td>
+            <td style="padding: 0.75rem; border: 1px solid #ddd;">${emp.department}</td>
+            <td style="padding: 0.75rem; border: 1px solid #ddd; text-align: center; font-weight: 600; color: var(--emerald-primary);">${emp.days_present}</td>
+            <td style="padding: 0.75rem; border: 1px solid #ddd; text-align: center; font-weight: 600; color: ${emp.days_absent > 0 ? 'var(--orange-warning)' : 'var(--text-tertiary)'};">${emp.days_absent}</td>
+            <td style="padding: 0.75rem; border: 1px solid #ddd; text-align: center; font-weight: 600; color: var(--teal-secondary);">${emp.total_hours.toFixed(1)}</td>
+        `;
+        
+        tbody.appendChild(row);
+    });
+    
+    // Mostrar el reporte
+    document.getElementById('monthlyReportPreview').style.display = 'block';
+    document.getElementById('monthlyReportPreview').scrollIntoView({ behavior: 'smooth' });
+}
+
+function hideMonthlyReportPreview() {
+    document.getElementById('monthlyReportPreview').style.display = 'none';
+}
+
+function exportMonthlyToExcel() {
+    const month = document.getElementById('monthlyReportMonth').value;
+    
+    if (!month) {
+        showWarning('Mes Requerido', 'Por favor selecciona un mes para exportar');
+        return;
+    }
+    
+    // Crear tabla temporal para exportar
+    const table = document.getElementById('monthlyReportTable').cloneNode(true);
+    const blob = new Blob([`
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>Reporte Mensual ${month}</title>
+        </head>
+        <body>
+            <h2>Reporte Mensual de Asistencia - ${month}</h2>
+            ${table.outerHTML}
+        </body>
+        </html>
+    `], { type: 'application/vnd.ms-excel' });
+    
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = `reporte_mensual_${month}.xls`;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(url);
+    
+    showSuccess('Exportación Exitosa', `Reporte mensual de ${month} exportado correctamente`);
+}
@@ -0,0 +1,227 @@
+let allEmployees = [];
+
+// Cargar empleados al iniciar
+document.addEventListener('DOMContentLoaded', function() {
+    loadEmployees();
+});
+
+function loadEmployees() {
+    fetch('/api/employees')
+        .then(response => response.json())
+        .then(data => {
+            allEmployees = data;
+            displayEmployees(data);
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            showEmptyState('Error al cargar empleados');
+        });
+}
+
+function displayEmployees(employees) {
+    const grid = document.getElementById('employeesGrid');
+    
+    if (employees.length === 0) {
+        showEmptyState('No hay empleados registrados');
+        return;
+    }
+
+    grid.innerHTML = employees.map(emp => `
+        <div class="employee-card">
+            <div class="status-badge ${emp.active ? 'badge-active' : 'badge-inactive'}">
+                ${emp.active ? 'Activo' : 'Inactivo'}
+            </div>
+            
+            <div class="employee-header">
+                <div class="employee-avatar">
+                    ${emp.name.charAt(0).toUpperCase()}
+                </div>
+                <div class="employee-info">
+                    <h3>${emp.name}</h3>
+                    <div class="employee-id">ID: ${emp.employee_id}</div>
+                </div>
+            </div>
+
+            <div class="employee-details">
+                <div class="detail-row">
+                    <i class="fas fa-building detail-icon"></i>
+                    <span>${emp.department}</span>
+                </div>
+                <div class="detail-row">
+                    <i class="fas fa-clock detail-icon"></i>
+                    <span>Horario: ${emp.schedule}</span>
+                </div>
+                ${emp.phone ? `
+                <div class="detail-row">
+                    <i class="fas fa-phone detail-icon"></i>
+                    <span>${emp.phone}</span>
+                </div>
+                ` : ''}
+                ${emp.email ? `
+                <div class="detail-row">
+                    <i class="fas fa-envelope detail-icon"></i>
+                    <span>${emp.email}</span>
+                </div>
+                ` : ''}
+                <div class="detail-row">
+                    <i class="fas fa-calendar detail-icon"></i>
+                    <span>Creado: ${new Date(emp.created_at).toLocaleDateString()}</span>
+                </div>
+            </div>
+
+            <div class="employee-actions">
+                <button class="btn btn-primary" onclick="editEmployee('${emp.employee_id}')">
+                    <i class="fas fa-edit"></i>
+                    Editar
+                </button>
+                <button class="btn ${emp.active ? 'btn-warning' : 'btn-success'}" 
+                        onclick="toggleEmployee('${emp.employee_id}', ${emp.active})">
+                    <i class="fas fa-${emp.active ? 'pause' : 'play'}"></i>
+                    ${emp.active ? 'Desactivar' : 'Activar'}
+                </button>
+                <button class="btn btn-danger" onclick="deleteEmployee('${emp.employee_id}', '${emp.name}')">
+                    <i class="fas fa-trash"></i>
+                    Eliminar
+                </button>
+            </div>
+        </div>
+    `).join('');
+}
+
+function showEmptyState(message) {
+    const grid = document.getElementById('employeesGrid');
+    grid.innerHTML = `
+        <div class="empty-state">
+            <div class="empty-icon">
+                <i class="fas fa-users"></i>
+            </div>
+            <h3>${message}</h3>
+            <p>No se encontraron empleados para mostrar</p>
+        </div>
+    `;
+}
+
+function filterEmployees() {
+    const searchTerm = document.getElementById('searchInput').value.toLowerCase();
+    const filtered = allEmployees.filter(emp => 
+        emp.name.toLowerCase().includes(searchTerm) ||
+        emp.employee_id.toLowerCase().includes(searchTerm) ||
+        emp.department.toLowerCase().includes(searchTerm)
+    );
+    displayEmployees(filtered);
+}
+
+function addEmployee() {
+    const name = prompt('Nombre del empleado:');
+    if (!name) return;
+    
+    const id = prompt('ID del empleado:');
+    if (!id) return;
+    
+    const department = prompt('Departamento:', 'General');
+    
+    const employeeData = {
+        employee_id: id,
+        name: name,
+        department: department || 'General'
+    };
+
+    fetch('/api/employees', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(employeeData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('Empleado agregado exitosamente');
+            loadEmployees();
+        } else {
+            alert('Error: ' + data.message);
+        }
+    })
+    .catch(error => {
+        alert('Error al agregar empleado');
+    });
+}
+
+function editEmployee(employeeId) {
+    const employee = allEmployees.find(emp => emp.employee_id === employeeId);
+    if (!employee) return;
+
+    const name = prompt('Nombre:', employee.name);
+    if (name === null) return;
+
+    const department = prompt('Departamento:', employee.department);
+    if (department === null) return;
+
+    const phone = prompt('Teléfono:', employee.phone || '');
+    const email = prompt('Email:', employee.email || '');
+
+    const updatedData = {
+        name: name,
+        department: department,
+        phone: phone || '',
+        email: email || '',
+        active: employee.active
+    };
+
+    fetch(`/api/employees/${employeeId}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(updatedData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('Empleado actualizado exitosamente');
+            loadEmployees();
+        } else {
+            alert('Error: ' + data.message);
+        }
+    })
+    .catch(error => {
+        alert('Error al actualizar empleado');
+    });
+}
+
+function toggleEmployee(employeeId, currentStatus) {
+    const action = currentStatus ? 'desactivar' : 'activar';
+    if (!confirm(`¿Estás seguro de ${action} este empleado?`)) return;
+
+    fetch(`/api/employees/${employeeId}/toggle`, {
+        method: 'POST'
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert(data.message);
+            loadEmployees();
+        } else {
+            alert('Error: ' + data.message);
+        }
+    })
+    .catch(error => {
+        alert('Error al cambiar estado del empleado');
+    });
+}
+
+function deleteEmployee(employeeId, employeeName) {
+    if (!confirm(`¿Estás seguro de eliminar a ${employeeName}? Esta acción no se puede deshacer.`)) return;
+
+    fetch(`/api/employees/${employeeId}`, {
+        method: 'DELETE'
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert(data.message);
+            loadEmployees();
+        } else {
+            alert('Error: ' + data.message);
+        }
+    })
+    .catch(error => {
+        alert('Error al eliminar empleado');
+    });
+}
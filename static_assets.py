@@ -0,0 +1,312 @@
+"""
+Assets estáticos de las plantillas: extracción, minificado y versionado
+Las hojas de estilo y scripts de las plantillas viven en static/src/ (antes en línea
+en cada HTML y reenviados en cada carga). El build genera en static/dist/:
+- <nombre>.<hash>.css/.js minificados, con el hash del contenido en el nombre
+- variantes precomprimidas .gz (y .br si el paquete brotli está instalado)
+- manifest.json: nombre fuente -> nombre versionado
+
+Las plantillas usan {{ asset_url('dashboard_pcshek.js') }}: con manifest apunta al
+archivo versionado (servido con caché de un año, immutable); sin build, al fuente.
+
+Uso:
+    python static_assets.py             # build (build.sh / Dockerfile)
+    python static_assets.py report      # bytes de la primera carga por plantilla
+    python static_assets.py extract     # mover bloques en línea de TEMPLATES a static/src
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+SRC_DIR = os.path.join(BASE_DIR, 'static', 'src')
+DIST_DIR = os.path.join(BASE_DIR, 'static', 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Plantillas que sirve system_optimized_v2.py
+TEMPLATES = ('dashboard_pcshek.html', 'employees_pcshek.html', 'employees_simple.html')
+INLINE_BLOCK = re.compile(r'^(?P<indent>[ \t]*)<(?P<tag>style|script)>\n?(?P<body>.*?)[ \t]*</(?P=tag)>[ \t]*$',
+                          re.S | re.M)
+ASSET_REFERENCE = re.compile(r"asset_url\('(?P<name>[^']+)'\)")
+
+# Contexto en el que '/' abre una expresión regular y no es una división
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = re.compile(r'\b(return|typeof|case|do|else|in|of|new|delete|void|throw)$')
+
+
+# Minificado conservador: quita comentarios e indentación, nunca reordena tokens
+
+def _skip_string(source, i):
+    quote = source[i]
+    j = i + 1
+    while j < len(source):
+        if source[j] == '\\':
+            j += 2
+            continue
+        if source[j] == quote:
+            return j + 1
+        j += 1
+    return j
+
+
+def _scan_template(source, j):
+    """Texto de una plantilla `...` desde j; devuelve (fin, cerrada) al llegar a ` o ${"""
+    while j < len(source):
+        if source[j] == '\\':
+            j += 2
+            continue
+        if source[j] == '`':
+            return j + 1, True
+        if source.startswith('${', j):
+            return j + 2, False
+        j += 1
+    return j, True
+
+
+def _scan_regex(source, i):
+    """Fin de una expresión regular literal, o None si la línea no la cierra"""
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        char = source[j]
+        if char == '\\':
+            j += 2
+            continue
+        if char == '\n':
+            return None
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            j += 1
+            while j < len(source) and source[j].isalpha():
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _append_space(out, newline):
+    if newline:
+        if out and out[-1] == ' ':
+            out.pop()
+        if out and out[-1] != '\n':
+            out.append('\n')
+    elif out and out[-1][-1] not in ' \n':
+        out.append(' ')
+
+
+def minify_js(source):
+    """Sin comentarios ni indentación; los saltos de línea se conservan (inserción automática de ';')"""
+    out = []
+    braces = []  # '{' de código o 'tpl' para el ${ de una plantilla
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in '"\'':
+            j = _skip_string(source, i)
+        elif char == '`' or (char == '}' and braces and braces[-1] == 'tpl'):
+            if char == '}':
+                braces.pop()
+            j, closed = _scan_template(source, i + 1)
+            if not closed:
+                braces.append('tpl')
+        elif char == '{':
+            braces.append('{')
+            j = i + 1
+        elif char == '}':
+            if braces:
+                braces.pop()
+            j = i + 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end < 0 else end
+            continue
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = len(source) if end < 0 else end + 2
+            _append_space(out, '\n' in source[i:end])
+            i = end
+            continue
+        elif char == '/':
+            tail = ''.join(out[-8:]).rstrip()
+            j = None
+            if not tail or tail[-1] in REGEX_PRECEDERS or REGEX_KEYWORDS.search(tail):
+                j = _scan_regex(source, i)
+            j = j or i + 1
+        elif char in ' \t\r\n':
+            _append_space(out, char == '\n')
+            i += 1
+            continue
+        else:
+            j = i + 1
+        out.append(source[i:j])
+        i = j
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    """Sin comentarios ni espacios alrededor de { } ; , > ni después de ':'"""
+    parts = []
+    code = []  # Código entre cadenas; los comentarios cuentan como un espacio
+    i = 0
+    code_start = 0
+    while i < len(source):
+        char = source[i]
+        if char in '"\'':
+            code.append(source[code_start:i])
+            parts.append(_compact_css(''.join(code)))
+            code = []
+            j = _skip_string(source, i)
+            parts.append(source[i:j])
+            i = code_start = j
+        elif source.startswith('/*', i):
+            code.append(source[code_start:i] + ' ')
+            end = source.find('*/', i + 2)
+            i = code_start = len(source) if end < 0 else end + 2
+        else:
+            i += 1
+    code.append(source[code_start:])
+    parts.append(_compact_css(''.join(code)))
+    return ''.join(parts).strip() + '\n'
+
+
+def _compact_css(code):
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r' ?([{};,>]) ?', r'\1', code)
+    code = re.sub(r': ', ':', code)
+    return code.replace(';}', '}')
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# Build
+
+def _compress_variants(path, content):
+    with open(path + '.gz', 'wb') as handle:
+        handle.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if BROTLI_AVAILABLE:
+        with open(path + '.br', 'wb') as handle:
+            handle.write(brotli.compress(content, quality=11))
+
+
+def build(src_dir=SRC_DIR, dist_dir=DIST_DIR):
+    """Minificar y versionar static/src; devuelve el manifest"""
+    os.makedirs(dist_dir, exist_ok=True)
+    manifest = {}
+    for name in sorted(os.listdir(src_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext not in MINIFIERS:
+            continue
+        with open(os.path.join(src_dir, name), encoding='utf-8') as handle:
+            content = MINIFIERS[ext](handle.read()).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()[:10]
+        built = f'{stem}.{digest}{ext}'
+        path = os.path.join(dist_dir, built)
+        with open(path, 'wb') as handle:
+            handle.write(content)
+        _compress_variants(path, content)
+        manifest[name] = built
+
+    # Quitar versiones anteriores
+    current = set(manifest.values())
+    for name in os.listdir(dist_dir):
+        if name != 'manifest.json' and re.sub(r'\.(gz|br)$', '', name) not in current:
+            os.remove(os.path.join(dist_dir, name))
+
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    return manifest
+
+
+def extract(templates=TEMPLATES):
+    """Mover los <style>/<script> en línea de las plantillas a static/src (una sola vez)"""
+    os.makedirs(SRC_DIR, exist_ok=True)
+    for template in templates:
+        path = os.path.join(TEMPLATES_DIR, template)
+        with open(path, encoding='utf-8') as handle:
+            html = handle.read()
+        stem = os.path.splitext(template)[0]
+        counters = {'style': 0, 'script': 0}
+
+        def replace(match):
+            body = match.group('body')
+            if '{{' in body or '{%' in body:
+                return match.group(0)  # Depende de Jinja: se queda en la plantilla
+            tag = match.group('tag')
+            counters[tag] += 1
+            suffix = '' if counters[tag] == 1 else f'-{counters[tag]}'
+            name = f"{stem}{suffix}.{'css' if tag == 'style' else 'js'}"
+            lines = body.splitlines()
+            indent = min((len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0)
+            with open(os.path.join(SRC_DIR, name), 'w', encoding='utf-8') as handle:
+                handle.write('\n'.join(line[indent:] for line in lines).strip('\n') + '\n')
+            if tag == 'style':
+                return f'''{match.group('indent')}<link href="{{{{ asset_url('{name}') }}}}" rel="stylesheet">'''
+            return f'''{match.group('indent')}<script src="{{{{ asset_url('{name}') }}}}"></script>'''
+
+        html = INLINE_BLOCK.sub(replace, html)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(html)
+        print(f"{template}: {counters['style']} style, {counters['script']} script")
+
+
+def report(templates=TEMPLATES):
+    """Bytes de la primera carga: HTML con todo en línea frente a HTML + assets precomprimidos"""
+    manifest = load_manifest()
+    print(f"{'plantilla':<24}{'en línea':>12}{'1ª visita':>12}{'repetida':>12}")
+    for template in templates:
+        with open(os.path.join(TEMPLATES_DIR, template), encoding='utf-8') as handle:
+            source = handle.read()
+        html = len(source.encode('utf-8'))
+        inline = html
+        first_visit = html
+        for name in ASSET_REFERENCE.findall(source):
+            inline += os.path.getsize(os.path.join(SRC_DIR, name))
+            built = os.path.join(DIST_DIR, manifest.get(name, ''))
+            variant = built + ('.br' if os.path.exists(built + '.br') else '.gz')
+            first_visit += os.path.getsize(variant) if os.path.exists(variant) else os.path.getsize(os.path.join(SRC_DIR, name))
+        print(f"{template:<24}{inline:>12,}{first_visit:>12,}{html:>12,}")
+
+
+# Servidor
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifest del último build ({} si no se ha ejecutado)"""
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def precompressed(filename, accept_encoding, dist_dir=DIST_DIR):
+    """(variante, codificación) precomprimida que acepta el cliente, o (None, None)"""
+    accepted = {part.split(';')[0].strip() for part in (accept_encoding or '').split(',')}
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in accepted and os.path.exists(os.path.join(dist_dir, filename + suffix)):
+            return filename + suffix, encoding
+    return None, None
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    if command == 'extract':
+        extract()
+    elif command == 'report':
+        report()
+    else:
+        for source, built in build().items():
+            print(f"{source} -> {built}")
@@ -13,6 +13,9 @@ from datetime import datetime, timedelta, time
 import time as time_module
 import os
 from dotenv import load_dotenv
+from query_registry import QueryRegistry
+from http_cache import DataVersions
+from schedule_rules import ScheduleRules
 
 # Cargar variables de entorno
 load_dotenv()
@@ -66,6 +69,11 @@ class BreakAttendanceSystem:
         
         self.init_database()
         
+        # Ventanas de break y almuerzo compiladas desde department_schedules (ver schedule_rules.py)
+        queries = QueryRegistry(self.db_type)
+        self.schedule_rules = ScheduleRules(self.get_connection, queries, DataVersions(self.get_connection, queries))
+        self.schedule_rules.load()
+        
     def init_database(self):
         """Inicializar base de datos con sistema de breaks"""
         conn = self.get_connection()
@@ -175,19 +183,12 @@ class BreakAttendanceSystem:
             return 'entrada'
         
         # 2. Detectar breaks según departamento y turno
-        if department in ['Reacondicionamiento', 'Logistica', 'Administracion']:
-            # Break administrativo: 9:00-10:00 AM
-            if time(9, 0) <= time_only <= time(10, 0):
-                return self.detect_break_type(employee_id, timestamp, 'admin_break')
-                
-            # Almuerzo administrativo: 12:00-14:00
-            if time(12, 0) <= time_only <= time(14, 0):
-                return self.detect_break_type(employee_id, timestamp, 'almuerzo')
-        
-        elif department == 'Operativos':
-            break_window = self.get_break_window_by_shift(shift_type)
-            if break_window['start'] <= time_only <= break_window['end']:
-                return self.detect_break_type(employee_id, timestamp, 'operativo_break')
+        rules = self.schedule_rules.rules_for(department, shift_type)
+        window = rules.window_at(time_only)
+        if window == 'break':
+            return self.detect_break_type(employee_id, timestamp, rules.break_type)
+        if window == 'almuerzo':
+            return self.detect_break_type(employee_id, timestamp, 'almuerzo')
         
         # 3. Determinar entrada/salida regular
         return self.determine_regular_event_type(employee_id, timestamp)
@@ -195,9 +196,8 @@ class BreakAttendanceSystem:
     def get_break_window_by_shift(self, shift_type):
         """Obtener ventana de break según turno operativo"""
         windows = {
-            'mañana': {'start': time(9, 0), 'end': time(10, 0)},
-            'tarde': {'start': time(17, 0), 'end': time(18, 0)},
-            'noche': {'start': time(1, 0), 'end': time(2, 0)}
+            rules.shift_type: {'start': time.fromisoformat(rules.break_start), 'end': time.fromisoformat(rules.break_end)}
+            for rules in (self.schedule_rules.rules_for('Operativos', shift) for shift in ('mañana', 'tarde', 'noche'))
         }
         return windows.get(shift_type, windows['mañana'])
     
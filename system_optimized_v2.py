@@ -2,17 +2,34 @@
 Sistema de Asistencia Optimizado con PostgreSQL
 Versión actualizada que usa la configuración de .env
 """
-from flask import Flask, render_template, jsonify, request, send_file
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, jsonify, request, send_file, send_from_directory, url_for
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms
 from flask_cors import CORS
 import requests
 from requests.auth import HTTPDigestAuth
 import json
+import mimetypes
 import threading
-from datetime import datetime, timedelta, time as dt_time
+import atexit
+from datetime import datetime, timedelta
 import time as time_module
 import os
 from dotenv import load_dotenv
+from schema_migrations import SchemaMigrator
+from query_registry import RECORD_FILTERS, QueryRegistry, records_query_name
+from dashboard_state import ALL_ROOM, DashboardState, parse_scope
+from event_bus import create_bus
+from ingest_leader import IngestLeader
+from batching_emitter import BatchingEmitter
+from http_cache import DataVersions, ResponseCache
+from static_assets import DIST_DIR, load_manifest, precompressed
+from sse_stream import SSEBroker
+from timing_wheel import TimingWheel
+from schedule_rules import ScheduleRules
+from work_calendar import WorkCalendar
+from presence_bitmap import PresenceBitmap, counts as presence_counts
+from shift_map import ShiftMap, week_start as shift_week_start
+from absence_detector import AbsenceDetector
 try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, PatternFill, Alignment
@@ -39,7 +56,10 @@ load_dotenv()
 app = Flask(__name__, static_folder='static')
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'hikvision_attendance_2024')
 CORS(app, origins=["http://localhost:3001", "http://localhost:3000"])
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Con REDIS_URL las emisiones de cualquier worker llegan a los clientes de todos los workers
+socketio = SocketIO(app, cors_allowed_origins="*", message_queue=os.getenv('REDIS_URL'))
+# Eventos en tiempo real agrupados por ventana (ver batching_emitter.py)
+emitter = BatchingEmitter(socketio)
 
 class OptimizedAttendanceSystem:
     def __init__(self):
@@ -57,6 +77,7 @@ class OptimizedAttendanceSystem:
         
         # Estado del sistema
         self.monitoring = False
+        self.monitoring_requested = False  # Se conserva si el liderazgo pasa a otro worker
         self.connected = False
         self.last_event_time = time_module.time()
         
@@ -65,237 +86,100 @@ class OptimizedAttendanceSystem:
         self.cache_timestamp = 0
         self.cache_duration = 300  # 5 minutos
         
+        # Día laboral al que corresponde la tabla employee_presence
+        self.presence_workday = None
+        self.presence_lock = threading.Lock()
+        
         # Configurar base de datos
         self.setup_database()
         
+        # Proyección en memoria del dashboard (ver dashboard_state.py)
+        self.dashboard_state = DashboardState(app.json.dumps, rules_for=self.schedule_rules.rules_for)
+        self._sync_requested_at = 0
+        self.stream = SSEBroker(self.dashboard_state, app.json.dumps)  # /api/stream
+        
+        # Breaks vencidos y no tomados: un temporizador por empleado, sin sondear la base de datos
+        self.break_timers = TimingWheel(self.on_break_timer)
+        self.break_timers.start()
+        
+        # Un solo worker lee el dispositivo; los demás replican su estado por el bus
+        self.event_bus = create_bus()
+        self.ingest_leader = IngestLeader(self.get_connection, self.queries, on_elected=self._on_elected,
+                                          on_demoted=self._on_demoted, on_tick=self._on_leader_tick)
+        self.event_bus.subscribe(self._on_bus_message)
+        self.ingest_leader.check()
+        self.ingest_leader.start()
+        atexit.register(self.ingest_leader.release)
+        
+        try:
+            self.refresh_dashboard_state()
+        except Exception as e:
+            print(f"Error cargando estado del dashboard: {e}")
+        
+        # Quien no marcó al inicio de su turno: una revisión por cohorte (ver absence_detector.py)
+        self.absence_detector = AbsenceDetector(self.schedule_rules, self.work_calendar, self.shift_map, self.active_employees,
+                                                self.arrived_since, self.notify_absences,
+                                                is_active=lambda: self.ingest_leader.is_leader)
+        self.absence_detector.start()
+        
     def setup_database(self):
         """Configurar conexión a base de datos"""
         if self.database_url and self.database_url.startswith('postgresql'):
-            # Usar PostgreSQL
-            import psycopg2
+            # Usar PostgreSQL (pool: las sentencias preparadas se conservan por conexión)
+            from query_registry import PostgresPool
             self.db_type = 'postgresql'
-            self.get_connection = lambda: psycopg2.connect(self.database_url)
+            self.pg_pool = PostgresPool(self.database_url)
+            self.get_connection = self.pg_pool.connect
             print("Configurado para PostgreSQL")
         else:
             # Fallback a SQLite
-            import sqlite3
+            from sqlite_profile import SQLiteProfile
             self.db_type = 'sqlite'
-            self.db_path = 'attendance.db'
-            self.get_connection = lambda: sqlite3.connect(self.db_path)
+            self.db_path = os.getenv('SQLITE_PATH', 'attendance.db')
+            # WAL + escritor único + lectores reutilizables (ver sqlite_profile.py)
+            self.sqlite_profile = SQLiteProfile(self.db_path)
+            self.get_connection = self.sqlite_profile.connect
             print("Usando SQLite como fallback")
         
-        self.init_database()
+        # Consultas con nombre por dialecto (ver query_registry.py)
+        self.queries = QueryRegistry(self.db_type)
         
-    def init_database(self):
-        """Inicializar base de datos"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        # Traza opcional de sentencias SQL (ver query_advisor.py)
+        if os.getenv('SQL_TRACE_FILE'):
+            from query_advisor import SQLTracer
+            self.get_connection = SQLTracer(os.getenv('SQL_TRACE_FILE')).wrap(self.get_connection)
+            print(f"Traza SQL activa: {os.getenv('SQL_TRACE_FILE')}")
         
-        try:
-            if self.db_type == 'postgresql':
-                # Crear tablas PostgreSQL
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS employees (
-                        id SERIAL PRIMARY KEY,
-                        employee_id TEXT UNIQUE NOT NULL,
-                        name TEXT NOT NULL,
-                        department TEXT DEFAULT 'General',
-                        schedule TEXT DEFAULT 'estandar',
-                        phone TEXT DEFAULT '',
-                        email TEXT DEFAULT '',
-                        active BOOLEAN DEFAULT true,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        synced_to_device BOOLEAN DEFAULT false
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS employee_schedules (
-                        id SERIAL PRIMARY KEY,
-                        employee_id TEXT NOT NULL,
-                        schedule_type TEXT NOT NULL,
-                        shift_type TEXT DEFAULT NULL,
-                        start_time TIME NOT NULL,
-                        end_time TIME NOT NULL,
-                        days_of_week TEXT NOT NULL,
-                        active_from DATE DEFAULT CURRENT_DATE,
-                        active_until DATE DEFAULT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS break_types (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR(50) NOT NULL,
-                        display_name VARCHAR(100) NOT NULL,
-                        duration_minutes INTEGER NOT NULL,
-                        mandatory BOOLEAN DEFAULT true,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS department_schedules (
-                        id SERIAL PRIMARY KEY,
-                        department VARCHAR(100) NOT NULL,
-                        shift_type VARCHAR(50),
-                        work_start TIME NOT NULL,
-                        work_end TIME NOT NULL,
-                        break_start TIME NOT NULL,
-                        break_end TIME NOT NULL,
-                        has_lunch BOOLEAN DEFAULT FALSE,
-                        lunch_options TEXT[],
-                        friday_end TIME,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS attendance_records (
-                        id SERIAL PRIMARY KEY,
-                        employee_id TEXT NOT NULL,
-                        event_type TEXT NOT NULL,
-                        timestamp TIMESTAMP NOT NULL,
-                        reader_no INTEGER DEFAULT 1,
-                        verify_method TEXT DEFAULT 'huella',
-                        status TEXT DEFAULT 'autorizado',
-                        break_type VARCHAR(50),
-                        is_break_record BOOLEAN DEFAULT FALSE,
-                        break_duration_minutes INTEGER
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS daily_summaries (
-                        id SERIAL PRIMARY KEY,
-                        employee_id TEXT NOT NULL,
-                        date DATE NOT NULL,
-                        first_entry TIME,
-                        last_exit TIME,
-                        total_hours DECIMAL(4,2) DEFAULT 0,
-                        worked_day BOOLEAN DEFAULT false,
-                        is_holiday BOOLEAN DEFAULT false,
-                        is_weekend BOOLEAN DEFAULT false,
-                        late_minutes INTEGER DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(employee_id, date)
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS weekly_shift_assignments (
-                        id SERIAL PRIMARY KEY,
-                        employee_id TEXT NOT NULL,
-                        week_start DATE NOT NULL,
-                        week_end DATE NOT NULL,
-                        shift_type TEXT NOT NULL,
-                        start_time TIME NOT NULL,
-                        end_time TIME NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(employee_id, week_start)
-                    )
-                ''')
-                
-                # Crear índices para optimización
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_employee_id ON attendance_records(employee_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance_records(DATE(timestamp))')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_active ON employees(active)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_weekly_shifts_employee_week ON weekly_shift_assignments(employee_id, week_start)')
-                
-            else:
-                # Crear tablas SQLite
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS employees (
-                        id INTEGER PRIMARY KEY,
-                        employee_id TEXT UNIQUE,
-                        name TEXT,
-                        department TEXT DEFAULT 'General',
-                        schedule TEXT DEFAULT 'estandar',
-                        phone TEXT DEFAULT '',
-                        email TEXT DEFAULT '',
-                        active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        synced_to_device BOOLEAN DEFAULT 0
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS employee_schedules (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        employee_id TEXT NOT NULL,
-                        schedule_type TEXT NOT NULL,
-                        shift_type TEXT DEFAULT NULL,
-                        start_time TEXT NOT NULL,
-                        end_time TEXT NOT NULL,
-                        days_of_week TEXT NOT NULL,
-                        active_from DATE DEFAULT CURRENT_DATE,
-                        active_until DATE DEFAULT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS attendance_records (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        employee_id TEXT,
-                        event_type TEXT,
-                        timestamp TIMESTAMP,
-                        reader_no INTEGER DEFAULT 1,
-                        verify_method TEXT DEFAULT 'huella',
-                        status TEXT DEFAULT 'autorizado'
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS daily_summaries (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        employee_id TEXT NOT NULL,
-                        date DATE NOT NULL,
-                        first_entry TEXT,
-                        last_exit TEXT,
-                        total_hours REAL DEFAULT 0,
-                        worked_day BOOLEAN DEFAULT 0,
-                        is_holiday BOOLEAN DEFAULT 0,
-                        is_weekend BOOLEAN DEFAULT 0,
-                        late_minutes INTEGER DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(employee_id, date)
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS weekly_shift_assignments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        employee_id TEXT NOT NULL,
-                        week_start DATE NOT NULL,
-                        week_end DATE NOT NULL,
-                        shift_type TEXT NOT NULL,
-                        start_time TEXT NOT NULL,
-                        end_time TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(employee_id, week_start)
-                    )
-                ''')
-                
-                cursor.execute('''
-                    INSERT OR IGNORE INTO employees (employee_id, name, department) 
-                    VALUES (?, ?, ?)
-                ''', ('1', 'Administrador', 'Administración'))
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_employee_id ON attendance_records(employee_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_timestamp ON attendance_records(timestamp)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance_records(date(timestamp))')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_employees_active ON employees(active)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_weekly_shifts_employee_week ON weekly_shift_assignments(employee_id, week_start)')
-            
-            conn.commit()
-            print("Base de datos inicializada")
-            
-        except Exception as e:
-            print(f"Error inicializando base de datos: {e}")
-        finally:
-            conn.close()
+        # Contadores de cambios para ETag/304 de las APIs de lectura (ver http_cache.py)
+        self.data_versions = DataVersions(self.get_connection, self.queries)
+        
+        # Esquema versionado: comprobación barata de versión; solo un proceso aplica migraciones
+        migration_connection = self.sqlite_profile.direct_connection if self.db_type == 'sqlite' else self.get_connection
+        self.migrator = SchemaMigrator(migration_connection, self.db_type)
+        self.migrator.ensure_current(auto_migrate=os.getenv('AUTO_MIGRATE', 'true').lower() != 'false')
+        
+        # Horarios, ventanas de break y descuentos por departamento y turno (ver schedule_rules.py)
+        self.schedule_rules = ScheduleRules(self.get_connection, self.queries, self.data_versions)
+        self.schedule_rules.load()
+        
+        # Calendario laboral por mes con festivos, precalculado sobre las reglas (ver work_calendar.py)
+        self.work_calendar = WorkCalendar(self.schedule_rules, self.get_connection, self.queries, self.data_versions)
+        self.work_calendar.load()
+        
+        # Días trabajados por empleado y año en bits para cruzarlos con el calendario (ver presence_bitmap.py)
+        self.presence_bitmap = PresenceBitmap(self.get_connection, self.queries, self.data_versions)
+        
+        # Turnos por semana en memoria: una consulta por semana, no una por marcaje (ver shift_map.py)
+        self.shift_map = ShiftMap(self.get_connection, self.queries)
+        
+        if self.db_type == 'sqlite':
+            self.sqlite_profile.start_maintenance()
+        
+    def begin_write(self, conn):
+        """Verificar y escribir en una transacción: en SQLite la conexión de escritura se toma antes de leer
+        (en PostgreSQL cada conexión ya es su propia transacción)"""
+        if self.db_type == 'sqlite':
+            conn.begin_write()
     
     def test_connection(self):
         """Probar conexión al dispositivo"""
@@ -325,14 +209,11 @@ class OptimizedAttendanceSystem:
         """Registrar asistencia"""
         try:
             conn = self.get_connection()
+            self.begin_write(conn)  # Verificación de duplicados en la transacción del marcaje
             cursor = conn.cursor()
             
             # Obtener información del empleado
-            if self.db_type == 'postgresql':
-                cursor.execute('SELECT name, department, schedule FROM employees WHERE employee_id = %s', (employee_id,))
-            else:
-                cursor.execute('SELECT name, department, schedule FROM employees WHERE employee_id = ?', (employee_id,))
-            
+            self.queries.run(cursor, 'employees.by_id', (employee_id,))
             employee = cursor.fetchone()
             
             if not employee:
@@ -343,64 +224,56 @@ class OptimizedAttendanceSystem:
             # Usar hora local de Colombia directamente
             local_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            # Verificar duplicados
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    SELECT timestamp FROM attendance_records 
-                    WHERE employee_id = %s AND timestamp > NOW() - INTERVAL '10 seconds'
-                    ORDER BY timestamp DESC LIMIT 1
-                ''', (employee_id,))
-            else:
-                cursor.execute('''
-                    SELECT timestamp FROM attendance_records 
-                    WHERE employee_id = ? AND datetime(timestamp) > datetime('now', '-10 seconds')
-                    ORDER BY timestamp DESC LIMIT 1
-                ''', (employee_id,))
-            
+            # Verificar duplicados (misma hora local con la que se guardan los registros)
+            duplicate_cutoff = (datetime.now() - timedelta(seconds=10)).strftime('%Y-%m-%d %H:%M:%S')
+            self.queries.run(cursor, 'attendance.recent_for_employee', (employee_id, duplicate_cutoff))
             recent_record = cursor.fetchone()
             if recent_record:
                 print(f"DUPLICADO EVITADO: {employee[0]} - Registro muy reciente")
                 conn.close()
                 return False
             
-            # Determinar tipo de evento
-            event_type = self.determine_event_type(employee_id)
+            # Día laboral (el turno noche conserva el día en que empezó) y tipo de evento
+            context = self.punch_context(employee_id, datetime.strptime(local_timestamp, '%Y-%m-%d %H:%M:%S'))
+            workday = context[1]
+            event_type = self.determine_event_type(employee_id, context)
             
             # Determinar si es break o almuerzo
             is_break = event_type.startswith('break_')
             is_lunch = event_type.startswith('almuerzo_')
             
-            break_type = None
-            if is_break:
-                if employee[1] == 'Operativos':
-                    break_type = 'operativo_break'
-                else:
-                    break_type = 'admin_break'
-            elif is_lunch:
-                break_type = 'almuerzo_admin'
+            break_type = self.break_type_for(event_type, employee[1])
             
             # Insertar registro
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    INSERT INTO attendance_records 
-                    (employee_id, event_type, timestamp, reader_no, verify_method, status, is_break_record, break_type)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ''', (employee_id, event_type, local_timestamp, reader_no, verify_method, "autorizado", is_break or is_lunch, break_type))
-            else:
-                cursor.execute('''
-                    INSERT INTO attendance_records 
-                    (employee_id, event_type, timestamp, reader_no, verify_method, status, is_break_record, break_type)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (employee_id, event_type, local_timestamp, reader_no, verify_method, "autorizado", is_break or is_lunch, break_type))
+            self.queries.run(cursor, 'attendance.insert', (
+                employee_id, event_type, local_timestamp, workday, reader_no, verify_method, "autorizado",
+                is_break or is_lunch, break_type
+            ))
+            
+            # Actualizar presencia en la misma transacción del marcaje
+            self.update_presence(cursor, employee_id, event_type, local_timestamp, break_type, workday)
+            
+            # Tardanza calculada una sola vez, con la primera entrada del día laboral (la única que escribe)
+            first_entry = False
+            if event_type == 'entrada':
+                expected_start, late_minutes = self.lateness(employee[1], local_timestamp, context[2], workday)
+                self.queries.run(cursor, 'summaries.first_entry', (
+                    employee_id, workday, local_timestamp, expected_start, late_minutes
+                ))
+                first_entry = cursor.rowcount == 1
+            self.data_versions.bump(cursor, f'attendance:{local_timestamp[:10]}')
             
             conn.commit()
             conn.close()
             
+            self.publish_punch(employee_id, employee[0], employee[1], event_type, local_timestamp, verify_method, reader_no)
+            self.update_break_timers(employee_id, employee[0], employee[1], event_type, local_timestamp)
+            
             print(f"REGISTRO: {employee[0]} - {event_type.upper()} - {local_timestamp}")
             
             # Mostrar tipo de break o almuerzo si aplica
             if is_break:
-                if employee[1] == 'Operativos':
+                if break_type == 'operativo_break':
                     break_display = 'BREAK OPERATIVO' if event_type == 'break_salida' else 'REGRESO DE BREAK OPERATIVO'
                 else:
                     break_display = 'BREAK ADMINISTRATIVO' if event_type == 'break_salida' else 'REGRESO DE BREAK'
@@ -409,27 +282,12 @@ class OptimizedAttendanceSystem:
                 lunch_display = 'SALIDA A ALMUERZO' if event_type == 'almuerzo_salida' else 'REGRESO DE ALMUERZO'
                 print(f"ALMUERZO: {lunch_display}")
             
-            # Emitir evento WebSocket
-            socketio.emit('attendance_record', {
-                'employee_id': employee_id,
-                'name': employee[0],
-                'event_type': event_type,
-                'timestamp': local_timestamp,
-                'verify_method': verify_method,
-                'department': employee[1] or 'General',
-                'schedule': employee[2] or 'estandar',
-                'real_time': True,
-                'is_break': is_break,
-                'is_lunch': is_lunch,
-                'break_type': break_type
-            })
-            
-            # Verificar tardanza solo para la primera entrada del día
-            if event_type == 'entrada':
-                self.check_late_arrival_first_entry(employee_id, employee[0], employee[1], employee[2], local_timestamp)
+            # Alerta de tardanza solo para la primera entrada del día
+            if first_entry and late_minutes:
+                self.notify_late_arrival(employee_id, employee[0], employee[1], expected_start, local_timestamp, late_minutes)
             
             # Actualizar resumen diario
-            self.update_daily_summary(employee_id, local_timestamp.split(' ')[0])
+            self.update_daily_summary(employee_id, workday)
             
             return True
             
@@ -437,102 +295,207 @@ class OptimizedAttendanceSystem:
             print(f"Error al registrar: {e}")
             return False
     
-    def determine_event_type(self, employee_id):
-        """Determinar entrada, salida, break o almuerzo"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Obtener información del empleado y último registro
-        if self.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT e.department, ar.event_type FROM employees e
-                LEFT JOIN (
-                    SELECT employee_id, event_type FROM attendance_records 
-                    WHERE employee_id = %s AND DATE(timestamp) = CURRENT_DATE
-                    ORDER BY timestamp DESC LIMIT 1
-                ) ar ON e.employee_id = ar.employee_id
-                WHERE e.employee_id = %s
-            ''', (employee_id, employee_id))
+    def break_type_for(self, event_type, department):
+        """Tipo de break de un marcaje (attendance_records.break_type), None si no es break ni almuerzo"""
+        if event_type.startswith('break_'):
+            return self.schedule_rules.break_type(department)
+        if event_type.startswith('almuerzo_'):
+            return 'almuerzo_admin'
+        return None
+    
+    def update_break_timers(self, employee_id, name, department, event_type, timestamp):
+        """Programar o cancelar los vencimientos del empleado según el marcaje (ver timing_wheel.py)"""
+        if event_type in ('break_salida', 'almuerzo_salida'):
+            self.schedule_break_overrun(employee_id, name, department, event_type, timestamp)
+            if event_type == 'break_salida':
+                self.break_timers.cancel((employee_id, 'break_missing'))
+        elif event_type in ('break_entrada', 'almuerzo_entrada'):
+            self.break_timers.cancel((employee_id, 'break_overrun'))
+        elif event_type == 'entrada' and not self.dashboard_state.break_taken(employee_id):
+            self.schedule_break_missing(employee_id, name, department, timestamp)
+    
+    def schedule_break_overrun(self, employee_id, name, department, event_type, timestamp):
+        break_type = self.break_type_for(event_type, department)
+        started = datetime.strptime(timestamp[:19], '%Y-%m-%d %H:%M:%S')
+        minutes = self.schedule_rules.minutes_for(break_type)
+        label = 'almuerzo' if event_type == 'almuerzo_salida' else 'break'
+        self.break_timers.schedule((employee_id, 'break_overrun'), (started + timedelta(minutes=minutes)).timestamp(), {
+            'employee_id': employee_id,
+            'name': name,
+            'department': department or 'General',
+            'alert_type': 'break_overrun',
+            'break_type': break_type,
+            'started_at': timestamp,
+            'duration_minutes': minutes,
+            'message': f'{name} superó los {minutes} minutos de {label} (desde {timestamp[11:16]})'
+        })
+    
+    def schedule_break_missing(self, employee_id, name, department, timestamp):
+        """Al entrar: alerta si al cerrar la ventana del break todavía no lo tomó"""
+        arrival = datetime.strptime(timestamp[:19], '%Y-%m-%d %H:%M:%S')
+        rules = self.schedule_rules.rules_for(department, self.shift_map.shift_for(employee_id, arrival))
+        if not rules.break_end:
+            return  # Sin ventana de break (departamento sin break o turno sin asignar)
+        if rules.shift_type:
+            message = f'{name} no ha tomado su break del turno {rules.shift_type}'
         else:
-            cursor.execute('''
-                SELECT e.department, ar.event_type FROM employees e
-                LEFT JOIN (
-                    SELECT employee_id, event_type FROM attendance_records 
-                    WHERE employee_id = ? AND date(timestamp) = date('now')
-                    ORDER BY timestamp DESC LIMIT 1
-                ) ar ON e.employee_id = ar.employee_id
-                WHERE e.employee_id = ?
-            ''', (employee_id, employee_id))
+            message = f'{name} no ha tomado su break obligatorio'
+        
+        deadline = datetime.combine(arrival.date(), datetime.strptime(rules.break_end, '%H:%M').time())
+        if deadline <= arrival and rules.overnight_break:
+            deadline += timedelta(days=1)  # Turno de noche: la ventana cierra de madrugada
+        if deadline <= arrival:
+            return  # Llegó con la ventana ya cerrada
+        self.break_timers.schedule((employee_id, 'break_missing'), deadline.timestamp(), {
+            'employee_id': employee_id,
+            'name': name,
+            'department': department,
+            'alert_type': 'break_missing',
+            'deadline': deadline.strftime('%Y-%m-%d %H:%M:%S'),
+            'message': message
+        })
+    
+    def active_employees(self):
+        """{employee_id: (nombre, departamento)} de los empleados activos (cache de empleados)"""
+        return {emp['employee_id']: (emp['name'], emp['department']) for emp in self.get_employees() if emp['active']}
+    
+    def arrived_since(self, employee_ids, since):
+        """Empleados con marcajes desde since según la proyección del dashboard"""
+        self.refresh_dashboard_state()
+        return self.dashboard_state.arrived_since(employee_ids, since)
+    
+    def notify_absences(self, alert):
+        """Cohorte con ausentes al vencer su gracia: absence_alert a todos, sus departamentos y su turno"""
+        rooms = [ALL_ROOM] + sorted({f"dept:{employee['department']}" for employee in alert['employees']})
+        if alert['shift_type']:
+            rooms.append(f"shift:{alert['shift_type']}")
+        print(f"AUSENCIAS: {alert['message']}")
+        self.emit_to_rooms('absence_alert', rooms, alert)
+    
+    def restore_break_timers(self):
+        """Nuevo líder: vencimientos de quienes ya están en break o almuerzo"""
+        for employee_id, (name, department, event_type, timestamp) in self.dashboard_state.open_breaks().items():
+            self.schedule_break_overrun(employee_id, name, department, event_type, timestamp)
+    
+    def on_break_timer(self, key, alert):
+        """Vencimiento de un temporizador de break: emitir break_alert si sigue vigente"""
+        employee_id, alert_type = key
+        if not self.ingest_leader.is_leader:
+            return
+        if alert_type == 'break_overrun':
+            current = self.dashboard_state.open_break(employee_id)
+            if not current or current[3] != alert['started_at']:
+                return  # Regresó (marcaje aplicado por una reconstrucción del estado)
+        elif self.dashboard_state.break_taken(employee_id):
+            return
+        print(f"ALERTA BREAK: {alert['message']}")
+        self.emit_to_rooms('break_alert', self.dashboard_state.rooms_for(employee_id, alert['department']), alert)
+    
+    def update_presence(self, cursor, employee_id, event_type, timestamp, break_type=None, workday=None):
+        """Actualizar el estado actual del empleado usando el cursor de la transacción del marcaje"""
+        workday = workday or timestamp.split(' ')[0]
+        on_break = event_type in ('break_salida', 'almuerzo_salida')
+        break_started_at = timestamp if on_break else None
+        
+        self.queries.run(cursor, 'presence.upsert', (
+            employee_id, workday, event_type, timestamp, on_break, break_type if on_break else None, break_started_at
+        ))
+    
+    def ensure_presence_day(self):
+        """Reiniciar la tabla de presencia al cambiar el día y reconstruirla desde los registros del día laboral
         
-        result = cursor.fetchone()
+        Los turnos noche de ayer todavía abiertos se conservan hasta su salida
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        if self.presence_workday == today:
+            return
         
-        # Obtener turno del empleado si es operativo
-        shift_type = None
-        if result and result[0] == 'Operativos':
-            today = datetime.now().strftime('%Y-%m-%d')
-            week_start = datetime.now().date() - timedelta(days=datetime.now().weekday())
-            
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    SELECT shift_type FROM weekly_shift_assignments 
-                    WHERE employee_id = %s AND week_start = %s
-                ''', (employee_id, week_start))
-            else:
-                cursor.execute('''
-                    SELECT shift_type FROM weekly_shift_assignments 
-                    WHERE employee_id = ? AND week_start = ?
-                ''', (employee_id, week_start))
+        with self.presence_lock:
+            if self.presence_workday == today:
+                return
+            
+            yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+            conn = self.get_connection()
+            cursor = conn.cursor()
             
-            shift_result = cursor.fetchone()
-            if shift_result:
-                shift_type = shift_result[0]
+            try:
+                overnight = self.queries.array(self.overnight_employees(yesterday, cursor))
+                self.queries.run(cursor, 'presence.delete_stale', (today, yesterday, overnight))
+                self.queries.run(cursor, 'presence.rebuild_day', (yesterday, today, overnight))
+                
+                conn.commit()
+                self.presence_workday = today
+                
+            except Exception as e:
+                print(f"Error reiniciando presencia: {e}")
+            finally:
+                conn.close()
+    
+    def overnight_employees(self, day, cursor=None):
+        """Empleados cuyo turno de day cruza la medianoche (según su departamento)"""
+        departments = {emp['employee_id']: emp['department'] for emp in self.get_employees(False, cursor)}
+        return [employee_id for employee_id, (shift_type, _, _) in self.shift_map.week(day, cursor).items()
+                if self.schedule_rules.rules_for(departments.get(employee_id), shift_type).overnight]
+    
+    def workday_for(self, employee_id, department, moment, presence_workday=None, last_event=None):
+        """Día laboral 'YYYY-MM-DD' de un marcaje: el de ayer si pertenece al turno noche de ayer
+        
+        Con turno de ayer que cruza la medianoche, laborable ayer y hora anterior a su workday_cutoff:
+        continúa el turno abierto (último marcaje de ayer sin salida) o, sin marcajes de ayer, es una
+        llegada tarde a él antes de su hora de fin. Si no, el día del marcaje
+        """
+        today = moment.strftime('%Y-%m-%d')
+        previous = (moment - timedelta(days=1)).strftime('%Y-%m-%d')
+        rules = self.schedule_rules.rules_for(department, self.shift_map.shift_for(employee_id, previous))
+        hhmm = moment.strftime('%H:%M')
+        if not (rules.overnight and hhmm < rules.workday_cutoff and self.work_calendar.expected_for(rules, previous)):
+            return today
+        if last_event and str(presence_workday)[:10] in (today, previous):
+            return previous if str(presence_workday)[:10] == previous and last_event != 'salida' else today
+        return previous if hhmm < rules.work_end else today
+    
+    def punch_context(self, employee_id, moment=None):
+        """(departamento, día laboral, turno, último evento del día laboral o None) de un marcaje"""
+        self.ensure_presence_day()
+        moment = moment or datetime.now()
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
         
+        # Obtener información del empleado y su último registro (lectura por clave primaria)
+        self.queries.run(cursor, 'presence.department_last_event', (employee_id,))
+        result = cursor.fetchone()
         conn.close()
         
         if not result:
-            return 'entrada'
+            return None, moment.strftime('%Y-%m-%d'), None, None
         
-        department, last_event = result
-        current_time = datetime.now().time()
-        
-        # FASE 2: Detección de almuerzo para departamentos administrativos (12:00-14:00)
-        if department in ['Reacondicionamiento', 'Logistica', 'Administracion']:
-            # Almuerzo: 12:00-14:00
-            if dt_time(12, 0) <= current_time <= dt_time(14, 0):
-                if last_event in ['entrada', 'break_entrada']:
-                    return 'almuerzo_salida'
-                elif last_event == 'almuerzo_salida':
-                    return 'almuerzo_entrada'
-            
-            # Break de mañana: 9:00-10:00
-            elif dt_time(9, 0) <= current_time <= dt_time(10, 0):
-                if last_event == 'entrada':
-                    return 'break_salida'
-                elif last_event == 'break_salida':
-                    return 'break_entrada'
-        
-        # FASE 3: Breaks para operativos por turnos
-        elif department == 'Operativos' and shift_type:
-            if shift_type == 'mañana' and dt_time(9, 0) <= current_time <= dt_time(10, 0):
-                if last_event == 'entrada':
-                    return 'break_salida'
-                elif last_event == 'break_salida':
-                    return 'break_entrada'
-            elif shift_type == 'tarde' and dt_time(17, 0) <= current_time <= dt_time(18, 0):
-                if last_event == 'entrada':
-                    return 'break_salida'
-                elif last_event == 'break_salida':
-                    return 'break_entrada'
-            elif shift_type == 'noche' and dt_time(1, 0) <= current_time <= dt_time(2, 0):
-                if last_event == 'entrada':
-                    return 'break_salida'
-                elif last_event == 'break_salida':
-                    return 'break_entrada'
-        
-        # Lógica normal entrada/salida
+        department, presence_workday, last_event = result
+        workday = self.workday_for(employee_id, department, moment, presence_workday, last_event)
+        if str(presence_workday)[:10] != workday:
+            last_event = None  # Registro de otro día laboral
+        return department, workday, self.shift_map.shift_for(employee_id, workday), last_event
+    
+    def determine_event_type(self, employee_id, context=None):
+        """Determinar entrada, salida, break o almuerzo (context: punch_context del marcaje)"""
+        department, _, shift_type, last_event = context or self.punch_context(employee_id)
         if not last_event:
             return 'entrada'
         
+        # Ventana de almuerzo o break del departamento y turno del día laboral (ver schedule_rules.py)
+        window = self.schedule_rules.classify(department, shift_type, datetime.now())
+        if window == 'almuerzo':
+            if last_event in ['entrada', 'break_entrada']:
+                return 'almuerzo_salida'
+            elif last_event == 'almuerzo_salida':
+                return 'almuerzo_entrada'
+        elif window == 'break':
+            if last_event == 'entrada':
+                return 'break_salida'
+            elif last_event == 'break_salida':
+                return 'break_entrada'
+        
+        # Lógica normal entrada/salida
         return 'salida' if last_event in ['entrada', 'break_entrada', 'almuerzo_entrada'] else 'entrada'
     
     def add_employee(self, employee_id, name, department="General", schedule="estandar", phone="", email=""):
@@ -541,25 +504,17 @@ class OptimizedAttendanceSystem:
         cursor = conn.cursor()
         
         try:
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    INSERT INTO employees (employee_id, name, department, schedule, phone, email) 
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (employee_id, name, department, schedule, phone, email))
-            else:
-                cursor.execute('''
-                    INSERT INTO employees (employee_id, name, department, schedule, phone, email) 
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (employee_id, name, department, schedule, phone, email))
-            
+            self.queries.run(cursor, 'employees.insert', (employee_id, name, department, schedule, phone, email))
+            self.data_versions.bump(cursor, 'employees')
             conn.commit()
             conn.close()
             
             # Limpiar cache
             self.employees_cache = {}
             self.cache_timestamp = 0
+            self.invalidate_dashboard_state()
             
-            socketio.emit('employee_added', {
+            self.emit_to_rooms('employee_added', [ALL_ROOM, f'dept:{department}'], {
                 'employee_id': employee_id,
                 'name': name,
                 'department': department,
@@ -574,24 +529,26 @@ class OptimizedAttendanceSystem:
                 return False, f"El empleado con ID {employee_id} ya existe"
             return False, f"Error: {str(e)}"
     
-    def get_employees(self):
-        """Obtener lista de empleados con cache"""
+    def get_employees(self, use_cache=True, cursor=None):
+        """Obtener lista de empleados con cache (use_cache=False: leer siempre de la BD)
+        
+        cursor: leer con una conexión ya abierta (la cierra quien la abrió)
+        """
         current_time = time_module.time()
         
         # Usar cache si está vigente
-        if (current_time - self.cache_timestamp) < self.cache_duration and self.employees_cache:
+        if use_cache and (current_time - self.cache_timestamp) < self.cache_duration and self.employees_cache:
             return list(self.employees_cache.values())
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT employee_id, name, department, schedule, phone, email, active, synced_to_device, created_at
-            FROM employees ORDER BY name
-        ''')
+        if cursor is None:
+            conn = self.get_connection()
+            try:
+                return self.get_employees(use_cache, conn.cursor())
+            finally:
+                conn.close()
         
+        self.queries.run(cursor, 'employees.list')
         employees = cursor.fetchall()
-        conn.close()
         
         # Actualizar cache
         self.employees_cache = {}
@@ -607,40 +564,26 @@ class OptimizedAttendanceSystem:
         return list(self.employees_cache.values())
     
     def calculate_worked_hours(self, entrada_time, salida_time, department):
-        """Calcular horas reales trabajadas descontando breaks/almuerzos"""
+        """Calcular horas reales trabajadas descontando breaks/almuerzos
+        
+        entrada_time/salida_time: marcajes completos (datetime o 'YYYY-MM-DD HH:MM:SS'); una hora
+        sola ('HH:MM:SS' o time) se toma del mismo día. El turno noche llega con la salida del día
+        siguiente porque ambos marcajes comparten día laboral (attendance_records.workday)
+        """
         if not entrada_time or not salida_time:
             return 0
         
         try:
             # Convertir a datetime para cálculos
-            if isinstance(entrada_time, str):
-                entrada_dt = datetime.strptime(entrada_time, '%H:%M:%S')
-            else:
-                entrada_dt = datetime.combine(datetime.today(), entrada_time)
-            
-            if isinstance(salida_time, str):
-                salida_dt = datetime.strptime(salida_time, '%H:%M:%S')
-            else:
-                salida_dt = datetime.combine(datetime.today(), salida_time)
-            
-            # Si la salida es al día siguiente (turno nocturno)
-            if salida_dt.time() < entrada_dt.time():
-                salida_dt = salida_dt + timedelta(days=1)
+            entrada_dt = self.punch_datetime(entrada_time)
+            salida_dt = self.punch_datetime(salida_time)
             
             # Calcular horas brutas
             total_seconds = (salida_dt - entrada_dt).total_seconds()
             hours_worked = total_seconds / 3600
             
-            # Descontar breaks según departamento
-            if department in ['Reacondicionamiento', 'Logistica', 'Administracion']:
-                # Descontar 20 min de break + 60 min de almuerzo = 80 min = 1.33 horas
-                hours_worked -= 80 / 60
-            elif department == 'Operativos':
-                # Descontar solo 20 min de break = 0.33 horas
-                hours_worked -= 20 / 60
-            else:
-                # Otros departamentos: descontar break + almuerzo
-                hours_worked -= 80 / 60
+            # Descontar break (y almuerzo si el departamento lo tiene) según break_types
+            hours_worked -= self.schedule_rules.deduction_hours(department)
             
             return max(0, round(hours_worked, 2))
             
@@ -648,99 +591,195 @@ class OptimizedAttendanceSystem:
             print(f"Error calculando horas: {e}")
             return 0
     
-    def get_dashboard_data(self):
-        """Obtener datos del dashboard"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    @staticmethod
+    def punch_datetime(value):
+        """datetime de un marcaje (datetime, 'YYYY-MM-DD HH:MM:SS', 'HH:MM:SS' o time de hoy)"""
+        if isinstance(value, datetime):
+            return value
+        if not isinstance(value, str):
+            return datetime.combine(datetime.today(), value)
+        if len(value) <= 8:
+            return datetime.combine(datetime.today(), datetime.strptime(value, '%H:%M:%S').time())
+        return datetime.strptime(value[:19].replace('T', ' '), '%Y-%m-%d %H:%M:%S')
+    
+    def refresh_dashboard_state(self):
+        """Reconstruir la proyección del dashboard si cambió el día, se invalidó o caducó"""
+        self.ensure_presence_day()
+        today = datetime.now().strftime('%Y-%m-%d')
+        state = self.dashboard_state
+        
+        if not self.ingest_leader.is_leader:
+            # Réplica del líder; copia local con secuencia propia hasta recibir la del día
+            if state.workday != today:
+                self.request_state_sync()
+                self.stream.publish(state.rebuild(self.get_connection, self.queries, today, self.late_alert,
+                                                  new_epoch=True))
+            return False
         
+        if not state.needs_rebuild(today):
+            return False
+        delta = state.rebuild(self.get_connection, self.queries, today, self.late_alert)
+        # Clientes con otra versión piden snapshot (ver dashboard_state.py)
+        emitter.emit('dashboard_delta', delta)
+        self.stream.publish(delta)
+        self.publish('state', state=state.export_state())
+        return True
+    
+    def invalidate_dashboard_state(self):
+        """Cambios de empleados: el líder reconstruye su estado y lo replica al resto"""
+        self.dashboard_state.invalidate()
+        self.absence_detector.invalidate()
+        if not self.ingest_leader.is_leader:
+            self.publish('invalidate')
+    
+    def invalidate_shifts(self, weeks=None):
+        """Turnos modificados: descartar esas semanas aquí y en los demás workers"""
+        self.shift_map.invalidate(weeks)
+        self.absence_detector.invalidate()
+        self.publish('shifts', weeks=weeks)
+    
+    def technicians(self, employees, week_start=None, cursor=None):
+        """Operativos activos con su turno de la semana (assigned_shift None sin week_start)"""
+        assignments = self.shift_map.week(week_start, cursor) if week_start else {}
+        return [{
+            'employee_id': emp['employee_id'],
+            'name': emp['name'],
+            'department': emp['department'],
+            'assigned_shift': assignments[emp['employee_id']][0] if emp['employee_id'] in assignments else None
+        } for emp in employees if emp['active'] and emp['department'] == 'Operativos']
+    
+    def week_shifts(self, employees, week_start):
+        """{turno: [empleados activos con horario]} de la semana, por nombre"""
+        assignments = self.shift_map.week(week_start)
+        shifts = {'mañana': [], 'tarde': [], 'noche': []}
+        for emp in employees:
+            assignment = assignments.get(emp['employee_id'])
+            if emp['active'] and assignment and assignment[0] in shifts:
+                shifts[assignment[0]].append({
+                    'employee_id': emp['employee_id'],
+                    'name': emp['name'],
+                    'department': emp['department'],
+                    'start_time': assignment[1],
+                    'end_time': assignment[2]
+                })
+        return shifts
+    
+    def request_state_sync(self):
+        """Pedir al líder su estado completo (una petición pendiente a la vez; se repite tras 2 segundos)"""
+        if time_module.time() - self._sync_requested_at < 2:
+            return
+        self._sync_requested_at = time_module.time()
+        self.publish('sync_request')
+    
+    def publish(self, kind, **fields):
+        """Publicar un mensaje para los demás workers (ver event_bus.py)"""
         try:
-            # Registros de hoy
-            if self.db_type == 'postgresql':
-                cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = CURRENT_DATE")
-                total_records = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE DATE(timestamp) = CURRENT_DATE")
-                unique_employees = cursor.fetchone()[0]
-                
-                # Estado de empleados
-                cursor.execute('''
-                    SELECT e.name, e.employee_id, ar.event_type, ar.timestamp
-                    FROM employees e
-                    LEFT JOIN (
-                        SELECT DISTINCT ON (employee_id) employee_id, event_type, timestamp
-                        FROM attendance_records
-                        WHERE DATE(timestamp) = CURRENT_DATE
-                        ORDER BY employee_id, timestamp DESC
-                    ) ar ON e.employee_id = ar.employee_id
-                    WHERE e.active = true
-                ''')
-                employees_status = cursor.fetchall()
-                
-                # Registros recientes (solo empleados activos)
-                cursor.execute('''
-                    SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method
-                    FROM attendance_records ar
-                    JOIN employees e ON ar.employee_id = e.employee_id
-                    WHERE e.active = true
-                    ORDER BY ar.timestamp DESC LIMIT 20
-                ''')
-                recent_records = cursor.fetchall()
-                
-            else:
-                cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE date(timestamp) = date('now')")
-                total_records = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE date(timestamp) = date('now')")
-                unique_employees = cursor.fetchone()[0]
-                
-                cursor.execute('''
-                    SELECT e.name, e.employee_id, ar.event_type, ar.timestamp
-                    FROM employees e
-                    LEFT JOIN (
-                        SELECT employee_id, event_type, timestamp,
-                               ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY timestamp DESC) as rn
-                        FROM attendance_records
-                        WHERE date(timestamp) = date('now')
-                    ) ar ON e.employee_id = ar.employee_id AND ar.rn = 1
-                    WHERE e.active = 1
-                ''')
-                employees_status = cursor.fetchall()
-                
-                cursor.execute('''
-                    SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method
-                    FROM attendance_records ar
-                    JOIN employees e ON ar.employee_id = e.employee_id
-                    WHERE e.active = 1
-                    ORDER BY ar.timestamp DESC LIMIT 20
-                ''')
-                recent_records = cursor.fetchall()
-            
-            conn.close()
-            
-            # Procesar estado de empleados
-            inside = []
-            outside = []
-            
-            for emp in employees_status:
-                name, emp_id, last_event, timestamp = emp
-                if last_event == 'entrada':
-                    inside.append({'name': name, 'id': emp_id, 'time': timestamp})
+            self.event_bus.publish(dict(fields, kind=kind, origin=self.ingest_leader.holder))
+        except Exception as e:
+            print(f"Error publicando en el bus de eventos: {e}")
+    
+    def publish_delta(self, delta):
+        """Emitir un delta a cada sala afectada y replicarlo en los demás workers"""
+        for room, payload in self.dashboard_state.room_deltas(delta):
+            emitter.emit('dashboard_delta', payload, to=room)
+        self.stream.publish(delta)
+        self.publish('delta', delta=delta)
+    
+    def emit_to_rooms(self, event, rooms, data):
+        for room in rooms:
+            emitter.emit(event, data, to=room)
+    
+    def publish_punch(self, employee_id, name, department, event_type, timestamp, verify_method, reader_no=1):
+        """Aplicar un marcaje confirmado al estado del dashboard y emitir su delta"""
+        try:
+            if not self.ingest_leader.is_leader:
+                self.invalidate_dashboard_state()
+                return
+            self.refresh_dashboard_state()
+            delta = self.dashboard_state.apply_punch(employee_id, name, department, event_type, timestamp,
+                                                     verify_method, reader_no)
+            if delta:
+                self.publish_delta(delta)
+        except Exception as e:
+            print(f"Error actualizando estado del dashboard: {e}")
+    
+    def _on_bus_message(self, message):
+        """Mensajes de otros workers: peticiones al líder o réplica de su estado"""
+        if message.get('origin') == self.ingest_leader.holder:
+            return
+        kind = message.get('kind')
+        
+        if kind == 'shifts':
+            self.shift_map.invalidate(message.get('weeks'))
+            self.absence_detector.invalidate()
+            return
+        
+        if self.ingest_leader.is_leader:
+            if kind == 'sync_request':
+                if not self.refresh_dashboard_state():
+                    self.publish('state', state=self.dashboard_state.export_state())
+            elif kind == 'invalidate':
+                self.dashboard_state.invalidate()
+                self.absence_detector.invalidate()
+                self.refresh_dashboard_state()
+            elif kind == 'control':
+                if message.get('monitoring'):
+                    self.start_monitoring()
                 else:
-                    outside.append({'name': name, 'id': emp_id, 'time': timestamp})
-            
-            return {
-                'total_records': total_records,
-                'unique_employees': unique_employees,
-                'employees_inside': inside,
-                'employees_outside': outside,
-                'recent_records': recent_records,
-                'connected': self.connected,
-                'monitoring': self.monitoring
-            }
-            
+                    self.stop_monitoring()
+            return
+        
+        if kind == 'state':
+            self.dashboard_state.load_state(message['state'])
+            self._sync_requested_at = 0
+            self.stream.publish({'type': 'sync'})
+        elif kind == 'delta':
+            if self.dashboard_state.apply_remote(message['delta']):
+                self.stream.publish(message['delta'])
+            else:
+                self.request_state_sync()
+        elif kind == 'status':
+            self.connected = message.get('connected', False)
+            self.monitoring = message.get('monitoring', False)
+            self.monitoring_requested = message.get('monitoring_requested', False)
+    
+    def _on_elected(self):
+        """Este worker pasa a leer el dispositivo y a ser la fuente del estado del dashboard"""
+        self.dashboard_state.invalidate()
+        try:
+            self.refresh_dashboard_state()
+            self.restore_break_timers()
+        except Exception as e:
+            print(f"Error cargando estado del dashboard: {e}")
+        if self.monitoring_requested:
+            self.start_monitoring()
+    
+    def _on_demoted(self):
+        """Otro worker tomó el lease: dejar de leer el dispositivo"""
+        self.monitoring = False
+    
+    def _on_leader_tick(self, is_leader):
+        """Cada renovación del lease: el líder mantiene su estado al día y anuncia su estado"""
+        generation = self.schedule_rules.generation
+        self.schedule_rules.refresh()
+        self.work_calendar.refresh()
+        if not is_leader:
+            return
+        if self.schedule_rules.generation != generation:
+            self.dashboard_state.invalidate()  # pendientes de break/almuerzo según las reglas nuevas
+        try:
+            self.refresh_dashboard_state()
+        except Exception as e:
+            print(f"Error actualizando estado del dashboard: {e}")
+        self.publish('status', connected=self.connected, monitoring=self.monitoring,
+                     monitoring_requested=self.monitoring_requested)
+    
+    def get_dashboard_data(self):
+        """Obtener datos del dashboard (proyección en memoria, sin consultas por petición)"""
+        try:
+            self.refresh_dashboard_state()
         except Exception as e:
             print(f"Error obteniendo datos dashboard: {e}")
-            conn.close()
             return {
                 'total_records': 0,
                 'unique_employees': 0,
@@ -750,40 +789,50 @@ class OptimizedAttendanceSystem:
                 'connected': self.connected,
                 'monitoring': self.monitoring
             }
+        return self.dashboard_state.snapshot(self.connected, self.monitoring)
+    
+    def get_dashboard_body(self):
+        """JSON de /api/dashboard ya serializado para la versión actual"""
+        try:
+            self.refresh_dashboard_state()
+        except Exception:
+            return app.json.dumps(self.get_dashboard_data()).encode('utf-8')
+        return self.dashboard_state.body(self.connected, self.monitoring)
     
-    def is_work_day(self, date_obj, schedule, department):
-        """Determinar si es día laboral según horarios por departamento"""
-        day_of_week = date_obj.weekday()  # 0=Lunes, 6=Domingo
+    def set_holiday(self, day, name):
+        """Agregar (name) o eliminar (None) el festivo day y marcar los resúmenes ya guardados de ese día"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
         
-        # Horarios por departamento
-        if department in ['Reacondicionamiento', 'Logistica', 'Administracion']:
-            # L-J: 7:00-17:00, V: 7:00-16:00, S-D: No laboral
-            return day_of_week < 5  # Lunes a Viernes
-        elif department == 'Operativos':
-            # Todos los días según turno asignado
-            return True
-        else:
-            # General: L-V: 8:00-17:00
-            return day_of_week < 5  # Lunes a Viernes
-    
-    def get_expected_hours_by_department(self, department, day_of_week):
-        """Obtener horarios esperados por departamento y día"""
-        if department in ['Reacondicionamiento', 'Logistica', 'Administracion']:
-            if day_of_week < 4:  # Lunes a Jueves
-                return ('07:00', '17:00')
-            elif day_of_week == 4:  # Viernes
-                return ('07:00', '16:00')
-            else:  # Fin de semana
-                return None
-        elif department == 'Operativos':
-            # Depende del turno asignado - se manejará por separado
-            return ('06:00', '14:00')  # Default mañana
-        else:
-            # General
-            if day_of_week < 5:  # Lunes a Viernes
-                return ('08:00', '17:00')
+        try:
+            if name:
+                self.queries.run(cursor, 'holidays.upsert', (day, name))
             else:
-                return None
+                self.queries.run(cursor, 'holidays.delete', (day,))
+                if cursor.rowcount == 0:
+                    return {'success': False, 'message': f'{day} no es festivo'}
+            self.queries.run(cursor, 'summaries.mark_holiday', (bool(name), day))
+            self.data_versions.bump(cursor, 'holidays')
+            self.data_versions.bump(cursor, f'summaries:{day[:7]}')
+            conn.commit()
+        except Exception as e:
+            return {'success': False, 'message': f'Error: {str(e)}'}
+        finally:
+            conn.close()
+        
+        # Los demás workers lo recargan en su próxima renovación del lease
+        self.work_calendar.load()
+        self.absence_detector.invalidate()
+        return {'success': True, 'message': f'Festivo {day} {"guardado" if name else "eliminado"}'}
+    
+    def is_work_day(self, date_obj, schedule, department, shift_type=None):
+        """Determinar si es día laboral según department_schedules y los festivos (calendario del mes)"""
+        return self.work_calendar.is_work_day(department, date_obj, shift_type)
+    
+    def get_expected_hours_by_department(self, department, day_of_week, shift_type=None):
+        """Horario esperado ('HH:MM', 'HH:MM') del departamento y turno, None si no es día laboral"""
+        # Operativos sin turno: horario de su primer turno (mañana)
+        return self.schedule_rules.expected_hours(department, day_of_week, shift_type)
     
     def generate_attendance_report(self, start_date, end_date, employee_id=None, department=None):
         """Generar reporte de asistencia mejorado con cálculos precisos"""
@@ -792,24 +841,16 @@ class OptimizedAttendanceSystem:
         
         try:
             # Obtener todos los empleados activos
-            if self.db_type == 'postgresql':
-                emp_query = 'SELECT employee_id, name, department, schedule FROM employees WHERE active = true'
+            department_filter = department if department and department != 'General' else None
+            
+            if employee_id and department_filter:
+                self.queries.run(cursor, 'reports.employees_by_id_department', (employee_id, department_filter))
+            elif employee_id:
+                self.queries.run(cursor, 'reports.employees_by_id', (employee_id,))
+            elif department_filter:
+                self.queries.run(cursor, 'reports.employees_by_department', (department_filter,))
             else:
-                emp_query = 'SELECT employee_id, name, department, schedule FROM employees WHERE active = 1'
-            
-            emp_params = []
-            if employee_id:
-                emp_query += ' AND employee_id = {}'
-                emp_query = emp_query.format('%s' if self.db_type == 'postgresql' else '?')
-                emp_params.append(employee_id)
-            
-            if department and department != 'General':
-                emp_query += ' AND department = {}'
-                emp_query = emp_query.format('%s' if self.db_type == 'postgresql' else '?')
-                emp_params.append(department)
-            
-            emp_query += ' ORDER BY name'
-            cursor.execute(emp_query, emp_params)
+                self.queries.run(cursor, 'reports.employees')
             employees = cursor.fetchall()
             
             if not employees:
@@ -817,20 +858,7 @@ class OptimizedAttendanceSystem:
                 return {}
             
             # Obtener registros de asistencia
-            if self.db_type == 'postgresql':
-                records_query = '''
-                    SELECT employee_id, event_type, timestamp FROM attendance_records 
-                    WHERE DATE(timestamp) BETWEEN %s AND %s AND event_type IN ('entrada', 'salida')
-                    ORDER BY employee_id, timestamp
-                '''
-            else:
-                records_query = '''
-                    SELECT employee_id, event_type, timestamp FROM attendance_records 
-                    WHERE date(timestamp) BETWEEN ? AND ? AND event_type IN ('entrada', 'salida')
-                    ORDER BY employee_id, timestamp
-                '''
-            
-            cursor.execute(records_query, [start_date, end_date])
+            self.queries.run(cursor, 'attendance.entries_exits_range', (start_date, end_date))
             records = cursor.fetchall()
             conn.close()
             
@@ -852,6 +880,7 @@ class OptimizedAttendanceSystem:
                         'late_days': 0,
                         'absent_days': 0,
                         'weekend_days': 0,
+                        'holiday_days': 0,
                         'average_daily_hours': 0
                     },
                     'days': {}
@@ -862,15 +891,18 @@ class OptimizedAttendanceSystem:
             while temp_date <= end_date_obj:
                 date_str = temp_date.strftime('%Y-%m-%d')
                 day_name = temp_date.strftime('%A')
-                day_of_week = temp_date.weekday()
+                
+                is_holiday = self.work_calendar.is_holiday(temp_date)
+                week = self.shift_map.week(temp_date)
                 
                 for emp_id in report_data:
                     emp_data = report_data[emp_id]
                     department = emp_data['department']
                     
-                    # Determinar si es día laboral
-                    is_work_day = self.is_work_day(temp_date, emp_data['schedule'], department)
-                    expected_hours = self.get_expected_hours_by_department(department, day_of_week) if is_work_day else None
+                    # Horario esperado del día en el calendario del mes (None: no laborable o festivo)
+                    assignment = week.get(emp_id)
+                    expected_hours = self.work_calendar.expected(department, temp_date, assignment[0] if assignment else None)
+                    is_work_day = expected_hours is not None
                     
                     emp_data['days'][date_str] = {
                         'date': temp_date.strftime('%d/%m/%Y'),
@@ -878,7 +910,8 @@ class OptimizedAttendanceSystem:
                         'expected_hours': expected_hours,
                         'entrada': None,
                         'salida': None,
-                        'status': 'No laborable' if not is_work_day else 'Ausente',
+                        'is_holiday': is_holiday,
+                        'status': ('Festivo' if is_holiday else 'No laborable') if not is_work_day else 'Ausente',
                         'late': False,
                         'early_exit': False,
                         'hours_worked': 0,
@@ -888,33 +921,32 @@ class OptimizedAttendanceSystem:
                     }
                     
                     if not is_work_day:
-                        emp_data['summary']['weekend_days'] += 1
+                        emp_data['summary']['holiday_days' if is_holiday else 'weekend_days'] += 1
                 
                 temp_date += timedelta(days=1)
             
-            # Procesar registros de asistencia
+            # Procesar registros de asistencia por día laboral (marcajes completos para los cálculos)
+            punches = {}
             for record in records:
-                emp_id, event_type, timestamp = record
+                emp_id, event_type, timestamp, workday = record
                 if emp_id not in report_data:
                     continue
                 
-                # Extraer fecha y hora
-                timestamp_str = str(timestamp)
-                if 'T' in timestamp_str:
-                    date_part = timestamp_str.split('T')[0]
-                    time_part = timestamp_str.split('T')[1][:8]
-                else:
-                    date_part = timestamp_str[:10]
-                    time_part = timestamp_str[11:19]
+                # Extraer día laboral y hora
+                date_part = str(workday)[:10]
+                time_part = str(timestamp)[11:19]
                 
                 if date_part in report_data[emp_id]['days']:
                     day_data = report_data[emp_id]['days'][date_part]
+                    day_punches = punches.setdefault((emp_id, date_part), [None, None])
                     
                     if event_type == 'entrada':
                         if not day_data['entrada']:
                             day_data['entrada'] = time_part
+                            day_punches[0] = self.punch_datetime(timestamp)
                     elif event_type == 'salida':
                         day_data['salida'] = time_part  # Última salida
+                        day_punches[1] = self.punch_datetime(timestamp)
             
             # Calcular estadísticas finales
             for emp_id in report_data:
@@ -930,32 +962,31 @@ class OptimizedAttendanceSystem:
                     expected_start, expected_end = day_data['expected_hours']
                     
                     if entrada and salida:
+                        entrada_dt, salida_dt = punches[(emp_id, date_str)]
+                        
                         # Calcular horas trabajadas con descuentos
-                        hours_worked = self.calculate_worked_hours(entrada, salida, department)
+                        hours_worked = self.calculate_worked_hours(entrada_dt, salida_dt, department)
                         day_data['hours_worked'] = hours_worked
                         day_data['status'] = 'Presente'
                         
                         # Verificar tardanza
-                        entrada_time = datetime.strptime(entrada, '%H:%M:%S').time()
-                        expected_start_time = datetime.strptime(expected_start, '%H:%M').time()
+                        workday = datetime.strptime(date_str, '%Y-%m-%d')
+                        expected_dt = datetime.combine(workday, datetime.strptime(expected_start, '%H:%M').time())
                         
-                        if entrada_time > expected_start_time:
+                        if entrada_dt > expected_dt:
                             day_data['late'] = True
-                            entrada_dt = datetime.combine(datetime.today(), entrada_time)
-                            expected_dt = datetime.combine(datetime.today(), expected_start_time)
                             day_data['late_minutes'] = int((entrada_dt - expected_dt).total_seconds() / 60)
                             day_data['observations'].append(f"Tardó {day_data['late_minutes']} min")
                             emp_data['summary']['late_days'] += 1
                         
-                        # Verificar salida temprana
-                        salida_time = datetime.strptime(salida, '%H:%M:%S').time()
-                        expected_end_time = datetime.strptime(expected_end, '%H:%M').time()
+                        # Verificar salida temprana (el fin de un turno noche es del día siguiente)
+                        expected_end_dt = datetime.combine(workday, datetime.strptime(expected_end, '%H:%M').time())
+                        if expected_end < expected_start:
+                            expected_end_dt += timedelta(days=1)
                         
-                        if salida_time < expected_end_time:
+                        if salida_dt < expected_end_dt:
                             day_data['early_exit'] = True
-                            salida_dt = datetime.combine(datetime.today(), salida_time)
-                            expected_dt = datetime.combine(datetime.today(), expected_end_time)
-                            day_data['early_minutes'] = int((expected_dt - salida_dt).total_seconds() / 60)
+                            day_data['early_minutes'] = int((expected_end_dt - salida_dt).total_seconds() / 60)
                             day_data['observations'].append(f"Salió {day_data['early_minutes']} min temprano")
                         
                         emp_data['summary']['total_days_worked'] += 1
@@ -1116,65 +1147,46 @@ class OptimizedAttendanceSystem:
         
         return filename
     
-    def check_late_arrival_first_entry(self, employee_id, name, department, schedule, timestamp):
-        """Verificar si la primera entrada del día es tardía usando horarios por departamento"""
+    def lateness(self, department, timestamp, shift_type=None, workday=None):
+        """(hora esperada 'HH:MM' o None si no es día laboral, minutos de tardanza) de una primera entrada
+        
+        workday: día laboral del marcaje (el turno noche que llega pasada la medianoche empezó el día anterior)
+        """
+        arrival_time = datetime.strptime(str(timestamp)[:19], '%Y-%m-%d %H:%M:%S')
+        workday = datetime.strptime(str(workday)[:10], '%Y-%m-%d').date() if workday else arrival_time.date()
+        
+        expected_hours = self.work_calendar.expected(department, workday, shift_type)
+        if not expected_hours:
+            return None, 0
+        
+        expected_dt = datetime.combine(workday, datetime.strptime(expected_hours[0], '%H:%M').time())
+        if arrival_time <= expected_dt:
+            return expected_hours[0], 0
+        return expected_hours[0], int((arrival_time - expected_dt).total_seconds() / 60)
+    
+    def late_alert(self, employee_id, name, department, expected_time, timestamp, late_minutes):
+        """Alerta de tardanza con los valores guardados en daily_summaries"""
+        return {
+            'employee_id': employee_id,
+            'name': name,
+            'department': department,
+            'expected_time': expected_time,
+            'actual_time': timestamp[11:16],
+            'late_minutes': late_minutes,
+            'timestamp': timestamp[:19],
+            'severity': 'severe' if late_minutes > 30 else 'moderate' if late_minutes > 15 else 'mild'
+        }
+    
+    def notify_late_arrival(self, employee_id, name, department, expected_time, timestamp, late_minutes):
+        """Primera entrada tardía (ya guardada con el marcaje): alerta y delta del dashboard"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Verificar si es la primera entrada del día
-            today = timestamp.split(' ')[0]
-            
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    SELECT COUNT(*) FROM attendance_records 
-                    WHERE employee_id = %s AND DATE(timestamp) = %s AND event_type = 'entrada'
-                ''', (employee_id, today))
-            else:
-                cursor.execute('''
-                    SELECT COUNT(*) FROM attendance_records 
-                    WHERE employee_id = ? AND date(timestamp) = ? AND event_type = 'entrada'
-                ''', (employee_id, today))
-            
-            entry_count = cursor.fetchone()[0]
-            conn.close()
-            
-            # Solo verificar tardanza si es la primera entrada del día
-            if entry_count > 1:
-                return
-            
-            # Obtener horario esperado por departamento
-            arrival_time = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-            day_of_week = arrival_time.weekday()
+            alert = self.late_alert(employee_id, name, department, expected_time, timestamp, late_minutes)
+            delta = self.dashboard_state.apply_late(alert)
+            if delta:
+                self.publish_delta(delta)
             
-            expected_hours = self.get_expected_hours_by_department(department, day_of_week)
-            if not expected_hours:
-                return  # No es día laboral
+            print(f"TARDANZA: {name} llegó {late_minutes} minutos tarde")
             
-            # Verificar tardanza
-            arrival_time_only = arrival_time.time()
-            expected_start = datetime.strptime(expected_hours[0], '%H:%M').time()
-            
-            if arrival_time_only > expected_start:
-                # Calcular minutos de tardanza
-                arrival_dt = datetime.combine(datetime.today(), arrival_time_only)
-                expected_dt = datetime.combine(datetime.today(), expected_start)
-                late_minutes = int((arrival_dt - expected_dt).total_seconds() / 60)
-                
-                # Emitir notificación de tardanza
-                socketio.emit('late_arrival_alert', {
-                    'employee_id': employee_id,
-                    'name': name,
-                    'department': department,
-                    'expected_time': expected_hours[0],
-                    'actual_time': arrival_time_only.strftime('%H:%M'),
-                    'late_minutes': late_minutes,
-                    'timestamp': timestamp,
-                    'severity': 'severe' if late_minutes > 30 else 'moderate' if late_minutes > 15 else 'mild'
-                })
-                
-                print(f"TARDANZA: {name} llegó {late_minutes} minutos tarde")
-                
         except Exception as e:
             print(f"Error verificando tardanza: {e}")
     
@@ -1185,11 +1197,7 @@ class OptimizedAttendanceSystem:
             cursor = conn.cursor()
             
             # Obtener información del empleado
-            if self.db_type == 'postgresql':
-                cursor.execute('SELECT name, department FROM employees WHERE employee_id = %s', (employee_id,))
-            else:
-                cursor.execute('SELECT name, department FROM employees WHERE employee_id = ?', (employee_id,))
-            
+            self.queries.run(cursor, 'employees.name_department', (employee_id,))
             employee_info = cursor.fetchone()
             if not employee_info:
                 conn.close()
@@ -1197,20 +1205,8 @@ class OptimizedAttendanceSystem:
             
             name, department = employee_info
             
-            # Obtener todos los registros del día (solo entrada/salida)
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    SELECT event_type, timestamp FROM attendance_records 
-                    WHERE employee_id = %s AND DATE(timestamp) = %s AND event_type IN ('entrada', 'salida')
-                    ORDER BY timestamp
-                ''', (employee_id, date))
-            else:
-                cursor.execute('''
-                    SELECT event_type, timestamp FROM attendance_records 
-                    WHERE employee_id = ? AND date(timestamp) = ? AND event_type IN ('entrada', 'salida')
-                    ORDER BY timestamp
-                ''', (employee_id, date))
-            
+            # Obtener todos los registros del día laboral (solo entrada/salida)
+            self.queries.run(cursor, 'attendance.entries_exits_employee_workday', (employee_id, date))
             records = cursor.fetchall()
             
             if not records:
@@ -1222,13 +1218,11 @@ class OptimizedAttendanceSystem:
             last_exit = None
             
             for event_type, timestamp in records:
-                time_part = str(timestamp)[11:19] if 'T' in str(timestamp) else str(timestamp).split(' ')[1][:8]
-                
                 if event_type == 'entrada':
                     if not first_entry:
-                        first_entry = time_part
+                        first_entry = timestamp
                 elif event_type == 'salida':
-                    last_exit = time_part
+                    last_exit = timestamp
             
             # Calcular horas trabajadas con descuentos
             total_hours = 0
@@ -1238,157 +1232,54 @@ class OptimizedAttendanceSystem:
                 total_hours = self.calculate_worked_hours(first_entry, last_exit, department)
                 worked_day = total_hours > 1  # Mínimo 1 hora para contar como día trabajado
             
-            # Verificar si es fin de semana
+            # Fin de semana (día no laborable del departamento) y festivo
             date_obj = datetime.strptime(date, '%Y-%m-%d')
-            is_weekend = not self.is_work_day(date_obj, 'general', department)
-            
-            # Insertar o actualizar resumen
-            if self.db_type == 'postgresql':
-                cursor.execute('''
-                    INSERT INTO daily_summaries 
-                    (employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (employee_id, date) 
-                    DO UPDATE SET 
-                        first_entry = EXCLUDED.first_entry,
-                        last_exit = EXCLUDED.last_exit,
-                        total_hours = EXCLUDED.total_hours,
-                        worked_day = EXCLUDED.worked_day
-                ''', (employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend))
-            else:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO daily_summaries 
-                    (employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend))
+            is_weekend = not self.schedule_rules.is_work_day(department, date_obj.weekday())
+            is_holiday = self.work_calendar.is_holiday(date_obj)
+            
+            # Insertar o actualizar resumen (horas de la primera entrada y la última salida)
+            first_entry = str(first_entry)[11:19] if first_entry else None
+            last_exit = str(last_exit)[11:19] if last_exit else None
+            self.queries.run(cursor, 'summaries.upsert', (
+                employee_id, date, first_entry, last_exit, total_hours, worked_day, is_weekend, is_holiday
+            ))
+            self.data_versions.bump(cursor, f'summaries:{date[:7]}')
             
             conn.commit()
             conn.close()
             
         except Exception as e:
             print(f"Error actualizando resumen diario: {e}")
-        """Obtener datos del dashboard"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    
+    def start_monitoring(self):
+        """Iniciar monitoreo (solo en el worker líder de ingesta)"""
+        self.monitoring_requested = True
+        if not self.ingest_leader.is_leader:
+            self.publish('control', monitoring=True)
+            print("Monitoreo solicitado al worker líder")
+            return
+        if not self.monitoring:
+            self.monitoring = True
+            monitor_thread = threading.Thread(target=self._monitor_events, daemon=True)
+            monitor_thread.start()
+            print("Monitoreo iniciado")
+    
+    def stop_monitoring(self):
+        """Detener monitoreo"""
+        self.monitoring_requested = False
+        if not self.ingest_leader.is_leader:
+            self.publish('control', monitoring=False)
+            return
+        self.monitoring = False
+        print("Monitoreo detenido")
+    
+    def _monitor_events(self):
+        """Monitoreo de eventos del dispositivo"""
+        url = f"http://{self.device_ip}/ISAPI/Event/notification/alertStream"
         
-        try:
-            # Registros de hoy
-            if self.db_type == 'postgresql':
-                cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = CURRENT_DATE")
-                total_records = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE DATE(timestamp) = CURRENT_DATE")
-                unique_employees = cursor.fetchone()[0]
-                
-                # Estado de empleados
-                cursor.execute('''
-                    SELECT e.name, e.employee_id, ar.event_type, ar.timestamp
-                    FROM employees e
-                    LEFT JOIN (
-                        SELECT DISTINCT ON (employee_id) employee_id, event_type, timestamp
-                        FROM attendance_records
-                        WHERE DATE(timestamp) = CURRENT_DATE
-                        ORDER BY employee_id, timestamp DESC
-                    ) ar ON e.employee_id = ar.employee_id
-                    WHERE e.active = true
-                ''')
-                employees_status = cursor.fetchall()
-                
-                # Registros recientes (solo empleados activos)
-                cursor.execute('''
-                    SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method
-                    FROM attendance_records ar
-                    JOIN employees e ON ar.employee_id = e.employee_id
-                    WHERE e.active = true
-                    ORDER BY ar.timestamp DESC LIMIT 20
-                ''')
-                recent_records = cursor.fetchall()
-                
-            else:
-                cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE date(timestamp) = date('now')")
-                total_records = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE date(timestamp) = date('now')")
-                unique_employees = cursor.fetchone()[0]
-                
-                cursor.execute('''
-                    SELECT e.name, e.employee_id, ar.event_type, ar.timestamp
-                    FROM employees e
-                    LEFT JOIN (
-                        SELECT employee_id, event_type, timestamp,
-                               ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY timestamp DESC) as rn
-                        FROM attendance_records
-                        WHERE date(timestamp) = date('now')
-                    ) ar ON e.employee_id = ar.employee_id AND ar.rn = 1
-                    WHERE e.active = 1
-                ''')
-                employees_status = cursor.fetchall()
-                
-                cursor.execute('''
-                    SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method
-                    FROM attendance_records ar
-                    JOIN employees e ON ar.employee_id = e.employee_id
-                    WHERE e.active = 1
-                    ORDER BY ar.timestamp DESC LIMIT 20
-                ''')
-                recent_records = cursor.fetchall()
-            
-            conn.close()
-            
-            # Procesar estado de empleados
-            inside = []
-            outside = []
-            
-            for emp in employees_status:
-                name, emp_id, last_event, timestamp = emp
-                if last_event == 'entrada':
-                    inside.append({'name': name, 'id': emp_id, 'time': timestamp})
-                else:
-                    outside.append({'name': name, 'id': emp_id, 'time': timestamp})
-            
-            return {
-                'total_records': total_records,
-                'unique_employees': unique_employees,
-                'employees_inside': inside,
-                'employees_outside': outside,
-                'recent_records': recent_records,
-                'connected': self.connected,
-                'monitoring': self.monitoring
-            }
-            
-        except Exception as e:
-            print(f"Error obteniendo datos dashboard: {e}")
-            conn.close()
-            return {
-                'total_records': 0,
-                'unique_employees': 0,
-                'employees_inside': [],
-                'employees_outside': [],
-                'recent_records': [],
-                'connected': self.connected,
-                'monitoring': self.monitoring
-            }
-    
-    def start_monitoring(self):
-        """Iniciar monitoreo"""
-        if not self.monitoring:
-            self.monitoring = True
-            monitor_thread = threading.Thread(target=self._monitor_events, daemon=True)
-            monitor_thread.start()
-            print("Monitoreo iniciado")
-    
-    def stop_monitoring(self):
-        """Detener monitoreo"""
-        self.monitoring = False
-        print("Monitoreo detenido")
-    
-    def _monitor_events(self):
-        """Monitoreo de eventos del dispositivo"""
-        url = f"http://{self.device_ip}/ISAPI/Event/notification/alertStream"
-        
-        while self.monitoring:
-            try:
-                response = self.session.get(url, stream=True, timeout=60)
+        while self.monitoring:
+            try:
+                response = self.session.get(url, stream=True, timeout=60)
                 
                 if response.status_code == 200:
                     self.connected = True
@@ -1460,19 +1351,85 @@ class OptimizedAttendanceSystem:
                 if employee_id:
                     self.record_attendance(employee_id, timestamp, reader_no, verify_method)
 
+def month_bounds(month):
+    """'YYYY-MM' -> ('YYYY-MM-01', primer día del mes siguiente) para filtros de rango sobre la fecha"""
+    year, month_num = map(int, month.split('-'))
+    next_year, next_month = (year + 1, 1) if month_num == 12 else (year, month_num + 1)
+    return f'{year:04d}-{month_num:02d}-01', f'{next_year:04d}-{next_month:02d}-01'
+
 # Instancia global
 system = OptimizedAttendanceSystem()
 
+# ETag/304 y compresión de las APIs de lectura (ver http_cache.py)
+response_cache = ResponseCache(system.data_versions, app.json.dumps, app.response_class)
+
 # WebSocket events
 @socketio.on('connect')
 def handle_connect():
     print('Cliente conectado')
+    # Sala del alcance pedido al conectar (?scope=); snapshot_request puede cambiarla
+    try:
+        scope = parse_scope(request.args.get('scope'))
+    except ValueError:
+        scope = None
+    join_room(scope or ALL_ROOM)
     emit('status', {'connected': system.connected, 'monitoring': system.monitoring})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     print('Cliente desconectado')
 
+@socketio.on('snapshot_request')
+def handle_snapshot_request(data=None):
+    """Deltas desde la versión del cliente o snapshot completo (respuesta por ack)
+
+    data.scope ('dept:<departamento>', 'shift:<turno>', 'reader:<lector>' o 'all') elige
+    la sala del cliente: solo recibe los deltas y eventos que la afectan.
+    """
+    data = data or {}
+    try:
+        scope = parse_scope(data.get('scope'))
+    except ValueError as e:
+        return {'error': str(e)}
+    
+    room = scope or ALL_ROOM
+    for joined in rooms():
+        if joined not in (request.sid, room):
+            leave_room(joined)
+    join_room(room)
+    
+    try:
+        system.refresh_dashboard_state()
+    except Exception as e:
+        print(f"Error obteniendo datos dashboard: {e}")
+    return system.dashboard_state.sync_reply(data.get('since'), data.get('epoch'), system.connected,
+                                             system.monitoring, scope)
+
+# Assets versionados de las plantillas (python static_assets.py; sin build se sirven los fuentes)
+asset_manifest = load_manifest()
+ASSET_MAX_AGE = 31536000
+
+@app.context_processor
+def inject_asset_url():
+    def asset_url(name):
+        built = asset_manifest.get(name)
+        if built:
+            return url_for('dist_asset', filename=built)
+        return url_for('static', filename=f'src/{name}')
+    return {'asset_url': asset_url}
+
+@app.route('/static/dist/<path:filename>')
+def dist_asset(filename):
+    """El nombre cambia con el contenido: caché de un año y variante precomprimida si el cliente la acepta"""
+    variant, encoding = precompressed(filename, request.headers.get('Accept-Encoding'))
+    response = send_from_directory(DIST_DIR, variant or filename, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 # Rutas web
 @app.route('/')
 def dashboard():
@@ -1488,11 +1445,81 @@ def employees_simple():
 
 @app.route('/api/dashboard')
 def api_dashboard():
-    return jsonify(system.get_dashboard_data())
+    return app.response_class(system.get_dashboard_body(), mimetype='application/json')
+
+@app.route('/api/dashboard/live')
+def api_dashboard_live():
+    """Misma respuesta que snapshot_request para clientes sin WebSocket (?epoch=<epoch>&since=<seq>&scope=<sala>)"""
+    since = request.args.get('since', type=int)
+    try:
+        scope = parse_scope(request.args.get('scope'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    system.refresh_dashboard_state()
+    return jsonify(system.dashboard_state.sync_reply(since, request.args.get('epoch'),
+                                                     system.connected, system.monitoring, scope))
+
+@app.route('/api/bootstrap')
+def api_bootstrap():
+    """Primera carga del dashboard en una sola respuesta y una sola conexión (?scope=<sala>)
+    
+    live: mismo snapshot que snapshot_request; el WebSocket continúa desde su epoch/seq
+    records: marcajes del día (next_cursor si hay más de BOOTSTRAP_RECORDS)
+    employees: lista completa; technicians: turnos de la semana en curso (week_start)
+    """
+    try:
+        scope = parse_scope(request.args.get('scope'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    system.refresh_dashboard_state()
+    
+    day = datetime.strptime(system.dashboard_state.workday, '%Y-%m-%d')
+    day_range = (day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d'))
+    week_start = (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+    # Las salas de departamento y lector filtran los marcajes; las de turno muestran todos
+    kind, _, value = (scope or '').partition(':')
+    if kind == 'dept':
+        filter_names, filter_values = ['department'], (value,)
+    elif kind == 'reader' and value.isdigit():
+        filter_names, filter_values = ['reader_no'], (int(value),)
+    else:
+        filter_names, filter_values = [], ()
+    
+    conn = system.get_connection()
+    cursor = conn.cursor()
+    try:
+        rows, next_cursor = read_records_page(cursor, day_range, filter_names, filter_values, None, BOOTSTRAP_RECORDS)
+        employees = system.get_employees(use_cache=False, cursor=cursor)
+        technicians = system.technicians(employees, week_start, cursor)
+    finally:
+        conn.close()
+    
+    # Después de leer los marcajes: los deltas posteriores a seq no están en records
+    live = system.dashboard_state.live_snapshot(system.connected, system.monitoring, scope)
+    return jsonify({
+        'live': live,
+        'records': [record_fields(row, DEFAULT_RECORD_FIELDS) for row in rows],
+        'next_cursor': next_cursor,
+        'employees': employees,
+        'week_start': week_start,
+        'technicians': technicians
+    })
+
+@app.route('/api/stream')
+def api_stream():
+    """Eventos de solo lectura para pantallas de planta (Server-Sent Events, ver sse_stream.py)"""
+    try:
+        system.refresh_dashboard_state()
+    except Exception as e:
+        print(f"Error obteniendo datos dashboard: {e}")
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return app.response_class(system.stream.stream(last_event_id), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/employees')
 def api_employees():
-    return jsonify(system.get_employees())
+    # La versión de 'employees' ya garantiza datos frescos; sin la caché de 5 minutos del proceso
+    return response_cache.respond(request, ['employees'], lambda: system.get_employees(use_cache=False))
 
 @app.route('/api/employees', methods=['POST'])
 def api_add_employee():
@@ -1533,11 +1560,7 @@ def api_toggle_employee(employee_id):
     cursor = conn.cursor()
     
     try:
-        if system.db_type == 'postgresql':
-            cursor.execute('SELECT name, active FROM employees WHERE employee_id = %s', (employee_id,))
-        else:
-            cursor.execute('SELECT name, active FROM employees WHERE employee_id = ?', (employee_id,))
-        
+        system.queries.run(cursor, 'employees.name_active', (employee_id,))
         employee = cursor.fetchone()
         
         if not employee:
@@ -1546,17 +1569,15 @@ def api_toggle_employee(employee_id):
         
         new_status = not employee[1]
         
-        if system.db_type == 'postgresql':
-            cursor.execute('UPDATE employees SET active = %s WHERE employee_id = %s', (new_status, employee_id))
-        else:
-            cursor.execute('UPDATE employees SET active = ? WHERE employee_id = ?', (new_status, employee_id))
-        
+        system.queries.run(cursor, 'employees.set_active', (new_status, employee_id))
+        system.data_versions.bump(cursor, 'employees')
         conn.commit()
         conn.close()
         
         # Limpiar cache
         system.employees_cache = {}
         system.cache_timestamp = 0
+        system.invalidate_dashboard_state()
         
         status_text = "activado" if new_status else "desactivado"
         return jsonify({'success': True, 'message': f"Empleado {employee[0]} {status_text}"})
@@ -1572,28 +1593,20 @@ def api_update_employee(employee_id):
     cursor = conn.cursor()
     
     try:
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                UPDATE employees 
-                SET name=%s, department=%s, phone=%s, email=%s, active=%s
-                WHERE employee_id=%s
-            ''', (data.get('name'), data.get('department'), data.get('phone', ''), 
-                  data.get('email', ''), data.get('active', True), employee_id))
-        else:
-            cursor.execute('''
-                UPDATE employees 
-                SET name=?, department=?, phone=?, email=?, active=?
-                WHERE employee_id=?
-            ''', (data.get('name'), data.get('department'), data.get('phone', ''), 
-                  data.get('email', ''), data.get('active', True), employee_id))
+        system.queries.run(cursor, 'employees.update', (
+            data.get('name'), data.get('department'), data.get('phone', ''),
+            data.get('email', ''), data.get('active', True), employee_id
+        ))
         
         if cursor.rowcount > 0:
+            system.data_versions.bump(cursor, 'employees')
             conn.commit()
             conn.close()
             
             # Limpiar cache
             system.employees_cache = {}
             system.cache_timestamp = 0
+            system.invalidate_dashboard_state()
             
             return jsonify({'success': True, 'message': f"Empleado {data.get('name')} actualizado exitosamente"})
         else:
@@ -1611,11 +1624,7 @@ def api_delete_employee(employee_id):
     
     try:
         # Obtener nombre antes de eliminar
-        if system.db_type == 'postgresql':
-            cursor.execute('SELECT name FROM employees WHERE employee_id = %s', (employee_id,))
-        else:
-            cursor.execute('SELECT name FROM employees WHERE employee_id = ?', (employee_id,))
-        
+        system.queries.run(cursor, 'employees.name', (employee_id,))
         employee = cursor.fetchone()
         
         if not employee:
@@ -1623,17 +1632,15 @@ def api_delete_employee(employee_id):
             return jsonify({'success': False, 'message': 'Empleado no encontrado'})
         
         # Eliminar empleado
-        if system.db_type == 'postgresql':
-            cursor.execute('DELETE FROM employees WHERE employee_id = %s', (employee_id,))
-        else:
-            cursor.execute('DELETE FROM employees WHERE employee_id = ?', (employee_id,))
-        
+        system.queries.run(cursor, 'employees.delete', (employee_id,))
+        system.data_versions.bump(cursor, 'employees')
         conn.commit()
         conn.close()
         
         # Limpiar cache
         system.employees_cache = {}
         system.cache_timestamp = 0
+        system.invalidate_dashboard_state()
         
         return jsonify({'success': True, 'message': f"Empleado {employee[0]} eliminado exitosamente"})
         
@@ -1641,54 +1648,145 @@ def api_delete_employee(employee_id):
         conn.close()
         return jsonify({'success': False, 'message': f"Error: {str(e)}"})
 
+@app.route('/api/metrics/queries')
+def api_query_metrics():
+    """Tiempos por consulta con nombre desde el arranque del proceso"""
+    return jsonify({
+        'db_type': system.db_type,
+        'prepared_statements': system.queries.prepare,
+        'queries': system.queries.stats(),
+        'dashboard_state': system.dashboard_state.stats,
+        'emitter': emitter.stats,
+        'http_cache': response_cache.stats,
+        'stream': system.stream.stats,
+        'break_timers': dict(system.break_timers.stats, pending=len(system.break_timers)),
+        'absence_detector': dict(system.absence_detector.stats, pending=len(system.absence_detector.timers)),
+        'work_calendar': system.work_calendar.stats,
+        'presence_bitmap': system.presence_bitmap.stats,
+        'ingest_leader': system.ingest_leader.is_leader,
+        'ingest_holder': system.ingest_leader.holder
+    })
+
 @app.route('/api/test_connection', methods=['POST'])
 def api_test_connection():
     connected = system.test_connection()
     message = "✅ Dispositivo conectado" if connected else "❌ Dispositivo no disponible"
     return jsonify({'connected': connected, 'message': message})
 
+RECORD_FIELDS = ('id', 'employee_id', 'name', 'department', 'event_type', 'timestamp', 'verify_method', 'reader_no')
+DEFAULT_RECORD_FIELDS = ('name', 'event_type', 'timestamp', 'verify_method', 'department')
+RECORD_PAGE_ARGS = ('limit', 'cursor', 'fields', 'count') + tuple(name for name, _ in RECORD_FILTERS)
+RECORDS_PAGE_SIZE = 100
+RECORDS_PAGE_MAX = 1000
+BOOTSTRAP_RECORDS = RECORDS_PAGE_MAX
+
 @app.route('/api/records')
 def api_records():
+    """Marcajes de un día
+    
+    Solo ?date=: lista completa (formato original). Con limit, cursor, fields, count=1 o
+    filtros (department, event_type, employee_id, reader_no, verify_method): página por
+    keyset {'records', 'next_cursor', 'total'}.
+    """
     date = request.args.get('date')
     if not date:
         return jsonify([])
+    if any(arg in request.args for arg in RECORD_PAGE_ARGS):
+        return api_records_page(date)
     
-    conn = system.get_connection()
-    cursor = conn.cursor()
-    
-    try:
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method, e.department
-                FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE DATE(ar.timestamp) = %s
-                ORDER BY ar.timestamp DESC
-            ''', (date,))
-        else:
-            cursor.execute('''
-                SELECT e.name, ar.event_type, ar.timestamp, ar.verify_method, e.department
-                FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE date(ar.timestamp) = ?
-                ORDER BY ar.timestamp DESC
-            ''', (date,))
-        
-        records = cursor.fetchall()
-        conn.close()
+    def build():
+        conn = system.get_connection()
+        cursor = conn.cursor()
+        try:
+            system.queries.run(cursor, 'attendance.day_detail', (date,))
+            records = cursor.fetchall()
+        finally:
+            conn.close()
         
-        return jsonify([{
+        return [{
             'name': record[0],
             'event_type': record[1],
             'timestamp': record[2],
             'verify_method': record[3],
             'department': record[4] or 'General'
-        } for record in records])
-        
+        } for record in records]
+    
+    try:
+        # Los días pasados ya no reciben marcajes (se registran con la hora actual)
+        past_day = date < datetime.now().strftime('%Y-%m-%d')
+        return response_cache.respond(request, [f'attendance:{date}', 'employees'], build, immutable=past_day)
     except Exception as e:
-        conn.close()
         return jsonify([])
 
+def api_records_page(date):
+    """Página de marcajes ordenada por (timestamp, id) descendente; next_cursor continúa la lectura"""
+    try:
+        day = datetime.strptime(date, '%Y-%m-%d')
+        limit = min(max(int(request.args.get('limit', RECORDS_PAGE_SIZE)), 1), RECORDS_PAGE_MAX)
+        cursor_value = request.args.get('cursor')
+        cursor_key = None
+        if cursor_value:
+            cursor_timestamp, _, cursor_id = cursor_value.rpartition('|')
+            cursor_key = (cursor_timestamp, int(cursor_id))
+        filters = [(name, request.args[name]) for name, _ in RECORD_FILTERS if request.args.get(name)]
+        filters = [(name, int(value) if name == 'reader_no' else value) for name, value in filters]
+    except ValueError:
+        return jsonify({'error': 'Parámetros inválidos (date=YYYY-MM-DD, limit y reader_no numéricos, cursor de next_cursor)'}), 400
+    
+    fields = request.args.get('fields')
+    fields = tuple(fields.split(',')) if fields else DEFAULT_RECORD_FIELDS
+    unknown = [field for field in fields if field not in RECORD_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Campos desconocidos: {', '.join(unknown)}"}), 400
+    
+    filter_names = [name for name, _ in filters]
+    filter_values = tuple(value for _, value in filters)
+    day_range = (day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d'))
+    
+    def build():
+        conn = system.get_connection()
+        cursor = conn.cursor()
+        try:
+            rows, next_cursor = read_records_page(cursor, day_range, filter_names, filter_values, cursor_key, limit)
+            
+            total = None
+            if request.args.get('count') in ('1', 'true'):
+                system.queries.run(cursor, records_query_name('page_count', filter_names), day_range + filter_values)
+                total = cursor.fetchone()[0]
+        finally:
+            conn.close()
+        
+        return {'records': [record_fields(row, fields) for row in rows], 'next_cursor': next_cursor, 'total': total}
+    
+    try:
+        past_day = date < datetime.now().strftime('%Y-%m-%d')
+        return response_cache.respond(request, [f'attendance:{date}', 'employees'], build, immutable=past_day)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def read_records_page(cursor, day_range, filter_names, filter_values, cursor_key, limit):
+    """(filas, next_cursor) de una página por keyset desde cursor_key (None: primera página)"""
+    # Una fila de más indica si hay página siguiente
+    if cursor_key:
+        system.queries.run(cursor, records_query_name('page_after', filter_names),
+                           day_range + filter_values + cursor_key + (limit + 1,))
+    else:
+        system.queries.run(cursor, records_query_name('page', filter_names),
+                           day_range + filter_values + (limit + 1,))
+    rows = cursor.fetchall()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][5]}|{rows[-1][0]}"
+    return rows, next_cursor
+
+def record_fields(row, fields):
+    """Fila de RECORDS_PAGE proyectada a fields"""
+    record = dict(zip(RECORD_FIELDS, row))
+    record['department'] = record['department'] or 'General'
+    return {field: record[field] for field in fields}
+
 @app.route('/api/reports/daily')
 def api_daily_report():
     date = request.args.get('date')
@@ -1699,48 +1797,20 @@ def api_daily_report():
     cursor = conn.cursor()
     
     try:
-        if system.db_type == 'postgresql':
-            cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = %s", (date,))
-            total_records = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE DATE(timestamp) = %s", (date,))
-            unique_employees = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = %s AND event_type = 'entrada'", (date,))
-            entries = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE DATE(timestamp) = %s AND event_type = 'salida'", (date,))
-            exits = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                SELECT e.name, ar.event_type, ar.timestamp
-                FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE DATE(ar.timestamp) = %s
-                ORDER BY ar.timestamp
-            ''', (date,))
-            records = cursor.fetchall()
-        else:
-            cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE date(timestamp) = ?", (date,))
-            total_records = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(DISTINCT employee_id) FROM attendance_records WHERE date(timestamp) = ?", (date,))
-            unique_employees = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE date(timestamp) = ? AND event_type = 'entrada'", (date,))
-            entries = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM attendance_records WHERE date(timestamp) = ? AND event_type = 'salida'", (date,))
-            exits = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                SELECT e.name, ar.event_type, ar.timestamp
-                FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE date(ar.timestamp) = ?
-                ORDER BY ar.timestamp
-            ''', (date,))
-            records = cursor.fetchall()
+        system.queries.run(cursor, 'attendance.count_day', (date,))
+        total_records = cursor.fetchone()[0]
+        
+        system.queries.run(cursor, 'attendance.count_employees_day', (date,))
+        unique_employees = cursor.fetchone()[0]
+        
+        system.queries.run(cursor, 'attendance.count_event_day', (date, 'entrada'))
+        entries = cursor.fetchone()[0]
+        
+        system.queries.run(cursor, 'attendance.count_event_day', (date, 'salida'))
+        exits = cursor.fetchone()[0]
+        
+        system.queries.run(cursor, 'attendance.day_report', (date,))
+        records = cursor.fetchall()
         
         conn.close()
         
@@ -1776,30 +1846,11 @@ def api_weekly_report():
     cursor = conn.cursor()
     
     try:
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT COUNT(*) FROM attendance_records 
-                WHERE DATE(timestamp) BETWEEN %s AND %s
-            ''', (start_date.date(), end_date.date()))
-            total_records = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                SELECT COUNT(DISTINCT employee_id) FROM attendance_records 
-                WHERE DATE(timestamp) BETWEEN %s AND %s
-            ''', (start_date.date(), end_date.date()))
-            active_employees = cursor.fetchone()[0]
-        else:
-            cursor.execute('''
-                SELECT COUNT(*) FROM attendance_records 
-                WHERE date(timestamp) BETWEEN ? AND ?
-            ''', (start_date.date(), end_date.date()))
-            total_records = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                SELECT COUNT(DISTINCT employee_id) FROM attendance_records 
-                WHERE date(timestamp) BETWEEN ? AND ?
-            ''', (start_date.date(), end_date.date()))
-            active_employees = cursor.fetchone()[0]
+        system.queries.run(cursor, 'attendance.count_range', (start_date.date(), end_date.date()))
+        total_records = cursor.fetchone()[0]
+        
+        system.queries.run(cursor, 'attendance.count_employees_range', (start_date.date(), end_date.date()))
+        active_employees = cursor.fetchone()[0]
         
         conn.close()
         
@@ -1832,222 +1883,92 @@ def api_attendance_report():
 
 @app.route('/api/breaks/status')
 def api_break_status():
-    """Obtener estado actual de breaks y almuerzos"""
+    """Obtener estado actual de breaks y almuerzos (proyección en memoria del día)"""
     try:
-        conn = system.get_connection()
-        cursor = conn.cursor()
-        
-        today = datetime.now().strftime('%Y-%m-%d')
-        
-        # Empleados actualmente en break
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                WITH last_break_events AS (
-                    SELECT DISTINCT ON (ar.employee_id) 
-                           ar.employee_id, e.name, e.department, ar.event_type, ar.timestamp, ar.break_type
-                    FROM attendance_records ar
-                    JOIN employees e ON ar.employee_id = e.employee_id
-                    WHERE DATE(ar.timestamp) = %s 
-                          AND ar.is_break_record = true
-                          AND e.active = true
-                    ORDER BY ar.employee_id, ar.timestamp DESC
-                )
-                SELECT employee_id, name, department, event_type, timestamp, break_type
-                FROM last_break_events
-                WHERE event_type IN ('break_salida', 'almuerzo_salida')
-            ''', (today,))
-        else:
-            cursor.execute('''
-                SELECT ar.employee_id, e.name, e.department, ar.event_type, ar.timestamp, ar.break_type
-                FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE date(ar.timestamp) = ? 
-                      AND ar.is_break_record = 1
-                      AND e.active = 1
-                      AND ar.event_type IN ('break_salida', 'almuerzo_salida')
-                      AND ar.timestamp = (
-                          SELECT MAX(timestamp) FROM attendance_records ar2
-                          WHERE ar2.employee_id = ar.employee_id 
-                                AND date(ar2.timestamp) = ?
-                                AND ar2.is_break_record = 1
-                      )
-            ''', (today, today))
-        
-        current_breaks = cursor.fetchall()
-        
-        # Procesar empleados en break/almuerzo
-        on_break = []
-        on_lunch = []
-        
-        for record in current_breaks:
-            emp_id, name, department, event_type, timestamp, break_type = record
-            
-            # Calcular duración
-            start_time = datetime.strptime(str(timestamp)[11:19], '%H:%M:%S').time()
-            current_time = datetime.now().time()
-            
-            start_dt = datetime.combine(datetime.today(), start_time)
-            current_dt = datetime.combine(datetime.today(), current_time)
-            duration = int((current_dt - start_dt).total_seconds() / 60)
-            
-            employee_data = {
-                'employee_id': emp_id,
-                'name': name,
-                'department': department,
-                'start_time': str(start_time)[:5],
-                'duration': duration
-            }
-            
-            if event_type == 'break_salida':
-                on_break.append(employee_data)
-            elif event_type == 'almuerzo_salida':
-                on_lunch.append(employee_data)
-        
-        # Contar breaks completados
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT COUNT(*) FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE DATE(ar.timestamp) = %s 
-                      AND ar.is_break_record = true
-                      AND ar.event_type = 'break_entrada'
-                      AND e.active = true
-            ''', (today,))
-        else:
-            cursor.execute('''
-                SELECT COUNT(*) FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE date(ar.timestamp) = ? 
-                      AND ar.is_break_record = 1
-                      AND ar.event_type = 'break_entrada'
-                      AND e.active = 1
-            ''', (today,))
-        
-        breaks_completed = cursor.fetchone()[0]
-        
-        # Contar almuerzos completados
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT COUNT(*) FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE DATE(ar.timestamp) = %s 
-                      AND ar.is_break_record = true
-                      AND ar.event_type = 'almuerzo_entrada'
-                      AND e.active = true
-            ''', (today,))
-        else:
-            cursor.execute('''
-                SELECT COUNT(*) FROM attendance_records ar
-                JOIN employees e ON ar.employee_id = e.employee_id
-                WHERE date(ar.timestamp) = ? 
-                      AND ar.is_break_record = 1
-                      AND ar.event_type = 'almuerzo_entrada'
-                      AND e.active = 1
-            ''', (today,))
-        
-        lunch_completed = cursor.fetchone()[0]
-        
-        # Calcular pendientes
-        if system.db_type == 'postgresql':
-            cursor.execute("SELECT COUNT(*) FROM employees WHERE active = true AND department IN ('Reacondicionamiento', 'Logistica', 'Administracion')")
-        else:
-            cursor.execute("SELECT COUNT(*) FROM employees WHERE active = 1 AND department IN ('Reacondicionamiento', 'Logistica', 'Administracion')")
-        
-        admin_employees = cursor.fetchone()[0]
-        
-        if system.db_type == 'postgresql':
-            cursor.execute("SELECT COUNT(*) FROM employees WHERE active = true AND department = 'Operativos'")
-        else:
-            cursor.execute("SELECT COUNT(*) FROM employees WHERE active = 1 AND department = 'Operativos'")
-        
-        operativo_employees = cursor.fetchone()[0]
-        
-        total_employees = admin_employees + operativo_employees
-        breaks_pending = max(0, total_employees - breaks_completed)
-        lunch_pending = max(0, admin_employees - lunch_completed)
-        
-        conn.close()
-        
-        return jsonify({
-            'on_break': on_break,
-            'on_lunch': on_lunch,
-            'breaks_completed': breaks_completed,
-            'breaks_pending': breaks_pending,
-            'lunch_completed': lunch_completed,
-            'lunch_pending': lunch_pending
-        })
+        system.refresh_dashboard_state()
+        return jsonify(system.dashboard_state.break_status())
         
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/api/schedule-rules')
+def api_schedule_rules():
+    """Reglas de horario y breaks compiladas (department_schedules y break_types)"""
+    return jsonify(system.schedule_rules.snapshot())
+
+@app.route('/api/holidays', methods=['GET', 'POST'])
+def api_holidays():
+    """Festivos del calendario laboral (GET ?year=YYYY; POST JSON date YYYY-MM-DD y name)"""
+    if request.method == 'GET':
+        year = request.args.get('year', type=int)
+        return response_cache.respond(request, ['holidays'], lambda: {'holidays': system.work_calendar.holiday_list(year)})
+    
+    data = request.json or {}
+    try:
+        day = datetime.strptime(data.get('date') or '', '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return jsonify({'success': False, 'message': 'date (YYYY-MM-DD) requerido'})
+    name = (data.get('name') or '').strip()
+    if not name:
+        return jsonify({'success': False, 'message': 'name requerido'})
+    return jsonify(system.set_holiday(day, name))
+
+@app.route('/api/holidays/<day>', methods=['DELETE'])
+def api_delete_holiday(day):
+    try:
+        day = datetime.strptime(day, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Fecha inválida (YYYY-MM-DD)'})
+    return jsonify(system.set_holiday(day, None))
+
 @app.route('/api/alerts/late')
 def api_late_alerts():
-    """Obtener alertas de llegadas tardías del día con horarios por departamento"""
+    """Obtener alertas de llegadas tardías del día con horarios por departamento
+    
+    Con start_date y end_date (YYYY-MM-DD, opcional department): historial del rango
+    leído de daily_summaries (tardanza guardada con la primera entrada de cada día).
+    """
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    if start_date or end_date:
+        return api_late_history(start_date, end_date, request.args.get('department'))
     try:
-        conn = system.get_connection()
-        cursor = conn.cursor()
-        
-        today = datetime.now().strftime('%Y-%m-%d')
-        
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT e.employee_id, e.name, e.department, e.schedule,
-                       MIN(ar.timestamp) as first_entry
-                FROM employees e
-                JOIN attendance_records ar ON e.employee_id = ar.employee_id
-                WHERE DATE(ar.timestamp) = %s AND ar.event_type = 'entrada' AND e.active = true
-                GROUP BY e.employee_id, e.name, e.department, e.schedule
-            ''', (today,))
-        else:
-            cursor.execute('''
-                SELECT e.employee_id, e.name, e.department, e.schedule,
-                       MIN(ar.timestamp) as first_entry
-                FROM employees e
-                JOIN attendance_records ar ON e.employee_id = ar.employee_id
-                WHERE date(ar.timestamp) = ? AND ar.event_type = 'entrada' AND e.active = 1
-                GROUP BY e.employee_id, e.name, e.department, e.schedule
-            ''', (today,))
-        
-        records = cursor.fetchall()
-        conn.close()
-        
-        late_alerts = []
-        
-        for record in records:
-            emp_id, name, dept, schedule, first_entry = record
-            
-            # Obtener horario esperado por departamento
-            entry_time = datetime.strptime(str(first_entry)[:19], '%Y-%m-%d %H:%M:%S')
-            day_of_week = entry_time.weekday()
-            
-            expected_hours = system.get_expected_hours_by_department(dept, day_of_week)
-            if not expected_hours:
-                continue
-                
-            # Extraer hora de entrada
-            entry_time_only = entry_time.time()
-            expected_start = datetime.strptime(expected_hours[0], '%H:%M').time()
-            
-            if entry_time_only > expected_start:
-                # Calcular minutos de tardanza
-                entry_dt = datetime.combine(datetime.today(), entry_time_only)
-                expected_dt = datetime.combine(datetime.today(), expected_start)
-                late_minutes = int((entry_dt - expected_dt).total_seconds() / 60)
-                
-                late_alerts.append({
-                    'employee_id': emp_id,
-                    'name': name,
-                    'department': dept,
-                    'expected_time': expected_hours[0],
-                    'actual_time': str(entry_time_only)[:5],
-                    'late_minutes': late_minutes,
-                    'timestamp': first_entry
-                })
-        
-        return jsonify(late_alerts)
+        system.refresh_dashboard_state()
+        return jsonify(system.dashboard_state.late_alerts)
         
     except Exception as e:
         return jsonify({'error': str(e)})
+
+def api_late_history(start_date, end_date, department=None):
+    try:
+        start = datetime.strptime(start_date or end_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date or start_date, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': 'Fechas inválidas (YYYY-MM-DD)'}), 400
+    
+    # Versiones de los meses del rango: cambian con cada resumen diario escrito
+    months = sorted({(start + timedelta(days=offset)).strftime('%Y-%m') for offset in range(0, (end - start).days + 1, 28)}
+                    | {end.strftime('%Y-%m')})
+    
+    def build():
+        conn = system.get_connection()
+        cursor = conn.cursor()
+        try:
+            system.queries.run(cursor, 'summaries.late_range', (start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        return [system.late_alert(emp_id, name, dept, expected_start, str(first_entry_at), late_minutes)
+                for emp_id, name, dept, expected_start, first_entry_at, late_minutes in rows
+                if not department or dept == department]
+    
+    try:
+        past_range = end.strftime('%Y-%m-%d') < datetime.now().strftime('%Y-%m-%d')
+        return response_cache.respond(request, [f'summaries:{month}' for month in months] + ['employees'], build,
+                                      immutable=past_range)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/export/excel')
 def api_export_excel():
     if not EXCEL_AVAILABLE:
@@ -2115,93 +2036,99 @@ def api_export_pdf():
     except Exception as e:
         return jsonify({'error': str(e)})
 
+# Rotaciones de hasta BULK_MAX_WEEKS semanas; el horario de cada turno sale de schedule_rules
+SHIFT_DEPARTMENT = 'Operativos'
+BULK_MAX_WEEKS = 12
+
+def shift_hours(shift_type):
+    """('HH:MM:SS', 'HH:MM:SS') inicio y fin del turno según las reglas de Operativos; None si no existe"""
+    rules = system.schedule_rules.rules_for(SHIFT_DEPARTMENT, shift_type)
+    if rules.shift_type != shift_type:
+        return None
+    return (f'{rules.work_start}:00', f'{rules.work_end}:00')
+
+def rotation_assignments(employee_ids, rotation, week_start_date, weeks, stagger=False):
+    """Filas (employee_id, week_start, week_end, turno, inicio, fin) de la rotación semana a semana
+
+    week_start_date: lunes de la primera semana (ShiftMap lee las semanas por su lunes)
+    stagger: el empleado i empieza en rotation[i % len(rotation)] (grupos repartidos en los turnos)
+    """
+    hours = {shift_type: shift_hours(shift_type) for shift_type in rotation}
+    rows = []
+    for week in range(weeks):
+        start = week_start_date + timedelta(weeks=week)
+        end = start + timedelta(days=6)
+        for position, emp_id in enumerate(employee_ids):
+            shift_type = rotation[(week + (position if stagger else 0)) % len(rotation)]
+            rows.append((emp_id, start, end, shift_type) + hours[shift_type])
+    return rows
+
 @app.route('/api/schedules/bulk', methods=['POST'])
 def api_bulk_assign_schedule():
-    """Asignar horarios en lote a múltiples empleados"""
+    """Asignar turnos en lote a múltiples empleados, una o varias semanas
+    
+    JSON: employee_ids, week_start (YYYY-MM-DD) y shift_type, o rotation (['mañana', 'tarde', 'noche']:
+    un turno por semana, en orden); weeks (semanas consecutivas, 1 por defecto); stagger (cada
+    empleado empieza en un turno distinto de la rotación). Todo en una transacción: una consulta de
+    conflictos y un solo INSERT.
+    """
     data = request.json
+    
+    employee_ids = list(dict.fromkeys(data.get('employee_ids') or []))
+    rotation = data.get('rotation') or ([data['shift_type']] if data.get('shift_type') else [])
+    week_start = data.get('week_start')  # YYYY-MM-DD
+    
+    if not employee_ids or not rotation:
+        return jsonify({'success': False, 'message': 'Empleados y turno requeridos'})
+    if any(shift_hours(shift_type) is None for shift_type in rotation):
+        return jsonify({'success': False, 'message': 'Turno inválido'})
+    try:
+        # Cualquier día de la semana se guarda como la semana de su lunes
+        week_start = shift_week_start(week_start or '')
+        week_start_date = datetime.strptime(week_start, '%Y-%m-%d').date()
+        weeks = int(data.get('weeks', 1))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'week_start (YYYY-MM-DD) y weeks (entero) requeridos'})
+    if not 1 <= weeks <= BULK_MAX_WEEKS:
+        return jsonify({'success': False, 'message': f'weeks debe estar entre 1 y {BULK_MAX_WEEKS}'})
+    
+    week_starts = [week_start_date + timedelta(weeks=week) for week in range(weeks)]
+    rows = rotation_assignments(employee_ids, rotation, week_start_date, weeks, bool(data.get('stagger')))
+    
     conn = system.get_connection()
     cursor = conn.cursor()
     
     try:
-        employee_ids = data.get('employee_ids', [])
-        shift_type = data.get('shift_type')
-        week_start = data.get('week_start')  # YYYY-MM-DD
-        
-        if not employee_ids or not shift_type:
-            return jsonify({'success': False, 'message': 'Empleados y turno requeridos'})
-        
-        # Verificar si algún empleado ya tiene turno asignado para esa semana
-        from datetime import datetime, timedelta
-        week_start_date = datetime.strptime(week_start, '%Y-%m-%d').date()
-        week_end_date = week_start_date + timedelta(days=6)
-        
-        # Verificar conflictos
-        conflicts = []
-        for emp_id in employee_ids:
-            if system.db_type == 'postgresql':
-                cursor.execute('''
-                    SELECT e.name, wsa.shift_type FROM weekly_shift_assignments wsa
-                    JOIN employees e ON wsa.employee_id = e.employee_id
-                    WHERE wsa.employee_id = %s AND wsa.week_start = %s
-                ''', (emp_id, week_start_date))
-            else:
-                cursor.execute('''
-                    SELECT e.name, wsa.shift_type FROM weekly_shift_assignments wsa
-                    JOIN employees e ON wsa.employee_id = e.employee_id
-                    WHERE wsa.employee_id = ? AND wsa.week_start = ?
-                ''', (emp_id, week_start_date))
-            
-            existing = cursor.fetchone()
-            if existing:
-                conflicts.append(f"{existing[0]} ya tiene turno {existing[1]} asignado")
+        # Verificar conflictos de todos los empleados y semanas en una sola consulta (misma transacción que el INSERT)
+        system.begin_write(conn)
+        system.queries.run(cursor, 'shifts.conflicts', (system.queries.array(employee_ids), system.queries.array(week_starts)))
+        conflicts = [
+            f"{name} ya tiene turno {shift_type} asignado" + (f" (semana {str(start)[:10]})" if weeks > 1 else '')
+            for name, shift_type, start in cursor.fetchall()
+        ]
         
         if conflicts:
+            conn.close()
             return jsonify({
                 'success': False, 
                 'message': f'Conflictos encontrados: {"; ".join(conflicts)}'
             })
         
-        # Configurar horarios
-        shift_configs = {
-            'mañana': {'start_time': '06:00:00', 'end_time': '14:00:00'},
-            'tarde': {'start_time': '14:00:00', 'end_time': '21:00:00'},
-            'noche': {'start_time': '22:00:00', 'end_time': '06:00:00'}
-        }
-        
-        if shift_type not in shift_configs:
-            return jsonify({'success': False, 'message': 'Turno inválido'})
-        
-        config = shift_configs[shift_type]
-        
-        # Insertar asignaciones semanales
-        for emp_id in employee_ids:
-            if system.db_type == 'postgresql':
-                cursor.execute('''
-                    INSERT INTO weekly_shift_assignments 
-                    (employee_id, week_start, week_end, shift_type, start_time, end_time)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (employee_id, week_start) 
-                    DO UPDATE SET 
-                        shift_type = EXCLUDED.shift_type,
-                        start_time = EXCLUDED.start_time,
-                        end_time = EXCLUDED.end_time
-                ''', (emp_id, week_start_date, week_end_date, shift_type, 
-                      config['start_time'], config['end_time']))
-            else:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO weekly_shift_assignments 
-                    (employee_id, week_start, week_end, shift_type, start_time, end_time)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (emp_id, week_start_date, week_end_date, shift_type, 
-                      config['start_time'], config['end_time']))
+        # Todas las asignaciones en un solo INSERT, en la misma transacción
+        system.queries.run_values(cursor, 'shifts.upsert_values', rows)
+        system.data_versions.bump(cursor, 'shifts')
         
         conn.commit()
         conn.close()
+        system.invalidate_shifts([start.isoformat() for start in week_starts])
+        system.invalidate_dashboard_state()  # Salas por turno
         
-        return jsonify({
-            'success': True, 
-            'message': f'Turno {shift_type} asignado a {len(employee_ids)} empleados para la semana {week_start}'
-        })
+        if len(rotation) == 1 and weeks == 1:
+            message = f'Turno {rotation[0]} asignado a {len(employee_ids)} empleados para la semana {week_start}'
+        else:
+            message = (f'Rotación {" → ".join(rotation)} asignada a {len(employee_ids)} empleados '
+                       f'durante {weeks} semanas desde {week_start}')
+        return jsonify({'success': True, 'message': message, 'assignments': len(rows)})
         
     except Exception as e:
         conn.close()
@@ -2210,57 +2137,11 @@ def api_bulk_assign_schedule():
 @app.route('/api/employees/technicians')
 def api_get_technicians():
     """Obtener técnicos del departamento Desarme con estado de asignación"""
-    conn = system.get_connection()
-    cursor = conn.cursor()
-    
     try:
         week_start = request.args.get('week_start')
-        
-        if system.db_type == 'postgresql':
-            if week_start:
-                cursor.execute('''
-                    SELECT e.employee_id, e.name, e.department, wsa.shift_type
-                    FROM employees e
-                    LEFT JOIN weekly_shift_assignments wsa ON e.employee_id = wsa.employee_id AND wsa.week_start = %s
-                    WHERE e.active = true AND e.department = 'Operativos'
-                    ORDER BY e.name
-                ''', (week_start,))
-            else:
-                cursor.execute('''
-                    SELECT employee_id, name, department, NULL as shift_type
-                    FROM employees 
-                    WHERE active = true AND department = 'Operativos'
-                    ORDER BY name
-                ''')
-        else:
-            if week_start:
-                cursor.execute('''
-                    SELECT e.employee_id, e.name, e.department, wsa.shift_type
-                    FROM employees e
-                    LEFT JOIN weekly_shift_assignments wsa ON e.employee_id = wsa.employee_id AND wsa.week_start = ?
-                    WHERE e.active = 1 AND e.department = 'Operativos'
-                    ORDER BY e.name
-                ''', (week_start,))
-            else:
-                cursor.execute('''
-                    SELECT employee_id, name, department, NULL as shift_type
-                    FROM employees 
-                    WHERE active = 1 AND department = 'Operativos'
-                    ORDER BY name
-                ''')
-        
-        technicians = cursor.fetchall()
-        conn.close()
-        
-        return jsonify([{
-            'employee_id': tech[0],
-            'name': tech[1],
-            'department': tech[2],
-            'assigned_shift': tech[3] if len(tech) > 3 else None
-        } for tech in technicians])
+        return jsonify(system.technicians(system.get_employees(use_cache=False), week_start))
         
     except Exception as e:
-        conn.close()
         return jsonify({'error': str(e)})
 
 @app.route('/api/schedules/weekly-report')
@@ -2270,58 +2151,20 @@ def api_weekly_schedule_report():
     if not week_start:
         return jsonify({'error': 'Fecha de inicio de semana requerida'})
     
-    try:
-        conn = system.get_connection()
-        cursor = conn.cursor()
-        
+    def build():
         from datetime import datetime, timedelta
         week_start_date = datetime.strptime(week_start, '%Y-%m-%d').date()
         week_end_date = week_start_date + timedelta(days=6)
         
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT e.employee_id, e.name, e.department, wsa.shift_type, wsa.start_time, wsa.end_time
-                FROM employees e
-                JOIN weekly_shift_assignments wsa ON e.employee_id = wsa.employee_id
-                WHERE e.active = true AND wsa.week_start = %s
-                ORDER BY wsa.shift_type, e.name
-            ''', (week_start_date,))
-        else:
-            cursor.execute('''
-                SELECT e.employee_id, e.name, e.department, wsa.shift_type, wsa.start_time, wsa.end_time
-                FROM employees e
-                JOIN weekly_shift_assignments wsa ON e.employee_id = wsa.employee_id
-                WHERE e.active = 1 AND wsa.week_start = ?
-                ORDER BY wsa.shift_type, e.name
-            ''', (week_start_date,))
-        
-        schedules = cursor.fetchall()
-        conn.close()
-        
-        # Agrupar por turno
-        report = {
+        # Agrupado por turno desde el mapa de la semana
+        return {
             'week_start': week_start,
             'week_end': week_end_date.strftime('%Y-%m-%d'),
-            'shifts': {
-                'mañana': [],
-                'tarde': [],
-                'noche': []
-            }
+            'shifts': system.week_shifts(system.get_employees(use_cache=False), week_start_date)
         }
-        
-        for schedule in schedules:
-            emp_id, name, dept, shift, start_time, end_time = schedule
-            if shift in report['shifts']:
-                report['shifts'][shift].append({
-                    'employee_id': emp_id,
-                    'name': name,
-                    'department': dept,
-                    'start_time': str(start_time),
-                    'end_time': str(end_time)
-                })
-        
-        return jsonify(report)
-        
+    
+    try:
+        return response_cache.respond(request, ['shifts', 'employees'], build)
     except Exception as e:
         return jsonify({'error': str(e)})
 
@@ -2337,32 +2180,10 @@ def api_export_schedule_pdf():
     
     try:
         # Obtener datos del reporte
-        conn = system.get_connection()
-        cursor = conn.cursor()
-        
         from datetime import datetime, timedelta
         week_start_date = datetime.strptime(week_start, '%Y-%m-%d').date()
         week_end_date = week_start_date + timedelta(days=6)
-        
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT e.employee_id, e.name, e.department, wsa.shift_type, wsa.start_time, wsa.end_time
-                FROM employees e
-                JOIN weekly_shift_assignments wsa ON e.employee_id = wsa.employee_id
-                WHERE e.active = true AND wsa.week_start = %s
-                ORDER BY wsa.shift_type, e.name
-            ''', (week_start_date,))
-        else:
-            cursor.execute('''
-                SELECT e.employee_id, e.name, e.department, wsa.shift_type, wsa.start_time, wsa.end_time
-                FROM employees e
-                JOIN weekly_shift_assignments wsa ON e.employee_id = wsa.employee_id
-                WHERE e.active = 1 AND wsa.week_start = ?
-                ORDER BY wsa.shift_type, e.name
-            ''', (week_start_date,))
-        
-        schedules = cursor.fetchall()
-        conn.close()
+        week = system.week_shifts(system.get_employees(use_cache=False), week_start_date)
         
         # Crear PDF
         buffer = io.BytesIO()
@@ -2375,12 +2196,9 @@ def api_export_schedule_pdf():
         story.append(title)
         story.append(Spacer(1, 20))
         
-        # Agrupar por turno
-        shifts = {'mañana': [], 'tarde': [], 'noche': []}
-        for schedule in schedules:
-            emp_id, name, dept, shift, start_time, end_time = schedule
-            if shift in shifts:
-                shifts[shift].append([name, dept, f"{start_time} - {end_time}"])
+        # Filas por turno
+        shifts = {shift: [[emp['name'], emp['department'], f"{emp['start_time']} - {emp['end_time']}"] for emp in employees]
+                  for shift, employees in week.items()}
         
         # Crear tablas por turno
         shift_names = {'mañana': 'TURNO MAÑANA (06:00 - 14:00)', 'tarde': 'TURNO TARDE (14:00 - 21:00)', 'noche': 'TURNO NOCHE (22:00 - 06:00)'}
@@ -2428,33 +2246,16 @@ def api_export_schedule_pdf():
 
 @app.route('/api/schedules')
 def api_get_schedules():
-    conn = system.get_connection()
-    cursor = conn.cursor()
-    
-    try:
-        if system.db_type == 'postgresql':
-            cursor.execute('''
-                SELECT es.employee_id, e.name, es.schedule_type, es.shift_type, 
-                       es.start_time, es.end_time, es.days_of_week, es.active_from, es.active_until
-                FROM employee_schedules es
-                JOIN employees e ON es.employee_id = e.employee_id
-                WHERE e.active = true
-                ORDER BY e.name
-            ''')
-        else:
-            cursor.execute('''
-                SELECT es.employee_id, e.name, es.schedule_type, es.shift_type, 
-                       es.start_time, es.end_time, es.days_of_week, es.active_from, es.active_until
-                FROM employee_schedules es
-                JOIN employees e ON es.employee_id = e.employee_id
-                WHERE e.active = 1
-                ORDER BY e.name
-            ''')
-        
-        schedules = cursor.fetchall()
-        conn.close()
+    def build():
+        conn = system.get_connection()
+        cursor = conn.cursor()
+        try:
+            system.queries.run(cursor, 'schedules.active')
+            schedules = cursor.fetchall()
+        finally:
+            conn.close()
         
-        return jsonify([{
+        return [{
             'employee_id': schedule[0],
             'name': schedule[1],
             'schedule_type': schedule[2],
@@ -2464,10 +2265,11 @@ def api_get_schedules():
             'days_of_week': schedule[6],
             'active_from': str(schedule[7]) if schedule[7] else None,
             'active_until': str(schedule[8]) if schedule[8] else None
-        } for schedule in schedules])
-        
+        } for schedule in schedules]
+    
+    try:
+        return response_cache.respond(request, ['schedules', 'employees'], build)
     except Exception as e:
-        conn.close()
         return jsonify({'error': str(e)})
 
 @app.route('/api/reports/monthly')
@@ -2479,40 +2281,16 @@ def api_monthly_report():
     if not month:
         return jsonify({'error': 'Mes requerido (formato YYYY-MM)'})
     
-    try:
+    def build():
         conn = system.get_connection()
         cursor = conn.cursor()
         
-        # Construir consulta
-        if system.db_type == 'postgresql':
-            base_query = '''
-                SELECT e.employee_id, e.name, e.department, e.schedule,
-                       ds.date, ds.first_entry, ds.last_exit, ds.total_hours, 
-                       ds.worked_day, ds.is_weekend, ds.is_holiday
-                FROM employees e
-                LEFT JOIN daily_summaries ds ON e.employee_id = ds.employee_id
-                WHERE e.active = true AND DATE_TRUNC('month', ds.date) = %s::date
-            '''
-            params = [month + '-01']
-        else:
-            base_query = '''
-                SELECT e.employee_id, e.name, e.department, e.schedule,
-                       ds.date, ds.first_entry, ds.last_exit, ds.total_hours, 
-                       ds.worked_day, ds.is_weekend, ds.is_holiday
-                FROM employees e
-                LEFT JOIN daily_summaries ds ON e.employee_id = ds.employee_id
-                WHERE e.active = 1 AND strftime('%Y-%m', ds.date) = ?
-            '''
-            params = [month]
-        
+        # Rango del mes [inicio, inicio del mes siguiente)
+        month_start, next_month_start = month_bounds(month)
         if employee_id:
-            base_query += ' AND e.employee_id = {}'
-            base_query = base_query.format('%s' if system.db_type == 'postgresql' else '?')
-            params.append(employee_id)
-        
-        base_query += ' ORDER BY e.name, ds.date'
-        
-        cursor.execute(base_query, params)
+            system.queries.run(cursor, 'reports.monthly_employee', (month_start, next_month_start, employee_id))
+        else:
+            system.queries.run(cursor, 'reports.monthly', (month_start, next_month_start))
         records = cursor.fetchall()
         conn.close()
         
@@ -2556,8 +2334,10 @@ def api_monthly_report():
                 if holiday:
                     monthly_data[emp_id]['holiday_days'] += 1
         
-        return jsonify(monthly_data)
-        
+        return monthly_data
+    
+    try:
+        return response_cache.respond(request, [f'summaries:{month}', 'employees'], build)
     except Exception as e:
         return jsonify({'error': str(e)})
 
@@ -2569,73 +2349,98 @@ def api_monthly_summary():
     if not month:
         return jsonify({'error': 'Mes requerido (formato YYYY-MM)'})
     
-    try:
+    def build():
         conn = system.get_connection()
         cursor = conn.cursor()
         
         # Obtener todos los empleados activos
-        if system.db_type == 'postgresql':
-            cursor.execute('SELECT employee_id, name, department FROM employees WHERE active = true ORDER BY name')
-        else:
-            cursor.execute('SELECT employee_id, name, department FROM employees WHERE active = 1 ORDER BY name')
-        
+        system.queries.run(cursor, 'employees.active')
         employees = cursor.fetchall()
         
-        # Calcular días laborables del mes (excluyendo fines de semana)
-        year, month_num = map(int, month.split('-'))
-        import calendar
-        
-        # Contar días laborables (L-V)
-        work_days = 0
-        for day in range(1, calendar.monthrange(year, month_num)[1] + 1):
-            weekday = calendar.weekday(year, month_num, day)
-            if weekday < 5:  # L-V (0-4)
-                work_days += 1
+        # Días trabajados de todos los empleados en una consulta: bits por día del mes y horas
+        month_start, next_month_start = month_bounds(month)
+        system.queries.run(cursor, 'summaries.worked_days', (month_start, next_month_start))
+        worked = {}
+        for emp_id, day, hours in cursor.fetchall():
+            mask, total = worked.get(emp_id, (0, 0))
+            worked[emp_id] = (mask | 1 << (int(str(day)[8:10]) - 1), total + (float(hours) if hours else 0))
+        conn.close()
         
+        # Días laborables del calendario de cada departamento (festivos excluidos); ausente: laborable sin trabajar
         summary_data = []
-        
         for emp_id, name, department in employees:
-            # Obtener resumen del empleado para el mes
-            if system.db_type == 'postgresql':
-                cursor.execute('''
-                    SELECT COUNT(*) as days_present, COALESCE(SUM(total_hours), 0) as total_hours
-                    FROM daily_summaries 
-                    WHERE employee_id = %s AND DATE_TRUNC('month', date) = %s::date AND worked_day = true
-                ''', (emp_id, month + '-01'))
-            else:
-                cursor.execute('''
-                    SELECT COUNT(*) as days_present, COALESCE(SUM(total_hours), 0) as total_hours
-                    FROM daily_summaries 
-                    WHERE employee_id = ? AND strftime('%Y-%m', date) = ? AND worked_day = 1
-                ''', (emp_id, month))
-            
-            result = cursor.fetchone()
-            days_present = result[0] if result else 0
-            total_hours = round(float(result[1]) if result and result[1] else 0, 2)
-            days_absent = work_days - days_present
+            month_calendar = system.work_calendar.for_department(department, month)
+            present_mask, total_hours = worked.get(emp_id, (0, 0))
             
             summary_data.append({
                 'employee_id': emp_id,
                 'name': name,
                 'department': department,
-                'days_present': days_present,
-                'days_absent': max(0, days_absent),
-                'total_hours': total_hours
+                'work_days': month_calendar.work_days(),
+                'days_present': present_mask.bit_count(),
+                'days_absent': month_calendar.work_days(~present_mask),
+                'total_hours': round(total_hours, 2)
             })
         
-        conn.close()
-        
-        return jsonify({
+        return {
             'month': month,
-            'work_days': work_days,
+            'work_days': system.work_calendar.for_department('General', month).work_days(),
             'employees': summary_data,
             'totals': {
                 'total_employees': len(summary_data),
                 'total_hours': sum(emp['total_hours'] for emp in summary_data),
                 'avg_days_present': round(sum(emp['days_present'] for emp in summary_data) / len(summary_data), 1) if summary_data else 0
             }
-        })
+        }
+    
+    try:
+        return response_cache.respond(request, [f'summaries:{month}', 'employees', 'holidays', 'schedule_rules'], build)
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/reports/presence-stats')
+def api_presence_stats():
+    """Días presente, ausente en días hábiles y presente en festivos por empleado en un año (índice de bits)"""
+    try:
+        year = int(request.args.get('year', datetime.now().year))
+    except ValueError:
+        return jsonify({'error': 'Año inválido (formato YYYY)'})
+    department = request.args.get('department')
+    today = datetime.now().date()
+    
+    def build():
+        bits = system.presence_bitmap.year(year)
+        
+        # Del año en curso solo cuentan como ausencia los días hábiles hasta ayer (hoy aún pueden marcar)
+        elapsed = -1 if year < today.year else 0 if year > today.year else (1 << (today.timetuple().tm_yday - 1)) - 1
+        
+        masks = {}
+        employees = []
+        for employee in system.get_employees(use_cache=False):
+            if not employee['active'] or department and employee['department'] != department:
+                continue
+            if employee['department'] not in masks:
+                rules = system.schedule_rules.rules_for(employee['department'])
+                masks[employee['department']] = system.work_calendar.year_masks(rules, year)
+            work_mask, holiday_mask = masks[employee['department']]
+            employees.append(dict(presence_counts(bits.get(employee['employee_id'], 0), work_mask, holiday_mask, elapsed),
+                                  employee_id=employee['employee_id'], name=employee['name'], department=employee['department']))
+        
+        departments = {}
+        for emp in employees:
+            totals = departments.setdefault(emp['department'], {'employees': 0, 'days_present': 0, 'absent_work_days': 0,
+                                                                'present_holidays': 0, 'present_non_work_days': 0})
+            totals['employees'] += 1
+            for key in ('days_present', 'absent_work_days', 'present_holidays', 'present_non_work_days'):
+                totals[key] += emp[key]
         
+        return {'year': year, 'department': department, 'employees': employees, 'departments': departments}
+    
+    try:
+        names = [f'summaries:{year:04d}-{month_num:02d}' for month_num in range(1, 13)]
+        # El año en curso cambia con la fecha (días transcurridos) aunque no cambie ningún resumen
+        return response_cache.respond(request, names + ['employees', 'holidays', 'schedule_rules'], build,
+                                      extra=today.isoformat() if year == today.year else None)
     except Exception as e:
         return jsonify({'error': str(e)})
 
@@ -2645,12 +2450,10 @@ def api_delete_schedule(employee_id):
     cursor = conn.cursor()
     
     try:
-        if system.db_type == 'postgresql':
-            cursor.execute('DELETE FROM employee_schedules WHERE employee_id = %s', (employee_id,))
-        else:
-            cursor.execute('DELETE FROM employee_schedules WHERE employee_id = ?', (employee_id,))
+        system.queries.run(cursor, 'schedules.delete_employee', (employee_id,))
         
         if cursor.rowcount > 0:
+            system.data_versions.bump(cursor, 'schedules')
             conn.commit()
             conn.close()
             return jsonify({'success': True, 'message': 'Horario eliminado exitosamente'})
@@ -2662,6 +2465,35 @@ def api_delete_schedule(employee_id):
         conn.close()
         return jsonify({'success': False, 'message': f'Error: {str(e)}'})
 
+@app.route('/api/schedules/<employee_id>/shifts/<week_start>', methods=['DELETE'])
+def api_delete_shift_assignment(employee_id, week_start):
+    """Quitar el turno semanal de un empleado (week_start: cualquier día de la semana)"""
+    try:
+        week_start = shift_week_start(week_start)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Semana inválida (formato YYYY-MM-DD)'})
+    
+    conn = system.get_connection()
+    cursor = conn.cursor()
+    
+    try:
+        system.queries.run(cursor, 'shifts.delete_week', (employee_id, week_start))
+        
+        if cursor.rowcount > 0:
+            system.data_versions.bump(cursor, 'shifts')
+            conn.commit()
+            conn.close()
+            system.invalidate_shifts([week_start])
+            system.invalidate_dashboard_state()  # Salas por turno
+            return jsonify({'success': True, 'message': f'Turno de la semana {week_start} eliminado'})
+        else:
+            conn.close()
+            return jsonify({'success': False, 'message': 'Turno no encontrado'})
+            
+    except Exception as e:
+        conn.close()
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'})
+
 if __name__ == '__main__':
     print("SISTEMA DE ASISTENCIA OPTIMIZADO")
     print("=" * 50)
@@ -0,0 +1,107 @@
+"""Protocolo de deltas del dashboard: época, secuencia, huecos y registro acotado"""
+import json
+
+from dashboard_state import DashboardState
+
+WORKDAY = '2026-10-19'
+
+
+def state_data(epoch='e1', version=0):
+    return {
+        'epoch': epoch, 'version': version, 'workday': WORKDAY,
+        'last_punch': {}, 'punch_counts': {}, 'reader_punches': {},
+        'employees': [['E1', 'Uno', None, None], ['E2', 'Dos', None, None]],
+        'departments': {'E1': 'Operativos', 'E2': 'Logistica'},
+        'shifts': {'E1': 'mañana'},
+        'recent': [], 'on_break': [], 'break_done': {}, 'lunch_done': {},
+        'late_alerts': [], 'room_versions': {}
+    }
+
+
+def make_state(delta_log_size=100, **kwargs):
+    state = DashboardState(json.dumps, delta_log_size=delta_log_size)
+    state.load_state(state_data(**kwargs))
+    return state
+
+
+def punch(state, employee_id, minute, event_type='entrada', department='Operativos'):
+    return state.apply_punch(employee_id, 'Nombre', department, event_type,
+                             f'{WORKDAY} 08:{minute:02d}:00', 'huella', reader_no=1)
+
+
+def test_punches_advance_global_and_room_sequences():
+    state = make_state()
+    first = punch(state, 'E1', 0)
+    second = punch(state, 'E2', 1, department='Logistica')
+    assert (first['epoch'], first['seq'], second['seq']) == ('e1', 1, 2)
+    assert first['rooms'] == {'all': 1, 'dept:Operativos': 1, 'shift:mañana': 1, 'reader:1': 1}
+    assert second['rooms'] == {'all': 2, 'dept:Logistica': 1, 'reader:1': 2}
+    assert second['total_records'] == 2
+
+
+def test_stale_or_duplicate_punches_do_not_emit():
+    state = make_state()
+    assert punch(state, 'E1', 5)['seq'] == 1
+    assert punch(state, 'E1', 5) is None  # Ya incluido
+    assert punch(state, 'E1', 4) is None
+    assert state.apply_punch('E1', 'Uno', 'Operativos', 'entrada', '2026-10-18 23:00:00', 'huella') is None
+    state.invalidate()
+    assert punch(state, 'E1', 6) is None
+    assert state.version == 1
+
+
+def test_deltas_since_replays_or_asks_for_snapshot():
+    state = make_state()
+    for minute in range(3):
+        punch(state, 'E1', minute)
+    assert [delta['seq'] for delta in state.deltas_since(0, 'e1')] == [1, 2, 3]
+    assert [delta['seq'] for delta in state.deltas_since(2, 'e1')] == [3]
+    assert state.deltas_since(3, 'e1') == []
+    assert state.deltas_since(1, 'otra') is None  # Otra época: snapshot
+    assert state.deltas_since(4, 'e1') is None  # Del futuro
+    assert state.deltas_since(None, 'e1') is None
+
+
+def test_bounded_log_forces_snapshot_for_old_clients():
+    state = make_state(delta_log_size=3)
+    for minute in range(5):
+        punch(state, 'E1', minute)
+    assert state.deltas_since(1, 'e1') is None
+    assert [delta['seq'] for delta in state.deltas_since(2, 'e1')] == [3, 4, 5]
+
+    reply = state.sync_reply(1, 'e1', True, False)
+    assert 'snapshot' in reply and reply['seq'] == 5
+    reply = state.sync_reply(4, 'e1', True, False)
+    assert [delta['seq'] for delta in reply['deltas']] == [5]
+
+
+def test_follower_applies_only_the_next_delta_of_its_epoch():
+    leader = make_state()
+    follower = make_state()
+    deltas = [punch(leader, 'E1', 0), punch(leader, 'E2', 1, department='Logistica'), punch(leader, 'E1', 2, 'salida')]
+    deltas = json.loads(json.dumps(deltas))  # Como llegan por Redis
+
+    assert not follower.apply_remote(deltas[1])  # Hueco: pedir estado
+    assert follower.version == 0
+    assert follower.apply_remote(deltas[0])
+    assert not follower.apply_remote(deltas[0])  # Repetido
+    assert follower.apply_remote(deltas[1])
+    assert follower.apply_remote(deltas[2])
+    assert follower.version == 3
+    assert follower.room_versions == leader.room_versions
+    assert follower.snapshot(True, False) == leader.snapshot(True, False)
+
+    other = make_state(epoch='e2')
+    assert not other.apply_remote(deltas[0])
+
+
+def test_follower_catches_up_from_exported_state():
+    leader = make_state()
+    punch(leader, 'E1', 0)
+    follower = DashboardState(json.dumps)
+    follower.load_state(json.loads(json.dumps(leader.export_state())))
+    delta = json.loads(json.dumps(punch(leader, 'E2', 1, department='Logistica')))
+    assert follower.apply_remote(delta)
+    assert (follower.epoch, follower.version) == ('e1', 2)
+    assert follower.deltas_since(0, 'e1') is None  # Registro desde la copia, no desde 0
+    assert [d['seq'] for d in follower.deltas_since(1, 'e1')] == [2]
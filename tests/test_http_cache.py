@@ -0,0 +1,93 @@
+"""ResponseCache: ETag, 304 y cuerpos comprimidos por codificación"""
+import gzip
+import json
+from types import SimpleNamespace
+
+from http_cache import MIN_COMPRESS_BYTES, ResponseCache
+
+
+class FakeVersions:
+    def __init__(self):
+        self.versions = {}
+
+    def read(self, names):
+        return [(name, self.versions.get(name, 0), 0.0) for name in names]
+
+
+def response(body=None, status=200, mimetype=None, headers=None):
+    return SimpleNamespace(body=body, status=status, headers=headers or {})
+
+
+def request(accept_encoding=None, if_none_match=None, path='/api/x?'):
+    headers = {}
+    if accept_encoding:
+        headers['Accept-Encoding'] = accept_encoding
+    if if_none_match:
+        headers['If-None-Match'] = if_none_match
+    return SimpleNamespace(full_path=path, headers=headers)
+
+
+def make_cache():
+    return ResponseCache(FakeVersions(), json.dumps, response)
+
+
+def large_payload():
+    return {'rows': [{'id': i, 'name': f'Empleado {i}'} for i in range(2000)]}
+
+
+def test_large_body_compressed_after_uncompressed_request():
+    cache = make_cache()
+    plain = cache.respond(request(), ['employees'], large_payload)
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.body) > MIN_COMPRESS_BYTES
+
+    compressed = cache.respond(request('gzip'), ['employees'], large_payload)
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.body)) == large_payload()
+
+
+def test_large_body_uncompressed_after_compressed_request():
+    cache = make_cache()
+    compressed = cache.respond(request('gzip'), ['employees'], large_payload)
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+
+    plain = cache.respond(request(), ['employees'], large_payload)
+    assert 'Content-Encoding' not in plain.headers
+    assert json.loads(plain.body) == large_payload()
+
+
+def test_small_body_built_once_for_every_encoding():
+    cache = make_cache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {'ok': True}
+
+    for accept_encoding in ('gzip', None, 'gzip, br', 'gzip'):
+        result = cache.respond(request(accept_encoding), ['employees'], build)
+        assert 'Content-Encoding' not in result.headers
+        assert json.loads(result.body) == {'ok': True}
+    assert len(builds) == 1
+    assert cache.stats['hits'] == 3
+
+
+def test_not_modified_until_version_changes():
+    cache = make_cache()
+    first = cache.respond(request(), ['employees'], lambda: {'v': 1})
+    etag = first.headers['ETag']
+
+    assert cache.respond(request(if_none_match=etag), ['employees'], lambda: {'v': 1}).status == 304
+
+    cache.versions.versions['employees'] = 1
+    changed = cache.respond(request(if_none_match=etag), ['employees'], lambda: {'v': 2})
+    assert changed.status == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_extra_changes_etag_and_drops_last_modified():
+    cache = make_cache()
+    today = cache.respond(request(), ['summaries:2026-10'], lambda: {}, extra='2026-10-19')
+    tomorrow = cache.respond(request(), ['summaries:2026-10'], lambda: {}, extra='2026-10-20')
+    assert today.headers['ETag'] != tomorrow.headers['ETag']
+    assert 'Last-Modified' not in today.headers
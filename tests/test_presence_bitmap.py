@@ -0,0 +1,102 @@
+"""Índice de presencia en bits: máscaras del año, conteos y recarga por mes"""
+import sqlite3
+from datetime import date
+
+import pytest
+
+from presence_bitmap import PresenceBitmap, counts, month_mask, year_offset
+from query_registry import QueryRegistry
+from schedule_rules import ScheduleRules
+from schema_migrations import SchemaMigrator
+from work_calendar import WorkCalendar
+
+
+class FakeVersions:
+    def __init__(self):
+        self.versions = {}
+
+    def read(self, names):
+        return [(name, self.versions.get(name, 0), 0.0) for name in names]
+
+    def bump(self, name):
+        self.versions[name] = self.versions.get(name, 0) + 1
+
+
+def bits(*days):
+    value = 0
+    for day in days:
+        value |= 1 << year_offset(day)
+    return value
+
+
+def test_month_masks_partition_the_year():
+    for year in (2026, 2028):
+        masks = [month_mask(year, month_num) for month_num in range(1, 13)]
+        assert sum(mask.bit_count() for mask in masks) == (366 if year == 2028 else 365)
+        combined = 0
+        for mask in masks:
+            assert combined & mask == 0
+            combined |= mask
+    assert month_mask(2026, 3) & bits(date(2026, 3, 1), date(2026, 3, 31)) == bits(date(2026, 3, 1), date(2026, 3, 31))
+    assert month_mask(2026, 3) & bits(date(2026, 2, 28), date(2026, 4, 1)) == 0
+
+
+def test_counts_with_calendar_masks():
+    calendar = WorkCalendar(ScheduleRules(None, None, None), None, None, None)
+    calendar.holidays = {date(2026, 10, 12): 'Feriado'}  # Lunes
+    rules = calendar.schedule_rules.rules_for('Administracion')
+    work_mask, holiday_mask = calendar.year_masks(rules, 2026)
+
+    # Presente el festivo, martes 13, sábado 17; transcurrido hasta el viernes 16
+    present = bits(date(2026, 10, 12), date(2026, 10, 13), date(2026, 10, 17))
+    elapsed = bits(*(date(2026, 10, day) for day in range(12, 17)))
+    assert counts(present, work_mask, holiday_mask, elapsed) == {
+        'days_present': 3,
+        'work_days': 4,  # Lunes festivo fuera
+        'absent_work_days': 3,
+        'present_holidays': 1,
+        'present_non_work_days': 2  # Festivo y sábado
+    }
+    assert counts(0, work_mask, holiday_mask)['work_days'] == work_mask.bit_count()
+
+
+@pytest.fixture
+def bitmap(tmp_path):
+    db_path = str(tmp_path / 'attendance.db')
+    SchemaMigrator(lambda: sqlite3.connect(db_path), 'sqlite').migrate()
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO daily_summaries (employee_id, date, total_hours, worked_day) VALUES (?, ?, ?, ?)', [
+        ('E1', '2026-01-02', 8, 1), ('E1', '2026-03-10', 8, 1), ('E1', '2026-03-11', 0, 0),
+        ('E2', '2026-03-10', 4, 1), ('E1', '2025-12-31', 8, 1)
+    ])
+    conn.commit()
+    conn.close()
+    versions = FakeVersions()
+    return PresenceBitmap(lambda: sqlite3.connect(db_path), QueryRegistry('sqlite'), versions, max_years=2), \
+        versions, db_path
+
+
+def test_year_loads_once_and_reloads_changed_months(bitmap):
+    presence, versions, db_path = bitmap
+    assert presence.year(2026) == {'E1': bits(date(2026, 1, 2), date(2026, 3, 10)), 'E2': bits(date(2026, 3, 10))}
+    assert presence.year(2026)['E1'] == bits(date(2026, 1, 2), date(2026, 3, 10))
+    assert presence.stats == {'year_loads': 1, 'month_reloads': 0}
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE daily_summaries SET worked_day = 1 WHERE date = '2026-03-11'")
+    conn.execute("UPDATE daily_summaries SET worked_day = 0 WHERE employee_id = 'E2'")
+    conn.commit()
+    conn.close()
+    versions.bump('summaries:2026-03')
+
+    assert presence.year(2026) == {'E1': bits(date(2026, 1, 2), date(2026, 3, 10), date(2026, 3, 11)), 'E2': 0}
+    assert presence.stats == {'year_loads': 1, 'month_reloads': 1}
+
+
+def test_cache_keeps_max_years(bitmap):
+    presence, _, _ = bitmap
+    presence.year(2024)
+    presence.year(2025)
+    presence.year(2026)
+    assert sorted(presence._years) == [2025, 2026]
+    assert presence.year(2025) == {'E1': bits(date(2025, 12, 31))}
@@ -0,0 +1,71 @@
+"""Paginación por keyset de /api/records: (timestamp, id) descendente sin huecos ni repetidos"""
+import sqlite3
+
+import pytest
+
+from query_registry import QueryRegistry, records_query_name
+from schema_migrations import SchemaMigrator
+
+DAY_RANGE = ('2026-10-19', '2026-10-20')
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    db_path = str(tmp_path / 'attendance.db')
+    SchemaMigrator(lambda: sqlite3.connect(db_path), 'sqlite').migrate()
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO employees (employee_id, name, department) VALUES (?, ?, ?)',
+                     [('E1', 'Uno', 'Operativos'), ('E2', 'Dos', 'Logistica')])
+    rows = []
+    for minute in range(30):
+        # Varios marcajes por segundo: el id desempata
+        for employee_id in ('E1', 'E2', 'E1'):
+            event_type = 'entrada' if minute % 2 else 'salida'
+            rows.append((employee_id, event_type, f'2026-10-19 08:{minute:02d}:00', 1 if employee_id == 'E1' else 2))
+    rows.append(('E1', 'entrada', '2026-10-18 23:59:59', 1))  # Otro día
+    conn.executemany('INSERT INTO attendance_records (employee_id, event_type, timestamp, reader_no) VALUES (?, ?, ?, ?)',
+                     rows)
+    conn.commit()
+    yield conn.cursor()
+    conn.close()
+
+
+def read_all(cursor, queries, filters, limit):
+    """Recorrer las páginas como read_records_page: una fila de más indica si hay siguiente"""
+    names = [name for name, _ in filters]
+    values = tuple(value for _, value in filters)
+    pages = []
+    cursor_key = None
+    while True:
+        if cursor_key:
+            queries.run(cursor, records_query_name('page_after', names), DAY_RANGE + values + cursor_key + (limit + 1,))
+        else:
+            queries.run(cursor, records_query_name('page', names), DAY_RANGE + values + (limit + 1,))
+        rows = cursor.fetchall()
+        pages.append(rows[:limit])
+        if len(rows) <= limit:
+            return pages
+        cursor_key = (rows[limit - 1][5], rows[limit - 1][0])
+
+
+@pytest.mark.parametrize('limit', [1, 7, 90, 200])
+def test_pages_cover_the_day_in_order(cursor, limit):
+    queries = QueryRegistry('sqlite')
+    pages = read_all(cursor, queries, [], limit)
+    records = [row for page in pages for row in page]
+    assert all(len(page) <= limit for page in pages)
+    assert len(records) == 90
+    assert len({row[0] for row in records}) == 90
+    keys = [(row[5], row[0]) for row in records]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_apply_to_every_page(cursor):
+    queries = QueryRegistry('sqlite')
+    filters = [('event_type', 'entrada'), ('reader_no', 1)]
+    records = [row for page in read_all(cursor, queries, filters, 4) for row in page]
+    assert len(records) == 30
+    assert {(row[1], row[4], row[7]) for row in records} == {('E1', 'entrada', 1)}
+
+    queries.run(cursor, records_query_name('page_count', ['event_type', 'reader_no']), DAY_RANGE + ('entrada', 1))
+    assert cursor.fetchone()[0] == 30
@@ -0,0 +1,41 @@
+"""Reglas compiladas de schedule_rules.py y pendientes de break/almuerzo derivados de ellas"""
+from dashboard_state import BreakTracker
+from schedule_rules import ScheduleRules
+
+
+def default_rules():
+    return ScheduleRules(None, None, None)
+
+
+def test_rules_for_ignores_accents_and_case():
+    rules = default_rules()
+    assert rules.rules_for('Administración').department == 'Administracion'
+    assert rules.rules_for('LOGÍSTICA').department == 'Logistica'
+
+
+def test_windows_give_break_and_lunch_eligibility():
+    rules = default_rules()
+    admin = rules.rules_for('Administracion')
+    assert (admin.has_break, admin.has_lunch) == (True, True)
+    night = rules.rules_for('Operativos', 'noche')
+    assert (night.has_break, night.has_lunch) == (True, False)
+    # Sin turno asignado no hay ventanas
+    unassigned = rules.rules_for('Operativos')
+    assert (unassigned.has_break, unassigned.has_lunch) == (False, False)
+
+
+def test_break_tracker_counts_accented_departments():
+    tracker = BreakTracker(default_rules().rules_for)
+    departments = {'A1': 'Administración', 'A2': 'Logistica', 'O1': 'Operativos', 'O2': 'Operativos'}
+    shifts = {'O1': 'mañana'}
+    tracker.load([], departments, shifts)
+    assert tracker.counters() == {
+        'breaks_completed': 0, 'breaks_pending': 3, 'lunch_completed': 0, 'lunch_pending': 2
+    }
+    assert tracker.counters({'A1'}) == {
+        'breaks_completed': 0, 'breaks_pending': 1, 'lunch_completed': 0, 'lunch_pending': 1
+    }
+
+    tracker.apply('A1', 'Ana', 'Administración', 'break_entrada', '2026-10-19 10:00:00')
+    assert tracker.counters({'A1', 'O2'})['breaks_pending'] == 0
+    assert tracker.counters()['breaks_pending'] == 2
@@ -0,0 +1,91 @@
+"""SchemaMigrator: orden por versión, dialecto, aplicación única y bloqueo entre procesos"""
+import sqlite3
+import threading
+
+import pytest
+
+from schema_migrations import SchemaMigrator
+
+
+def write(directory, filename, content):
+    (directory / filename).write_text(content, encoding='utf-8')
+
+
+def make_migrations(directory):
+    write(directory, '0010_tercera.sqlite.sql', "INSERT INTO log (step) VALUES ('0010');")
+    write(directory, '0002_segunda.py',
+          "def upgrade(cursor, db_type):\n"
+          "    cursor.execute(\"INSERT INTO log (step) VALUES ('0002 ' || ?)\", (db_type,))\n")
+    write(directory, '0001_primera.sqlite.sql',
+          "-- Tabla de registro de pasos\nCREATE TABLE log (id INTEGER PRIMARY KEY AUTOINCREMENT, step TEXT);")
+    write(directory, '0001_primera.postgresql.sql', 'CREATE TABLE log (id SERIAL PRIMARY KEY, step TEXT);')
+    write(directory, 'README.txt', 'no es una migración')
+
+
+def test_available_is_ordered_and_filtered_by_dialect(tmp_path):
+    make_migrations(tmp_path)
+    migrator = SchemaMigrator(None, 'sqlite', str(tmp_path))
+    assert [(version, name) for version, name, _ in migrator.available()] == [
+        (1, 'primera'), (2, 'segunda'), (10, 'tercera')
+    ]
+    assert migrator.available()[0][2].endswith('0001_primera.sqlite.sql')
+    assert migrator.latest_version() == 10
+
+
+def test_migrations_apply_once_in_order(tmp_path):
+    make_migrations(tmp_path)
+    db_path = str(tmp_path / 'attendance.db')
+    migrator = SchemaMigrator(lambda: sqlite3.connect(db_path), 'sqlite', str(tmp_path))
+    assert migrator.current_version() == 0
+    assert not migrator.ensure_current(auto_migrate=False)
+
+    assert migrator.migrate() == [1, 2, 10]
+    assert migrator.migrate() == []
+    assert migrator.ensure_current(auto_migrate=False)
+    assert migrator.pending() == []
+
+    conn = sqlite3.connect(db_path)
+    assert [row[0] for row in conn.execute('SELECT step FROM log ORDER BY id')] == ['0002 sqlite', '0010']
+    conn.close()
+
+
+def test_failed_migration_rolls_back_and_stops(tmp_path):
+    make_migrations(tmp_path)
+    write(tmp_path, '0003_rota.sqlite.sql', "INSERT INTO log (step) VALUES ('0003'); INSERT INTO no_existe VALUES (1);")
+    db_path = str(tmp_path / 'attendance.db')
+    migrator = SchemaMigrator(lambda: sqlite3.connect(db_path), 'sqlite', str(tmp_path))
+    with pytest.raises(sqlite3.OperationalError):
+        migrator.migrate()
+
+    assert migrator.current_version() == 2
+    conn = sqlite3.connect(db_path)
+    assert [row[0] for row in conn.execute('SELECT step FROM log ORDER BY id')] == ['0002 sqlite']
+    conn.close()
+
+
+def test_concurrent_migrators_apply_each_version_once(tmp_path):
+    db_path = str(tmp_path / 'attendance.db')
+    applied = []
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def run():
+        migrator = SchemaMigrator(lambda: sqlite3.connect(db_path, timeout=30), 'sqlite')
+        barrier.wait()
+        try:
+            applied.extend(migrator.migrate())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    latest = SchemaMigrator(None, 'sqlite').latest_version()
+    assert sorted(applied) == list(range(1, latest + 1))
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('SELECT COUNT(*), MAX(version) FROM schema_migrations').fetchone() == (latest, latest)
+    conn.close()
@@ -0,0 +1,85 @@
+"""TimingWheel: colocación por nivel, cascada y vencimiento exacto"""
+import random
+
+from timing_wheel import TimingWheel
+
+
+def make_wheel(levels=(4, 4, 2), start=0):
+    expired = []
+    clock = [start]
+    wheel = TimingWheel(lambda key, payload: expired.append((clock[0], key, payload)),
+                        tick=1, levels=levels, clock=lambda: clock[0])
+    return wheel, clock, expired
+
+
+def run_until(wheel, clock, end):
+    while clock[0] < end:
+        clock[0] += 1
+        wheel.advance()
+
+
+def test_place_uses_lowest_level_that_reaches_due():
+    wheel, _, _ = make_wheel()
+    wheel.schedule('near', 3)
+    wheel.schedule('minute', 9)
+    wheel.schedule('hour', 20)
+    wheel.schedule('beyond', 100)  # Más allá de 4 * 4 * 2 ticks
+    assert wheel._timers['near'][0] == 0
+    assert wheel._timers['minute'][0] == 1
+    assert wheel._timers['hour'][0] == 2
+    assert wheel._timers['beyond'][0] == 2
+    assert len(wheel) == 4
+
+
+def test_timers_expire_on_their_tick_after_cascading():
+    wheel, clock, expired = make_wheel()
+    wheel.schedule('a', 9, 'datos')
+    wheel.schedule('b', 20)
+    wheel.schedule('c', 100)
+    run_until(wheel, clock, 120)
+    assert expired == [(9, 'a', 'datos'), (20, 'b', None), (100, 'c', None)]
+    assert wheel.stats['cascaded'] > 0
+    assert len(wheel) == 0
+
+
+def test_past_deadline_expires_on_next_tick():
+    wheel, clock, expired = make_wheel(start=50)
+    wheel.schedule('late', 10)
+    run_until(wheel, clock, 51)
+    assert expired == [(51, 'late', None)]
+
+
+def test_reschedule_and_cancel():
+    wheel, clock, expired = make_wheel()
+    wheel.schedule('x', 5)
+    wheel.schedule('x', 30)
+    wheel.schedule('y', 7)
+    assert wheel.cancel('y')
+    assert not wheel.cancel('y')
+    run_until(wheel, clock, 40)
+    assert expired == [(30, 'x', None)]
+
+
+def test_random_deadlines_expire_exactly_once_in_order():
+    rng = random.Random(7)
+    wheel, clock, expired = make_wheel(levels=(8, 6, 3), start=13)
+    due = {key: rng.randint(14, 600) for key in range(300)}
+    for key, deadline in due.items():
+        wheel.schedule(key, deadline)
+    # Algunos se programan con la rueda ya en marcha
+    run_until(wheel, clock, 100)
+    for key in range(300, 350):
+        due[key] = rng.randint(101, 700)
+        wheel.schedule(key, due[key])
+    run_until(wheel, clock, 800)
+
+    assert sorted(key for _, key, _ in expired) == sorted(due)
+    assert all(tick == due[key] for tick, key, _ in expired)
+
+
+def test_advance_jumps_several_ticks():
+    wheel, clock, expired = make_wheel()
+    wheel.schedule('a', 3)
+    wheel.schedule('b', 27)
+    assert wheel.advance(now=30) == 2
+    assert [key for _, key, _ in expired] == ['a', 'b']
@@ -0,0 +1,63 @@
+"""Día laboral de los turnos que cruzan la medianoche: reglas y relleno de la migración 0010"""
+import os
+import sqlite3
+
+from schedule_rules import ScheduleRules
+from schema_migrations import MIGRATIONS_DIR, SchemaMigrator
+
+
+def test_night_rule_crosses_midnight():
+    rules = ScheduleRules(None, None, None)
+    night = rules.rules_for('Operativos', 'noche')
+    assert night.overnight
+    assert night.workday_cutoff == '14:00'  # Mitad de las horas libres entre las 06:00 y las 22:00
+    morning = rules.rules_for('Operativos', 'mañana')
+    assert not morning.overnight
+    assert morning.workday_cutoff == '00:00'
+
+
+def migrate(db_path, directory):
+    return SchemaMigrator(lambda: sqlite3.connect(db_path), 'sqlite', directory).migrate()
+
+
+def test_backfill_moves_only_night_shift_early_punches(tmp_path):
+    db_path = str(tmp_path / 'attendance.db')
+    # Esquema anterior a 0010 con marcajes sin workday
+    before = tmp_path / 'before'
+    before.mkdir()
+    for filename in os.listdir(MIGRATIONS_DIR):
+        if filename[:4].isdigit() and int(filename[:4]) < 10:
+            os.symlink(os.path.join(MIGRATIONS_DIR, filename), before / filename)
+    migrate(db_path, str(before))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO employees (employee_id, name, department) VALUES (?, ?, ?)', [
+        ('N1', 'Noche luego mañana', 'Operativos'),
+        ('N2', 'Noche sin turno después', 'Operativos'),
+        ('A1', 'Administrativo', 'Administración')
+    ])
+    conn.executemany('''
+        INSERT INTO weekly_shift_assignments (employee_id, week_start, week_end, shift_type, start_time, end_time)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [
+        ('N1', '2026-10-12', '2026-10-18', 'noche', '22:00', '06:00'),
+        ('N1', '2026-10-19', '2026-10-25', 'mañana', '06:00', '14:00'),
+        ('N2', '2026-10-12', '2026-10-18', 'noche', '22:00', '06:00')
+    ])
+    punches = [
+        ('N1', 'salida', '2026-10-14 05:58:00'),   # Turno del 13
+        ('N1', 'entrada', '2026-10-19 05:55:00'),  # Lunes de mañana tras la semana de noche
+        ('N1', 'salida', '2026-10-19 14:02:00'),
+        ('N2', 'salida', '2026-10-19 05:50:00'),   # Cierra el turno del domingo 18
+        ('A1', 'entrada', '2026-10-14 05:00:00')
+    ]
+    conn.executemany('INSERT INTO attendance_records (employee_id, event_type, timestamp) VALUES (?, ?, ?)', punches)
+    conn.commit()
+    conn.close()
+
+    assert migrate(db_path, MIGRATIONS_DIR)[0] == 10
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT employee_id, timestamp, workday FROM attendance_records ORDER BY id').fetchall()
+    conn.close()
+    assert [row[2] for row in rows] == ['2026-10-13', '2026-10-19', '2026-10-19', '2026-10-18', '2026-10-14']
@@ -0,0 +1,139 @@
+"""
+Temporizadores en memoria con rueda jerárquica (timing wheel)
+Cada temporizador se guarda en la casilla de su vencimiento: programar y cancelar son
+O(1) y cada tick solo procesa la casilla actual, sin recorrer los pendientes ni
+consultar la base de datos. Con el tick por defecto de 1 segundo:
+
+    nivel 0: 60 casillas de 1 segundo   (próximo minuto)
+    nivel 1: 60 casillas de 1 minuto    (próxima hora)
+    nivel 2: 24 casillas de 1 hora      (próximo día)
+
+Al llegar a una casilla de nivel 1 o 2 sus temporizadores bajan al nivel que les
+corresponde (cascada, a lo sumo una vez por nivel). Los vencimientos más lejanos que
+el último nivel esperan en su casilla más lejana y se recolocan al llegar a ella.
+
+Uso:
+    wheel = TimingWheel(on_expire)              # on_expire(clave, datos)
+    wheel.start()
+    wheel.schedule(('T1', 'break_overrun'), vencimiento_epoch, datos)
+    wheel.cancel(('T1', 'break_overrun'))
+"""
+import os
+import threading
+import time
+
+WHEEL_LEVELS = (60, 60, 24)
+
+
+class TimingWheel:
+    def __init__(self, on_expire, tick=None, levels=WHEEL_LEVELS, clock=time.time):
+        self.on_expire = on_expire
+        self.tick = tick if tick is not None else float(os.getenv('TIMER_TICK_SECONDS', '1'))
+        self.levels = levels
+        self.clock = clock
+
+        self._spans = []  # Ticks que cubre una casilla de cada nivel
+        span = 1
+        for size in levels:
+            self._spans.append(span)
+            span *= size
+        self._wheels = [[{} for _ in range(size)] for size in levels]  # casilla: clave -> (tick, datos)
+        self._timers = {}  # clave -> (nivel, casilla)
+        self._now = int(clock() / self.tick)  # Último tick procesado
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.stats = {'scheduled': 0, 'cancelled': 0, 'expired': 0, 'cascaded': 0}
+
+    def __len__(self):
+        return len(self._timers)
+
+    def _place(self, key, due, payload, first):
+        """Guardar en el nivel más bajo cuya casilla se procesa entre first y su vencimiento"""
+        for level, size in enumerate(self.levels):
+            span = self._spans[level]
+            index = due // span
+            if index * span >= first and index - -(-first // span) < size:
+                break
+        else:
+            index = -(-first // span) + size - 1  # Más allá del último nivel: su casilla más lejana
+        slot = index % size
+        self._wheels[level][slot][key] = (due, payload)
+        self._timers[key] = (level, slot)
+
+    def schedule(self, key, deadline, payload=None):
+        """Programar (o reprogramar) el temporizador key para el instante deadline (epoch)"""
+        with self._lock:
+            self._remove(key)
+            due = max(int(deadline / self.tick), self._now + 1)
+            self._place(key, due, payload, self._now + 1)
+            self.stats['scheduled'] += 1
+
+    def cancel(self, key):
+        """Cancelar key; devuelve si estaba pendiente"""
+        with self._lock:
+            if self._remove(key):
+                self.stats['cancelled'] += 1
+                return True
+            return False
+
+    def _remove(self, key):
+        location = self._timers.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        del self._wheels[level][slot][key]
+        return True
+
+    def advance(self, now=None):
+        """Procesar los ticks hasta now y llamar on_expire con los vencidos"""
+        target = int((self.clock() if now is None else now) / self.tick)
+        expired = []
+        with self._lock:
+            while self._now < target:
+                if not self._timers:
+                    self._now = target
+                    break
+                tick = self._now + 1
+                # Niveles superiores primero: lo que baja a un nivel inferior se procesa en este mismo tick
+                for level in range(len(self.levels) - 1, 0, -1):
+                    span = self._spans[level]
+                    if tick % span:
+                        continue
+                    slot = (tick // span) % self.levels[level]
+                    entries = self._wheels[level][slot]
+                    self._wheels[level][slot] = {}
+                    for key, (due, payload) in entries.items():
+                        self._place(key, due, payload, tick)
+                    self.stats['cascaded'] += len(entries)
+
+                slot = tick % self.levels[0]
+                entries = self._wheels[0][slot]
+                self._wheels[0][slot] = {}
+                for key, (due, payload) in entries.items():
+                    del self._timers[key]
+                    expired.append((key, payload))
+                self._now = tick
+
+        for key, payload in expired:
+            self.stats['expired'] += 1
+            try:
+                self.on_expire(key, payload)
+            except Exception as e:
+                print(f"Error en temporizador {key}: {e}")
+        return len(expired)
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            self.advance()
+
+    def stop(self):
+        self._stop.set()
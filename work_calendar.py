@@ -0,0 +1,153 @@
+"""
+Calendario laboral precalculado por mes: horario esperado y festivos
+Para cada regla de schedule_rules.py (departamento y turno) y mes se arma una sola vez
+un MonthCalendar con:
+- expected: (inicio, fin) o None por día del mes; la consulta de un día es un índice
+- work_mask / holiday_mask: un bit por día (bit 0 = día 1) de los días laborables y
+  de los festivos; contar días es popcount y cruzarlos con otros bits es AND/OR
+
+Festivos (tabla holidays, migración 0011): no son laborables para los departamentos
+sin turnos; los turnos (Operativos) trabajan igual y el día queda marcado como festivo
+(daily_summaries.is_holiday).
+
+Los meses se recalculan cuando se recompilan las reglas o cambia el contador
+'holidays' de data_versions (se comprueba en cada renovación del lease, igual que
+'schedule_rules'). Hasta la primera carga no hay festivos.
+"""
+import calendar
+import threading
+from datetime import date, datetime
+
+
+def as_date(day):
+    """date de un date, datetime o 'YYYY-MM-DD[ ...]'"""
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return date.fromisoformat(str(day)[:10])
+
+
+def month_key(day):
+    return f'{day.year:04d}-{day.month:02d}'
+
+
+class MonthCalendar:
+    """Días de un mes para una regla (departamento, turno)"""
+    __slots__ = ('month', 'days', 'expected', 'work_mask', 'holiday_mask')
+
+    def __init__(self, month, rules, holidays):
+        year, month_num = map(int, month.split('-'))
+        first_weekday, self.days = calendar.monthrange(year, month_num)
+        self.month = month
+
+        expected = []
+        work_mask = holiday_mask = 0
+        for index in range(self.days):
+            hours = rules.expected[(first_weekday + index) % 7]
+            if date(year, month_num, index + 1) in holidays:
+                holiday_mask |= 1 << index
+                if rules.shift_type is None:
+                    hours = None
+            if hours:
+                work_mask |= 1 << index
+            expected.append(hours)
+        self.expected = tuple(expected)
+        self.work_mask = work_mask
+        self.holiday_mask = holiday_mask
+
+    def work_days(self, mask=-1):
+        """Días laborables (dentro de mask: p. ej. los días ya transcurridos)"""
+        return (self.work_mask & mask).bit_count()
+
+
+class WorkCalendar:
+    def __init__(self, schedule_rules, get_connection, queries, versions):
+        self.schedule_rules = schedule_rules
+        self.get_connection = get_connection
+        self.queries = queries
+        self.versions = versions
+
+        self.version = None
+        self.holidays = {}  # date -> nombre
+        # (generación de las reglas, {(departamento, turno, 'YYYY-MM'): MonthCalendar})
+        self._months = (None, {})
+        self._lock = threading.Lock()
+
+        self.stats = {'months_built': 0, 'holiday_loads': 0}
+
+    def load(self):
+        """Leer los festivos y descartar los meses calculados; conserva los anteriores si falla"""
+        try:
+            version = self.versions.read(['holidays'])[0][1]
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            try:
+                self.queries.run(cursor, 'holidays.list')
+                holidays = {as_date(day): name for day, name in cursor.fetchall()}
+            finally:
+                conn.close()
+            with self._lock:
+                self.holidays = holidays
+                self._months = (None, {})
+            self.version = version
+            self.stats['holiday_loads'] += 1
+        except Exception as e:
+            print(f"Error cargando festivos: {e}")
+
+    def refresh(self):
+        """Recargar si cambió el contador 'holidays'"""
+        try:
+            version = self.versions.read(['holidays'])[0][1]
+        except Exception as e:
+            print(f"Error leyendo versión de festivos: {e}")
+            return
+        if version != self.version:
+            self.load()
+
+    def month(self, rules, month):
+        """MonthCalendar de unas reglas compiladas para 'YYYY-MM'"""
+        generation, months = self._months
+        if generation != self.schedule_rules.generation:
+            with self._lock:
+                self._months = (self.schedule_rules.generation, {})
+                generation, months = self._months
+        key = (rules.department, rules.shift_type, month)
+        month_calendar = months.get(key)
+        if month_calendar is None:
+            month_calendar = MonthCalendar(month, rules, self.holidays)
+            months[key] = month_calendar
+            self.stats['months_built'] += 1
+        return month_calendar
+
+    def for_department(self, department, month, shift_type=None):
+        return self.month(self.schedule_rules.rules_for(department, shift_type), month)
+
+    def year_masks(self, rules, year):
+        """(work_mask, holiday_mask) del año completo: bit 0 = 1 de enero"""
+        work_mask = holiday_mask = 0
+        offset = 0
+        for month_num in range(1, 13):
+            month_calendar = self.month(rules, f'{year:04d}-{month_num:02d}')
+            work_mask |= month_calendar.work_mask << offset
+            holiday_mask |= month_calendar.holiday_mask << offset
+            offset += month_calendar.days
+        return work_mask, holiday_mask
+
+    def expected_for(self, rules, day):
+        """('HH:MM' inicio, 'HH:MM' fin) o None si day no es laborable para esas reglas"""
+        day = as_date(day)
+        return self.month(rules, month_key(day)).expected[day.day - 1]
+
+    def expected(self, department, day, shift_type=None):
+        return self.expected_for(self.schedule_rules.rules_for(department, shift_type), day)
+
+    def is_work_day(self, department, day, shift_type=None):
+        return self.expected(department, day, shift_type) is not None
+
+    def is_holiday(self, day):
+        return as_date(day) in self.holidays
+
+    def holiday_list(self, year=None):
+        return [{'date': day.isoformat(), 'name': name} for day, name in sorted(self.holidays.items())
+                if year is None or day.year == year]